@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any, Mapping, Optional, Protocol
 
+from app.domain.auth.models import RefreshToken
 from app.domain.user.models import User
 
 
@@ -19,11 +21,27 @@ class UserRepository(Protocol):
         """IDでユーザーを1件取得。見つからなければ None を返す。"""
         ...
 
+    def update_hashed_password(self, user_id: int, hashed_password: str) -> None:
+        """パスワードハッシュだけを差し替える（ハッシュパラメータ更新時の再ハッシュ用）。"""
+        ...
+
+
+class PasswordHasherBusyError(Exception):
+    """パスワードハッシュ処理が混み合っていて、今は受け付けられないことを表す例外。
+
+    PasswordHasher の実装が待ち行列の上限に達したときに送出する。
+    interface 層では 503 + Retry-After にマッピングする想定。
+    """
+
+    def __init__(self, message: str = "Password hasher is busy", retry_after_seconds: int = 1) -> None:
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
 
 class PasswordHasher(Protocol):
     """パスワードハッシュ/検証用のポート
 
-    実装例: Argon2PasswordHasher
+    実装例: Argon2PasswordHasher, PooledPasswordHasher
     """
 
     def hash(self, plain_password: str) -> str:
@@ -34,6 +52,10 @@ class PasswordHasher(Protocol):
         """平文とハッシュを比較し、一致していれば True を返す。"""
         ...
 
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """現在のハッシュパラメータと異なる設定で作られたハッシュなら True を返す。"""
+        ...
+
 
 class TokenProvider(Protocol):
     """アクセストークン（JWT など）の発行・検証を抽象化するポート
@@ -61,3 +83,50 @@ class TokenProvider(Protocol):
         （例: TokenDecodeError）を投げる想定。
         """
         ...
+
+
+class TokenRevocationChecker(Protocol):
+    """ステートレストークン（claims だけで User を復元するモード）の失効判定ポート
+
+    実装例: InMemoryRevocationList（DB から定期的にリフレッシュされるメモリ上の失効リスト）
+    """
+
+    # 失効リストを一度でも読み込めていれば True。False の間は claims を信用せず、DB から User を読む
+    loaded: bool
+
+    def is_revoked(self, user_id: int, version: int) -> bool:
+        """
+        user_id / version のトークンが失効していれば True を返す。
+
+        - ユーザーが非アクティブ
+        - トークン発行後にユーザーの version が上がった（ロール変更など）
+        のいずれかなら失効とみなす。リクエストの処理中に DB へ問い合わせてはいけない。
+        """
+        ...
+
+
+class RefreshTokenRepository(Protocol):
+    """リフレッシュトークンの保存・ローテーション用のポート
+
+    実装例: SqlAlchemyRefreshTokenRepository
+    """
+
+    def add(self, token: RefreshToken) -> RefreshToken:
+        """新しいリフレッシュトークン（ハッシュ）を保存する。"""
+        ...
+
+    def get_by_hash(self, token_hash: str) -> Optional[RefreshToken]:
+        """トークンハッシュで 1 件取得。見つからなければ None を返す。"""
+        ...
+
+    def revoke_if_active(self, token_id: int, revoked_at: datetime) -> bool:
+        """
+        まだ失効していなければ失効させて True を返す。
+
+        同じトークンで同時にリフレッシュされた場合でも、True になるのは 1 回だけ。
+        """
+        ...
+
+    def revoke_family(self, family_id: str, revoked_at: datetime) -> None:
+        """同じ系列のトークンをすべて失効させる（再利用を検知したとき用）。"""
+        ...
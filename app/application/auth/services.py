@@ -1,13 +1,26 @@
 # app/application/auth/services.py
 from __future__ import annotations
 
+import hashlib
+import secrets
+import uuid
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Mapping, Optional
 
+from app.domain.auth.enums import UserRoleName
 from app.domain.user.models import User
 from app.domain.user.errors import InactiveUserError
-from app.domain.auth.models import AuthToken
-
-from app.application.auth.ports import UserRepository, PasswordHasher, TokenProvider
+from app.domain.auth.models import AuthToken, RefreshToken
+
+from app.application.auth.ports import (
+    UserRepository,
+    PasswordHasher,
+    PasswordHasherBusyError,
+    RefreshTokenRepository,
+    TokenProvider,
+    TokenRevocationChecker,
+)
 from app.application.auth.read_models import CurrentUserReadModel
 
 
@@ -23,11 +36,21 @@ class TokenError(Exception):
     pass
 
 
+class RefreshTokenReuseError(TokenError):
+    """ローテーション済みのリフレッシュトークンが再利用された（盗用の疑い）"""
+
+    pass
+
+
 @dataclass(frozen=True)
 class AuthSettings:
     """認証関連の設定値（settings から注入する想定）"""
 
     access_token_expires_minutes: int
+    # True のとき、roles / is_superuser / version をトークンに埋め込み、
+    # get_user_from_token は DB を見ずに claims だけで User を組み立てる
+    stateless_tokens: bool = False
+    refresh_token_expires_days: int = 14
 
 
 """
@@ -45,11 +68,15 @@ class AuthService:
         password_hasher: PasswordHasher,
         token_provider: TokenProvider,
         settings: AuthSettings,
+        revocations: Optional[TokenRevocationChecker] = None,
+        refresh_tokens: Optional[RefreshTokenRepository] = None,
     ) -> None:
         self._user_repo = user_repo
         self._password_hasher = password_hasher
         self._token_provider = token_provider
         self._settings = settings
+        self._revocations = revocations
+        self._refresh_tokens = refresh_tokens
 
     # ==========
     # ログイン
@@ -73,8 +100,22 @@ class AuthService:
         if not user.is_active:
             raise AuthenticationError("Inactive user")
 
+        # 古いコストパラメータのハッシュなら、平文が手元にある今のうちに作り直す
+        self._rehash_if_needed(user, password)
+
         return user
 
+    def _rehash_if_needed(self, user: User, password: str) -> None:
+        if not self._password_hasher.needs_rehash(user.hashed_password):
+            return
+        try:
+            new_hash = self._password_hasher.hash(password)
+        except PasswordHasherBusyError:
+            # 再ハッシュは次回ログインでもよいので、混雑時はログイン自体を優先する
+            return
+        self._user_repo.update_hashed_password(user.id, new_hash)
+        user.hashed_password = new_hash
+
     # ==========
     # アクセストークン発行
     # ==========
@@ -86,18 +127,99 @@ class AuthService:
         payload の構造（"sub" に何を入れるかなど）は infra 側の JwtTokenProvider と合わせる。
         """
 
-        payload = {
+        token_str = self._token_provider.encode(
+            payload=self._build_access_token_payload(user),
+            expires_in_minutes=self._settings.access_token_expires_minutes,
+        )
+
+        refresh_token: Optional[str] = None
+        if self._refresh_tokens is not None:
+            refresh_token = self._issue_refresh_token(user, family_id=uuid.uuid4().hex)
+
+        return AuthToken(access_token=token_str, token_type="bearer", refresh_token=refresh_token)
+
+    def _build_access_token_payload(self, user: User) -> dict[str, Any]:
+        payload: dict[str, Any] = {
             "sub": str(user.id),
             "email": user.email,
-            # 必要に応じて is_superuser や roles も含めてOK
         }
+        if self._settings.stateless_tokens:
+            # ステートレスモード: /me や認可に必要な情報を claims に載せておく
+            payload.update(
+                {
+                    "name": user.full_name,
+                    "tz": user.timezone,
+                    "roles": [UserRoleName(role).value for role in user.roles],
+                    "is_superuser": user.is_superuser,
+                    "ver": user.version,
+                    # User.created_at / updated_at もトークンの発行時刻ではなく実際の値を返せるように
+                    "created_at": int(user.created_at.timestamp()),
+                    "updated_at": int(user.updated_at.timestamp()),
+                }
+            )
+        return payload
 
-        token_str = self._token_provider.encode(
-            payload=payload,
+    # ===================
+    # リフレッシュトークンでアクセストークンを再発行する
+    # ===================
+
+    def refresh_access_token(self, refresh_token: str) -> AuthToken:
+        """
+        リフレッシュトークンを検証し、新しいアクセストークン + ローテーション後のリフレッシュトークンを返す。
+
+        - パスワード検証（Argon2）は行わない
+        - 使ったリフレッシュトークンは失効させ、同じ系列で新しいものを発行する
+        - 失効済みトークンが再び使われたら、その系列ごと失効させて RefreshTokenReuseError
+        - 不正 / 期限切れ → TokenError、ユーザー不在 / 非アクティブ → AuthenticationError
+        """
+
+        if self._refresh_tokens is None:
+            raise TokenError("Refresh tokens are not enabled")
+
+        now = datetime.now(timezone.utc)
+        stored = self._refresh_tokens.get_by_hash(self._hash_refresh_token(refresh_token))
+        if stored is None:
+            raise TokenError("Invalid refresh token")
+
+        if stored.revoked_at is not None or not self._refresh_tokens.revoke_if_active(stored.id, now):
+            # 既にローテーション済みのトークン → 盗まれた可能性があるので系列ごと無効化
+            self._refresh_tokens.revoke_family(stored.family_id, now)
+            raise RefreshTokenReuseError("Refresh token reuse detected")
+
+        if stored.is_expired(now):
+            raise TokenError("Refresh token expired")
+
+        user = self._user_repo.get_by_id(stored.user_id)
+        if user is None or not user.is_active:
+            self._refresh_tokens.revoke_family(stored.family_id, now)
+            raise AuthenticationError("Inactive user")
+
+        access_token = self._token_provider.encode(
+            payload=self._build_access_token_payload(user),
             expires_in_minutes=self._settings.access_token_expires_minutes,
         )
+        new_refresh_token = self._issue_refresh_token(user, family_id=stored.family_id)
+        return AuthToken(access_token=access_token, token_type="bearer", refresh_token=new_refresh_token)
+
+    def _issue_refresh_token(self, user: User, family_id: str) -> str:
+        # 256bit のランダム値なので、保存は低コストな SHA-256 で十分（Argon2 は不要）
+        raw = secrets.token_urlsafe(32)
+        now = datetime.now(timezone.utc)
+        self._refresh_tokens.add(
+            RefreshToken(
+                id=None,
+                user_id=user.id,
+                token_hash=self._hash_refresh_token(raw),
+                family_id=family_id,
+                expires_at=now + timedelta(days=self._settings.refresh_token_expires_days),
+                created_at=now,
+            )
+        )
+        return raw
 
-        return AuthToken(access_token=token_str, token_type="bearer")
+    @staticmethod
+    def _hash_refresh_token(raw: str) -> str:
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
     # ===================
     # トークンからユーザーを復元する
@@ -126,7 +248,21 @@ class AuthService:
         except (TypeError, ValueError):
             raise TokenError("Token 'sub' must be an integer string")
 
+        # 失効リストがまだ読み込めていない間（起動直後・初回の読み込みに失敗したとき）は、
+        # 無効化されたユーザーを通さないよう DB から読む。
+        # created_at を持たない（この claims を載せる前に発行された）トークンも、期限が切れるまで DB から読む
+        if (
+            self._settings.stateless_tokens
+            and self._revocations is not None
+            and self._revocations.loaded
+            and "ver" in payload
+            and "created_at" in payload
+        ):
+            return self._build_user_from_claims(user_id, payload)
+
         user = self._user_repo.get_by_id(user_id)
+        if user is None:
+            raise AuthenticationError("User not found")
         # ★ アクティブかどうかのルールはドメインに委譲する
         try:
             user.ensure_active()
@@ -137,6 +273,38 @@ class AuthService:
 
         return user
 
+    def _build_user_from_claims(self, user_id: int, payload: Mapping[str, Any]) -> User:
+        """
+        ステートレスモード: トークンの claims だけで User を組み立てる（DB アクセスなし）。
+
+        - 失効判定は TokenRevocationChecker（メモリ上の失効リスト）に委ねる
+        - hashed_password は claims に含めないので空文字になる。パスワード操作には使わないこと
+        """
+        try:
+            version = int(payload["ver"])
+            roles = [UserRoleName(role) for role in payload.get("roles", [])]
+            created_at = datetime.fromtimestamp(int(payload["created_at"]), tz=timezone.utc)
+            updated_at = datetime.fromtimestamp(int(payload.get("updated_at", payload["created_at"])), tz=timezone.utc)
+        except (TypeError, ValueError) as exc:
+            raise TokenError("Invalid token claims") from exc
+
+        if self._revocations.is_revoked(user_id, version):
+            raise AuthenticationError("Token revoked")
+
+        return User(
+            id=user_id,
+            email=str(payload.get("email", "")),
+            full_name=str(payload.get("name") or payload.get("email", "")),
+            hashed_password="",
+            is_active=True,  # 非アクティブなユーザーは失効リストに載っている
+            is_superuser=bool(payload.get("is_superuser", False)),
+            timezone=str(payload.get("tz", "Asia/Tokyo")),
+            roles=roles,
+            created_at=created_at,
+            updated_at=updated_at,
+            version=version,
+        )
+
     # =============================
     # /me 用の ReadModel 生成ヘルパー
     # =============================
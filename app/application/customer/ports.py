@@ -8,7 +8,12 @@ from __future__ import annotations
 
 from typing import Protocol, Sequence, Optional
 
-from app.application.customer.read_models import CustomerSummaryReadModel, CustomerDetailReadModel
+from app.application.customer.read_models import (
+    CustomerSummaryReadModel,
+    CustomerDetailReadModel,
+    TimelineCursor,
+    TimelineEntryReadModel,
+)
 from app.application.customer.query_filter import CustomerFilter
 from app.domain.user.models import User
 from app.domain.customer.models import Customer
@@ -63,6 +68,24 @@ class CustomerQueryRepository(Protocol):
         ...
 
 
+class CustomerTimelineRepository(Protocol):
+    """顧客タイムライン（活動履歴 + メモ、アーカイブ済みの分を含む）を読むリポジトリ。"""
+
+    def fetch_customer_timeline(
+        self,
+        current_user: User,
+        customer_id: int,
+        before: Optional[TimelineCursor],
+        limit: int,
+    ) -> Optional[list[TimelineEntryReadModel]]:
+        """before の位置より後ろのエントリを (created_at, kind, id) の降順に最大 limit 件返す。
+
+        戻り値:
+            顧客が存在しなければ None
+        """
+        ...
+
+
 class CustomerRepository(Protocol):
     """顧客の書き込み系ユースケースで利用するリポジトリ（作成・更新など）。"""
 
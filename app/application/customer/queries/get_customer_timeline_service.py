@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from app.application.customer.read_models import CustomerTimelineReadModel, TimelineCursor
+from app.domain.user.models import User
+from app.domain.user.errors import InactiveUserError
+from app.application.customer.ports import CustomerTimelineRepository
+from app.application.common.errors import AuthorizationError, NotFoundError
+
+
+@dataclass
+class GetCustomerTimelineQueryService:
+    """顧客タイムライン（活動履歴 + メモを新しい順）を提供するサービス。"""
+
+    customer_timeline_repo: CustomerTimelineRepository
+
+    def get_customer_timeline(
+        self,
+        current_user: User,
+        customer_id: int,
+        before: Optional[TimelineCursor] = None,
+        limit: int = 20,
+    ) -> CustomerTimelineReadModel:
+        """顧客タイムラインを取得するユースケース。
+        - current_user が閲覧可能な顧客のみが対象
+        - 保持期間を過ぎてアーカイブされた活動履歴・メモも、さかのぼれば返す（詳細画面より遅い経路）
+        """
+        try:
+            current_user.ensure_active()
+        except InactiveUserError as exc:
+            raise AuthorizationError("Inactive user") from exc
+
+        entries = self.customer_timeline_repo.fetch_customer_timeline(
+            current_user=current_user,
+            customer_id=customer_id,
+            before=before,
+            limit=limit,
+        )
+        if entries is None:
+            raise NotFoundError(f"Customer {customer_id} not found")
+
+        # limit 件そろっていれば、最後の 1 件より後ろに続きがあるかもしれない
+        # （日時だけだと同じ日時のエントリを飛ばすので、(created_at, kind, id) の位置で返す）
+        last = entries[-1] if len(entries) == limit else None
+        next_before = TimelineCursor(last.created_at, last.kind, last.id) if last is not None else None
+        return CustomerTimelineReadModel(customer_id=customer_id, entries=entries, next_before=next_before)
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
@@ -14,9 +16,11 @@ Description:
     すべて「出力専用 DTO（ReadModel）」をここに集約
 
     - CustomerSummaryReadModel:
-        顧客一覧の 1行分（id, name, email, shop_name, visit_count, …）
+        顧客一覧の 1行分（id, name, email, shop_name, visit_count, 受注・商談金額の集計, …）
     - CustomerListResult:
         ページング情報付きの全体結果（total_count, page, page_size, customer_summaries）
+    - CustomerTimelineReadModel:
+        顧客の活動履歴・メモを新しい順に並べたタイムライン（アーカイブ済みの分も含む）
 
 Point:
     - 中身は dataclass だけ（ロジックは書かない）。
@@ -30,7 +34,7 @@ class CustomerSummaryReadModel:
     """顧客サマリーのReadモデル"""
 
     id: int
-    email: str
+    email: Optional[str]  # customers.email は NULL 可（外部取り込みの顧客など）
     name: str
     status: CustomerStatus
     shop_id: int
@@ -40,6 +44,10 @@ class CustomerSummaryReadModel:
     visit_count: int
     last_visit_at: Optional[datetime]
     created_at: datetime
+    # 顧客ごとの商談金額の集計（customer_value_aggregates。商談の変更時に差分で更新される）
+    lifetime_value: float = 0.0
+    sales_last_365d: float = 0.0
+    open_pipeline_amount: float = 0.0
 
 
 @dataclass
@@ -123,3 +131,46 @@ class CustomerBasicReadModel:
     assigned_to_user_id: Optional[int]
     created_at: datetime
     updated_at: datetime
+
+
+@dataclass
+class TimelineEntryReadModel:
+    """顧客タイムラインの 1 件（活動履歴 or メモ）。
+
+    - kind: "activity" / "note"
+    - archived: コールドアーカイブから読んだ行なら True
+    """
+
+    kind: str
+    id: int
+    activity_type: Optional[ActivityType]
+    subject: Optional[str]
+    body: Optional[str]
+    created_by_user_id: int
+    created_at: datetime
+    archived: bool
+
+
+@dataclass(frozen=True)
+class TimelineCursor:
+    """タイムラインのページ位置（この位置より後ろ = 古いエントリを返す）。
+
+    - エントリは (created_at, kind, id) の降順に並ぶ。同じ日時のエントリ（一括取り込みなど）もページをまたいで欠けない
+    - kind / id が None なら、created_at より前のエントリすべて（日時だけを指定した場合）
+    """
+
+    created_at: datetime
+    kind: Optional[str] = None
+    id: Optional[int] = None
+
+
+@dataclass
+class CustomerTimelineReadModel:
+    """顧客タイムラインのReadモデル
+
+    - next_before: 次のページを取るときに before に渡す位置（最後のエントリ。これ以上なければ None）
+    """
+
+    customer_id: int
+    entries: list[TimelineEntryReadModel]
+    next_before: Optional[TimelineCursor]
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+# 書き込み系ユースケースの「入力 DTO」をここに集約
+
+
+@dataclass
+class CreateReservationInput:
+    shop_id: int
+    customer_id: int
+    start_datetime: datetime
+    end_datetime: datetime
+    memo: Optional[str] = None
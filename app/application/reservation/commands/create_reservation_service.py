@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional
+
+from app.application.common.errors import AuthorizationError, NotFoundError
+from app.application.reservation.command_inputs import CreateReservationInput
+from app.application.reservation.errors import InvalidReservationInputError, ReservationConflictError
+from app.application.reservation.ports import ReservationRepository, ReservationSchedule
+from app.application.reservation.read_models import ReservationReadModel
+from app.domain.reservation.errors import ReservationValidationError
+from app.domain.reservation.models import Reservation
+from app.domain.user.errors import InactiveUserError
+from app.domain.user.models import User
+
+"""
+Title: 「予約作成ユースケースそのもの（処理の本体）を書くファイル」
+
+Point:
+    - 重なり判定はまず ReservationSchedule（メモリ上のインデックス）に聞く。重なっていればここで 409 にして DB には行かない。
+    - 通ったものは DB でもう一度だけ確認する（別プロセスのワーカーが作った直後の予約はインデックスにまだ載っていないため）。
+      こちらは start_datetime の索引で範囲を絞った数行の読み取りで、テーブルの走査ではない。
+    - DB での確認の前に店舗のロックを取る（lock_shop）。同じ店舗への同時の作成は確認と INSERT が直列になり、
+      二重予約にならない（ロックは commit / rollback で外れる）。
+"""
+
+
+@dataclass
+class CreateReservationCommandService:
+    reservation_repo: ReservationRepository
+    schedule: ReservationSchedule
+    max_duration: Optional[timedelta] = None
+
+    def create_reservation(
+        self,
+        current_user: User,
+        data: CreateReservationInput,
+    ) -> ReservationReadModel:
+        """新規予約を作成するユースケース。"""
+
+        # 認可チェック（共通ルール：非アクティブユーザーは操作不可）
+        try:
+            current_user.ensure_active()
+        except InactiveUserError as exc:
+            raise AuthorizationError("Inactive user") from exc
+
+        # 1. ドメインルールに従って Reservation を生成（日時は UTC にそろう）
+        try:
+            reservation = Reservation.create(
+                shop_id=data.shop_id,
+                customer_id=data.customer_id,
+                start_datetime=data.start_datetime,
+                end_datetime=data.end_datetime,
+                memo=data.memo,
+                max_duration=self.max_duration,
+            )
+        except ReservationValidationError as exc:
+            raise InvalidReservationInputError(str(exc)) from exc
+
+        # 2. 顧客の存在と所属店舗のチェック（顧客がいれば店舗もある）
+        customer_shop_id = self.reservation_repo.get_customer_shop_id(data.customer_id)
+        if customer_shop_id is None:
+            raise NotFoundError(f"Customer not found: id={data.customer_id}")
+        if customer_shop_id != data.shop_id:
+            raise InvalidReservationInputError("顧客の所属店舗と予約先の店舗が異なります。")
+
+        # 3. 重なりチェック（インデックス → 店舗のロックを取ってから DB の順）
+        start, end = reservation.start_datetime, reservation.end_datetime
+        if self.schedule.overlaps(data.shop_id, start, end):
+            raise ReservationConflictError("指定した時間帯には既に予約があります。")
+        self.reservation_repo.lock_shop(data.shop_id)
+        if self.reservation_repo.has_overlap(data.shop_id, start, end):
+            raise ReservationConflictError("指定した時間帯には既に予約があります。")
+
+        # 4. 永続化し、インデックスにも反映（反映はトランザクションの確定後）
+        saved = self.reservation_repo.create(reservation)
+        self.schedule.record(saved)
+
+        return ReservationReadModel(
+            id=saved.id,
+            shop_id=saved.shop_id,
+            customer_id=saved.customer_id,
+            status=saved.status,
+            start_datetime=saved.start_datetime,
+            end_datetime=saved.end_datetime,
+            memo=saved.memo,
+            created_at=saved.created_at,
+        )
@@ -0,0 +1,15 @@
+# =========================
+# アプリケーション層の例外
+# =========================
+
+
+class ReservationConflictError(Exception):
+    """同じ店舗の既存の予約と時間が重なっている（HTTP 409 相当）。"""
+
+    pass
+
+
+class InvalidReservationInputError(Exception):
+    """ドメインのバリデーションに反した入力（HTTP 400 相当）。"""
+
+    pass
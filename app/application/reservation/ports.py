@@ -0,0 +1,161 @@
+# app/application/reservation/ports.py
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Optional, Protocol, Sequence
+
+from app.application.reservation.read_models import ReservationReadModel
+from app.domain.reservation.enums import ReservationStatus
+from app.domain.reservation.models import Reservation
+
+"""
+Title: 「予約ユースケースが外の世界（DB・メモリ上のインデックス）に出す要求の口（Port）」
+
+Point:
+    - ReservationRepository: 予約の永続化と、DB を正とした重なりの最終確認。
+    - ReservationQueryRepository: 店舗・期間で絞った予約一覧。
+    - ReservationSchedule: 店舗ごとの「埋まっている時間帯」への問い合わせ。
+      重なり判定・空き枠探しはここに聞く（実装はメモリ上のインデックスで、テーブルを走査しない）。
+    - ReservationCalendarRepository / ReservationCalendarCache: カレンダーの枠ごとの件数と、終わった日の件数のキャッシュ。
+    - ReservationCohortRepository / ReservationCohortCache: 月次コホートリテンションの件数と、コホートごとのキャッシュ。
+    - 予約の時間帯は start <= t < end の半開区間で扱う（10:00-11:00 と 11:00-12:00 は重ならない）。
+"""
+
+
+class ReservationRepository(Protocol):
+    """予約の書き込み系ユースケースで利用するリポジトリ。"""
+
+    def get_customer_shop_id(self, customer_id: int) -> Optional[int]:
+        """顧客の所属店舗 ID を返す。顧客が存在しなければ None。"""
+        ...
+
+    def lock_shop(self, shop_id: int) -> None:
+        """店舗の予約の書き込みをトランザクションの終わりまで直列化する（has_overlap → create の前に呼ぶ）。"""
+        ...
+
+    def has_overlap(self, shop_id: int, start: datetime, end: datetime) -> bool:
+        """キャンセル以外の既存予約に [start, end) と重なるものがあるかを DB で確認する。"""
+        ...
+
+    def create(self, reservation: Reservation) -> Reservation:
+        """新規予約を永続化し、id などが確定した Reservation を返す。"""
+        ...
+
+
+class ReservationQueryRepository(Protocol):
+    """予約一覧を読むリポジトリ。"""
+
+    def fetch_reservations(
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        include_canceled: bool,
+        limit: int,
+    ) -> list[ReservationReadModel]:
+        """start <= start_datetime < end の予約を開始日時の昇順に最大 limit 件返す。"""
+        ...
+
+
+class ReservationSchedule(Protocol):
+    """店舗ごとの、これから先の埋まっている時間帯。"""
+
+    def overlaps(self, shop_id: int, start: datetime, end: datetime) -> bool:
+        """[start, end) が既存の予約と重なるか。"""
+        ...
+
+    def next_free_start(
+        self,
+        shop_id: int,
+        after: datetime,
+        duration: timedelta,
+        until: Optional[datetime] = None,
+    ) -> Optional[datetime]:
+        """after 以降で duration の予約が入る最初の開始日時（until までに収まらなければ None）。"""
+        ...
+
+    def free_slots(
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        min_duration: timedelta,
+    ) -> list[tuple[datetime, datetime]]:
+        """[start, end) のうち予約の入っていない、min_duration 以上の時間帯を古い順に返す。"""
+        ...
+
+    def record(self, reservation: Reservation) -> None:
+        """作成した予約を反映する（実装はトランザクションの確定後に反映する）。"""
+        ...
+
+
+class ReservationCalendarRepository(Protocol):
+    """カレンダー用に、枠ごとの予約件数を数えるリポジトリ。"""
+
+    def count_by_slot(
+        self,
+        shop_id: int,
+        slot_edges: Sequence[datetime],
+    ) -> list[dict[ReservationStatus, int]]:
+        """slot_edges[i] <= start_datetime < slot_edges[i + 1] の予約をステータス別に数える。
+
+        戻り値:
+            len(slot_edges) - 1 個の {ステータス: 件数}（件数 0 のステータスも入る）
+        """
+        ...
+
+
+class ReservationCalendarCache(Protocol):
+    """終わった日のカレンダー（1 日分の枠ごとの件数）のキャッシュ。"""
+
+    def get(
+        self, shop_id: int, timezone: str, day: date, slot_minutes: int
+    ) -> Optional[list[dict[ReservationStatus, int]]]:
+        ...
+
+    def put(
+        self, shop_id: int, timezone: str, day: date, slot_minutes: int, counts: list[dict[ReservationStatus, int]]
+    ) -> None:
+        ...
+
+
+# (コホートの顧客数, [登録月から k か月後に来店した顧客数 ...])
+CohortCounts = tuple[int, list[int]]
+
+
+class ReservationCohortRepository(Protocol):
+    """月次コホートリテンション用に、登録月ごとの顧客数と来店した顧客数を数えるリポジトリ。"""
+
+    def count_cohorts(
+        self,
+        shop_id: int,
+        month_edges: Sequence[datetime],
+        first_cohort: int,
+    ) -> list[CohortCounts]:
+        """month_edges（月の境目、UTC）で区切った月のうち、first_cohort 番目以降の各月に登録した顧客を数える。
+
+        来店は来店済み / 会計済みの予約の開始日時で数え、同じ顧客の同じ月の来店は 1 回とする。
+        戻り値の i 番目は first_cohort + i 番目の月のコホートで、来店数のリストは登録月から最後の月まで。
+        """
+        ...
+
+
+class ReservationCohortCache(Protocol):
+    """コホート 1 行分（顧客数と各月の来店した顧客数）のキャッシュ。"""
+
+    def get(self, shop_id: int, timezone: str, cohort_month: date, through_month: date) -> Optional[CohortCounts]:
+        """through_month までの件数を持っていれば返す。"""
+        ...
+
+    def put(
+        self,
+        shop_id: int,
+        timezone: str,
+        cohort_month: date,
+        through_month: date,
+        cohort_start: datetime,
+        cohort_end: datetime,
+        counts: CohortCounts,
+    ) -> None:
+        """cohort_start <= 登録日時 < cohort_end の顧客の、through_month までの件数を入れる。"""
+        ...
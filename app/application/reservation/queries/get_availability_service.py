@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from app.application.common.errors import AuthorizationError
+from app.application.reservation.errors import InvalidReservationInputError
+from app.application.reservation.ports import ReservationSchedule
+from app.application.reservation.read_models import AvailabilityReadModel, FreeSlotReadModel
+from app.domain.user.errors import InactiveUserError
+from app.domain.user.models import User
+
+
+@dataclass
+class GetAvailabilityQueryService:
+    """店舗の空き枠を提供するサービス（ReservationSchedule だけを見て、DB の予約テーブルは走査しない）。"""
+
+    schedule: ReservationSchedule
+    max_window: timedelta = timedelta(days=31)
+
+    def get_availability(
+        self,
+        current_user: User,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        duration_minutes: int,
+    ) -> AvailabilityReadModel:
+        """空き枠を取得するユースケース。
+        - 過去の時間帯は空きとして返さない（期間の先頭は現在時刻に切り上げる）
+        - 営業時間は扱わない（予約の入っていない時間帯をそのまま返す）
+        """
+        try:
+            current_user.ensure_active()
+        except InactiveUserError as exc:
+            raise AuthorizationError("Inactive user") from exc
+
+        if start.tzinfo is None or end.tzinfo is None:
+            raise InvalidReservationInputError("start / end にはタイムゾーンを指定してください。")
+        if end <= start:
+            raise InvalidReservationInputError("end は start より後にしてください。")
+        if end - start > self.max_window:
+            raise InvalidReservationInputError(f"期間は {self.max_window.days} 日以内にしてください。")
+
+        start = max(start.astimezone(timezone.utc), datetime.now(timezone.utc))
+        end = end.astimezone(timezone.utc)
+        duration = timedelta(minutes=duration_minutes)
+
+        free_slots = (
+            self.schedule.free_slots(shop_id, start, end, min_duration=duration) if start < end else []
+        )
+        return AvailabilityReadModel(
+            shop_id=shop_id,
+            start=start,
+            end=end,
+            duration_minutes=duration_minutes,
+            free_slots=[FreeSlotReadModel(start=slot_start, end=slot_end) for slot_start, slot_end in free_slots],
+            next_free_start=(
+                free_slots[0][0] if free_slots else self.schedule.next_free_start(shop_id, start, duration)
+            ),
+        )
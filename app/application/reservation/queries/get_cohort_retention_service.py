@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from typing import Optional
+
+from app.application.common.errors import AuthorizationError
+from app.application.reservation.errors import InvalidReservationInputError
+from app.application.reservation.ports import CohortCounts, ReservationCohortCache, ReservationCohortRepository
+from app.application.reservation.queries.get_reservation_calendar_service import resolve_zone
+from app.application.reservation.read_models import CohortRetentionReadModel, CohortRowReadModel
+from app.domain.user.errors import InactiveUserError
+from app.domain.user.models import User
+
+"""
+Title: 「店舗の月次コホートリテンション（登録月ごとの顧客が、その後の各月に来店した割合）を返すユースケース」
+
+Point:
+    - 月はユーザーのタイムゾーン（User.timezone）で区切る。start_month から months か月分を登録月（コホート）とし、
+      来店も同じ months か月の範囲で数える（コホートごとに登録月から最後の月まで）。
+    - コホートごとの件数はキャッシュから返す。キャッシュにないコホートは、最初のものから最後の月までを
+      1 回だけリポジトリに問い合わせる（コホートごとに問い合わせない）。
+    - キャッシュは来店の記録・顧客の追加で、その顧客のコホートだけ捨てられる（実装側の責務）。
+"""
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _rates(counts: CohortCounts) -> list[float]:
+    customers, retained = counts
+    return [round(count / customers, 4) if customers else 0.0 for count in retained]
+
+
+@dataclass
+class GetCohortRetentionQueryService:
+    """月次コホートリテンションを提供するサービス。"""
+
+    cohort_repo: ReservationCohortRepository
+    cache: Optional[ReservationCohortCache] = None
+    max_months: int = 36
+
+    def get_cohort_retention(
+        self,
+        current_user: User,
+        shop_id: int,
+        start_month: date,
+        months: int = 12,
+    ) -> CohortRetentionReadModel:
+        """コホートリテンションを取得するユースケース（start_month から months か月分）。"""
+        try:
+            current_user.ensure_active()
+        except InactiveUserError as exc:
+            raise AuthorizationError("Inactive user") from exc
+
+        if not 1 <= months <= self.max_months:
+            raise InvalidReservationInputError(f"months は 1 以上 {self.max_months} 以下にしてください。")
+
+        zone_name, zone = resolve_zone(current_user.timezone)
+        first_month = start_month.replace(day=1)
+        month_starts = [add_months(first_month, i) for i in range(months + 1)]
+        edges = [datetime.combine(month, time(0), tzinfo=zone).astimezone(timezone.utc) for month in month_starts]
+        through_month = month_starts[-2]
+
+        # 1. キャッシュにあるコホート
+        counts_by_cohort: dict[int, CohortCounts] = {}
+        if self.cache is not None:
+            for i in range(months):
+                cached = self.cache.get(shop_id, zone_name, month_starts[i], through_month)
+                if cached is not None:
+                    counts_by_cohort[i] = cached
+
+        # 2. 残りは最初に欠けているコホートから最後の月までを 1 回で数える
+        missing = [i for i in range(months) if i not in counts_by_cohort]
+        if missing:
+            counted = self.cohort_repo.count_cohorts(shop_id, edges, missing[0])
+            for offset, counts in enumerate(counted):
+                i = missing[0] + offset
+                counts_by_cohort[i] = counts
+                if self.cache is not None:
+                    self.cache.put(
+                        shop_id, zone_name, month_starts[i], through_month, edges[i], edges[i + 1], counts
+                    )
+
+        return CohortRetentionReadModel(
+            shop_id=shop_id,
+            timezone=zone_name,
+            start_month=first_month,
+            months=months,
+            cohorts=[
+                CohortRowReadModel(
+                    cohort_month=month_starts[i],
+                    customers=counts_by_cohort[i][0],
+                    retained=counts_by_cohort[i][1],
+                    retention_rates=_rates(counts_by_cohort[i]),
+                )
+                for i in range(months)
+            ],
+        )
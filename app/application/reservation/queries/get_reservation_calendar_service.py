@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.application.common.errors import AuthorizationError
+from app.application.reservation.errors import InvalidReservationInputError
+from app.application.reservation.ports import ReservationCalendarCache, ReservationCalendarRepository
+from app.application.reservation.read_models import (
+    CalendarDayReadModel,
+    CalendarSlotReadModel,
+    ReservationCalendarReadModel,
+)
+from app.domain.reservation.enums import ReservationStatus
+from app.domain.user.errors import InactiveUserError
+from app.domain.user.models import User
+
+"""
+Title: 「店舗の日・週カレンダー（枠ごと・ステータス別の予約件数）を返すユースケース」
+
+Point:
+    - 枠はユーザーのタイムゾーン（User.timezone）の壁時計で区切る。夏時間の切り替え日は枠の長さが変わる。
+    - 予約は開始日時の入っている枠に数える。
+    - 期間中のキャッシュにない日をまとめて 1 回だけリポジトリに問い合わせる（枠ごとに問い合わせない）。
+    - 昨日以前（ユーザーのタイムゾーンで）の日は終わっていて件数が変わらないので、1 日単位でキャッシュする。
+"""
+
+DAY_MINUTES = 24 * 60
+
+
+def resolve_zone(name: str) -> tuple[str, ZoneInfo]:
+    """ユーザーのタイムゾーン名から (使う名前, ZoneInfo) を返す（コホートリテンションでも使う）。"""
+    try:
+        return name, ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        # 不正なタイムゾーンが入っているユーザーでも画面は出す（UTC で区切る）
+        return "UTC", ZoneInfo("UTC")
+
+
+def _day_edges(day: date, zone: ZoneInfo, slot_minutes: int) -> list[datetime]:
+    """day の 0 時から翌日 0 時までの枠の境目（壁時計で slot_minutes ごと、UTC）。"""
+    midnight = datetime.combine(day, time(0), tzinfo=zone)
+    edges = [
+        (midnight + timedelta(minutes=minute)).astimezone(timezone.utc)
+        for minute in range(0, DAY_MINUTES + 1, slot_minutes)
+    ]
+    # 夏時間の開始で存在しない壁時計の時刻（例: 2:00〜2:59）は、次に存在する境目にそろえる（その枠は長さ 0 になる）
+    for i in range(len(edges) - 2, -1, -1):
+        edges[i] = min(edges[i], edges[i + 1])
+    return edges
+
+
+def _totals(counts: list[dict[ReservationStatus, int]]) -> dict[ReservationStatus, int]:
+    return {status: sum(slot[status] for slot in counts) for status in ReservationStatus}
+
+
+@dataclass
+class GetReservationCalendarQueryService:
+    """店舗の日・週カレンダーを提供するサービス。"""
+
+    calendar_repo: ReservationCalendarRepository
+    cache: Optional[ReservationCalendarCache] = None
+
+    def get_calendar(
+        self,
+        current_user: User,
+        shop_id: int,
+        start_date: date,
+        days: int = 1,
+        slot_minutes: int = 30,
+    ) -> ReservationCalendarReadModel:
+        """カレンダーを取得するユースケース（start_date から days 日分）。"""
+        try:
+            current_user.ensure_active()
+        except InactiveUserError as exc:
+            raise AuthorizationError("Inactive user") from exc
+
+        if slot_minutes <= 0 or DAY_MINUTES % slot_minutes != 0:
+            raise InvalidReservationInputError("slot_minutes は 1 日（1440 分）を割り切れる長さにしてください。")
+
+        zone_name, zone = resolve_zone(current_user.timezone)
+        today = datetime.now(zone).date()
+        dates = [start_date + timedelta(days=i) for i in range(days)]
+
+        # 1. 終わった日はキャッシュから
+        counts_by_day: dict[date, list[dict[ReservationStatus, int]]] = {}
+        if self.cache is not None:
+            for day in dates:
+                if day < today:
+                    cached = self.cache.get(shop_id, zone_name, day, slot_minutes)
+                    if cached is not None:
+                        counts_by_day[day] = cached
+
+        # 2. 残りは最初の日から最後の日までを 1 回で数える（間にキャッシュ済みの日があっても一緒に数える）
+        missing = [day for day in dates if day not in counts_by_day]
+        if missing:
+            span = [missing[0] + timedelta(days=i) for i in range((missing[-1] - missing[0]).days + 1)]
+            slots_per_day = DAY_MINUTES // slot_minutes
+            edges: list[datetime] = []
+            for day in span:
+                edges.extend(_day_edges(day, zone, slot_minutes)[: slots_per_day])
+            edges.append(_day_edges(span[-1], zone, slot_minutes)[-1])
+
+            counts = self.calendar_repo.count_by_slot(shop_id, edges)
+            for i, day in enumerate(span):
+                day_counts = counts[i * slots_per_day : (i + 1) * slots_per_day]
+                counts_by_day.setdefault(day, day_counts)
+                if self.cache is not None and day < today:
+                    self.cache.put(shop_id, zone_name, day, slot_minutes, day_counts)
+
+        # 3. 枠の開始・終了はユーザーのタイムゾーンで返す
+        result_days = []
+        for day in dates:
+            day_counts = counts_by_day[day]
+            edges = [edge.astimezone(zone) for edge in _day_edges(day, zone, slot_minutes)]
+            result_days.append(
+                CalendarDayReadModel(
+                    date=day,
+                    slots=[
+                        CalendarSlotReadModel(start=edges[i], end=edges[i + 1], counts=slot)
+                        for i, slot in enumerate(day_counts)
+                    ],
+                    totals=_totals(day_counts),
+                )
+            )
+        return ReservationCalendarReadModel(
+            shop_id=shop_id, timezone=zone_name, slot_minutes=slot_minutes, days=result_days
+        )
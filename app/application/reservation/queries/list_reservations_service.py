@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from app.application.common.errors import AuthorizationError
+from app.application.reservation.errors import InvalidReservationInputError
+from app.application.reservation.ports import ReservationQueryRepository
+from app.application.reservation.read_models import ReservationListResult
+from app.domain.user.errors import InactiveUserError
+from app.domain.user.models import User
+
+
+@dataclass
+class ListReservationsQueryService:
+    """店舗・期間で絞った予約一覧を提供するサービス。"""
+
+    reservation_query_repo: ReservationQueryRepository
+    max_window: timedelta = timedelta(days=31)
+
+    def list_reservations(
+        self,
+        current_user: User,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        include_canceled: bool = False,
+        limit: int = 100,
+    ) -> ReservationListResult:
+        """予約一覧を取得するユースケース。
+        - 過去の期間も指定できる（アーカイブ済みのパーティションからも読む）
+        - 期間は max_window まで（カレンダー 1 か月分を想定）
+        """
+        try:
+            current_user.ensure_active()
+        except InactiveUserError as exc:
+            raise AuthorizationError("Inactive user") from exc
+
+        if end <= start:
+            raise InvalidReservationInputError("end は start より後にしてください。")
+        if end - start > self.max_window:
+            raise InvalidReservationInputError(f"期間は {self.max_window.days} 日以内にしてください。")
+
+        reservations = self.reservation_query_repo.fetch_reservations(
+            shop_id=shop_id,
+            start=start,
+            end=end,
+            include_canceled=include_canceled,
+            limit=limit,
+        )
+        return ReservationListResult(shop_id=shop_id, start=start, end=end, reservations=reservations)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+from app.domain.reservation.enums import ReservationStatus
+
+"""
+Title: 予約ユースケースの “結果の形（データ構造）” だけを定義するファイル
+
+Description:
+    - ReservationReadModel:
+        予約 1 件（作成結果・一覧の 1 行）
+    - ReservationListResult:
+        店舗・期間で絞った予約一覧
+    - AvailabilityReadModel:
+        指定した期間の空き枠と、期間の先頭以降で最初に取れる枠
+    - ReservationCalendarReadModel:
+        店舗の日・週カレンダー（ユーザーのタイムゾーンで区切った枠ごとの、ステータス別の予約件数）
+    - CohortRetentionReadModel:
+        登録月ごとの顧客のコホートが、その後の各月に来店した割合（リテンション）
+
+Point:
+    - 中身は dataclass だけ（ロジックは書かない）。
+"""
+
+
+@dataclass
+class ReservationReadModel:
+    """予約 1 件のReadモデル"""
+
+    id: int
+    shop_id: int
+    customer_id: int
+    status: ReservationStatus
+    start_datetime: datetime
+    end_datetime: Optional[datetime]  # 既存データには終了日時のない予約もある
+    memo: Optional[str]
+    created_at: datetime
+
+
+@dataclass
+class ReservationListResult:
+    """店舗・期間で絞った予約一覧（開始日時の昇順）"""
+
+    shop_id: int
+    start: datetime
+    end: datetime
+    reservations: list[ReservationReadModel]
+
+
+@dataclass
+class FreeSlotReadModel:
+    """予約の入っていない時間帯 1 つ（start <= t < end）"""
+
+    start: datetime
+    end: datetime
+
+
+@dataclass
+class AvailabilityReadModel:
+    """指定期間の空き枠のReadモデル"""
+
+    shop_id: int
+    start: datetime
+    end: datetime
+    duration_minutes: int
+    free_slots: list[FreeSlotReadModel]
+    # 期間の先頭以降で duration_minutes の予約が入る最初の開始日時（期間の外でもよい）
+    next_free_start: Optional[datetime]
+
+
+@dataclass
+class CalendarSlotReadModel:
+    """カレンダーの 1 枠（start <= 開始日時 < end の予約の、ステータス別の件数）"""
+
+    start: datetime  # ユーザーのタイムゾーンの日時
+    end: datetime
+    counts: dict[ReservationStatus, int]
+
+
+@dataclass
+class CalendarDayReadModel:
+    """カレンダーの 1 日分"""
+
+    date: date
+    slots: list[CalendarSlotReadModel]
+    totals: dict[ReservationStatus, int]
+
+
+@dataclass
+class ReservationCalendarReadModel:
+    """店舗の日・週カレンダーのReadモデル"""
+
+    shop_id: int
+    timezone: str
+    slot_minutes: int
+    days: list[CalendarDayReadModel]
+
+
+@dataclass
+class CohortRowReadModel:
+    """コホート 1 行分（cohort_month に登録した顧客）。
+
+    retained[k] は登録月から k か月後の月に来店済み / 会計済みの予約がある顧客の数（k = 0 は登録月）。
+    """
+
+    cohort_month: date
+    customers: int
+    retained: list[int]
+    retention_rates: list[float]
+
+
+@dataclass
+class CohortRetentionReadModel:
+    """店舗の月次コホートリテンションのReadモデル（月はユーザーのタイムゾーンで区切る）"""
+
+    shop_id: int
+    timezone: str
+    start_month: date
+    months: int
+    cohorts: list[CohortRowReadModel]
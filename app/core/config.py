@@ -1,7 +1,8 @@
 # app/core/config.py
 from __future__ import annotations
 
-from typing import Literal
+from functools import lru_cache
+from typing import Any, Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -19,9 +20,126 @@ class Settings(BaseSettings):
     # SQLite / Postgres など、汎用的に使えるように str にしておく
     database_url: str
 
+    # コネクションプール（SQLAlchemy QueuePool）
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    # LIFO にすると負荷が下がったときに余分な接続がアイドルのまま残り、recycle で閉じられやすい
+    db_pool_use_lifo: bool = False
+    # 接続の死活確認: pre_ping はチェックアウトごとに SELECT 1、
+    # recycle は db_pool_recycle_seconds を過ぎた接続を作り直すだけ（往復なし）
+    db_pool_liveness: Literal["pre_ping", "recycle"] = "pre_ping"
+    db_pool_recycle_seconds: int = 1800
+    # engine ごとのコンパイル済み SQL キャッシュ（SQLAlchemy の query_cache_size、デフォルト 500）
+    db_query_cache_size: int = 500
+
+    # GET /metrics（Prometheus テキスト形式）とリクエスト計測
+    metrics_enabled: bool = True
+
+    # リクエストごとの SQL 件数・DB 時間の計測（Server-Timing ヘッダー + 構造化ログ）
+    sql_instrumentation_enabled: bool = True
+    # 同じ SQL がこの回数以上、異なるパラメータで実行されたら N+1 とみなす
+    sql_n_plus_one_threshold: int = 10
+    # off: 検知しない / log: 警告ログ / raise: 例外（テスト用）
+    sql_n_plus_one_mode: Literal["off", "log", "raise"] = "log"
+
+    # スロークエリログ（閾値を超えた SQL を正規化して記録し、EXPLAIN を非同期で取る）
+    slow_query_log_enabled: bool = True
+    slow_query_threshold_ms: float = 200.0
+    # 同じフィンガープリントの 2 回目以降をログに出す確率（集計は毎回行う）
+    slow_query_sample_rate: float = 0.1
+    slow_query_explain_enabled: bool = True
+    slow_query_max_fingerprints: int = 500
+
+    # SQLite ファイル運用時のプロファイル（WAL / synchronous=NORMAL / mmap など）
+    sqlite_profile_enabled: bool = True
+    sqlite_mmap_size_bytes: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_optimize_interval_seconds: float = 3600.0
+
+    # 予約の hot / cold パーティション（python -m app.infrastructure.db.reservation_partitions compact）
+    # この日数より前の期間（SQLite は年、Postgres は月単位）を cold に移す
+    reservation_hot_retention_days: int = 730
+    reservation_compaction_batch_size: int = 10_000
+
+    # 活動履歴・メモ・監査ログのコールドアーカイブ（python -m app.infrastructure.db.cold_archive archive）
+    # 未指定なら SQLite ファイルは <DB名>.archive.db、それ以外は本体と同じ DB
+    # シャーディング有効時（APP_SHARD_DATABASE_URLS）は全シャードで共有する置き場所として必須
+    archive_database_url: Optional[str] = None
+    archive_retention_days: int = 365
+    archive_batch_size: int = 5_000
+    archive_codec: Literal["zlib", "lzma"] = "zlib"
+
+    # 店舗単位のシャーディング（python -m app.infrastructure.db.sharding init / move）。空ならシャーディングしない
+    # APP_DATABASE_URL がシャード 0（ディレクトリ兼務）、ここに並べた URL がシャード 1, 2, ...（JSON の配列で指定）
+    shard_database_urls: list[str] = []
+    shard_assignment_ttl_seconds: float = 60.0
+    shard_id_block_size: int = 1_000
+    # シャードをまたぐ並列読み取りのスレッド数（プロセス全体）。0 ならシャード数 × (db_pool_size + db_max_overflow)
+    shard_fan_out_workers: int = 0
+
+    # 予約 API（/api/reservations）。重なり判定・空き枠検索は店舗ごとのメモリ上のインデックスで行う
+    reservation_index_enabled: bool = True
+    # 別プロセスのワーカーが作った予約が空き枠に反映されるまでの最大遅延
+    reservation_index_ttl_seconds: float = 30.0
+    reservation_index_max_shops: int = 1_000
+    # 終了日時のない既存予約の長さ / 予約 1 件の最大の長さ
+    reservation_default_duration_minutes: int = 60
+    reservation_max_duration_minutes: int = 24 * 60
+    # 一覧・空き枠で一度に指定できる期間
+    reservation_max_window_days: int = 31
+    # カレンダー（/api/reservations/calendar）の終わった日のキャッシュ（店舗 × タイムゾーン × 日 × 枠の長さ の数）
+    reservation_calendar_cache_max_days: int = 10_000
+    # コホートリテンション（/api/reservations/cohorts）。一度に指定できる月数と、コホートごとのキャッシュ
+    reservation_cohort_max_months: int = 36
+    # 別プロセスのワーカーが記録した来店がレポートに反映されるまでの最大遅延
+    reservation_cohort_cache_ttl_seconds: float = 300.0
+    reservation_cohort_cache_max_entries: int = 50_000
+    reservation_cohort_chunk_size: int = 50_000
+
+    # RFM セグメント（python -m app.infrastructure.db.rfm_segmentation）。F / M を数える期間と、一度に読む・書く行数
+    rfm_window_days: int = 365
+    rfm_chunk_size: int = 100_000
+    # 顧客ごとの受注・商談金額の集計（sales_last_365d の期間。python -m app.infrastructure.db.customer_value decay で進める）
+    customer_value_window_days: int = 365
+
     secret_key: str
     access_token_expire_minutes: int = 30
 
+    # リフレッシュトークン（/api/auth/refresh）。ローテーション + 再利用検知つき
+    refresh_tokens_enabled: bool = True
+    refresh_token_expire_days: int = 14
+
+    # 認証済みユーザーキャッシュ（CachedUserRepository）
+    user_cache_enabled: bool = True
+    user_cache_ttl_seconds: float = 300.0
+    # is_active / version の変更がキャッシュに反映されるまでの最大遅延
+    user_cache_active_staleness_seconds: float = 30.0
+    user_cache_max_size: int = 10_000
+
+    # 検証済みトークンのキャッシュ（CachingTokenProvider）
+    token_cache_enabled: bool = True
+    token_cache_max_size: int = 10_000
+
+    # Argon2 のハッシュ/検証を行う専用プロセスプール（PooledPasswordHasher）
+    password_hash_pool_enabled: bool = True
+    password_hash_workers: int = 2
+    # 実行中のほかに待たせてよい件数。これを超えたログインは 503 で即座に断る
+    password_hash_max_queue: int = 16
+    password_hash_retry_after_seconds: int = 1
+
+    # Argon2id のコスト。未設定なら pwdlib の推奨値を使う
+    # python -m app.infrastructure.security.argon2_calibration --write-env .env で計測・保存できる
+    argon2_time_cost: Optional[int] = None
+    argon2_memory_cost: Optional[int] = None  # KiB
+    argon2_parallelism: Optional[int] = None
+
+    # ステートレストークン: roles / is_superuser / version を claims に載せ、
+    # get_current_user は DB を見ずに User を組み立てる（失効はメモリ上の失効リストで判定）
+    stateless_tokens_enabled: bool = False
+    token_revocation_refresh_seconds: float = 30.0
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_prefix="APP_",
@@ -29,4 +147,14 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings を初回アクセス時に 1 回だけ作る（.env の読み込みを import 時に行わない）。"""
+    return Settings()
+
+
+def __getattr__(name: str) -> Any:
+    # 互換用: from app.core.config import settings はアクセスされた時点で get_settings() を返す
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
 
 
 @dataclass
@@ -9,3 +11,24 @@ class AuthToken:
 
     access_token: str
     token_type: str  # "bearer" など
+    refresh_token: Optional[str] = None
+
+
+@dataclass
+class RefreshToken:
+    """リフレッシュトークン（DB にはトークンそのものではなくハッシュだけを保存する）"""
+
+    id: Optional[int]
+    user_id: int
+    token_hash: str
+    family_id: str  # ローテーションで繋がる一連のトークンを束ねる ID（再利用検知で一括失効させる単位）
+    expires_at: datetime
+    created_at: datetime
+    revoked_at: Optional[datetime] = None
+
+    def is_expired(self, now: datetime) -> bool:
+        expires_at = self.expires_at
+        if expires_at.tzinfo is None:
+            # SQLite はタイムゾーンを保持しないので UTC とみなす
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return now >= expires_at
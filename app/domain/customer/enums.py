@@ -7,3 +7,17 @@ class CustomerStatus(str, Enum):
     ACTIVE = "ACTIVE"
     INACTIVE = "INACTIVE"
     LOST = "LOST"
+
+
+class CustomerSegment(str, Enum):
+    """RFM（最終来店・受注日 / 来店・受注回数 / 受注金額）のスコアから決める顧客セグメント。
+
+    customers.rank に保存する（決め方は app.domain.customer.segments）。
+    """
+
+    CHAMPIONS = "CHAMPIONS"  # 最近来ていて、回数・金額とも多い
+    LOYAL = "LOYAL"  # 回数・金額が多めの常連
+    NEW = "NEW"  # 最近来たが、回数・金額はまだ少ない
+    NEEDS_ATTENTION = "NEEDS_ATTENTION"  # どれも中くらい
+    AT_RISK = "AT_RISK"  # 回数・金額は多いが、しばらく来ていない
+    HIBERNATING = "HIBERNATING"  # しばらく来ておらず、回数・金額も少ない
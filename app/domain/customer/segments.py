@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from app.domain.customer.enums import CustomerSegment
+
+"""
+Title: 「RFM スコアから顧客セグメントを決めるルール」
+
+Point:
+    - スコアは 1〜5（顧客全体の中での五分位。5 が最も良い）。
+      R: 最終来店・受注日が新しいほど高い / F: 期間内の来店・受注回数 / M: 期間内の受注金額
+    - F と M はまとめて FM = (F + M) / 2（切り上げ）として扱う。
+    - 集計ジョブ（app.infrastructure.db.rfm_segmentation）はこの関数から 5 × 5 × 5 の表を作って使う。
+"""
+
+MIN_SCORE = 1
+MAX_SCORE = 5
+
+
+def segment_for(recency: int, frequency: int, monetary: int) -> CustomerSegment:
+    """R / F / M の各スコア（1〜5）から顧客セグメントを決める。"""
+    for score in (recency, frequency, monetary):
+        if not MIN_SCORE <= score <= MAX_SCORE:
+            raise ValueError(f"RFM score must be between {MIN_SCORE} and {MAX_SCORE}: {score}")
+
+    fm = (frequency + monetary + 1) // 2
+    if recency >= 4:
+        if fm >= 4:
+            return CustomerSegment.CHAMPIONS
+        return CustomerSegment.LOYAL if fm == 3 else CustomerSegment.NEW
+    if recency == 3:
+        return CustomerSegment.LOYAL if fm >= 3 else CustomerSegment.NEEDS_ATTENTION
+    return CustomerSegment.AT_RISK if fm >= 3 else CustomerSegment.HIBERNATING
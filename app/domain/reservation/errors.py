@@ -0,0 +1,4 @@
+class ReservationValidationError(Exception):
+    """予約の生成に関するビジネスルール違反。"""
+
+    pass
@@ -2,18 +2,19 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from typing import Optional
 
 from app.domain.reservation.enums import ReservationStatus
+from app.domain.reservation.errors import ReservationValidationError
 
 
 @dataclass
 class Reservation:
     """ドメインモデルとしての予約情報のエンティティ"""
 
-    id: int
+    id: Optional[int]
     shop_id: int
     customer_id: int
     status: ReservationStatus
@@ -22,3 +23,49 @@ class Reservation:
     memo: Optional[str]
     created_at: datetime
     updated_at: datetime
+
+    @classmethod
+    def create(
+        cls,
+        *,
+        shop_id: int,
+        customer_id: int,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        memo: Optional[str] = None,
+        max_duration: Optional[timedelta] = None,
+        now: Optional[datetime] = None,
+    ) -> "Reservation":
+        """新規作成時の不変条件を満たした Reservation を生成する（日時は UTC にそろえる）。"""
+
+        now = now or datetime.now(timezone.utc)
+
+        # 1. タイムゾーンなしの日時は受け付けない（どの地域の 10:00 か決められないため）
+        if start_datetime.tzinfo is None or end_datetime.tzinfo is None:
+            raise ReservationValidationError("開始・終了日時にはタイムゾーンを指定してください。")
+        start_datetime = start_datetime.astimezone(timezone.utc)
+        end_datetime = end_datetime.astimezone(timezone.utc)
+
+        # 2. 時間の前後関係と長さ
+        if end_datetime <= start_datetime:
+            raise ReservationValidationError("終了日時は開始日時より後にしてください。")
+        if max_duration is not None and end_datetime - start_datetime > max_duration:
+            raise ReservationValidationError("予約の時間が長すぎます。")
+
+        # 3. 過去の枠には予約できない
+        if start_datetime < now:
+            raise ReservationValidationError("過去の日時には予約できません。")
+
+        memo = (memo or "").strip() or None
+
+        return cls(
+            id=None,
+            shop_id=shop_id,
+            customer_id=customer_id,
+            status=ReservationStatus.BEFORE_VISIT,
+            start_datetime=start_datetime,
+            end_datetime=end_datetime,
+            memo=memo,
+            created_at=now,
+            updated_at=now,
+        )
@@ -24,6 +24,8 @@ class User:
     roles: Sequence[UserRoleName]
     created_at: datetime
     updated_at: datetime
+    # 楽観的ロックバージョン（キャッシュ無効化やトークンの失効判定に使う）
+    version: int = 1
 
     # ★ ドメイン振る舞いを追加
     def ensure_active(self) -> None:
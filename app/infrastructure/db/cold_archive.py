@@ -0,0 +1,489 @@
+from __future__ import annotations
+
+import argparse
+import enum
+import json
+import logging
+import lzma
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, Optional, Sequence
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Engine,
+    Enum as SAEnum,
+    Index,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    delete,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.engine import Connection, make_url
+
+from app.infrastructure.orm.activity import ActivityORM
+from app.infrastructure.orm.audit_log import AuditLogORM
+from app.infrastructure.orm.note import NoteORM
+
+"""
+Title: 「活動履歴・メモ・監査ログのコールドアーカイブ（圧縮セグメント）とアーカイブジョブ」
+
+Description:
+    activities / notes / audit_logs は追記のみで増え続けるが、画面で見るのはほぼ直近分だけ。
+    保持期間（APP_ARCHIVE_RETENTION_DAYS）より古い行をアーカイブ DB の archive_segments に移し、
+    hot テーブルとその索引を小さく保つ。
+
+        archive_segments 1 行 = 「1 テーブル × 1 持ち主（顧客 or ユーザー）× 1 年」分の行を
+                                列ごとの JSON にして zlib / lzma で圧縮した BLOB
+
+    持ち主は activities / notes が customer_id、audit_logs が user_id。
+    顧客のタイムラインや監査ログの参照は「持ち主 + 期間」で引くので、(source_table, owner_id, period_end) の索引で
+    必要なセグメントだけを新しい順に展開する。
+
+Point:
+    - アーカイブ DB は APP_ARCHIVE_DATABASE_URL。未指定なら SQLite ファイルは <DB名>.archive<拡張子>、
+      それ以外は本体と同じ DB に archive_segments を作る。
+    - シャーディング有効時は、ジョブが全シャードの activities / notes（と、シャード 0 の audit_logs）を
+      1 つの共有アーカイブへ移す（タイムラインはどのシャードの顧客もそこから読む）。シャードごとの既定の置き場所に
+      分かれないよう、APP_ARCHIVE_DATABASE_URL の指定を必須にしている。
+    - ジョブは batch_size 件ずつ「アーカイブへ書いてコミット → hot から削除してコミット」を繰り返す。
+      2 段の間で落ちると同じ行が hot とアーカイブの両方に入るが、読み出し側が id で重複を落とすので結果は変わらない。
+    - 書き込みは同じ (テーブル, 持ち主, 年) の既存セグメントと合わせて 1 つに作り直す（id で重複も落とす）。
+      毎日回しても 1 持ち主 1 年 1 セグメントのままで、読み出しで展開する BLOB の数が増えていかない。
+      この仕組みより前に書かれた細切れのセグメントは compact でまとめる。
+    - zstandard / pyarrow は依存に入れていないので、圧縮は標準ライブラリ（zlib / lzma）、形式は列指向の JSON。
+      同じ値が並ぶ列（種別・作成者・日付の上位桁）がよく縮む。持ち主ごとの行数は少ないことが多いので、
+      セグメントは月ではなく年で切る（月単位だと 1 セグメント 1〜2 行になり、圧縮のヘッダ分でかえって大きくなる）。
+    - 読み出しは遅い経路（展開 + デコード）。顧客詳細の「最近 5 件」は従来どおり hot だけを見る。
+"""
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_METADATA = MetaData()
+
+ARCHIVE_SEGMENTS = Table(
+    "archive_segments",
+    ARCHIVE_METADATA,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("source_table", String(64), nullable=False, comment="元テーブル名"),
+    Column("owner_id", Integer, nullable=True, comment="持ち主（customer_id / user_id）"),
+    Column("period_start", DateTime(timezone=True), nullable=False, comment="セグメント内の最古の created_at"),
+    Column("period_end", DateTime(timezone=True), nullable=False, comment="セグメント内の最新の created_at"),
+    Column("min_row_id", Integer, nullable=False),
+    Column("max_row_id", Integer, nullable=False),
+    Column("row_count", Integer, nullable=False),
+    Column("codec", String(16), nullable=False),
+    Column("payload", LargeBinary, nullable=False),
+    Column("archived_at", DateTime(timezone=True), nullable=False),
+    Index("ix_archive_segments_owner_period", "source_table", "owner_id", "period_end"),
+)
+
+
+@dataclass(frozen=True)
+class ArchiveSource:
+    """アーカイブ対象のテーブルと、その行の持ち主を表す列。"""
+
+    table: Table
+    owner_column: str
+
+    @property
+    def name(self) -> str:
+        return self.table.name
+
+
+ARCHIVE_SOURCES: dict[str, ArchiveSource] = {
+    source.name: source
+    for source in (
+        ArchiveSource(ActivityORM.__table__, "customer_id"),
+        ArchiveSource(NoteORM.__table__, "customer_id"),
+        ArchiveSource(AuditLogORM.__table__, "user_id"),
+    )
+}
+
+
+# ==========
+# セグメントの符号化
+# ==========
+
+_COMPRESS = {
+    "zlib": lambda data: zlib.compress(data, 9),
+    "lzma": lambda data: lzma.compress(data, preset=6),
+}
+_DECOMPRESS = {
+    "zlib": zlib.decompress,
+    "lzma": lzma.decompress,
+}
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite からは naive で返ってくる（保存時に UTC にそろえている前提）
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _encode_value(column: Column, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return _as_utc(value).isoformat()
+    if isinstance(value, enum.Enum):
+        # DB と同じく名前で持つ（native_enum=False の SAEnum と揃える）
+        return value.name
+    return value
+
+
+def _decode_value(column: Column, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, SAEnum) and column.type.enum_class is not None:
+        return column.type.enum_class[value]
+    return value
+
+
+def encode_segment(source: ArchiveSource, rows: Sequence[Mapping[str, Any]], codec: str = "zlib") -> bytes:
+    """行のリストを列指向の JSON にして圧縮する。"""
+    columns = list(source.table.columns)
+    document = {
+        "columns": [column.name for column in columns],
+        "data": [[_encode_value(column, row[column.name]) for row in rows] for column in columns],
+    }
+    raw = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode()
+    return _COMPRESS[codec](raw)
+
+
+def decode_segment(source: ArchiveSource, payload: bytes, codec: str) -> list[dict[str, Any]]:
+    document = json.loads(_DECOMPRESS[codec](payload))
+    columns = [source.table.columns[name] for name in document["columns"]]
+    decoded = [[_decode_value(column, value) for value in values] for column, values in zip(columns, document["data"])]
+    names = [column.name for column in columns]
+    return [dict(zip(names, values)) for values in zip(*decoded)]
+
+
+def _year_key(value: datetime) -> int:
+    return _as_utc(value).year
+
+
+def _owner_clause(owner_id: Optional[int]) -> Any:
+    column = ARCHIVE_SEGMENTS.c.owner_id
+    return column.is_(None) if owner_id is None else column == owner_id
+
+
+def _segment_values(
+    source: ArchiveSource,
+    owner_id: Optional[int],
+    rows: Sequence[Mapping[str, Any]],
+    codec: str,
+    archived_at: datetime,
+) -> dict[str, Any]:
+    created = [_as_utc(row["created_at"]) for row in rows]
+    ids = [row["id"] for row in rows]
+    return {
+        "source_table": source.name,
+        "owner_id": owner_id,
+        "period_start": min(created),
+        "period_end": max(created),
+        "min_row_id": min(ids),
+        "max_row_id": max(ids),
+        "row_count": len(rows),
+        "codec": codec,
+        "payload": encode_segment(source, rows, codec),
+        "archived_at": archived_at,
+    }
+
+
+# ==========
+# ストア
+# ==========
+
+
+def default_archive_database_url(database_url: str) -> str:
+    """APP_ARCHIVE_DATABASE_URL が未指定のときのアーカイブ DB。"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database and url.database != ":memory:":
+        path = Path(url.database)
+        return str(url.set(database=str(path.with_name(f"{path.stem}.archive{path.suffix}"))))
+    return database_url
+
+
+class ColdArchiveStore:
+    """archive_segments の読み書き。engine はアーカイブ DB（本体と同じ engine でもよい）。"""
+
+    def __init__(self, engine: Engine, codec: str = "zlib") -> None:
+        if codec not in _COMPRESS:
+            raise ValueError(f"unknown archive codec: {codec}")
+        self.engine = engine
+        self.codec = codec
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def ensure_schema(self) -> None:
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                ARCHIVE_METADATA.create_all(self.engine, checkfirst=True)
+                self._schema_ready = True
+
+    def write(self, source: ArchiveSource, rows: Sequence[Mapping[str, Any]]) -> int:
+        """行を「持ち主 × 年」ごとのセグメントにしてコミットする。戻り値は書いたセグメント数。
+
+        同じ (テーブル, 持ち主, 年) のセグメントが既にあれば、その行と合わせて 1 つに作り直す。
+        """
+        groups: dict[tuple[Optional[int], int], list[Mapping[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault((row[source.owner_column], _year_key(row["created_at"])), []).append(row)
+
+        self.ensure_schema()
+        with self.engine.begin() as conn:
+            for (owner_id, year), group in groups.items():
+                self._merge_into_year(conn, source, owner_id, year, group)
+        return len(groups)
+
+    def _merge_into_year(
+        self,
+        conn: Connection,
+        source: ArchiveSource,
+        owner_id: Optional[int],
+        year: int,
+        rows: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """(source, owner_id, year) の既存セグメントを rows と合わせた 1 セグメントに置き換える。"""
+        table = ARCHIVE_SEGMENTS
+        existing = conn.execute(
+            select(table.c.id, table.c.codec, table.c.payload).where(
+                table.c.source_table == source.name,
+                _owner_clause(owner_id),
+                table.c.period_start >= datetime(year, 1, 1, tzinfo=timezone.utc),
+                table.c.period_start < datetime(year + 1, 1, 1, tzinfo=timezone.utc),
+            )
+        ).all()
+        merged: dict[int, Mapping[str, Any]] = {}
+        for segment in existing:
+            for row in decode_segment(source, segment.payload, segment.codec):
+                merged[row["id"]] = row
+        for row in rows:
+            merged[row["id"]] = row
+
+        if existing:
+            conn.execute(delete(table).where(table.c.id.in_([segment.id for segment in existing])))
+        ordered = [merged[row_id] for row_id in sorted(merged)]
+        conn.execute(
+            insert(table),
+            [_segment_values(source, owner_id, ordered, self.codec, datetime.now(timezone.utc))],
+        )
+
+    def compact(self) -> int:
+        """同じ (テーブル, 持ち主, 年) に複数あるセグメントを 1 つにまとめる。まとめたグループ数を返す。"""
+        self.ensure_schema()
+        table = ARCHIVE_SEGMENTS
+        query = select(table.c.source_table, table.c.owner_id, table.c.period_start)
+        with self.engine.connect() as conn:
+            counts: dict[tuple[str, Optional[int], int], int] = {}
+            for segment in conn.execute(query):
+                key = (segment.source_table, segment.owner_id, _year_key(segment.period_start))
+                counts[key] = counts.get(key, 0) + 1
+
+        compacted = 0
+        for (source_name, owner_id, year), count in counts.items():
+            if count < 2:
+                continue
+            # グループごとにコミットする（途中で止めても、まとめ終わったグループはそのまま）
+            with self.engine.begin() as conn:
+                self._merge_into_year(conn, ARCHIVE_SOURCES[source_name], owner_id, year, [])
+            compacted += 1
+        return compacted
+
+    def read(
+        self,
+        source: ArchiveSource,
+        owner_id: Optional[int],
+        before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        not_before: Optional[datetime] = None,
+        before_id: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """持ち主のアーカイブ済みの行を (created_at, id) の新しい順に返す。
+
+        - before: これより前（created_at < before）の行だけ
+        - before_id: 指定すると、created_at が before と同じ行も id < before_id なら返す（キーセットでのページング）
+        - not_before: これより古い行しか持たないセグメントは開かない（呼び出し側で既に limit 件そろっている場合など）
+        - limit 件そろい、残りのセグメントがすべてそれより古ければ、そこで展開をやめる
+        """
+        self.ensure_schema()
+        table = ARCHIVE_SEGMENTS
+        query = (
+            select(table.c.period_start, table.c.period_end, table.c.codec, table.c.payload)
+            .where(table.c.source_table == source.name)
+            .where(_owner_clause(owner_id))
+            .order_by(table.c.period_end.desc())
+        )
+        if before is not None:
+            query = query.where(table.c.period_start < before if before_id is None else table.c.period_start <= before)
+        if not_before is not None:
+            query = query.where(table.c.period_end >= not_before)
+
+        rows_by_id: dict[int, dict[str, Any]] = {}
+        with self.engine.connect() as conn:
+            for segment in conn.execute(query):
+                if limit is not None and len(rows_by_id) >= limit:
+                    newest = sorted((row["created_at"] for row in rows_by_id.values()), reverse=True)
+                    if _as_utc(segment.period_end) < newest[limit - 1]:
+                        break
+                for row in decode_segment(source, segment.payload, segment.codec):
+                    if before is not None and (row["created_at"], row["id"]) >= (_as_utc(before), before_id or 0):
+                        continue
+                    rows_by_id[row["id"]] = row
+
+        rows = sorted(rows_by_id.values(), key=lambda row: (row["created_at"], row["id"]), reverse=True)
+        return rows if limit is None else rows[:limit]
+
+    def stats(self) -> list[dict[str, Any]]:
+        """テーブルごとのセグメント数・行数・圧縮後サイズ。"""
+        self.ensure_schema()
+        table = ARCHIVE_SEGMENTS
+        query = select(
+            table.c.source_table,
+            func.count().label("segments"),
+            func.sum(table.c.row_count).label("rows"),
+            func.sum(func.length(table.c.payload)).label("bytes"),
+        ).group_by(table.c.source_table)
+        with self.engine.connect() as conn:
+            return [dict(row) for row in conn.execute(query).mappings()]
+
+
+# ==========
+# アーカイブジョブ
+# ==========
+
+
+@dataclass
+class ArchiveResult:
+    table: str
+    archived_rows: int
+    segments: int
+
+
+class ColdArchiver:
+    """保持期間より古い行を hot テーブルから ColdArchiveStore に移す。"""
+
+    def __init__(self, engine: Engine, store: ColdArchiveStore, batch_size: int = 5_000) -> None:
+        self.engine = engine
+        self.store = store
+        self.batch_size = batch_size
+
+    def archive_before(self, cutoff: datetime, tables: Optional[Iterable[str]] = None) -> list[ArchiveResult]:
+        return [self.archive_source(ARCHIVE_SOURCES[name], cutoff) for name in (tables or ARCHIVE_SOURCES)]
+
+    def _batches(self, source: ArchiveSource, cutoff: datetime) -> Iterator[list[dict[str, Any]]]:
+        table = source.table
+        last_id = 0
+        while True:
+            # created_at に索引はないので id のキーセットで前に進む（テーブル全体を 1 回なめるだけで済む）
+            query = (
+                select(table)
+                .where(table.c.id > last_id, table.c.created_at < cutoff)
+                .order_by(table.c.id)
+                .limit(self.batch_size)
+            )
+            with self.engine.connect() as conn:
+                batch = [dict(row) for row in conn.execute(query).mappings()]
+            if not batch:
+                return
+            last_id = batch[-1]["id"]
+            yield batch
+
+    def archive_source(self, source: ArchiveSource, cutoff: datetime) -> ArchiveResult:
+        result = ArchiveResult(table=source.name, archived_rows=0, segments=0)
+        for batch in self._batches(source, cutoff):
+            # 1) アーカイブ側に書いて確定させてから 2) hot から消す（逆順だと落ちたときに行が消える）
+            result.segments += self.store.write(source, batch)
+            with self.engine.begin() as conn:
+                conn.execute(delete(source.table).where(source.table.c.id.in_([row["id"] for row in batch])))
+            result.archived_rows += len(batch)
+            logger.info("archived %s rows from %s (total %s)", len(batch), source.name, result.archived_rows)
+        return result
+
+
+def create_archive_store(
+    database_url: str,
+    archive_database_url: Optional[str],
+    engine: Engine,
+    codec: str,
+) -> ColdArchiveStore:
+    """Settings からアーカイブストアを作る。アーカイブ先が本体と同じ DB なら engine を共有する。"""
+    url = archive_database_url or default_archive_database_url(database_url)
+    if url == database_url:
+        return ColdArchiveStore(engine, codec=codec)
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite://") else {}
+    # 遅い経路なので小さいプールで足りる
+    return ColdArchiveStore(create_engine(url, connect_args=connect_args, pool_size=2, max_overflow=2), codec=codec)
+
+
+def _archive_targets(database: Any, tables: Optional[Sequence[str]]) -> list[tuple[Optional[int], Engine, list[str]]]:
+    """(シャード番号 or None, engine, 対象テーブル) の一覧。シャード 1.. にあるのは店舗に属するテーブルだけ。"""
+    names = list(tables or ARCHIVE_SOURCES)
+    router = database.shard_router
+    if router is None:
+        return [(None, database.engine, names)]
+
+    from app.infrastructure.db.sharding import DIRECTORY_SHARD, SHARDED_TABLES
+
+    sharded = {table.name for table in SHARDED_TABLES}
+    targets: list[tuple[Optional[int], Engine, list[str]]] = []
+    for index, shard in enumerate(router.shards):
+        shard_names = names if index == DIRECTORY_SHARD else [name for name in names if name in sharded]
+        if shard_names:
+            targets.append((index, shard.engine, shard_names))
+    return targets
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Archive old activities / notes / audit logs into cold storage.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("archive", help="保持期間より古い行をアーカイブに移す")
+    run.add_argument("--retention-days", type=int, default=None, help="未指定なら APP_ARCHIVE_RETENTION_DAYS")
+    run.add_argument("--table", action="append", choices=sorted(ARCHIVE_SOURCES), help="対象テーブル（既定: すべて）")
+    sub.add_parser("stats", help="アーカイブ済みのセグメント数・行数・サイズを表示する")
+    sub.add_parser("compact", help="同じ持ち主・年に複数あるセグメントを 1 つにまとめる")
+    args = parser.parse_args(argv)
+
+    from app.core.config import get_settings
+    from app.infrastructure.db.session import dispose_database, get_database
+
+    settings = get_settings()
+    database = get_database()
+    try:
+        if args.command == "archive":
+            if database.shard_router is not None and settings.archive_database_url is None:
+                raise SystemExit(
+                    "sharding is enabled: set APP_ARCHIVE_DATABASE_URL so that every shard archives into one shared store"
+                )
+            retention_days = args.retention_days or settings.archive_retention_days
+            cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+            for shard, engine, tables in _archive_targets(database, args.table):
+                archiver = ColdArchiver(engine, database.archive_store, batch_size=settings.archive_batch_size)
+                prefix = "" if shard is None else f"shard {shard} "
+                for result in archiver.archive_before(cutoff, tables):
+                    print(f"{prefix}{result.table}: {result.archived_rows} rows in {result.segments} segments")
+        elif args.command == "compact":
+            print(f"compacted {database.archive_store.compact()} segment groups")
+        elif args.command == "stats":
+            for row in database.archive_store.stats():
+                print(f"{row['source_table']}: {row['rows']} rows in {row['segments']} segments, {row['bytes']} bytes")
+    finally:
+        dispose_database()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterator, Union
+
+from sqlalchemy import Float, Select, func, type_coerce
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+if TYPE_CHECKING:
+    import numpy as np
+
+"""
+Title: 「SELECT の結果を NumPy の配列として chunk ごとに読むための小道具（バッチ集計・レポート用）」
+
+Point:
+    - 日時は SQL 側で epoch 秒（float）にして読む（epoch_seconds）。1 行ずつ datetime を作らずに、そのまま float64 の配列にできる。
+      SQLite は julianday、Postgres は extract(epoch)。それ以外の DB では ValueError。
+    - stream_arrays は yield_per で chunk_size 行ずつ読み、(行数, 列数) の float64 配列を返す。NULL は NaN になる。
+    - NumPy は呼び出されたときに import する（import app.main では読み込まない）。
+"""
+
+
+def epoch_seconds(column: Any, dialect: str) -> ColumnElement[float]:
+    """日時の列を UNIX epoch 秒（UTC）にする式。dialect は "sqlite" か "postgresql"（それ以外は ValueError）。"""
+    if dialect == "sqlite":
+        # SQLAlchemy は SQLite にタイムゾーンなしの UTC 文字列で保存している
+        return type_coerce((func.julianday(column) - 2440587.5) * 86400.0, Float)
+    if dialect == "postgresql":
+        return type_coerce(func.extract("epoch", column), Float)
+    raise ValueError(f"epoch_seconds does not support {dialect} (supported: sqlite, postgresql)")
+
+
+def stream_arrays(
+    executor: Union[Connection, Session],
+    query: Select,
+    chunk_size: int = 100_000,
+) -> Iterator["np.ndarray"]:
+    """query の結果を chunk_size 行ずつの float64 配列で返す（列はすべて数値か NULL であること）。"""
+    import numpy as np
+
+    result = executor.execute(query, execution_options={"yield_per": chunk_size})
+    for rows in result.partitions():
+        # Row のまま渡すと NumPy が 1 行ずつ配列プロトコルの属性を探して遅いので、tuple にしてから渡す
+        yield np.array(list(map(tuple, rows)), dtype=np.float64).reshape(len(rows), -1)
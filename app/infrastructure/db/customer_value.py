@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import DateTime, Engine, bindparam, case, delete, event, func, insert, inspect, literal, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, UOWTransaction
+
+from app.domain.opportunity.enums import OpportunityStatus
+from app.infrastructure.orm.opportunity import CustomerValueAggregateORM, OpportunityORM
+
+"""
+Title: 「顧客ごとの商談金額の集計（受注累計 / 直近 365 日の受注 / 進行中の商談）の差分更新と減衰ジョブ」
+
+実行: python -m app.infrastructure.db.customer_value decay|rebuild [--window-days 365]
+
+Description:
+    「直近 1 年の受注が 100 万円以上なら VIP」のようなルールのたびに商談を集計し直さなくて済むよう、
+    customer_value_aggregates（顧客ごとに 1 行）に次の 3 つを持っておく。
+
+        lifetime_value       : 受注（WON）した商談金額の累計
+        sales_last_365d      : window_start 以降に成約した受注金額の合計
+        open_pipeline_amount : 進行中（OPEN / ON_HOLD）の商談金額の合計
+
+    受注の成約日は expected_close_date、なければ updated_at（RFM 集計と同じ）。
+
+Point:
+    - 書き込み用の sessionmaker に track_customer_value() で flush のフックを付ける。
+      flush する商談の「変更前の寄与」を引き、「変更後の寄与」を足す差分を、同じトランザクションの UPSERT で反映する
+      （x = x + 差分 なので、別のリクエストが同じ顧客を同時に更新しても失われない）。
+      顧客の付け替え（customer_id の変更）や削除も同じ仕組みで扱える。
+    - sales_last_365d への加算は「成約日 >= その行の window_start」のときだけ（SQL の CASE で判定）。
+      引くときも同じ条件なので、減衰ジョブで期間外になった受注を二重に引くことはない。
+    - 減衰ジョブ（decay）は window_start を as_of - window_days まで進め、その間に期間外になった受注の分だけ引く。
+      1 日 1 回程度回す想定（回すまでの間は、期間が最大でその分だけ長い）。
+    - flush を通らない書き込み（Core の一括 UPDATE、データ投入など）は反映されないので、そのあとは rebuild で作り直す。
+"""
+
+OPEN_STATUSES = (OpportunityStatus.OPEN, OpportunityStatus.ON_HOLD)
+AGGREGATE_TABLE = CustomerValueAggregateORM.__table__
+OPPORTUNITY_TABLE = OpportunityORM.__table__
+CLOSED_AT = func.coalesce(OPPORTUNITY_TABLE.c.expected_close_date, OPPORTUNITY_TABLE.c.updated_at)
+
+# 集計に効く商談の列（OpportunityORM の側で active_history=True にして、未ロードでも変更前の値が取れるようにしている）
+_TRACKED_FIELDS = ("customer_id", "status", "amount", "expected_close_date", "updated_at")
+_ZERO = Decimal(0)
+_PENDING_KEY = "customer_value_deltas"
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite から読んだ日時はタイムゾーンなし（UTC）
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+@dataclass(frozen=True)
+class _Contribution:
+    """1 件の商談が集計に足している値。"""
+
+    customer_id: int
+    won_amount: Decimal
+    won_at: Optional[datetime]
+    open_amount: Decimal
+
+
+def _contribution(values: dict[str, Any]) -> Optional[_Contribution]:
+    status, amount = values["status"], Decimal(values["amount"] or 0)
+    if values["customer_id"] is None or status is None:
+        return None
+    if status == OpportunityStatus.WON:
+        won_at = values["expected_close_date"] or values["updated_at"]
+        return _Contribution(values["customer_id"], amount, _as_utc(won_at) if won_at else None, _ZERO)
+    if status in OPEN_STATUSES:
+        return _Contribution(values["customer_id"], _ZERO, None, amount)
+    return None
+
+
+def _values(obj: OpportunityORM, before: bool) -> dict[str, Any]:
+    """flush 前（before=True）/ 後の、集計に効く列の値。"""
+    state = inspect(obj)
+    values = {}
+    for name in _TRACKED_FIELDS:
+        history = state.attrs[name].history
+        if before and history.deleted:
+            values[name] = history.deleted[0]
+        elif not before and history.added:
+            values[name] = history.added[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        elif before and history.added:
+            values[name] = None  # 変更前は NULL だった
+        else:
+            values[name] = getattr(obj, name)
+    return values
+
+
+def collect_deltas(session: Session) -> list[dict[str, Any]]:
+    """flush 中の商談の変更を、(顧客, 成約日) ごとの差分にまとめる。"""
+    totals: dict[tuple[int, Optional[datetime]], list[Decimal]] = defaultdict(lambda: [_ZERO, _ZERO])
+
+    def add(contribution: Optional[_Contribution], sign: int) -> None:
+        if contribution is None:
+            return
+        total = totals[(contribution.customer_id, contribution.won_at)]
+        total[0] += sign * contribution.won_amount
+        total[1] += sign * contribution.open_amount
+
+    for obj in session.new:
+        if isinstance(obj, OpportunityORM):
+            add(_contribution(_values(obj, before=False)), 1)
+    for obj in session.dirty:
+        if isinstance(obj, OpportunityORM) and session.is_modified(obj):
+            before, after = _contribution(_values(obj, before=True)), _contribution(_values(obj, before=False))
+            if before != after:
+                add(before, -1)
+                add(after, 1)
+    for obj in session.deleted:
+        if isinstance(obj, OpportunityORM):
+            add(_contribution(_values(obj, before=True)), -1)
+
+    return [
+        {"customer_id": customer_id, "won_at": won_at, "won_delta": won, "open_delta": open_}
+        for (customer_id, won_at), (won, open_) in sorted(totals.items(), key=lambda item: item[0][0])
+        if won or open_
+    ]
+
+
+def apply_deltas(conn: Connection, deltas: list[dict[str, Any]], window_start: datetime) -> None:
+    """差分を UPSERT で足し込む（行がなければ window_start を今の期間の開始にして作る）。"""
+    if not deltas:
+        return
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    table = AGGREGATE_TABLE
+    won_at = bindparam("won_at", type_=DateTime(timezone=True))
+    statement = dialect_insert(table).values(
+        customer_id=bindparam("customer_id"),
+        lifetime_value=bindparam("won_delta"),
+        sales_last_365d=case((won_at >= window_start, bindparam("won_delta")), else_=_ZERO),
+        open_pipeline_amount=bindparam("open_delta"),
+        window_start=window_start,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.customer_id],
+        set_={
+            "lifetime_value": table.c.lifetime_value + statement.excluded.lifetime_value,
+            "sales_last_365d": table.c.sales_last_365d
+            + case((won_at >= table.c.window_start, statement.excluded.lifetime_value), else_=_ZERO),
+            "open_pipeline_amount": table.c.open_pipeline_amount + statement.excluded.open_pipeline_amount,
+        },
+    )
+    conn.execute(statement, deltas)
+
+
+def track_customer_value(target: Any, window_days: int = 365) -> None:
+    """target（sessionmaker / Session）の flush で、商談の変更を customer_value_aggregates に足し込む。"""
+    window = timedelta(days=window_days)
+
+    def _before_flush(session: Session, flush_context: UOWTransaction, instances: Any) -> None:
+        # 差分は flush 前に引く（削除する商談の値を、まだ DB から読めるうちに）。前回失敗した flush の分は上書きで捨てる
+        session.info[_PENDING_KEY] = collect_deltas(session)
+
+    def _after_flush(session: Session, flush_context: UOWTransaction) -> None:
+        deltas = session.info.pop(_PENDING_KEY, None)
+        if deltas:
+            apply_deltas(session.connection(), deltas, datetime.now(timezone.utc) - window)
+
+    event.listen(target, "before_flush", _before_flush)
+    event.listen(target, "after_flush", _after_flush)
+
+
+class CustomerValueJob:
+    """集計の期間を進める（decay）/ 商談から作り直す（rebuild）ジョブ本体。"""
+
+    def __init__(self, engine: Engine, window_days: int = 365) -> None:
+        self._engine = engine
+        self._window = timedelta(days=window_days)
+
+    def decay(self, as_of: Optional[datetime] = None) -> int:
+        """window_start を as_of - window_days まで進める。期間外になった受注を引いた顧客の数を返す。"""
+        new_start = (as_of or datetime.now(timezone.utc)) - self._window
+        table, opportunities = AGGREGATE_TABLE, OPPORTUNITY_TABLE
+        with self._engine.begin() as conn:
+            oldest = conn.scalar(select(func.min(table.c.window_start)))
+            if oldest is None or _as_utc(oldest) >= new_start:
+                return 0
+            won_before_new_start = (opportunities.c.status == OpportunityStatus.WON) & (CLOSED_AT < new_start)
+            expired = (
+                select(func.coalesce(func.sum(opportunities.c.amount), 0))
+                .where(
+                    opportunities.c.customer_id == table.c.customer_id,
+                    won_before_new_start,
+                    CLOSED_AT >= table.c.window_start,
+                )
+                .scalar_subquery()
+            )
+            # 期間外になる受注を持つ顧客だけ引き算する（相関サブクエリを全顧客に走らせない）
+            affected = select(opportunities.c.customer_id).where(won_before_new_start, CLOSED_AT >= oldest)
+            decayed = conn.execute(
+                update(table)
+                .where(table.c.window_start < new_start, table.c.customer_id.in_(affected))
+                .values(sales_last_365d=table.c.sales_last_365d - expired)
+            ).rowcount
+            conn.execute(update(table).where(table.c.window_start < new_start).values(window_start=new_start))
+        return decayed
+
+    def rebuild(self, as_of: Optional[datetime] = None) -> int:
+        """商談テーブルから全顧客の集計を作り直す。作った行数を返す。"""
+        window_start = (as_of or datetime.now(timezone.utc)) - self._window
+        table, opportunities = AGGREGATE_TABLE, OPPORTUNITY_TABLE
+        amount = func.coalesce(opportunities.c.amount, 0)
+        won = opportunities.c.status == OpportunityStatus.WON
+        totals = select(
+            opportunities.c.customer_id,
+            func.sum(case((won, amount), else_=0)),
+            func.sum(case((won & (CLOSED_AT >= window_start), amount), else_=0)),
+            func.sum(case((opportunities.c.status.in_(OPEN_STATUSES), amount), else_=0)),
+            literal(window_start, DateTime(timezone=True)),
+        ).group_by(opportunities.c.customer_id)
+        with self._engine.begin() as conn:
+            conn.execute(delete(table))
+            return conn.execute(
+                insert(table).from_select(
+                    ["customer_id", "lifetime_value", "sales_last_365d", "open_pipeline_amount", "window_start"],
+                    totals,
+                )
+            ).rowcount
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain per-customer opportunity value aggregates.")
+    parser.add_argument("command", choices=["decay", "rebuild"], help="decay: 期間を進める / rebuild: 作り直す")
+    parser.add_argument("--window-days", type=int, default=None, help="未指定なら APP_CUSTOMER_VALUE_WINDOW_DAYS")
+    args = parser.parse_args(argv)
+
+    from app.core.config import get_settings
+    from app.infrastructure.db.session import dispose_database, get_database
+
+    settings = get_settings()
+    database = get_database()
+    engines = (
+        [shard.engine for shard in database.shard_router.shards]
+        if database.shard_router is not None
+        else [database.engine]
+    )
+    try:
+        for engine in engines:
+            job = CustomerValueJob(engine, window_days=args.window_days or settings.customer_value_window_days)
+            if args.command == "decay":
+                print(f"{engine.url.render_as_string()}: decayed {job.decay()} customers")
+            else:
+                print(f"{engine.url.render_as_string()}: rebuilt {job.rebuild()} customers")
+    finally:
+        dispose_database()
+
+
+if __name__ == "__main__":
+    main()
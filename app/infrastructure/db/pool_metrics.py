@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.pool import Pool, QueuePool
+
+"""
+Title: 「コネクションプールの状態を見えるようにする」
+
+Description:
+    プールが埋まるとリクエストは pool_timeout まで黙って待たされる。
+    どれくらい待っているのか、何本使われているのか、overflow が出ているのかを
+    記録して、管理用エンドポイント（/api/admin/db-pool）から確認できるようにする。
+
+Point:
+    - チェックアウト待ち時間: InstrumentedQueuePool.connect() の所要時間
+      （プール待ち + 新規接続の確立を含む）。SQLAlchemy にはチェックアウト前のイベントがないので、
+      Pool.connect() をラップして測る。
+    - 使用中 / overflow / 空き本数: QueuePool 自身のカウンタをスナップショット時に読む。
+    - 新規接続数・無効化数: プールのイベント（connect / invalidate）で数える。
+"""
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """コネクションプールの状態のスナップショット。"""
+
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checked_out_max: int
+    checkouts_total: int
+    timeouts_total: int
+    connections_created_total: int
+    invalidations_total: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+    @property
+    def wait_seconds_avg(self) -> float:
+        return self.wait_seconds_total / self.checkouts_total if self.checkouts_total else 0.0
+
+
+class PoolMetrics:
+    """プールのイベントとチェックアウト待ち時間を集計する。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pool: Optional[Pool] = None
+        self._checked_out = 0
+        self._checked_out_max = 0
+        self._checkouts_total = 0
+        self._timeouts_total = 0
+        self._connections_created_total = 0
+        self._invalidations_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def attach(self, engine: Engine) -> None:
+        """engine のプールにリスナーを登録する（InstrumentedQueuePool なら待ち時間も記録する）。"""
+        pool = engine.pool
+        self._pool = pool
+        if isinstance(pool, InstrumentedQueuePool):
+            pool.metrics = self
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+
+    def record_checkout_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._checkouts_total += 1
+            self._wait_seconds_total += seconds
+            self._wait_seconds_max = max(self._wait_seconds_max, seconds)
+
+    def record_timeout(self, seconds: float) -> None:
+        # タイムアウトした待ちは平均には入れず、最大待ち時間にだけ反映する
+        with self._lock:
+            self._timeouts_total += 1
+            self._wait_seconds_max = max(self._wait_seconds_max, seconds)
+
+    def stats(self) -> PoolStats:
+        pool = self._pool
+        queue_pool = pool if isinstance(pool, QueuePool) else None
+        with self._lock:
+            return PoolStats(
+                pool_size=queue_pool.size() if queue_pool else 0,
+                max_overflow=queue_pool._max_overflow if queue_pool else 0,
+                checked_out=self._checked_out,
+                checked_in=queue_pool.checkedin() if queue_pool else 0,
+                # QueuePool.overflow() は pool_size 未満だと負になるので 0 で切る
+                overflow=max(queue_pool.overflow(), 0) if queue_pool else 0,
+                checked_out_max=self._checked_out_max,
+                checkouts_total=self._checkouts_total,
+                timeouts_total=self._timeouts_total,
+                connections_created_total=self._connections_created_total,
+                invalidations_total=self._invalidations_total,
+                wait_seconds_total=self._wait_seconds_total,
+                wait_seconds_max=self._wait_seconds_max,
+            )
+
+    # ==========
+    # プールのイベント
+    # ==========
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        with self._lock:
+            self._connections_created_total += 1
+
+    def _on_checkout(self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        with self._lock:
+            self._checked_out += 1
+            self._checked_out_max = max(self._checked_out_max, self._checked_out)
+
+    def _on_checkin(self, dbapi_connection: Any, connection_record: Any) -> None:
+        with self._lock:
+            self._checked_out = max(self._checked_out - 1, 0)
+
+    def _on_invalidate(self, dbapi_connection: Any, connection_record: Any, exception: Any) -> None:
+        with self._lock:
+            self._invalidations_total += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+    """connect()（= チェックアウト）にかかった時間を PoolMetrics に記録する QueuePool。"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):  # type: ignore[override]
+        metrics = self.metrics
+        if metrics is None:
+            return super().connect()
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            metrics.record_timeout(time.perf_counter() - start)
+            raise
+        metrics.record_checkout_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self) -> QueuePool:
+        # engine.dispose() などで作り直されたプールにも同じ metrics を引き継ぐ
+        pool = super().recreate()
+        if isinstance(pool, InstrumentedQueuePool):
+            pool.metrics = self.metrics
+            if self.metrics is not None:
+                self.metrics._pool = pool
+        return pool
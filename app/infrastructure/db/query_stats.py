@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Literal, Optional
+
+from sqlalchemy import Engine, event
+
+"""
+Title: 「リクエスト単位の SQL 件数・DB 時間の計測と N+1 検知」
+
+Description:
+    エンドポイントごとに何本の SQL を投げ、DB で何 ms 使っているのかが分からないので、
+    engine の before/after_cursor_execute フックで 1 文ずつ計測し、
+    「いま処理中のリクエスト」の RequestQueryStats に積み上げる。
+    リクエストの開始・終了（Server-Timing ヘッダーと構造化ログの出力）は interface 層のミドルウェアが行う。
+
+Point:
+    - 「いま処理中のリクエスト」は contextvars で持つ。FastAPI は同期エンドポイントや依存関数を
+      スレッドプールで動かすが、その際も contextvars はコピーされて引き継がれる。
+      リクエスト外（バックグラウンドスレッドなど）の SQL は計測しない。
+    - N+1 検知: 同じ SQL 文が「異なるパラメータで」threshold 回以上実行されたら N+1 とみなす。
+      mode="log" なら警告ログ、mode="raise" なら NPlusOneQueryError（テスト用）。
+      executemany（一括 INSERT など）は対象外。
+"""
+
+logger = logging.getLogger(__name__)
+
+NPlusOneMode = Literal["off", "log", "raise"]
+
+
+class NPlusOneQueryError(RuntimeError):
+    """同じ SQL がパラメータだけ変えて何度も実行された（N+1 の疑い）ことを表す例外。"""
+
+
+@dataclass
+class RequestQueryStats:
+    """1 リクエスト分の SQL 実行統計。"""
+
+    query_count: int = 0
+    total_seconds: float = 0.0
+    # SQL 文ごとの、実行に使われた異なるパラメータの数（N+1 検知用）
+    distinct_params: dict[str, set[int]] = field(default_factory=dict)
+    n_plus_one_statements: list[str] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000
+
+
+_current_stats: contextvars.ContextVar[Optional[RequestQueryStats]] = contextvars.ContextVar(
+    "request_query_stats", default=None
+)
+
+
+def begin_request_stats() -> tuple[RequestQueryStats, contextvars.Token]:
+    """このリクエストの計測を始める（ミドルウェアから呼ぶ）。"""
+    stats = RequestQueryStats()
+    return stats, _current_stats.set(stats)
+
+
+def end_request_stats(token: contextvars.Token) -> None:
+    _current_stats.reset(token)
+
+
+def current_request_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+class QueryInstrumentation:
+    """engine に SQL 計測用のイベントフックを登録する。"""
+
+    def __init__(self, n_plus_one_threshold: int = 10, n_plus_one_mode: NPlusOneMode = "log") -> None:
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.n_plus_one_mode = n_plus_one_mode
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(
+        self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        if context is not None and _current_stats.get() is not None:
+            context._query_stats_started_at = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        stats = _current_stats.get()
+        started_at = getattr(context, "_query_stats_started_at", None)
+        if stats is None or started_at is None:
+            return
+
+        stats.query_count += 1
+        stats.total_seconds += time.perf_counter() - started_at
+
+        if executemany or self.n_plus_one_mode == "off":
+            return
+        seen = stats.distinct_params.setdefault(statement, set())
+        if len(seen) >= self.n_plus_one_threshold:
+            # 既に検知済み（これ以上集合を大きくしない）
+            return
+        seen.add(hash(repr(parameters)))
+        if len(seen) == self.n_plus_one_threshold:
+            self._report_n_plus_one(stats, statement)
+
+    def _report_n_plus_one(self, stats: RequestQueryStats, statement: str) -> None:
+        stats.n_plus_one_statements.append(statement)
+        message = (
+            f"Possible N+1 query: the same statement ran with {self.n_plus_one_threshold} "
+            f"different parameter sets in one request: {' '.join(statement.split())[:200]}"
+        )
+        if self.n_plus_one_mode == "raise":
+            raise NPlusOneQueryError(message)
+        logger.warning(message)
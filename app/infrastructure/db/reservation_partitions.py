@@ -0,0 +1,657 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Column, Engine, Index, MetaData, Select, Table, case, delete, event, func, insert, select, text
+from sqlalchemy import union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.infrastructure.orm.reservation import ReservationORM, ReservationVisitRollupORM
+
+"""
+Title: 「予約テーブルの時間パーティション（hot / cold）とコンパクション」
+
+Description:
+    reservations は来店のたびに増え続けるので、古い期間を「cold」に切り出す。
+
+        Postgres: reservations を start_datetime の月単位ネイティブパーティションにする
+                  （reservations_p2025_06 ...）。古い月は親から DETACH して reservations_archive スキーマへ移す。
+        SQLite  : hot は元の reservations テーブルのまま。古い年は
+                  <DB名>.reservations_<年>.db という別ファイルに移し、ATTACH して reservations_<年>.reservations として読む。
+
+    アーカイブした予約の件数・最終日時は reservation_visit_rollups（顧客ごとに 1 行）に足し込む。
+    顧客一覧の来店回数・最終来店日時は「hot の集計 + rollup」になるので、全履歴を走査しなくて済む。
+
+    対応している DB は Postgres と SQLite（ファイル）だけ。それ以外ではコンパクションは ValueError で止まり、
+    読み出しは hot だけを見る。
+
+Point:
+    - start_datetime で範囲を絞るクエリは ReservationPartitions.select_between() を使う。
+      範囲に重なる cold パーティションと hot だけを UNION ALL する（hot は start_datetime の索引で範囲外ならすぐ終わる）。
+    - cold パーティションは読み取り専用（過去の予約は更新しない前提）。作成・更新は常に hot（ReservationORM）。
+    - SQLite のコンパクションは「cold へコピー（INSERT OR IGNORE）→ コミット → rollup 加算 + hot から削除 → コミット」を
+      batch_size 件ずつ繰り返す。WAL では ATTACH したファイルをまたぐトランザクションは原子的でないため 2 段に分けている。
+      途中で落ちても再実行すれば、コピー済みの行は無視され、rollup は hot から消した行の分だけ加算される。
+    - Postgres で月パーティションのない期間の行は reservations_pdefault に入る。コンパクションは先にそのうち
+      cutoff より前の月を月パーティションに切り出してから（ensure_postgres_month_partition）、ほかの月と同じく DETACH する。
+    - SQLite の ATTACH 数には上限（既定 10）があるので、年単位のファイルにしている。
+      新しいアーカイブファイルは、接続をプールから取り出すとき（checkout）に ATTACH される。
+"""
+
+logger = logging.getLogger(__name__)
+
+HOT_TABLE: Table = ReservationORM.__table__
+ROLLUP_TABLE: Table = ReservationVisitRollupORM.__table__
+
+SQLITE_ARCHIVE_PREFIX = "reservations_"
+POSTGRES_ARCHIVE_SCHEMA = "reservations_archive"
+_POSTGRES_PARTITION_NAME = re.compile(r"^reservations_p(\d{4})_(\d{2})$")
+
+# Postgres ではアーカイブ済みパーティションの一覧を読み直す間隔（別プロセスのジョブが移すため）
+POSTGRES_DISCOVERY_TTL_SECONDS = 60.0
+
+
+def _month_start(year: int, month: int) -> datetime:
+    return datetime(year, month, 1, tzinfo=timezone.utc)
+
+
+def _next_month(year: int, month: int) -> tuple[int, int]:
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+@dataclass(frozen=True)
+class ArchivedPartition:
+    """cold に移した 1 パーティション（start <= start_datetime < end の予約を持つ）。"""
+
+    table: Table
+    start: datetime
+    end: datetime
+
+
+def _archive_table(name: str, schema: str) -> Table:
+    """hot と同じ列を持つ（外部キーなしの）アーカイブ用 Table。"""
+    table = Table(
+        name,
+        MetaData(),
+        *[Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable) for c in HOT_TABLE.columns],
+        schema=schema,
+    )
+    Index(f"ix_{name}_customer_id", table.c.customer_id)
+    Index(f"ix_{name}_start_datetime", table.c.start_datetime)
+    return table
+
+
+# ==========
+# SQLite: 年ごとの別ファイルを ATTACH
+# ==========
+
+
+def sqlite_archive_schema(year: int) -> str:
+    return f"{SQLITE_ARCHIVE_PREFIX}{year}"
+
+
+def sqlite_archive_path(database_path: Path, year: int) -> Path:
+    return database_path.with_name(f"{database_path.stem}.{sqlite_archive_schema(year)}{database_path.suffix or '.db'}")
+
+
+def sqlite_archived_years(database_path: Path) -> list[int]:
+    """DB ファイルの隣にあるアーカイブファイルの年を返す。"""
+    pattern = re.compile(
+        re.escape(f"{database_path.stem}.{SQLITE_ARCHIVE_PREFIX}") + r"(\d{4})" + re.escape(database_path.suffix or ".db")
+    )
+    years = []
+    for path in database_path.parent.glob(f"{database_path.stem}.{SQLITE_ARCHIVE_PREFIX}*"):
+        match = pattern.fullmatch(path.name)
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+
+@lru_cache(maxsize=None)
+def sqlite_archive_table(year: int) -> Table:
+    return _archive_table("reservations", sqlite_archive_schema(year))
+
+
+def _sqlite_database_path(engine: Engine) -> Optional[Path]:
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or not database or database == ":memory:" or "mode=memory" in str(engine.url):
+        return None
+    return Path(database)
+
+
+def _attached_schemas(dbapi_connection: Any) -> set[str]:
+    cursor = dbapi_connection.cursor()
+    try:
+        return {row[1] for row in cursor.execute("PRAGMA database_list").fetchall()}
+    finally:
+        cursor.close()
+
+
+def _attach_sqlite_archives(dbapi_connection: Any, database_path: Path) -> None:
+    attached = _attached_schemas(dbapi_connection)
+    cursor = dbapi_connection.cursor()
+    try:
+        for year in sqlite_archived_years(database_path):
+            schema = sqlite_archive_schema(year)
+            if schema not in attached:
+                cursor.execute(f"ATTACH DATABASE ? AS {schema}", (str(sqlite_archive_path(database_path, year)),))
+    finally:
+        cursor.close()
+
+
+def attach_sqlite_reservation_archives(engine: Engine) -> None:
+    """プールから接続を取り出すたびに、まだ ATTACH していないアーカイブファイルを ATTACH する。"""
+    database_path = _sqlite_database_path(engine)
+    if database_path is None:
+        return
+
+    def _on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        # ファイル一覧が前回と同じなら何もしない（glob だけのコスト）
+        years = tuple(sqlite_archived_years(database_path))
+        if connection_record.info.get("reservation_archive_years") != years:
+            _attach_sqlite_archives(dbapi_connection, database_path)
+            connection_record.info["reservation_archive_years"] = years
+
+    event.listen(engine, "checkout", _on_checkout)
+
+
+# ==========
+# Postgres: 月単位のネイティブパーティション
+# ==========
+
+
+def postgres_partition_name(year: int, month: int) -> str:
+    return f"reservations_p{year}_{month:02d}"
+
+
+def postgres_month_partition_ddl(year: int, month: int) -> str:
+    next_year, next_month = _next_month(year, month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {postgres_partition_name(year, month)} PARTITION OF reservations "
+        f"FOR VALUES FROM ('{_month_start(year, month).isoformat()}') "
+        f"TO ('{_month_start(next_year, next_month).isoformat()}')"
+    )
+
+
+def _months(first: date, last: date) -> list[tuple[int, int]]:
+    months = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        months.append((year, month))
+        year, month = _next_month(year, month)
+    return months
+
+
+def postgres_partitioning_ddl(first_month: date, last_month: date) -> list[str]:
+    """既存の reservations を月パーティションの親テーブルに作り替える DDL（1 トランザクションで流す）。
+
+    パーティションキーは主キーに含める必要があるので、主キーは (id, start_datetime) になる
+    （ORM 側の識別子は id のまま）。範囲外の行は DEFAULT パーティションに入る
+    （first_month は既存の最古の予約の月にする。DEFAULT に残った行はコンパクション時に月パーティションへ切り出す）。
+    """
+    statements = [
+        "ALTER TABLE reservations RENAME TO reservations_unpartitioned",
+        "CREATE TABLE reservations (LIKE reservations_unpartitioned INCLUDING DEFAULTS INCLUDING COMMENTS) "
+        "PARTITION BY RANGE (start_datetime)",
+        "ALTER TABLE reservations ADD PRIMARY KEY (id, start_datetime)",
+        "ALTER TABLE reservations ADD FOREIGN KEY (shop_id) REFERENCES shops (id) ON DELETE CASCADE",
+        "ALTER TABLE reservations ADD FOREIGN KEY (customer_id) REFERENCES customers (id) ON DELETE CASCADE",
+        "CREATE INDEX ON reservations (shop_id)",
+        "CREATE INDEX ON reservations (customer_id)",
+        "CREATE INDEX ON reservations (start_datetime)",
+        # id の連番は新しい親テーブルに付け替える（古いテーブルと一緒に消えないように）
+        "ALTER SEQUENCE reservations_id_seq OWNED BY reservations.id",
+    ]
+    statements += [postgres_month_partition_ddl(year, month) for year, month in _months(first_month, last_month)]
+    statements += [
+        f"CREATE TABLE IF NOT EXISTS {POSTGRES_DEFAULT_PARTITION} PARTITION OF reservations DEFAULT",
+        "INSERT INTO reservations SELECT * FROM reservations_unpartitioned",
+        "DROP TABLE reservations_unpartitioned",
+    ]
+    return statements
+
+
+POSTGRES_DEFAULT_PARTITION = "reservations_pdefault"
+
+
+def postgres_split_default_month_ddl(year: int, month: int) -> list[str]:
+    """DEFAULT パーティションにある year-month の行を、その月のパーティションに移して付け替える DDL。
+
+    DEFAULT に範囲内の行があると CREATE TABLE ... PARTITION OF は失敗するので、
+    別テーブルを作って行を移し（DELETE ... RETURNING）、ATTACH PARTITION する。
+    """
+    name = postgres_partition_name(year, month)
+    start, end = _month_start(year, month).isoformat(), _month_start(*_next_month(year, month)).isoformat()
+    return [
+        f"CREATE TABLE {name} (LIKE reservations INCLUDING DEFAULTS INCLUDING COMMENTS)",
+        f"WITH moved AS (DELETE FROM {POSTGRES_DEFAULT_PARTITION} "
+        f"WHERE start_datetime >= '{start}' AND start_datetime < '{end}' RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        f"ALTER TABLE reservations ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')",
+    ]
+
+
+def ensure_postgres_month_partition(conn: Connection, year: int, month: int) -> bool:
+    """year-month のパーティションがなければ作る（DEFAULT に入っていた行はそこへ移す）。作ったら True。"""
+    name = postgres_partition_name(year, month)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+    for statement in postgres_split_default_month_ddl(year, month):
+        conn.execute(text(statement))
+    return True
+
+
+def ensure_postgres_month_partitions(conn: Connection, first_month: date, months: int) -> None:
+    """first_month から months か月分のパーティションを（なければ）作る。"""
+    last = first_month
+    for _ in range(months - 1):
+        year, month = _next_month(last.year, last.month)
+        last = date(year, month, 1)
+    for year, month in _months(first_month, last):
+        ensure_postgres_month_partition(conn, year, month)
+
+
+@lru_cache(maxsize=None)
+def postgres_archive_table(year: int, month: int) -> Table:
+    return _archive_table(postgres_partition_name(year, month), POSTGRES_ARCHIVE_SCHEMA)
+
+
+# ==========
+# パーティション一覧と範囲クエリ
+# ==========
+
+
+class ReservationPartitions:
+    """hot テーブルと、アーカイブ済み（cold）パーティションの一覧。"""
+
+    def __init__(self, archived: Sequence[ArchivedPartition] = ()) -> None:
+        self.archived = sorted(archived, key=lambda p: p.start)
+
+    def tables_between(self, start: Optional[datetime], end: Optional[datetime]) -> list[Table]:
+        """start <= start_datetime < end の予約を持ちうるテーブル（cold は範囲に重なるものだけ + hot）。"""
+        tables = [
+            p.table
+            for p in self.archived
+            if (end is None or p.start < end) and (start is None or p.end > start)
+        ]
+        tables.append(HOT_TABLE)
+        return tables
+
+    def select_between(self, start: Optional[datetime], end: Optional[datetime]) -> Select:
+        """範囲内の予約を、関係するパーティションだけから集める SELECT（列は reservations と同じ）。
+
+        呼び出し側は .subquery() して hot テーブルと同じように使う。
+        """
+        parts = []
+        for table in self.tables_between(start, end):
+            query = select(*table.c)
+            if start is not None:
+                query = query.where(table.c.start_datetime >= start)
+            if end is not None:
+                query = query.where(table.c.start_datetime < end)
+            parts.append(query)
+        if len(parts) == 1:
+            return parts[0]
+        return select(*union_all(*parts).subquery("reservations").c)
+
+
+def load_reservation_partitions(conn: Connection) -> ReservationPartitions:
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        database_path = _sqlite_database_path(conn.engine)
+        if database_path is None:
+            return ReservationPartitions()
+        return ReservationPartitions(
+            [
+                ArchivedPartition(
+                    table=sqlite_archive_table(year),
+                    start=_month_start(year, 1),
+                    end=_month_start(year + 1, 1),
+                )
+                for year in sqlite_archived_years(database_path)
+            ]
+        )
+    if dialect == "postgresql":
+        names = conn.execute(
+            text("SELECT table_name FROM information_schema.tables WHERE table_schema = :schema"),
+            {"schema": POSTGRES_ARCHIVE_SCHEMA},
+        ).scalars()
+        archived = []
+        for name in names:
+            match = _POSTGRES_PARTITION_NAME.fullmatch(name)
+            if match:
+                year, month = int(match.group(1)), int(match.group(2))
+                archived.append(
+                    ArchivedPartition(
+                        table=postgres_archive_table(year, month),
+                        start=_month_start(year, month),
+                        end=_month_start(*_next_month(year, month)),
+                    )
+                )
+        return ReservationPartitions(archived)
+    return ReservationPartitions()
+
+
+_postgres_cache: "weakref.WeakKeyDictionary[Engine, tuple[float, ReservationPartitions]]" = weakref.WeakKeyDictionary()
+_postgres_cache_lock = threading.Lock()
+
+
+def invalidate_reservation_partitions(engine: Engine) -> None:
+    """cold パーティションを増やした・移したあとに呼ぶ（Postgres のキャッシュを捨てる）。"""
+    with _postgres_cache_lock:
+        _postgres_cache.pop(engine, None)
+
+
+def get_reservation_partitions(session: Session) -> ReservationPartitions:
+    """リポジトリから使う。SQLite はファイル一覧を毎回見る（安い）、Postgres は TTL つきでキャッシュする。"""
+    engine = session.get_bind()
+    if engine.dialect.name != "postgresql":
+        return load_reservation_partitions(session.connection())
+    now = time.monotonic()
+    with _postgres_cache_lock:
+        cached = _postgres_cache.get(engine)
+    if cached is not None and now - cached[0] < POSTGRES_DISCOVERY_TTL_SECONDS:
+        return cached[1]
+    partitions = load_reservation_partitions(session.connection())
+    with _postgres_cache_lock:
+        _postgres_cache[engine] = (now, partitions)
+    return partitions
+
+
+def prepare_archived_partition(conn: Connection, partition: ArchivedPartition) -> None:
+    """conn の DB で partition と同じ期間の cold パーティションを読み書きできるようにする（なければ空で作る）。
+
+    店舗を別のシャードへ移すとき（ShopRebalancer）に使う。SQLite では ATTACH するので、
+    そのトランザクションで最初の書き込みをする前に呼ぶこと。
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        database_path = _sqlite_database_path(conn.engine)
+        if database_path is None:
+            raise ValueError("cold reservation partitions need a file-based SQLite database")
+        schema = sqlite_archive_schema(partition.start.year)
+        if schema not in _attached_schemas(conn.connection.driver_connection):
+            conn.exec_driver_sql(
+                f"ATTACH DATABASE ? AS {schema}", (str(sqlite_archive_path(database_path, partition.start.year)),)
+            )
+    elif dialect == "postgresql":
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {POSTGRES_ARCHIVE_SCHEMA}"))
+    else:
+        raise ValueError(f"cold reservation partitions are not supported on {dialect}")
+    partition.table.metadata.create_all(conn)
+
+
+# ==========
+# コンパクション（hot → cold）
+# ==========
+
+
+@dataclass(frozen=True)
+class CompactionResult:
+    partition: str
+    moved_rows: int
+
+
+def _rollup_upsert(conn: Connection, rows: list[dict[str, Any]]) -> None:
+    """rollup に (件数, 最終日時) を足し込む。"""
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    statement = dialect_insert(ROLLUP_TABLE)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ROLLUP_TABLE.c.customer_id],
+        set_={
+            "visit_count": ROLLUP_TABLE.c.visit_count + statement.excluded.visit_count,
+            "last_visit_at": case(
+                (
+                    (ROLLUP_TABLE.c.last_visit_at.is_(None))
+                    | (statement.excluded.last_visit_at > ROLLUP_TABLE.c.last_visit_at),
+                    statement.excluded.last_visit_at,
+                ),
+                else_=ROLLUP_TABLE.c.last_visit_at,
+            ),
+        },
+    )
+    conn.execute(statement, rows)
+
+
+class ReservationCompactor:
+    """cutoff より前の予約を cold に移し、rollup に足し込むジョブ本体。"""
+
+    def __init__(self, engine: Engine, batch_size: int = 10_000) -> None:
+        self._engine = engine
+        self._batch_size = batch_size
+
+    def compact_before(self, cutoff: datetime, vacuum: bool = False) -> list[CompactionResult]:
+        """cutoff より前に丸ごと収まる期間（SQLite は年、Postgres は月）を cold に移す。
+
+        対応しているのは SQLite（ファイル）と Postgres だけ。それ以外の engine では ValueError。
+        """
+        dialect = self._engine.dialect.name
+        if dialect == "sqlite":
+            results = [self.compact_sqlite_year(year, vacuum=vacuum) for year in self._sqlite_years_before(cutoff)]
+        elif dialect == "postgresql":
+            self._split_postgres_default_before(cutoff)
+            results = [self.compact_postgres_month(year, month) for year, month in self._postgres_months_before(cutoff)]
+        else:
+            raise ValueError(f"reservation compaction is not supported on {dialect} (supported: sqlite, postgresql)")
+        invalidate_reservation_partitions(self._engine)
+        return results
+
+    # ---------- SQLite ----------
+
+    def _sqlite_years_before(self, cutoff: datetime) -> list[int]:
+        with self._engine.connect() as conn:
+            oldest = conn.execute(select(func.min(HOT_TABLE.c.start_datetime))).scalar_one()
+            if oldest is None:
+                return []
+            # cutoff の年より前で、hot に行が残っている年だけ（年の途中では切らない）
+            return [
+                year
+                for year in range(oldest.year, cutoff.year)
+                if conn.execute(
+                    select(HOT_TABLE.c.id)
+                    .where(HOT_TABLE.c.start_datetime >= _month_start(year, 1))
+                    .where(HOT_TABLE.c.start_datetime < _month_start(year + 1, 1))
+                    .limit(1)
+                ).first()
+                is not None
+            ]
+
+    def compact_sqlite_year(self, year: int, vacuum: bool = False) -> CompactionResult:
+        database_path = _sqlite_database_path(self._engine)
+        if database_path is None:
+            raise ValueError("reservation compaction needs a file-based SQLite database")
+        archive = sqlite_archive_table(year)
+        start, end = _month_start(year, 1), _month_start(year + 1, 1)
+        in_year = (HOT_TABLE.c.start_datetime >= start) & (HOT_TABLE.c.start_datetime < end)
+        columns = [c.name for c in HOT_TABLE.columns]
+        moved = 0
+
+        with self._engine.connect() as conn:
+            schema = sqlite_archive_schema(year)
+            if schema not in _attached_schemas(conn.connection.driver_connection):
+                conn.exec_driver_sql(f"ATTACH DATABASE ? AS {schema}", (str(sqlite_archive_path(database_path, year)),))
+            archive.metadata.create_all(conn)
+            conn.commit()
+
+            while True:
+                ids = (
+                    conn.execute(select(HOT_TABLE.c.id).where(in_year).order_by(HOT_TABLE.c.id).limit(self._batch_size))
+                    .scalars()
+                    .all()
+                )
+                if not ids:
+                    break
+                in_batch = HOT_TABLE.c.id.in_(ids)
+
+                # 1) cold へコピーして確定（同じ id は無視するので、再実行しても重複しない）
+                conn.execute(
+                    insert(archive)
+                    .prefix_with("OR IGNORE")
+                    .from_select(columns, select(*[HOT_TABLE.c[name] for name in columns]).where(in_batch))
+                )
+                conn.commit()
+
+                # 2) rollup への加算と hot からの削除は同じトランザクション
+                rollups = conn.execute(
+                    select(
+                        HOT_TABLE.c.customer_id,
+                        func.count().label("visit_count"),
+                        func.max(HOT_TABLE.c.start_datetime).label("last_visit_at"),
+                    )
+                    .where(in_batch)
+                    .group_by(HOT_TABLE.c.customer_id)
+                ).mappings().all()
+                _rollup_upsert(conn, [dict(row) for row in rollups])
+                conn.execute(delete(HOT_TABLE).where(in_batch))
+                conn.commit()
+                moved += len(ids)
+
+            if vacuum:
+                # cold ファイルを詰める（hot 側の空き領域はそのまま再利用される）
+                conn.exec_driver_sql(f"VACUUM {schema}")
+
+        logger.info("compacted %d reservations of %d into %s", moved, year, sqlite_archive_path(database_path, year))
+        return CompactionResult(partition=schema, moved_rows=moved)
+
+    # ---------- Postgres ----------
+
+    def _split_postgres_default_before(self, cutoff: datetime) -> None:
+        """DEFAULT パーティションにある cutoff より前に丸ごと収まる月を、月パーティションに切り出す。
+
+        partition-postgres の --from-month より古い行や、ensure-months を回す前に入った行は DEFAULT に入る。
+        月パーティションにしておけば、ほかの月と同じように rollup に畳んで DETACH できる。
+        """
+        with self._engine.connect() as conn:
+            if conn.execute(text("SELECT to_regclass(:name)"), {"name": POSTGRES_DEFAULT_PARTITION}).scalar() is None:
+                return
+            months = conn.execute(
+                text(
+                    "SELECT DISTINCT date_trunc('month', start_datetime AT TIME ZONE 'UTC') "
+                    f"FROM {POSTGRES_DEFAULT_PARTITION} WHERE start_datetime < :cutoff"
+                ),
+                {"cutoff": cutoff},
+            ).scalars().all()
+        for month_start in sorted(months):
+            year, month = month_start.year, month_start.month
+            if _month_start(*_next_month(year, month)) > cutoff:
+                continue
+            # 月ごとに 1 トランザクション（途中で止めても、切り出し終わった月はそのまま）
+            with self._engine.begin() as conn:
+                if ensure_postgres_month_partition(conn, year, month):
+                    logger.info("split %s out of %s", postgres_partition_name(year, month), POSTGRES_DEFAULT_PARTITION)
+
+    def _postgres_months_before(self, cutoff: datetime) -> list[tuple[int, int]]:
+        with self._engine.connect() as conn:
+            names = conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+                    "WHERE p.relname = 'reservations'"
+                )
+            ).scalars()
+            months = []
+            for name in names:
+                match = _POSTGRES_PARTITION_NAME.fullmatch(name)
+                if match:
+                    year, month = int(match.group(1)), int(match.group(2))
+                    if _month_start(*_next_month(year, month)) <= cutoff:
+                        months.append((year, month))
+        return sorted(months)
+
+    def compact_postgres_month(self, year: int, month: int) -> CompactionResult:
+        name = postgres_partition_name(year, month)
+        with self._engine.begin() as conn:
+            moved = conn.execute(text(f"SELECT count(*) FROM {name}")).scalar_one()
+            conn.execute(
+                text(
+                    "INSERT INTO reservation_visit_rollups (customer_id, visit_count, last_visit_at) "
+                    f"SELECT customer_id, count(*), max(start_datetime) FROM {name} GROUP BY customer_id "
+                    "ON CONFLICT (customer_id) DO UPDATE SET "
+                    "visit_count = reservation_visit_rollups.visit_count + EXCLUDED.visit_count, "
+                    "last_visit_at = GREATEST(reservation_visit_rollups.last_visit_at, EXCLUDED.last_visit_at)"
+                )
+            )
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {POSTGRES_ARCHIVE_SCHEMA}"))
+            conn.execute(text(f"ALTER TABLE reservations DETACH PARTITION {name}"))
+            conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {POSTGRES_ARCHIVE_SCHEMA}"))
+        logger.info("detached %s (%d reservations) into %s", name, moved, POSTGRES_ARCHIVE_SCHEMA)
+        return CompactionResult(partition=f"{POSTGRES_ARCHIVE_SCHEMA}.{name}", moved_rows=moved)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Reservation partition maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compact = sub.add_parser("compact", help="保持期間より前の予約を cold に移す")
+    compact.add_argument("--retention-days", type=int, default=None, help="未指定なら APP_RESERVATION_HOT_RETENTION_DAYS")
+    compact.add_argument("--vacuum", action="store_true", help="SQLite: 移したあと cold ファイルを VACUUM する")
+    partition = sub.add_parser("partition-postgres", help="Postgres: reservations を月パーティションに作り替える")
+    partition.add_argument(
+        "--from-month",
+        type=date.fromisoformat,
+        default=None,
+        help="例: 2020-01-01。未指定またはこれより古い予約があれば、最古の予約の月から作る",
+    )
+    partition.add_argument("--months-ahead", type=int, default=3)
+    ensure = sub.add_parser("ensure-months", help="Postgres: 今月から先の月パーティションを作る")
+    ensure.add_argument("--months-ahead", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from app.core.config import get_settings
+    from app.infrastructure.db.session import dispose_database, get_database
+
+    settings = get_settings()
+    database = get_database()
+    # 予約は店舗ごとのシャードにあり、cold パーティションもそのシャードに置く（読み出しは店舗のシャードから）
+    engines = (
+        [shard.engine for shard in database.shard_router.shards]
+        if database.shard_router is not None
+        else [database.engine]
+    )
+    today = datetime.now(timezone.utc).date().replace(day=1)
+    try:
+        for index, engine in enumerate(engines):
+            prefix = f"shard {index} " if len(engines) > 1 else ""
+            if args.command == "compact":
+                retention_days = args.retention_days or settings.reservation_hot_retention_days
+                cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+                compactor = ReservationCompactor(engine, batch_size=settings.reservation_compaction_batch_size)
+                for result in compactor.compact_before(cutoff, vacuum=args.vacuum):
+                    print(f"{prefix}{result.partition}: {result.moved_rows} rows")
+            elif args.command == "partition-postgres":
+                last = today
+                for _ in range(args.months_ahead):
+                    last = date(*_next_month(last.year, last.month), 1)
+                with engine.begin() as conn:
+                    # 既存の予約がすべて月パーティションに入るように、最古の予約の月から作る（DEFAULT に古い履歴をためない）
+                    oldest = conn.execute(select(func.min(HOT_TABLE.c.start_datetime))).scalar_one()
+                    oldest_month = oldest.astimezone(timezone.utc).date() if oldest is not None else None
+                    candidates = [m for m in (args.from_month, oldest_month, today) if m is not None]
+                    first = min(candidates).replace(day=1)
+                    for statement in postgres_partitioning_ddl(first, last):
+                        conn.execute(text(statement))
+            elif args.command == "ensure-months":
+                with engine.begin() as conn:
+                    ensure_postgres_month_partitions(conn, today, args.months_ahead + 1)
+    finally:
+        dispose_database()
+
+
+if __name__ == "__main__":
+    main()
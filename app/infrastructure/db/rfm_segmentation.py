@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from sqlalchemy import Engine, Float, Select, bindparam, func, select, type_coerce, update
+from sqlalchemy.engine import Connection
+
+from app.domain.customer.enums import CustomerSegment
+from app.domain.customer.segments import MAX_SCORE, segment_for
+from app.domain.opportunity.enums import OpportunityStatus
+from app.domain.reservation.enums import ReservationStatus
+from app.infrastructure.db.columnar import epoch_seconds, stream_arrays
+from app.infrastructure.db.reservation_partitions import HOT_TABLE, ROLLUP_TABLE, load_reservation_partitions
+from app.infrastructure.orm.customer import CustomerORM
+from app.infrastructure.orm.opportunity import OpportunityORM
+
+if TYPE_CHECKING:
+    import numpy as np
+
+"""
+Title: 「RFM セグメントのバッチ集計（予約・受注商談を NumPy にまとめて読み、customers.rank に書き戻す）」
+
+実行: python -m app.infrastructure.db.rfm_segmentation [--window-days 365] [--as-of 2026-01-01T00:00:00+00:00] [--dry-run]
+
+Description:
+    顧客ごとに
+        R: 最終来店・受注日（来店済み / 会計済みの予約、受注した商談。アーカイブ済みの予約は rollup の最終来店日時）
+        F: 期間内（as_of から window_days 日）の来店・受注の回数
+        M: 期間内の受注金額の合計
+    を求め、顧客全体の五分位で 1〜5 のスコアにして、app.domain.customer.segments のルールでセグメントを決める。
+
+Point:
+    - 行は chunk_size 件ずつストリーミングで読み（yield_per）、(customer_id, 日時の epoch 秒, 金額) の配列にする。
+      日時は SQL 側で epoch 秒にして読む（app.infrastructure.db.columnar）。1 行ずつ datetime を作らない。
+    - 顧客ごとの集計は customer_id を添字にした密な配列への np.maximum.at / np.bincount（Python のループなし）。
+    - 五分位は np.sort + np.searchsorted（同じ値の顧客は同じスコア）。セグメントは 5 × 5 × 5 の表引き。
+    - 書き戻しは rank が変わる顧客だけを chunk_size 件ずつの executemany UPDATE で行う（updated_at / version は変えない。
+      rank は集計結果で、顧客の編集ではないため）。
+    - 読み取りを全部終えてから書く（SQLite で読み取り中の接続があると書き込みがロック待ちになるため）。
+    - シャーディング時は全シャードの engine を渡す。ID は全シャードで一意なので、同じ配列に集めて全体で五分位を取る。
+"""
+
+EVENT_STATUSES = (ReservationStatus.VISITED.value, ReservationStatus.PAID.value)
+SEGMENTS = list(CustomerSegment)
+_UNKNOWN_RANK = -2  # SEGMENTS にない値（手で入れた A / B / C など）。必ず書き換える
+_NO_RANK = -1  # NULL（履歴のない顧客）
+
+
+def _segment_table() -> "np.ndarray":
+    """scores (r, f, m) → SEGMENTS の添字の表（添字 0 は使わない）。"""
+    import numpy as np
+
+    table = np.full((MAX_SCORE + 1,) * 3, _NO_RANK, dtype=np.int8)
+    for r in range(1, MAX_SCORE + 1):
+        for f in range(1, MAX_SCORE + 1):
+            for m in range(1, MAX_SCORE + 1):
+                table[r, f, m] = SEGMENTS.index(segment_for(r, f, m))
+    return table
+
+
+def quintile_scores(values: "np.ndarray") -> "np.ndarray":
+    """値の大きいほど高い 1〜5 のスコア（顧客全体の中での順位の五分位。同じ値は同じスコア）。"""
+    import numpy as np
+
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int8)
+    rank = np.searchsorted(np.sort(values), values, side="left")
+    return (1 + rank * MAX_SCORE // len(values)).astype(np.int8)
+
+
+class _Accumulator:
+    """customer_id を添字にした、顧客ごとの R / F / M の途中結果。"""
+
+    def __init__(self, size: int, window_start: float, as_of: float) -> None:
+        import numpy as np
+
+        self.size = size
+        self.window_start = window_start
+        self.as_of = as_of
+        self.last = np.full(size, -np.inf)
+        self.frequency = np.zeros(size, dtype=np.int64)
+        self.monetary = np.zeros(size, dtype=np.float64)
+        self.events = 0
+
+    def add(self, chunk: "np.ndarray", with_frequency: bool = True) -> None:
+        """chunk: (customer_id, epoch 秒[, 金額]) の 2 次元配列。"""
+        import numpy as np
+
+        customer_ids = chunk[:, 0].astype(np.int64)
+        at = chunk[:, 1]
+        keep = (customer_ids >= 0) & (customer_ids < self.size) & (at <= self.as_of)
+        customer_ids, at = customer_ids[keep], at[keep]
+        self.events += len(customer_ids)
+
+        np.maximum.at(self.last, customer_ids, at)
+        if not with_frequency:
+            return
+        in_window = at >= self.window_start
+        self.frequency += np.bincount(customer_ids[in_window], minlength=self.size)
+        if chunk.shape[1] > 2:
+            amounts = np.nan_to_num(chunk[:, 2][keep][in_window])
+            self.monetary += np.bincount(customer_ids[in_window], weights=amounts, minlength=self.size)
+
+
+@dataclass(frozen=True)
+class RfmResult:
+    customers: int
+    scored: int
+    updated: int
+    events: int
+    read_seconds: float
+    write_seconds: float
+    segments: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.read_seconds if self.read_seconds else 0.0
+
+
+class RfmSegmentation:
+    """RFM セグメントを集計して customers.rank に書き戻すジョブ。"""
+
+    def __init__(self, engines: Sequence[Engine], chunk_size: int = 100_000) -> None:
+        self._engines = list(engines)
+        self._chunk_size = chunk_size
+
+    def _event_queries(self, conn: Connection, window_start: datetime) -> list[tuple[Select, bool]]:
+        """(SELECT, F / M に数えるか) の一覧。"""
+        dialect = conn.dialect.name
+        queries = []
+        # 予約: hot は全件（R のため）、期間に重なるアーカイブ済みパーティションは期間内だけ
+        for table in load_reservation_partitions(conn).tables_between(window_start, None):
+            query = select(table.c.customer_id, epoch_seconds(table.c.start_datetime, dialect)).where(
+                table.c.status.in_(EVENT_STATUSES)
+            )
+            if table is not HOT_TABLE:
+                query = query.where(table.c.start_datetime >= window_start)
+            queries.append((query, True))
+        # アーカイブ済みの予約は rollup の最終来店日時だけ（R のため）
+        queries.append(
+            (
+                select(
+                    ROLLUP_TABLE.c.customer_id, epoch_seconds(ROLLUP_TABLE.c.last_visit_at, dialect)
+                ).where(ROLLUP_TABLE.c.last_visit_at.is_not(None)),
+                False,
+            )
+        )
+        # 受注した商談: 成約日（なければ更新日時）と金額
+        opportunities = OpportunityORM.__table__
+        closed_at = func.coalesce(opportunities.c.expected_close_date, opportunities.c.updated_at)
+        queries.append(
+            (
+                select(
+                    opportunities.c.customer_id,
+                    epoch_seconds(closed_at, dialect),
+                    type_coerce(func.coalesce(opportunities.c.amount, 0), Float),
+                ).where(opportunities.c.status == OpportunityStatus.WON.name),
+                True,
+            )
+        )
+        return queries
+
+    def run(
+        self,
+        as_of: Optional[datetime] = None,
+        window_days: int = 365,
+        dry_run: bool = False,
+    ) -> RfmResult:
+        import numpy as np
+
+        as_of = as_of or datetime.now(timezone.utc)
+        window_start = as_of - timedelta(days=window_days)
+        customers = CustomerORM.__table__
+        started_at = time.perf_counter()
+
+        # 1. 読み取り（顧客の現在の rank と、予約・商談・rollup）
+        max_ids = []
+        for engine in self._engines:
+            with engine.connect() as conn:
+                max_ids.append(conn.scalar(select(func.max(customers.c.id))) or 0)
+        size = max(max_ids, default=0) + 1
+        accumulator = _Accumulator(size, window_start.timestamp(), as_of.timestamp())
+        current = np.full(size, _NO_RANK, dtype=np.int8)
+        exists = np.zeros(size, dtype=bool)
+        codes = {segment.value: i for i, segment in enumerate(SEGMENTS)}
+
+        for engine in self._engines:
+            with engine.connect() as conn:
+                result = conn.execution_options(yield_per=self._chunk_size).execute(
+                    select(customers.c.id, customers.c.rank)
+                )
+                for rows in result.partitions():
+                    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+                    exists[ids] = True
+                    current[ids] = [
+                        _NO_RANK if row[1] is None else codes.get(row[1], _UNKNOWN_RANK) for row in rows
+                    ]
+                for query, with_frequency in self._event_queries(conn, window_start):
+                    for chunk in stream_arrays(conn, query, self._chunk_size):
+                        accumulator.add(chunk, with_frequency)
+
+        # 2. スコアとセグメント（履歴のある顧客だけで五分位を取る）
+        scored = exists & np.isfinite(accumulator.last)
+        new = np.full(size, _NO_RANK, dtype=np.int8)
+        if scored.any():
+            r = quintile_scores(accumulator.last[scored])
+            f = quintile_scores(accumulator.frequency[scored])
+            m = quintile_scores(accumulator.monetary[scored])
+            new[scored] = _segment_table()[r, f, m]
+        read_seconds = time.perf_counter() - started_at
+
+        # 3. rank が変わる顧客だけ書き戻す
+        changed = exists & (new != current)
+        updated = 0
+        started_at = time.perf_counter()
+        if not dry_run and changed.any():
+            labels: list[Optional[str]] = [segment.value for segment in SEGMENTS]
+            statement = (
+                update(customers)
+                .where(customers.c.id == bindparam("customer_id"))
+                .values(rank=bindparam("new_rank"))
+            )
+            changed_ids = np.flatnonzero(changed)
+            for engine in self._engines:
+                with engine.connect() as conn:
+                    on_engine = np.fromiter(
+                        (row[0] for row in conn.execute(select(customers.c.id))), dtype=np.int64
+                    )
+                targets = np.intersect1d(changed_ids, on_engine, assume_unique=True)
+                for start in range(0, len(targets), self._chunk_size):
+                    batch = targets[start : start + self._chunk_size]
+                    params = [
+                        {"customer_id": int(customer_id), "new_rank": labels[code] if code >= 0 else None}
+                        for customer_id, code in zip(batch, new[batch])
+                    ]
+                    with engine.begin() as conn:
+                        conn.execute(statement, params)
+                    updated += len(params)
+        write_seconds = time.perf_counter() - started_at
+
+        counts = np.bincount(new[scored].astype(np.int64), minlength=len(SEGMENTS))
+        return RfmResult(
+            customers=int(exists.sum()),
+            scored=int(scored.sum()),
+            updated=updated if not dry_run else int(changed.sum()),
+            events=accumulator.events,
+            read_seconds=read_seconds,
+            write_seconds=write_seconds,
+            segments={segment.value: int(count) for segment, count in zip(SEGMENTS, counts)},
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compute RFM segments and write them to customers.rank.")
+    parser.add_argument("--window-days", type=int, default=None, help="F / M を数える期間。未指定なら APP_RFM_WINDOW_DAYS")
+    parser.add_argument("--as-of", type=datetime.fromisoformat, default=None, help="基準日時（既定: 現在）")
+    parser.add_argument("--dry-run", action="store_true", help="書き戻さずに件数だけ表示する")
+    args = parser.parse_args(argv)
+
+    from app.core.config import get_settings
+    from app.infrastructure.db.session import dispose_database, get_database
+
+    settings = get_settings()
+    database = get_database()
+    engines = (
+        [shard.engine for shard in database.shard_router.shards]
+        if database.shard_router is not None
+        else [database.engine]
+    )
+    try:
+        result = RfmSegmentation(engines, chunk_size=settings.rfm_chunk_size).run(
+            as_of=args.as_of,
+            window_days=args.window_days or settings.rfm_window_days,
+            dry_run=args.dry_run,
+        )
+    finally:
+        dispose_database()
+
+    print(
+        f"customers={result.customers} scored={result.scored} "
+        f"{'would update' if args.dry_run else 'updated'}={result.updated} events={result.events}"
+    )
+    print(
+        f"read {result.read_seconds:.2f} s ({result.events_per_second:,.0f} events/s), "
+        f"write {result.write_seconds:.2f} s"
+    )
+    for segment, count in result.segments.items():
+        print(f"  {segment:<16} {count:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-from typing import Generator
+import threading
+from dataclasses import dataclass
+from typing import Any, Generator, Optional
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import sessionmaker, Session, SessionTransaction
 
-from app.core.config import settings
+from app.core.config import Settings, get_settings
+from app.infrastructure.db.cold_archive import ColdArchiveStore, create_archive_store
+from app.infrastructure.db.customer_value import track_customer_value
+from app.infrastructure.db.pool_metrics import InstrumentedQueuePool, PoolMetrics
+from app.infrastructure.db.query_stats import QueryInstrumentation
+from app.infrastructure.db.reservation_partitions import attach_sqlite_reservation_archives
+from app.infrastructure.db.sharding import Shard, ShardRouter, ShardSessions
+from app.infrastructure.db.slow_query_log import SlowQueryLog
+from app.infrastructure.db.sqlite_profile import SqliteOptimizer, SqliteProfile, apply_sqlite_profile
 
 """
 ①リクエスト到着
@@ -23,31 +34,249 @@ from app.core.config import settings
   - そのリクエスト中の変更はすべて取り消される
 """
 
-DATABASE_URL = settings.database_url
+def _is_sqlite_memory(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
 
 
-def _create_engine(url: str):
-    if url.startswith("sqlite://"):
+def _create_engine(url: str, app_settings: Settings) -> Engine:
+    if url.startswith("sqlite://") and _is_sqlite_memory(url):
+        # インメモリ SQLite は SingletonThreadPool のまま（プール設定は意味を持たない）
         return create_engine(
             url,
             connect_args={"check_same_thread": False},
             future=True,
+            query_cache_size=app_settings.db_query_cache_size,
+        )
+
+    pool_kwargs = dict(
+        poolclass=InstrumentedQueuePool,
+        pool_size=app_settings.db_pool_size,
+        max_overflow=app_settings.db_max_overflow,
+        pool_timeout=app_settings.db_pool_timeout_seconds,
+        pool_use_lifo=app_settings.db_pool_use_lifo,
+    )
+    if url.startswith("sqlite://"):
+        sqlite_engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            future=True,
+            query_cache_size=app_settings.db_query_cache_size,
+            **pool_kwargs,
         )
+        if app_settings.sqlite_profile_enabled:
+            apply_sqlite_profile(
+                sqlite_engine,
+                SqliteProfile(
+                    mmap_size_bytes=app_settings.sqlite_mmap_size_bytes,
+                    cache_size_kib=app_settings.sqlite_cache_size_kib,
+                    busy_timeout_ms=app_settings.sqlite_busy_timeout_ms,
+                ),
+            )
+        # 古い年の予約を移したアーカイブファイル（<DB名>.reservations_<年>.db）を ATTACH する
+        attach_sqlite_reservation_archives(sqlite_engine)
+        return sqlite_engine
+
+    if app_settings.db_pool_liveness == "recycle":
+        # チェックアウトごとの SELECT 1 をやめ、一定時間使った接続を作り直すだけにする
+        # （DB / LB のアイドルタイムアウトより短い値にしておくこと）
+        liveness_kwargs = dict(pool_pre_ping=False, pool_recycle=app_settings.db_pool_recycle_seconds)
+    else:
+        liveness_kwargs = dict(pool_pre_ping=True)
     return create_engine(
         url,
-        pool_pre_ping=True,
         future=True,
+        query_cache_size=app_settings.db_query_cache_size,
+        **pool_kwargs,
+        **liveness_kwargs,
     )
 
 
-engine = _create_engine(DATABASE_URL)
+class ReadOnlySessionError(RuntimeError):
+    """読み取り専用セッションで INSERT/UPDATE/DELETE を flush しようとしたときの例外。"""
+
+
+def _reject_flush(session: Session, flush_context, instances) -> None:
+    # 変更がない flush では before_flush は呼ばれないので、ここに来た時点で書き込みがある
+    raise ReadOnlySessionError("This session is read-only; writes must go through get_db().")
+
 
-SessionLocal = sessionmaker(
-    bind=engine,
-    autoflush=False,
-    autocommit=False,
-    expire_on_commit=False,
-)
+def _set_transaction_read_only(session: Session, transaction: SessionTransaction, connection: Connection) -> None:
+    # Postgres / MySQL では DB 側でも読み取り専用トランザクションにする（SQLite にはこの構文がない）
+    if connection.dialect.name in ("postgresql", "mysql", "mariadb"):
+        connection.execute(text("SET TRANSACTION READ ONLY"))
+
+
+def make_read_only_sessionmaker(bind: Engine) -> sessionmaker[Session]:
+    """GET / 参照系ユースケース用の sessionmaker を作る。
+
+    - トランザクション開始時に SET TRANSACTION READ ONLY（対応 DB のみ）
+    - 書き込みの flush は ReadOnlySessionError で弾く
+    """
+    factory = sessionmaker(
+        bind=bind,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+        info={"read_only": True},
+    )
+    event.listen(factory, "before_flush", _reject_flush)
+    event.listen(factory, "after_begin", _set_transaction_read_only)
+    return factory
+
+
+def make_shard(engine: Engine, customer_value_window_days: int = 365) -> Shard:
+    """engine から、書き込み用 / 読み取り専用の sessionmaker を持つ Shard を作る。
+
+    書き込み用の sessionmaker は、商談の変更を顧客ごとの金額集計（customer_value_aggregates）に足し込む。
+    """
+    session_factory = sessionmaker(
+        bind=engine,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+    )
+    track_customer_value(session_factory, window_days=customer_value_window_days)
+    return Shard(
+        engine=engine,
+        session_factory=session_factory,
+        read_session_factory=make_read_only_sessionmaker(engine),
+    )
+
+
+@dataclass
+class Database:
+    """engine と、それに紐づく sessionmaker / 計測フックの一式。"""
+
+    engine: Engine
+    session_factory: sessionmaker[Session]
+    read_session_factory: sessionmaker[Session]
+    pool_metrics: PoolMetrics
+    slow_query_log: Optional[SlowQueryLog]
+    sqlite_optimizer: Optional[SqliteOptimizer]
+    archive_store: ColdArchiveStore
+    shard_router: Optional[ShardRouter]
+
+    @classmethod
+    def create(cls, app_settings: Settings) -> "Database":
+        url = app_settings.database_url
+        engine = _create_engine(url, app_settings)
+
+        # チェックアウト待ち時間・使用中本数などを記録する（/api/admin/db-pool で参照）
+        pool_metrics = PoolMetrics()
+        pool_metrics.attach(engine)
+
+        # リクエストごとの SQL 件数・DB 時間と N+1 検知（出力は interface 層の SqlTimingMiddleware）
+        instrumentation: Optional[QueryInstrumentation] = None
+        if app_settings.sql_instrumentation_enabled:
+            instrumentation = QueryInstrumentation(
+                n_plus_one_threshold=app_settings.sql_n_plus_one_threshold,
+                n_plus_one_mode=app_settings.sql_n_plus_one_mode,
+            )
+            instrumentation.attach(engine)
+
+        # スロークエリログ（/api/admin/slow-queries で上位 N 件を参照）
+        slow_query_log: Optional[SlowQueryLog] = None
+        if app_settings.slow_query_log_enabled:
+            slow_query_log = SlowQueryLog(
+                threshold_ms=app_settings.slow_query_threshold_ms,
+                sample_rate=app_settings.slow_query_sample_rate,
+                explain_enabled=app_settings.slow_query_explain_enabled,
+                max_fingerprints=app_settings.slow_query_max_fingerprints,
+            )
+            slow_query_log.attach(engine)
+
+        # SQLite ファイルなら定期的に PRAGMA optimize を流す（開始/停止は ProviderRegistry が行う）
+        sqlite_optimizer = (
+            SqliteOptimizer(engine, interval_seconds=app_settings.sqlite_optimize_interval_seconds)
+            if url.startswith("sqlite://") and not _is_sqlite_memory(url) and app_settings.sqlite_profile_enabled
+            else None
+        )
+
+        # 古い活動履歴・メモ・監査ログの移し先（engine は接続しに行くまで何もしない）
+        archive_store = create_archive_store(
+            url, app_settings.archive_database_url, engine, codec=app_settings.archive_codec
+        )
+
+        # 店舗単位のシャーディング（この engine がシャード 0、APP_SHARD_DATABASE_URLS が 1, 2, ...）
+        primary = make_shard(engine, app_settings.customer_value_window_days)
+        shard_router: Optional[ShardRouter] = None
+        if app_settings.shard_database_urls:
+            shards = [primary]
+            for shard_url in app_settings.shard_database_urls:
+                shard_engine = _create_engine(shard_url, app_settings)
+                if instrumentation is not None:
+                    instrumentation.attach(shard_engine)
+                shards.append(make_shard(shard_engine, app_settings.customer_value_window_days))
+            shard_router = ShardRouter(
+                shards,
+                assignment_ttl_seconds=app_settings.shard_assignment_ttl_seconds,
+                id_block_size=app_settings.shard_id_block_size,
+                # 1 シャードあたり接続プールの上限まで同時に問い合わせられるように（それ以上はどのみち接続待ち）
+                fan_out_workers=app_settings.shard_fan_out_workers
+                or len(shards) * (app_settings.db_pool_size + app_settings.db_max_overflow),
+            )
+
+        return cls(
+            engine=engine,
+            session_factory=primary.session_factory,
+            read_session_factory=primary.read_session_factory,
+            pool_metrics=pool_metrics,
+            slow_query_log=slow_query_log,
+            sqlite_optimizer=sqlite_optimizer,
+            archive_store=archive_store,
+            shard_router=shard_router,
+        )
+
+    def dispose(self) -> None:
+        if self.slow_query_log is not None:
+            self.slow_query_log.shutdown()
+        if self.archive_store.engine is not self.engine:
+            self.archive_store.engine.dispose()
+        if self.shard_router is not None:
+            self.shard_router.dispose()
+            for shard in self.shard_router.shards[1:]:
+                shard.engine.dispose()
+        self.engine.dispose()
+
+
+# engine は import 時ではなく、最初に必要になったとき（lifespan か最初のリクエスト）に作る
+_database: Optional[Database] = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> Database:
+    """プロセスで 1 つの Database を返す（なければ Settings から作る）。"""
+    global _database
+    database = _database
+    if database is None:
+        with _database_lock:
+            if _database is None:
+                _database = Database.create(get_settings())
+            database = _database
+    return database
+
+
+def dispose_database() -> None:
+    """lifespan の終了時に呼ぶ。次に get_database() されたら作り直す。"""
+    global _database
+    with _database_lock:
+        database, _database = _database, None
+    if database is not None:
+        database.dispose()
+
+
+def __getattr__(name: str) -> Any:
+    # 互換用: from app.infrastructure.db.session import engine / SessionLocal などは
+    # アクセスされた時点で Database を作って返す
+    if name == "engine":
+        return get_database().engine
+    if name == "SessionLocal":
+        return get_database().session_factory
+    if name == "ReadOnlySessionLocal":
+        return get_database().read_session_factory
+    if name in ("pool_metrics", "slow_query_log", "sqlite_optimizer", "archive_store", "shard_router"):
+        return getattr(get_database(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -57,7 +286,7 @@ def get_db() -> Generator[Session, None, None]:
     - 正常終了時: commit
     - 例外発生時: rollback
     """
-    db: Session = SessionLocal()
+    db: Session = get_database().session_factory()
     try:
         yield db  # ★ ここでルーター / service / repository が実行される
         db.commit()  # ★ 正常終了ならここでトランザクション確定
@@ -66,3 +295,37 @@ def get_db() -> Generator[Session, None, None]:
         raise
     finally:
         db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """FastAPI Depends 用の読み取り専用 DB セッション依存関数。
+
+    - commit しない（確定させるものがないので、COMMIT の往復を省く）
+    - close 時にトランザクションは rollback で終わる
+    - 書き込みを flush しようとすると ReadOnlySessionError
+    """
+    db: Session = get_database().read_session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_shard_sessions() -> Generator[Optional[ShardSessions], None, None]:
+    """FastAPI Depends 用。シャーディングが有効ならリクエスト単位の ShardSessions、無効なら None。
+
+    - get_db() と同じく、正常終了時に commit・例外時に rollback（開いたシャードの分だけ）
+    """
+    router = get_database().shard_router
+    if router is None:
+        yield None
+        return
+    sessions = ShardSessions(router)
+    try:
+        yield sessions
+        sessions.commit()
+    except Exception:
+        sessions.rollback()
+        raise
+    finally:
+        sessions.close()
@@ -0,0 +1,584 @@
+from __future__ import annotations
+
+import argparse
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Optional, Sequence, TypeVar
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Engine,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.infrastructure.db.reservation_partitions import (
+    ArchivedPartition,
+    invalidate_reservation_partitions,
+    load_reservation_partitions,
+    prepare_archived_partition,
+)
+from app.infrastructure.orm import (
+    ActivityORM,
+    Base,
+    CustomerORM,
+    CustomerValueAggregateORM,
+    NoteORM,
+    OpportunityORM,
+    OpportunityStageORM,
+    ReservationORM,
+    ReservationVisitRollupORM,
+    ShopORM,
+    TaskORM,
+)
+
+"""
+Title: 「店舗（shop_id）単位のシャーディング：ルーター・ID 採番・店舗の移動（リバランス）」
+
+Description:
+    大きな店舗が 1 つの DB を占有しないよう、店舗ごとのデータを N 個の DB（シャード）に分ける。
+
+        シャード 0   : 既存の DB（APP_DATABASE_URL）。ユーザー・ロール・監査ログなどの全体データと、
+                       店舗の割り当て表（shop_shards）・ID 採番表（shard_id_blocks）を持つ「ディレクトリ」も兼ねる
+        シャード 1.. : APP_SHARD_DATABASE_URLS。店舗に属するテーブル（SHARDED_TABLES）と、
+                       参照用に複製した shops / opportunity_stages だけを持つ
+
+    shop_id → シャードは shop_shards の行で決める。行がない店舗はシャード 0（シャーディング前からの DB）に置く。
+    シャード数から計算（shop_id % N など）しないので、シャードを足しても既存の店舗の行き先は変わらない。
+        - init: 既存の店舗をすべてシャード 0 として shop_shards に書く（データはシャーディング前の DB にあるので）
+        - add-shop: 新しい店舗を、割り当てた店舗の少ないシャードへ置く（データを入れる前に流す）
+        - move: リバランスで店舗を動かすと shop_shards の行を書き換える
+
+Point:
+    - リポジトリは ShardRouter からセッションを受け取る。店舗が決まっていればそのシャードだけ、
+      決まっていなければ（shop_id なしの一覧、customer_id だけの詳細）全シャードに並列で投げて結果をマージする。
+    - 並列実行はスレッドプール。contextvars を引き継ぐので、リクエストごとの SQL 件数（Server-Timing）に各シャードの分も入る。
+    - 主キーの自動採番はシャードごとに独立していて衝突するので、ShardRouter.allocate_id() で
+      ディレクトリから ID をブロック単位（既定 1,000 件）で払い出して明示的に入れる。
+      店舗を移しても ID はそのまま持っていける。
+      （SQLite のシャード 0 では、同じリクエストで書き込み中にブロックを取り直すとロック待ちになる。
+      1 リクエスト 1 件の作成ならブロックの取得が先に済むので問題にならない）
+    - 店舗の移動は「コピー先の同じ店舗の行を消す → コピー → コミット → 割り当てを書き換え → コピー元から削除」。
+      移動中の書き込みは取りこぼすので、店舗を止めてから流す前提。途中で落ちても再実行すればやり直せる。
+      予約の cold パーティション（reservation_partitions）にある店舗の行も、コピー先に同じ期間のパーティションを
+      用意して一緒に移す（カレンダー・コホート・RFM はシャードの cold パーティションも読むため）。
+    - シャード 1.. に users は無いので、users への外部キーは張らない（create_shard_schema）。
+    - 予約のコンパクション・パーティション作成（reservation_partitions）やアーカイブ（cold_archive）などの保守ジョブは、
+      ジョブ自身が全シャードを順に処理する（APP_DATABASE_URL をシャードに向けて流さない）。
+      予約の cold パーティションは各シャードに、活動履歴・メモのアーカイブは APP_ARCHIVE_DATABASE_URL の 1 か所に置く。
+"""
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 店舗に属するテーブル。コピーは親 → 子の順、削除はその逆順
+SHARDED_TABLES: tuple[Table, ...] = (
+    CustomerORM.__table__,
+    ReservationORM.__table__,
+    ReservationVisitRollupORM.__table__,
+    OpportunityORM.__table__,
+    CustomerValueAggregateORM.__table__,
+    ActivityORM.__table__,
+    NoteORM.__table__,
+    TaskORM.__table__,
+)
+
+# 全シャードに複製する参照用テーブル（一覧・詳細の JOIN 先）
+REFERENCE_TABLES: tuple[Table, ...] = (ShopORM.__table__, OpportunityStageORM.__table__)
+
+DIRECTORY_METADATA = MetaData()
+
+SHOP_SHARDS = Table(
+    "shop_shards",
+    DIRECTORY_METADATA,
+    Column("shop_id", Integer, primary_key=True, autoincrement=False),
+    Column("shard", Integer, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+SHARD_ID_BLOCKS = Table(
+    "shard_id_blocks",
+    DIRECTORY_METADATA,
+    Column("table_name", String(64), primary_key=True),
+    Column("next_id", Integer, nullable=False),
+)
+
+DIRECTORY_SHARD = 0
+
+# customer_id で絞るときの IN リストの大きさ
+_IN_CHUNK = 500
+
+
+@dataclass
+class Shard:
+    """1 つのシャードの engine と sessionmaker。"""
+
+    engine: Engine
+    session_factory: sessionmaker[Session]
+    read_session_factory: sessionmaker[Session]
+
+
+def _shard_metadata() -> MetaData:
+    """シャード 1.. に作るテーブル（users など全体データへの外部キーは外す）。"""
+    metadata = MetaData()
+    for table in REFERENCE_TABLES + SHARDED_TABLES:
+        table.to_metadata(metadata)
+    for table in metadata.tables.values():
+        for constraint in list(table.foreign_key_constraints):
+            if constraint.elements[0].target_fullname.split(".")[0] in metadata.tables:
+                continue
+            table.constraints.discard(constraint)
+            for element in constraint.elements:
+                element.parent.foreign_keys.discard(element)
+                table.foreign_keys.discard(element)
+    return metadata
+
+
+def create_shard_schema(engine: Engine) -> None:
+    _shard_metadata().create_all(engine, checkfirst=True)
+
+
+# fan_out_workers 未指定のときに、同時に全シャードへ問い合わせられるリクエストの数
+DEFAULT_FAN_OUT_CONCURRENCY = 16
+
+
+class ShardRouter:
+    """shop_id → シャードの割り当てと、シャードをまたぐ並列実行。"""
+
+    def __init__(
+        self,
+        shards: Sequence[Shard],
+        assignment_ttl_seconds: float = 60.0,
+        id_block_size: int = 1_000,
+        fan_out_workers: Optional[int] = None,
+    ) -> None:
+        if not shards:
+            raise ValueError("ShardRouter needs at least one shard")
+        self.shards = list(shards)
+        self.assignment_ttl_seconds = assignment_ttl_seconds
+        self.id_block_size = id_block_size
+        # 並列実行のスレッドはプロセス全体で共有する。同時に走るリクエストがそれぞれ全シャードに問い合わせるので、
+        # 「同時リクエスト数 × シャード数」程度が要る（シャード数だけだとリクエスト同士が待ち合う）
+        self.fan_out_workers = fan_out_workers or self.shard_count * DEFAULT_FAN_OUT_CONCURRENCY
+
+        self._assignments: dict[int, int] = {}
+        self._assignments_loaded_at: Optional[float] = None
+        self._assignments_lock = threading.Lock()
+
+        self._id_blocks: dict[str, tuple[int, int]] = {}
+        self._id_lock = threading.Lock()
+
+        self._directory_ready = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def shard_count(self) -> int:
+        return len(self.shards)
+
+    @property
+    def directory(self) -> Shard:
+        return self.shards[DIRECTORY_SHARD]
+
+    def _ensure_directory(self) -> None:
+        if not self._directory_ready:
+            DIRECTORY_METADATA.create_all(self.directory.engine, checkfirst=True)
+            self._directory_ready = True
+
+    # ---------- 割り当て ----------
+
+    def _load_assignments(self) -> dict[int, int]:
+        now = time.monotonic()
+        loaded_at = self._assignments_loaded_at
+        if loaded_at is not None and now - loaded_at < self.assignment_ttl_seconds:
+            return self._assignments
+        with self._assignments_lock:
+            if self._assignments_loaded_at is None or now - self._assignments_loaded_at >= self.assignment_ttl_seconds:
+                self._ensure_directory()
+                with self.directory.engine.connect() as conn:
+                    rows = conn.execute(select(SHOP_SHARDS.c.shop_id, SHOP_SHARDS.c.shard)).all()
+                self._assignments = {shop_id: shard for shop_id, shard in rows}
+                self._assignments_loaded_at = now
+        return self._assignments
+
+    def invalidate_assignments(self) -> None:
+        self._assignments_loaded_at = None
+
+    def shard_for(self, shop_id: int) -> int:
+        # 割り当てのない店舗はシャーディング前からの DB（シャード 0）にある
+        return self._load_assignments().get(shop_id, DIRECTORY_SHARD)
+
+    def place_shop(self, shop_id: int, shard: Optional[int] = None) -> int:
+        """新しい店舗の置き場所を決めて shop_shards に書き、そのシャードを返す。
+
+        shard を省略すると、割り当てた店舗がいちばん少ないシャード。すでに割り当てがあればそのまま返す
+        （データの入っている店舗を動かすのは ShopRebalancer.move_shop）。
+        """
+        if shard is not None and not 0 <= shard < self.shard_count:
+            raise ValueError(f"shard {shard} is out of range (0..{self.shard_count - 1})")
+        self._ensure_directory()
+        current_query = select(SHOP_SHARDS.c.shard).where(SHOP_SHARDS.c.shop_id == shop_id)
+        try:
+            with self.directory.engine.begin() as conn:
+                current = conn.execute(current_query).scalar()
+                if current is not None:
+                    return current
+                if shard is None:
+                    counts = dict(
+                        conn.execute(select(SHOP_SHARDS.c.shard, func.count()).group_by(SHOP_SHARDS.c.shard)).all()
+                    )
+                    shard = min(range(self.shard_count), key=lambda candidate: counts.get(candidate, 0))
+                conn.execute(
+                    insert(SHOP_SHARDS).values(shop_id=shop_id, shard=shard, updated_at=datetime.now(timezone.utc))
+                )
+        except IntegrityError:
+            # 別プロセスが先に置いた → そちらに合わせる
+            with self.directory.engine.connect() as conn:
+                shard = conn.execute(current_query).scalar_one()
+        self.invalidate_assignments()
+        return shard
+
+    def pin_existing_shops(self) -> int:
+        """割り当てのない店舗をすべてシャード 0 として shop_shards に書く（init 用）。書いた件数を返す。"""
+        self._ensure_directory()
+        shops = ShopORM.__table__
+        now = datetime.now(timezone.utc)
+        with self.directory.engine.begin() as conn:
+            unassigned = conn.execute(
+                select(shops.c.id).where(~shops.c.id.in_(select(SHOP_SHARDS.c.shop_id))).order_by(shops.c.id)
+            ).scalars().all()
+            if unassigned:
+                conn.execute(
+                    insert(SHOP_SHARDS),
+                    [{"shop_id": shop_id, "shard": DIRECTORY_SHARD, "updated_at": now} for shop_id in unassigned],
+                )
+        self.invalidate_assignments()
+        return len(unassigned)
+
+    def assign(self, shop_id: int, shard: int) -> None:
+        """店舗の割り当てをディレクトリに書く（リバランス用）。"""
+        if not 0 <= shard < self.shard_count:
+            raise ValueError(f"shard {shard} is out of range (0..{self.shard_count - 1})")
+        self._ensure_directory()
+        now = datetime.now(timezone.utc)
+        with self.directory.engine.begin() as conn:
+            updated = conn.execute(
+                update(SHOP_SHARDS).where(SHOP_SHARDS.c.shop_id == shop_id).values(shard=shard, updated_at=now)
+            ).rowcount
+            if not updated:
+                conn.execute(insert(SHOP_SHARDS).values(shop_id=shop_id, shard=shard, updated_at=now))
+        self.invalidate_assignments()
+
+    # ---------- セッション ----------
+
+    def session(self, shard: int) -> Session:
+        return self.shards[shard].session_factory()
+
+    def read_session(self, shard: int) -> Session:
+        return self.shards[shard].read_session_factory()
+
+    def session_for_shop(self, shop_id: int) -> Session:
+        return self.session(self.shard_for(shop_id))
+
+    def read_session_for_shop(self, shop_id: int) -> Session:
+        return self.read_session(self.shard_for(shop_id))
+
+    # ---------- 並列実行 ----------
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.fan_out_workers, thread_name_prefix="shard-fan-out"
+                    )
+        return self._executor
+
+    def fan_out(self, fn: Callable[[Session], T], shards: Optional[Iterable[int]] = None) -> list[T]:
+        """fn(読み取り用セッション) を各シャードで並列に実行し、シャード順に結果を返す。"""
+        targets = list(range(self.shard_count)) if shards is None else list(shards)
+
+        def run(shard: int) -> T:
+            session = self.read_session(shard)
+            try:
+                return fn(session)
+            finally:
+                session.close()
+
+        if len(targets) == 1:
+            return [run(targets[0])]
+        futures = [self._pool().submit(contextvars.copy_context().run, run, shard) for shard in targets]
+        return [future.result() for future in futures]
+
+    def locate(self, table: Table, row_id: int) -> Optional[int]:
+        """主キーで行を探し、見つかったシャード番号を返す（customer_id だけの詳細・更新用）。"""
+        query = select(table.c.id).where(table.c.id == row_id)
+        found = self.fan_out(lambda session: session.execute(query).first() is not None)
+        return next((shard for shard, hit in enumerate(found) if hit), None)
+
+    # ---------- ID 採番 ----------
+
+    def allocate_id(self, table_name: str) -> int:
+        """シャードをまたいで一意な主キーを払い出す。"""
+        with self._id_lock:
+            next_id, end = self._id_blocks.get(table_name, (0, 0))
+            if next_id >= end:
+                next_id, end = self._reserve_id_block(table_name)
+            self._id_blocks[table_name] = (next_id + 1, end)
+            return next_id
+
+    def _max_id(self, table_name: str) -> int:
+        table = Base.metadata.tables[table_name]
+        return max(self.fan_out(lambda session: session.scalar(select(func.max(table.c.id))) or 0))
+
+    def _reserve_id_block(self, table_name: str) -> tuple[int, int]:
+        self._ensure_directory()
+        size = self.id_block_size
+        for _ in range(2):
+            with self.directory.engine.begin() as conn:
+                end = conn.execute(
+                    update(SHARD_ID_BLOCKS)
+                    .where(SHARD_ID_BLOCKS.c.table_name == table_name)
+                    .values(next_id=SHARD_ID_BLOCKS.c.next_id + size)
+                    .returning(SHARD_ID_BLOCKS.c.next_id)
+                ).scalar()
+            if end is not None:
+                return end - size, end
+            # はじめて採番するテーブル: 全シャードの最大 ID の次から
+            start = self._max_id(table_name) + 1
+            try:
+                with self.directory.engine.begin() as conn:
+                    conn.execute(insert(SHARD_ID_BLOCKS).values(table_name=table_name, next_id=start + size))
+                return start, start + size
+            except IntegrityError:
+                # 別プロセスが先に初期化した → もう一度 UPDATE から
+                continue
+        raise RuntimeError(f"could not reserve an id block for {table_name}")
+
+    def dispose(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class ShardSessions:
+    """1 リクエスト分のシャードごとの書き込みセッション（必要になったシャードだけ開く）。
+
+    get_db() と同じく、正常終了なら commit、例外なら rollback する。
+    シャードをまたぐ書き込みは原子的ではない（ふつうのリクエストは 1 店舗 = 1 シャードしか触らない）。
+    """
+
+    def __init__(self, router: ShardRouter) -> None:
+        self.router = router
+        self._sessions: dict[int, Session] = {}
+
+    def for_shard(self, shard: int) -> Session:
+        session = self._sessions.get(shard)
+        if session is None:
+            session = self._sessions[shard] = self.router.session(shard)
+        return session
+
+    def for_shop(self, shop_id: int) -> Session:
+        return self.for_shard(self.router.shard_for(shop_id))
+
+    def commit(self) -> None:
+        for session in self._sessions.values():
+            session.commit()
+
+    def rollback(self) -> None:
+        for session in self._sessions.values():
+            session.rollback()
+
+    def close(self) -> None:
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+
+
+# ==========
+# リバランス
+# ==========
+
+
+@dataclass
+class MoveResult:
+    shop_id: int
+    source: int
+    target: int
+    rows: dict[str, int] = field(default_factory=dict)
+
+
+def _chunks(values: Sequence[int], size: int = _IN_CHUNK) -> Iterable[Sequence[int]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _shop_filter(table: Table, shop_id: int, customer_ids: Sequence[int]) -> list[Any]:
+    """店舗に属する行の WHERE（shop_id 列があればそれ、なければ customer_id の IN をチャンクごとに）。"""
+    if "shop_id" in table.c:
+        return [table.c.shop_id == shop_id]
+    return [table.c.customer_id.in_(chunk) for chunk in _chunks(customer_ids)]
+
+
+def sync_reference_tables(router: ShardRouter) -> None:
+    """shops / opportunity_stages をディレクトリから他のシャードへ複製する。"""
+    with router.directory.engine.connect() as conn:
+        snapshot = {
+            table.name: [dict(row) for row in conn.execute(select(table)).mappings()] for table in REFERENCE_TABLES
+        }
+    for shard in router.shards[1:]:
+        create_shard_schema(shard.engine)
+        with shard.engine.begin() as conn:
+            for table in reversed(REFERENCE_TABLES):
+                conn.execute(delete(table))
+            for table in REFERENCE_TABLES:
+                if snapshot[table.name]:
+                    conn.execute(insert(table), snapshot[table.name])
+
+
+class ShopRebalancer:
+    """店舗を別のシャードへ移す。"""
+
+    def __init__(self, router: ShardRouter, batch_size: int = 10_000) -> None:
+        self.router = router
+        self.batch_size = batch_size
+
+    def _customer_ids(self, engine: Engine, shop_id: int) -> list[int]:
+        with engine.connect() as conn:
+            return list(conn.execute(select(CustomerORM.id).where(CustomerORM.shop_id == shop_id)).scalars())
+
+    def _cold_partitions(self, engine: Engine, shop_id: int) -> list[ArchivedPartition]:
+        """店舗の予約が入っている cold パーティション。"""
+        with engine.connect() as conn:
+            found = []
+            for partition in load_reservation_partitions(conn).archived:
+                prepare_archived_partition(conn, partition)
+                table = partition.table
+                if conn.execute(select(table.c.id).where(table.c.shop_id == shop_id).limit(1)).first() is not None:
+                    found.append(partition)
+            return found
+
+    def _delete_shop(
+        self, conn: Any, shop_id: int, customer_ids: Sequence[int], cold: Sequence[ArchivedPartition]
+    ) -> dict[str, int]:
+        deleted: dict[str, int] = {}
+        for table in (*(partition.table for partition in cold), *reversed(SHARDED_TABLES)):
+            deleted[table.fullname] = sum(
+                conn.execute(delete(table).where(condition)).rowcount
+                for condition in _shop_filter(table, shop_id, customer_ids)
+            )
+        return deleted
+
+    def move_shop(self, shop_id: int, target: int) -> MoveResult:
+        router = self.router
+        source = router.shard_for(shop_id)
+        result = MoveResult(shop_id=shop_id, source=source, target=target)
+        if source == target:
+            return result
+
+        source_engine = router.shards[source].engine
+        target_engine = router.shards[target].engine
+        if target != DIRECTORY_SHARD:
+            create_shard_schema(target_engine)
+        customer_ids = self._customer_ids(source_engine, shop_id)
+        cold = self._cold_partitions(source_engine, shop_id)
+
+        # 1) コピー（前回の途中で残った行は先に消す）→ コミット
+        with target_engine.begin() as target_conn:
+            for partition in cold:
+                prepare_archived_partition(target_conn, partition)
+            self._delete_shop(target_conn, shop_id, customer_ids, cold)
+            with source_engine.connect() as source_conn:
+                for partition in cold:
+                    prepare_archived_partition(source_conn, partition)
+                for table in (*SHARDED_TABLES, *(partition.table for partition in cold)):
+                    copied = 0
+                    for condition in _shop_filter(table, shop_id, customer_ids):
+                        rows = source_conn.execute(select(table).where(condition)).mappings()
+                        while batch := [dict(row) for row in rows.fetchmany(self.batch_size)]:
+                            target_conn.execute(insert(table), batch)
+                            copied += len(batch)
+                    result.rows[table.fullname] = copied
+        invalidate_reservation_partitions(target_engine)
+
+        # 2) 割り当てを書き換える（ここから読み書きはコピー先へ）
+        router.assign(shop_id, target)
+
+        # 3) コピー元から消す
+        with source_engine.begin() as source_conn:
+            for partition in cold:
+                prepare_archived_partition(source_conn, partition)
+            self._delete_shop(source_conn, shop_id, customer_ids, cold)
+
+        logger.info("moved shop %s from shard %s to %s: %s", shop_id, source, target, result.rows)
+        return result
+
+    def shop_sizes(self) -> list[tuple[int, int, int]]:
+        """(shop_id, シャード, 顧客数) の一覧。どの店舗を動かすか決める材料。"""
+        query = select(CustomerORM.shop_id, func.count()).group_by(CustomerORM.shop_id)
+        sizes: list[tuple[int, int, int]] = []
+        for shard, rows in enumerate(self.router.fan_out(lambda session: session.execute(query).all())):
+            sizes.extend((shop_id, shard, count) for shop_id, count in rows)
+        return sorted(sizes, key=lambda size: size[2], reverse=True)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Shop shard maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser(
+        "init",
+        help="既存の店舗をシャード 0 に割り当て、シャード 1.. にテーブルを作って shops / opportunity_stages を複製する",
+    )
+    sub.add_parser("sync-reference", help="shops / opportunity_stages を複製し直す")
+    add_shop = sub.add_parser("add-shop", help="新しく作った店舗をシャードに割り当て、shops を複製し直す")
+    add_shop.add_argument("shop_id", type=int)
+    add_shop.add_argument("--shard", type=int, default=None, help="未指定なら割り当てた店舗の少ないシャード")
+    sub.add_parser("sizes", help="店舗ごとのシャードと顧客数を表示する")
+    move = sub.add_parser("move", help="店舗を別のシャードへ移す")
+    move.add_argument("shop_id", type=int)
+    move.add_argument("target", type=int)
+    args = parser.parse_args(argv)
+
+    from app.infrastructure.db.session import dispose_database, get_database
+
+    router = get_database().shard_router
+    if router is None:
+        raise SystemExit("sharding is not enabled (set APP_SHARD_DATABASE_URLS)")
+    try:
+        if args.command == "init":
+            print(f"pinned {router.pin_existing_shops()} shops to shard {DIRECTORY_SHARD}")
+            sync_reference_tables(router)
+        elif args.command == "sync-reference":
+            sync_reference_tables(router)
+        elif args.command == "add-shop":
+            shard = router.place_shop(args.shop_id, args.shard)
+            sync_reference_tables(router)
+            print(f"shop {args.shop_id}: shard {shard}")
+        elif args.command == "sizes":
+            for shop_id, shard, customers in ShopRebalancer(router).shop_sizes():
+                print(f"shop {shop_id}: shard {shard}, {customers} customers")
+        elif args.command == "move":
+            result = ShopRebalancer(router).move_shop(args.shop_id, args.target)
+            print(f"shop {result.shop_id}: shard {result.source} -> {result.target} {result.rows}")
+    finally:
+        dispose_database()
+
+
+if __name__ == "__main__":
+    main()
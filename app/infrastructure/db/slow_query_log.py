@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from sqlalchemy import Engine, event
+
+"""
+Title: 「スロークエリログ（正規化 SQL / パラメータの形 / 呼び出し元 / EXPLAIN）」
+
+Description:
+    閾値（threshold_ms）を超えた SQL について、次をまとめて記録する。
+        - 正規化した SQL（リテラルを ? に、IN (...) を 1 つに、空白を 1 つに）とそのフィンガープリント
+        - バインドパラメータの「形」（値ではなく名前と型だけ。個人情報をログに出さない）
+        - 所要時間
+        - 呼び出し元のリポジトリメソッド（app.infrastructure.repositories 配下の最初のフレーム）
+        - 実行計画（SQLite: EXPLAIN QUERY PLAN / Postgres: EXPLAIN）
+
+Point:
+    - EXPLAIN はリクエストを止めないよう、別スレッドで別接続から取る。取るのはフィンガープリントごとに 1 回だけ。
+    - ログはフィンガープリントで重複排除する。初回は必ず出し、2 回目以降は sample_rate の確率で出す。
+      集計（回数・合計/最大時間）は毎回行い、report() で合計時間の多い順に上位 N 件を返す。
+    - 保持するフィンガープリントの数は max_fingerprints まで（超えたら新しいものは集計しない）。
+"""
+
+logger = logging.getLogger("app.sql.slow")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_REPOSITORY_MODULE_PREFIX = "app.infrastructure.repositories."
+
+
+def normalize_sql(statement: str) -> str:
+    """リテラルや IN リストの長さの違いを吸収した SQL を返す。"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def fingerprint(normalized_sql: str) -> str:
+    return hashlib.sha1(normalized_sql.encode("utf-8")).hexdigest()[:16]
+
+
+def parameter_shape(parameters: Any) -> Any:
+    """パラメータの値は捨てて、名前と型名だけを返す。"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def find_caller() -> Optional[str]:
+    """スタックをさかのぼって、最初に見つかったリポジトリのメソッド名を返す。"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(_REPOSITORY_MODULE_PREFIX):
+            return f"{module}.{frame.f_code.co_qualname}"
+        frame = frame.f_back
+    return None
+
+
+@dataclass
+class SlowQueryEntry:
+    """フィンガープリントごとの集計。"""
+
+    fingerprint: str
+    normalized_sql: str
+    parameter_shape: Any
+    caller: Optional[str]
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    plan: Optional[list[str]] = None
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class SlowQueryLog:
+    """engine に登録するスロークエリフック。"""
+
+    def __init__(
+        self,
+        threshold_ms: float = 200.0,
+        sample_rate: float = 0.1,
+        explain_enabled: bool = True,
+        max_fingerprints: int = 500,
+        explain_executor: Optional[Executor] = None,
+        random_fn: Callable[[], float] = random.random,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explain_enabled = explain_enabled
+        self.max_fingerprints = max_fingerprints
+        self._random = random_fn
+        self._lock = threading.Lock()
+        self._entries: dict[str, SlowQueryEntry] = {}
+        self._explain_executor = explain_executor
+        self._engine: Optional[Engine] = None
+
+    def attach(self, engine: Engine) -> None:
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def report(self, limit: int = 10) -> list[SlowQueryEntry]:
+        """合計時間の多い順に上位 limit 件を返す。"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return sorted(entries, key=lambda e: e.total_ms, reverse=True)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def shutdown(self) -> None:
+        if self._explain_executor is not None:
+            self._explain_executor.shutdown(wait=False, cancel_futures=True)
+            self._explain_executor = None
+
+    # ==========
+    # イベントフック
+    # ==========
+
+    def _before_cursor_execute(
+        self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        if context is not None:
+            context._slow_query_started_at = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        started_at = getattr(context, "_slow_query_started_at", None)
+        if started_at is None:
+            return
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        if elapsed_ms < self.threshold_ms or statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+        self.record(statement, parameters, elapsed_ms, caller=find_caller(), explain=not executemany)
+
+    def record(
+        self,
+        statement: str,
+        parameters: Any,
+        elapsed_ms: float,
+        caller: Optional[str] = None,
+        explain: bool = True,
+    ) -> None:
+        normalized = normalize_sql(statement)
+        fp = fingerprint(normalized)
+
+        with self._lock:
+            entry = self._entries.get(fp)
+            is_new = entry is None
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    return
+                entry = self._entries[fp] = SlowQueryEntry(
+                    fingerprint=fp,
+                    normalized_sql=normalized,
+                    parameter_shape=parameter_shape(parameters),
+                    caller=caller,
+                )
+            entry.count += 1
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+
+        if is_new or self._random() < self.sample_rate:
+            logger.warning(
+                json.dumps(
+                    {
+                        "event": "slow_query",
+                        "fingerprint": fp,
+                        "duration_ms": round(elapsed_ms, 2),
+                        "sql": normalized,
+                        "params": entry.parameter_shape,
+                        "caller": caller,
+                        "count": entry.count,
+                    },
+                    ensure_ascii=False,
+                )
+            )
+
+        if is_new and explain and self.explain_enabled and self._engine is not None:
+            self._get_explain_executor().submit(self._capture_plan, entry, statement, parameters)
+
+    # ==========
+    # EXPLAIN
+    # ==========
+
+    def _get_explain_executor(self) -> Executor:
+        with self._lock:
+            if self._explain_executor is None:
+                self._explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+            return self._explain_executor
+
+    def _capture_plan(self, entry: SlowQueryEntry, statement: str, parameters: Any) -> None:
+        engine = self._engine
+        if engine is None:
+            return
+        dialect = engine.dialect.name
+        if dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        elif dialect in ("postgresql", "mysql", "mariadb"):
+            prefix = "EXPLAIN "
+        else:
+            return
+        try:
+            with engine.connect() as conn:
+                rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        except Exception:
+            logger.exception("Failed to capture EXPLAIN for slow query %s", entry.fingerprint)
+            return
+        # SQLite は (id, parent, notused, detail)、Postgres は 1 列の QUERY PLAN
+        plan = [str(row[-1]) for row in rows]
+        with self._lock:
+            entry.plan = plan
+        logger.warning(json.dumps({"event": "slow_query_plan", "fingerprint": entry.fingerprint, "plan": plan}))
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import Engine, event, text
+
+"""
+Title: 「本番運用向けの SQLite プロファイル（WAL / PRAGMA / mmap）」
+
+Description:
+    エッジ店舗では SQLite ファイルでこのアプリを動かしている。
+    デフォルトの rollback journal では書き込み中は読み取りもブロックされ、
+    ページの読み込みは毎回 read() システムコールになる。
+    ここでは接続を張るたびに（connect イベント）次の PRAGMA を流す。
+
+        journal_mode=WAL        : 読み取りと書き込みが互いをブロックしない
+        synchronous=NORMAL      : WAL ならコミットごとの fsync を省いても壊れない（電源断で直近のコミットが失われうるだけ）
+        mmap_size               : DB ファイルをメモリマップして read() を減らす
+        cache_size              : 接続ごとのページキャッシュ（負値は KiB 指定）
+        temp_store=MEMORY       : ソートや一時テーブルをメモリ上で行う
+        busy_timeout            : ロック競合時に即 "database is locked" にせず待つ
+
+Point:
+    - journal_mode=WAL は DB ファイルに記録される永続設定だが、毎回流しても安い。
+    - インメモリ DB には WAL / mmap は効かないので適用しない（session 側で判定）。
+    - PRAGMA optimize は SqliteOptimizer が一定間隔でバックグラウンド実行する
+      （統計情報が古くなってクエリプランが劣化するのを防ぐ）。
+"""
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SqliteProfile:
+    """接続ごとに適用する PRAGMA の値。"""
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size_bytes: int = 256 * 1024 * 1024
+    cache_size_kib: int = 64 * 1024
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 5000
+
+    def pragmas(self) -> list[str]:
+        return [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA mmap_size={int(self.mmap_size_bytes)}",
+            f"PRAGMA cache_size=-{int(self.cache_size_kib)}",
+            f"PRAGMA temp_store={self.temp_store}",
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+        ]
+
+
+def apply_sqlite_profile(engine: Engine, profile: SqliteProfile) -> None:
+    """engine が新しく張る接続すべてに profile の PRAGMA を流すようにする。"""
+    statements = profile.pragmas()
+
+    def _on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", _on_connect)
+
+
+class SqliteOptimizer:
+    """interval_seconds ごとに PRAGMA optimize を流すバックグラウンドスレッド。"""
+
+    def __init__(self, engine: Engine, interval_seconds: float) -> None:
+        self._engine = engine
+        self._interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def optimize(self) -> None:
+        with self._engine.connect() as conn:
+            conn.execute(text("PRAGMA optimize"))
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sqlite-optimize", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_seconds):
+            try:
+                self.optimize()
+            except Exception:
+                # 失敗しても次の周期でまた試すだけ
+                logger.exception("PRAGMA optimize failed")
@@ -5,12 +5,13 @@ from app.infrastructure.orm.user import UserORM
 from app.infrastructure.orm.role import RoleORM, UserRoleORM
 from app.infrastructure.orm.shop import ShopORM
 from app.infrastructure.orm.customer import CustomerORM
-from app.infrastructure.orm.reservation import ReservationORM
+from app.infrastructure.orm.reservation import ReservationORM, ReservationVisitRollupORM
 from app.infrastructure.orm.activity import ActivityORM
-from app.infrastructure.orm.opportunity import OpportunityORM, OpportunityStageORM
+from app.infrastructure.orm.opportunity import CustomerValueAggregateORM, OpportunityORM, OpportunityStageORM
 from app.infrastructure.orm.task import TaskORM
 from app.infrastructure.orm.note import NoteORM
 from app.infrastructure.orm.audit_log import AuditLogORM
+from app.infrastructure.orm.refresh_token import RefreshTokenORM
 
 __all__ = [
     "Base",
@@ -20,10 +21,13 @@ __all__ = [
     "ShopORM",
     "CustomerORM",
     "ReservationORM",
+    "ReservationVisitRollupORM",
     "ActivityORM",
     "OpportunityORM",
     "OpportunityStageORM",
+    "CustomerValueAggregateORM",
     "TaskORM",
     "NoteORM",
     "AuditLogORM",
+    "RefreshTokenORM",
 ]
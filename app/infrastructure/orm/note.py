@@ -27,7 +27,7 @@ class NoteORM(Base):
         Integer, primary_key=True, autoincrement=True, comment="メモID"
     )
     customer_id: Mapped[Optional[int]] = mapped_column(
-        Integer, ForeignKey("customers.id", ondelete="SET NULL"), nullable=True, comment="関連顧客ID"
+        Integer, ForeignKey("customers.id", ondelete="SET NULL"), nullable=True, index=True, comment="関連顧客ID"
     )
     opportunity_id: Mapped[Optional[int]] = mapped_column(
         Integer, ForeignKey("opportunities.id", ondelete="SET NULL"), nullable=True, comment="関連商談ID"
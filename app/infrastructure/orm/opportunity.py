@@ -53,7 +53,10 @@ class OpportunityStageORM(Base):
 
 
 class OpportunityORM(Base):
-    """商談情報。"""
+    """商談情報。
+
+    顧客・ステータス・金額・日時の列は active_history=True（変更前の値を customer_value_aggregates の差分更新に使う）。
+    """
 
     __tablename__ = "opportunities"
 
@@ -65,12 +68,13 @@ class OpportunityORM(Base):
         ForeignKey("customers.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
+        active_history=True,
         comment="顧客ID",
     )
 
     title: Mapped[str] = mapped_column(String(255), nullable=False, comment="商談タイトル")
     amount: Mapped[Optional[Numeric]] = mapped_column(
-        Numeric(12, 2), nullable=True, comment="商談金額"
+        Numeric(12, 2), nullable=True, active_history=True, comment="商談金額"
     )
     probability: Mapped[Optional[int]] = mapped_column(
         Integer, nullable=True, comment="成約確度(0-100%)"
@@ -80,11 +84,12 @@ class OpportunityORM(Base):
         SAEnum(OpportunityStatus, native_enum=False),
         nullable=False,
         default=OpportunityStatus.OPEN,
+        active_history=True,
         comment="商談ステータス",
     )
 
     expected_close_date: Mapped[Optional[datetime]] = mapped_column(
-        DateTime(timezone=True), nullable=True, comment="成約予定日"
+        DateTime(timezone=True), nullable=True, active_history=True, comment="成約予定日"
     )
 
     stage_id: Mapped[Optional[int]] = mapped_column(
@@ -99,7 +104,7 @@ class OpportunityORM(Base):
         DateTime(timezone=True), nullable=False, comment="作成日時"
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, comment="更新日時"
+        DateTime(timezone=True), nullable=False, active_history=True, comment="更新日時"
     )
     version: Mapped[int] = mapped_column(
         Integer, nullable=False, default=1, comment="楽観的ロックバージョン"
@@ -131,3 +136,32 @@ class OpportunityORM(Base):
         back_populates="opportunity",
         lazy="selectin",
     )
+
+
+class CustomerValueAggregateORM(Base):
+    """顧客ごとの商談金額の集計（受注の累計 / 直近期間の受注 / 進行中の商談）。
+
+    商談の追加・ステータスや金額の変更のたびに差分だけ足し込む（app.infrastructure.db.customer_value）。
+    sales_last_365d は window_start 以降に成約した受注の合計で、window_start は定期ジョブ（decay）が進める。
+    """
+
+    __tablename__ = "customer_value_aggregates"
+
+    customer_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("customers.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="顧客ID",
+    )
+    lifetime_value: Mapped[Numeric] = mapped_column(
+        Numeric(14, 2), nullable=False, default=0, comment="受注した商談金額の累計"
+    )
+    sales_last_365d: Mapped[Numeric] = mapped_column(
+        Numeric(14, 2), nullable=False, default=0, comment="window_start 以降に成約した受注金額の合計"
+    )
+    open_pipeline_amount: Mapped[Numeric] = mapped_column(
+        Numeric(14, 2), nullable=False, default=0, comment="進行中（OPEN / ON_HOLD）の商談金額の合計"
+    )
+    window_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, comment="sales_last_365d の集計開始日時"
+    )
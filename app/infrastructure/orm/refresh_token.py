@@ -0,0 +1,50 @@
+from __future__ import annotations
+from app.infrastructure.db.base import Base
+
+from datetime import datetime
+from typing import Optional, TYPE_CHECKING
+
+from sqlalchemy import (
+    ForeignKey,
+    DateTime,
+    Integer,
+    String,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+if TYPE_CHECKING:
+    from app.infrastructure.orm.user import UserORM
+
+
+class RefreshTokenORM(Base):
+    """リフレッシュトークン（SHA-256 ハッシュのみ保存）。"""
+
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True, comment="リフレッシュトークンID"
+    )
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="ユーザーID",
+    )
+    token_hash: Mapped[str] = mapped_column(
+        String(64), unique=True, index=True, nullable=False, comment="トークンの SHA-256 (hex)"
+    )
+    family_id: Mapped[str] = mapped_column(
+        String(64), nullable=False, index=True, comment="ローテーション系列ID"
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, comment="有効期限"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, comment="作成日時"
+    )
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True, comment="失効(ローテーション済み)日時"
+    )
+
+    user: Mapped[UserORM] = relationship("UserORM")
@@ -7,6 +7,7 @@ from typing import Optional, TYPE_CHECKING
 from sqlalchemy import (
     ForeignKey,
     DateTime,
+    Index,
     Integer,
     Enum as SAEnum,
     Text,
@@ -25,6 +26,10 @@ class ReservationORM(Base):
     """予約 / 来店情報。"""
 
     __tablename__ = "reservations"
+    __table_args__ = (
+        # 店舗・期間で絞る読み取り（予約一覧・カレンダー・空き枠インデックスの読み込み）用
+        Index("ix_reservations_shop_id_start_datetime", "shop_id", "start_datetime"),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer, primary_key=True, autoincrement=True, comment="予約ID"
@@ -41,7 +46,7 @@ class ReservationORM(Base):
     )
 
     start_datetime: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, comment="開始日時"
+        DateTime(timezone=True), nullable=False, index=True, comment="開始日時"
     )
     end_datetime: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), nullable=True, comment="終了日時"
@@ -75,3 +80,26 @@ class ReservationORM(Base):
         "CustomerORM",
         back_populates="reservations",
     )
+
+
+class ReservationVisitRollupORM(Base):
+    """アーカイブ済み（cold）パーティションに移した予約の、顧客ごとの集計。
+
+    顧客一覧の来店回数・最終来店日時は「hot テーブルの集計 + この行」で求める。
+    行を足し込むのはコンパクション（app.infrastructure.db.reservation_partitions）だけ。
+    """
+
+    __tablename__ = "reservation_visit_rollups"
+
+    customer_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("customers.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="顧客ID",
+    )
+    visit_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment="アーカイブ済みの予約件数"
+    )
+    last_visit_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True, comment="アーカイブ済みの予約の最終開始日時"
+    )
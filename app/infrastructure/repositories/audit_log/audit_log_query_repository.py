@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.cold_archive import ARCHIVE_SOURCES, ColdArchiveStore
+from app.infrastructure.orm.audit_log import AuditLogORM
+
+
+@dataclass
+class AuditLogEntry:
+    """監査ログ 1 件（管理画面向け）。archived はコールドアーカイブから読んだ行なら True。"""
+
+    id: int
+    user_id: Optional[int]
+    action: str
+    entity_type: Optional[str]
+    entity_id: Optional[int]
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    created_at: datetime
+    archived: bool
+
+    @classmethod
+    def from_row(cls, row: Any, archived: bool) -> "AuditLogEntry":
+        created_at = row["created_at"]
+        return cls(
+            id=row["id"],
+            user_id=row["user_id"],
+            action=row["action"],
+            entity_type=row["entity_type"],
+            entity_id=row["entity_id"],
+            ip_address=row["ip_address"],
+            user_agent=row["user_agent"],
+            created_at=created_at if created_at.tzinfo is not None else created_at.replace(tzinfo=timezone.utc),
+            archived=archived,
+        )
+
+
+class SqlAlchemyAuditLogQueryRepository:
+    """ユーザーごとの監査ログを hot テーブルとコールドアーカイブから新しい順に読む。"""
+
+    def __init__(self, session: Session, archive_store: ColdArchiveStore) -> None:
+        self._session = session
+        self._archive_store = archive_store
+
+    def fetch_user_audit_logs(
+        self,
+        user_id: int,
+        before: Optional[datetime],
+        limit: int,
+        before_id: Optional[int] = None,
+    ) -> list[AuditLogEntry]:
+        """(created_at, id) の新しい順に limit 件。
+
+        - before だけ: created_at < before の行
+        - before + before_id: (created_at, id) < (before, before_id) の行（キーセット。同じ日時の行を飛ばさない）
+        """
+        table = AuditLogORM.__table__
+        if before is not None and before.tzinfo is not None:
+            # 保存している日時は UTC（SQLite ではタイムゾーンなしで比較される）
+            before = before.astimezone(timezone.utc)
+        query = (
+            select(table)
+            .where(table.c.user_id == user_id)
+            .order_by(table.c.created_at.desc(), table.c.id.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            if before_id is None:
+                query = query.where(table.c.created_at < before)
+            else:
+                query = query.where(
+                    or_(table.c.created_at < before, and_(table.c.created_at == before, table.c.id < before_id))
+                )
+        entries = [AuditLogEntry.from_row(row, False) for row in self._session.execute(query).mappings()]
+
+        not_before = entries[-1].created_at if len(entries) == limit else None
+        archived_rows = self._archive_store.read(
+            ARCHIVE_SOURCES["audit_logs"],
+            user_id,
+            before=before,
+            limit=limit,
+            not_before=not_before,
+            before_id=before_id,
+        )
+        hot_ids = {entry.id for entry in entries}
+        entries += [AuditLogEntry.from_row(row, True) for row in archived_rows if row["id"] not in hot_ids]
+
+        entries.sort(key=lambda entry: (entry.created_at, entry.id), reverse=True)
+        return entries[:limit]
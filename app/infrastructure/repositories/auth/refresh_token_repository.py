@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.application.auth.ports import RefreshTokenRepository
+from app.domain.auth.models import RefreshToken
+from app.infrastructure.orm.refresh_token import RefreshTokenORM
+
+
+class SqlAlchemyRefreshTokenRepository(RefreshTokenRepository):
+    """RefreshTokenRepository ポートの SQLAlchemy 実装"""
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+
+    def add(self, token: RefreshToken) -> RefreshToken:
+        orm = RefreshTokenORM(
+            user_id=token.user_id,
+            token_hash=token.token_hash,
+            family_id=token.family_id,
+            expires_at=token.expires_at,
+            created_at=token.created_at,
+            revoked_at=token.revoked_at,
+        )
+        self._session.add(orm)
+        self._session.flush()
+        return self._to_domain(orm)
+
+    def get_by_hash(self, token_hash: str) -> Optional[RefreshToken]:
+        # token_hash の unique index を使う 1 行の SELECT
+        stmt = select(RefreshTokenORM).where(RefreshTokenORM.token_hash == token_hash)
+        orm = self._session.execute(stmt).scalar_one_or_none()
+        if orm is None:
+            return None
+        return self._to_domain(orm)
+
+    def revoke_if_active(self, token_id: int, revoked_at: datetime) -> bool:
+        # 「まだ失効していなければ」を WHERE に入れて、同時リフレッシュでも 1 回だけ成功させる
+        stmt = (
+            update(RefreshTokenORM)
+            .where(RefreshTokenORM.id == token_id, RefreshTokenORM.revoked_at.is_(None))
+            .values(revoked_at=revoked_at)
+        )
+        result = self._session.execute(stmt)
+        return result.rowcount == 1
+
+    def revoke_family(self, family_id: str, revoked_at: datetime) -> None:
+        stmt = (
+            update(RefreshTokenORM)
+            .where(RefreshTokenORM.family_id == family_id, RefreshTokenORM.revoked_at.is_(None))
+            .values(revoked_at=revoked_at)
+        )
+        self._session.execute(stmt)
+
+    # ==========
+    # マッピング
+    # ==========
+
+    def _to_domain(self, orm: RefreshTokenORM) -> RefreshToken:
+        return RefreshToken(
+            id=orm.id,
+            user_id=orm.user_id,
+            token_hash=orm.token_hash,
+            family_id=orm.family_id,
+            expires_at=orm.expires_at,
+            created_at=orm.created_at,
+            revoked_at=orm.revoked_at,
+        )
@@ -39,6 +39,7 @@ class SqlAlchemyCustomerCommandRepository(CustomerRepository):
         """新規顧客を永続化して、保存後の Customer を返す。"""
 
         orm = CustomerORM(
+            id=customer.id,  # ふつうは None（DB の自動採番）。シャーディング時は ShardRouter で払い出した ID
             shop_id=customer.shop_id,
             external_code=None,  # 必要になれば Input から渡す
             name=customer.name,
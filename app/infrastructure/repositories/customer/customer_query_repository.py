@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Sequence, Tuple, Optional
+from functools import lru_cache
+from typing import Any, Sequence, Tuple, Optional
 
-from sqlalchemy import select, func, or_
+from sqlalchemy import Select, bindparam, case, select, func, or_
 from sqlalchemy.orm import Session
 
 from app.application.customer.ports import CustomerQueryRepository, CustomerRepository
@@ -18,19 +19,158 @@ from app.application.customer.read_models import (
 from app.domain.user.models import User
 from app.infrastructure.orm.customer import CustomerORM
 from app.infrastructure.orm.shop import ShopORM
-from app.infrastructure.orm.reservation import ReservationORM
+from app.infrastructure.orm.reservation import ReservationORM, ReservationVisitRollupORM
 from app.infrastructure.orm.activity import ActivityORM
 from app.infrastructure.orm.note import NoteORM
-from app.infrastructure.orm.opportunity import OpportunityORM, OpportunityStageORM
+from app.infrastructure.orm.opportunity import CustomerValueAggregateORM, OpportunityORM, OpportunityStageORM
 
 from app.domain.customer.models import Customer
 
 
+# ==========
+# ホットパスの SQL は import 時に 1 回だけ組み立てておく
+# ==========
+# 毎回 select(...).join(...).group_by(...) を組み立て直すと、Python 側の構築コストに加えて
+# SQLAlchemy がキャッシュキーを導き直すコストもかかる。値はすべて bindparam にして、
+# 実行時には params を渡すだけにする（コンパイル済み SQL は engine の query_cache_size 分だけ再利用される）。
+
+RECENT_LIMIT = 5
+
+# 来店回数・最終来店日時は「hot の予約の集計 + アーカイブ済み分の rollup（顧客ごとに 1 行）」
+_HOT_LAST_VISIT = func.max(ReservationORM.start_datetime)
+_ARCHIVED_LAST_VISIT = func.max(ReservationVisitRollupORM.last_visit_at)
+
+# 受注・商談金額は顧客ごとに 1 行の集計（customer_value_aggregates）を JOIN するだけ（商談は集計しない）
+def _customer_value(column: Any, label: str) -> Any:
+    return func.coalesce(func.max(column), 0).label(label)
+
+
+# 顧客 + 店舗 + 予約集計 + 金額集計（一覧と詳細で共通）
+_CUSTOMER_SUMMARY_BASE: Select = (
+    select(
+        CustomerORM.id,
+        CustomerORM.email,
+        CustomerORM.name,
+        CustomerORM.status,
+        ShopORM.id.label("shop_id"),
+        ShopORM.name.label("shop_name"),
+        (func.count(ReservationORM.id) + func.coalesce(func.max(ReservationVisitRollupORM.visit_count), 0)).label(
+            "visit_count"
+        ),
+        case(
+            (_HOT_LAST_VISIT >= _ARCHIVED_LAST_VISIT, _HOT_LAST_VISIT),
+            else_=func.coalesce(_ARCHIVED_LAST_VISIT, _HOT_LAST_VISIT),
+        ).label("last_visit_at"),
+        CustomerORM.created_at,
+        _customer_value(CustomerValueAggregateORM.lifetime_value, "lifetime_value"),
+        _customer_value(CustomerValueAggregateORM.sales_last_365d, "sales_last_365d"),
+        _customer_value(CustomerValueAggregateORM.open_pipeline_amount, "open_pipeline_amount"),
+    )
+    .join(ShopORM, ShopORM.id == CustomerORM.shop_id)
+    .outerjoin(ReservationVisitRollupORM, ReservationVisitRollupORM.customer_id == CustomerORM.id)
+    .outerjoin(CustomerValueAggregateORM, CustomerValueAggregateORM.customer_id == CustomerORM.id)
+    .outerjoin(ReservationORM, ReservationORM.customer_id == CustomerORM.id)
+    .group_by(
+        CustomerORM.id,
+        CustomerORM.email,
+        CustomerORM.name,
+        CustomerORM.status,
+        CustomerORM.created_at,
+        ShopORM.id,
+        ShopORM.name,
+    )
+)
+
+
+@lru_cache(maxsize=16)
+def _customer_summary_statements(
+    has_status: bool,
+    has_shop_id: bool,
+    has_assigned_to: bool,
+    has_keyword: bool,
+    order_by_id: bool = False,
+) -> tuple[Select, Select]:
+    """一覧用の (ページング済みの行取得, 件数) ステートメントを、フィルタの組み合わせごとに 1 回だけ作る。"""
+    base_query = _CUSTOMER_SUMMARY_BASE
+    if has_status:
+        base_query = base_query.where(CustomerORM.status == bindparam("status"))
+    if has_shop_id:
+        base_query = base_query.where(CustomerORM.shop_id == bindparam("shop_id"))
+    if has_assigned_to:
+        base_query = base_query.where(CustomerORM.assigned_to_user_id == bindparam("assigned_to_user_id"))
+    if has_keyword:
+        base_query = base_query.where(
+            or_(
+                CustomerORM.name.ilike(bindparam("keyword_like")),
+                CustomerORM.email.ilike(bindparam("keyword_like")),
+            )
+        )
+
+    # ORDER BY を付けると SQLite では集計結果のソートが増えて倍近く遅くなるので、必要なとき（シャードのマージ）だけ付ける
+    rows_query = base_query.order_by(CustomerORM.id) if order_by_id else base_query
+    rows_query = rows_query.limit(bindparam("limit")).offset(bindparam("offset"))
+    count_query = select(func.count()).select_from(base_query.subquery())
+    return rows_query, count_query
+
+
+_CUSTOMER_DETAIL_SUMMARY_QUERY: Select = _CUSTOMER_SUMMARY_BASE.where(CustomerORM.id == bindparam("customer_id"))
+
+_RECENT_ACTIVITIES_QUERY: Select = (
+    select(
+        ActivityORM.id,
+        ActivityORM.type,
+        ActivityORM.subject,
+        ActivityORM.scheduled_at,
+        ActivityORM.created_at,
+        ActivityORM.created_by_user_id,
+    )
+    .where(ActivityORM.customer_id == bindparam("customer_id"))
+    .order_by(ActivityORM.created_at.desc())
+    .limit(RECENT_LIMIT)
+)
+
+_RECENT_NOTES_QUERY: Select = (
+    select(
+        NoteORM.id,
+        NoteORM.body,
+        NoteORM.created_at,
+        NoteORM.created_by_user_id,
+    )
+    .where(NoteORM.customer_id == bindparam("customer_id"))
+    .order_by(NoteORM.created_at.desc())
+    .limit(RECENT_LIMIT)
+)
+
+_RECENT_OPPORTUNITIES_QUERY: Select = (
+    select(
+        OpportunityORM.id,
+        OpportunityORM.title,
+        OpportunityORM.amount,
+        OpportunityORM.probability,
+        OpportunityORM.status,
+        OpportunityORM.expected_close_date,
+        OpportunityStageORM.id.label("stage_id"),
+        OpportunityStageORM.name.label("stage_name"),
+        OpportunityStageORM.is_won,
+        OpportunityStageORM.is_lost,
+    )
+    .outerjoin(
+        OpportunityStageORM,
+        OpportunityStageORM.id == OpportunityORM.stage_id,
+    )
+    .where(OpportunityORM.customer_id == bindparam("customer_id"))
+    .order_by(OpportunityORM.created_at.desc())
+    .limit(RECENT_LIMIT)
+)
+
+
 class SqlAlchemyCustomerQueryRepository(CustomerQueryRepository):
     """SQLAlchemy を使って顧客サマリー一覧を取得する実装。"""
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session, order_by_id: bool = False) -> None:
         self._session = session
+        # True なら一覧を id 順に固定する（ShardedCustomerQueryRepository が各シャードの結果をマージするため）
+        self._order_by_id = order_by_id
 
     def fetch_customer_summaries(
         self,
@@ -39,64 +179,35 @@ class SqlAlchemyCustomerQueryRepository(CustomerQueryRepository):
         limit: int,
         offset: int,
     ) -> tuple[int, Sequence[CustomerSummaryReadModel]]:
-        # 1. ベースクエリ（顧客 + 店舗 + 予約集計）
-        base_query = (
-            select(
-                CustomerORM.id,
-                CustomerORM.email,
-                CustomerORM.name,
-                CustomerORM.status,
-                ShopORM.id.label("shop_id"),
-                ShopORM.name.label("shop_name"),
-                func.count(ReservationORM.id).label("visit_count"),
-                func.max(ReservationORM.start_datetime).label("last_visit_at"),
-                CustomerORM.created_at,
-            )
-            .join(ShopORM, ShopORM.id == CustomerORM.shop_id)
-            .outerjoin(ReservationORM, ReservationORM.customer_id == CustomerORM.id)
-            .group_by(
-                CustomerORM.id,
-                CustomerORM.email,
-                CustomerORM.name,
-                CustomerORM.status,
-                CustomerORM.created_at,
-                ShopORM.id,
-                ShopORM.name,
-            )
+        # 1. filters の組み合わせに対応する組み立て済みステートメントを取り出す（status, shop_id, keyword 等）
+        rows_query, total_count_query = _customer_summary_statements(
+            has_status=filters.status is not None,
+            has_shop_id=filters.shop_id is not None,
+            has_assigned_to=filters.assigned_to_user_id is not None,
+            has_keyword=bool(filters.keyword),
+            order_by_id=self._order_by_id,
         )
 
-        # 2. filters に応じて where 条件を追加（status, shop_id, keyword 等）
-        # ステータス
+        # 2. 値はすべてバインドパラメータで渡す
+        params: dict[str, Any] = {"limit": limit, "offset": offset}
         if filters.status is not None:
-            base_query = base_query.where(CustomerORM.status == filters.status)
-
-        # 店舗ID
+            params["status"] = filters.status
         if filters.shop_id is not None:
-            base_query = base_query.where(CustomerORM.shop_id == filters.shop_id)
-
-        # 担当者（assigned_to_user_id）
+            params["shop_id"] = filters.shop_id
         if filters.assigned_to_user_id is not None:
-            base_query = base_query.where(CustomerORM.assigned_to_user_id == filters.assigned_to_user_id)
-
-        # 名前 / メールアドレスのキーワード検索
+            params["assigned_to_user_id"] = filters.assigned_to_user_id
         if filters.keyword:
-            like = f"%{filters.keyword}%"
-            base_query = base_query.where(
-                or_(
-                    CustomerORM.name.ilike(like),
-                    CustomerORM.email.ilike(like),
-                )
-            )
+            # 名前 / メールアドレスのキーワード検索
+            params["keyword_like"] = f"%{filters.keyword}%"
 
         # 3. total_count（ページング前の件数）
-        total_count_query = select(func.count()).select_from(base_query.subquery())
         total_count: int = self._session.execute(
-            total_count_query
+            total_count_query, params
         ).scalar_one()  # scalar_oneで結果が必ず 1 行であるべき、という “契約” を保証できる
 
         # 4. ページングして rows 取得
         rows = (
-            self._session.execute(base_query.limit(limit).offset(offset)).mappings().all()
+            self._session.execute(rows_query, params).mappings().all()
         )  # mappings() で dict 形式で取れる, all() で全件を配列で取得
 
         # 5. ReadModel に詰め替え
@@ -113,6 +224,9 @@ class SqlAlchemyCustomerQueryRepository(CustomerQueryRepository):
                 visit_count=row["visit_count"] or 0,
                 last_visit_at=row["last_visit_at"],
                 created_at=row["created_at"],
+                lifetime_value=float(row["lifetime_value"]),
+                sales_last_365d=float(row["sales_last_365d"]),
+                open_pipeline_amount=float(row["open_pipeline_amount"]),
             )
             for row in rows
         ]
@@ -123,33 +237,8 @@ class SqlAlchemyCustomerQueryRepository(CustomerQueryRepository):
         # ===========================
         # 1. 顧客基本情報 + 来店サマリ
         # ===========================
-        base_query = (
-            select(
-                CustomerORM.id,
-                CustomerORM.email,
-                CustomerORM.name,
-                CustomerORM.status,
-                ShopORM.id.label("shop_id"),
-                ShopORM.name.label("shop_name"),
-                CustomerORM.created_at,
-                func.count(ReservationORM.id).label("visit_count"),
-                func.max(ReservationORM.start_datetime).label("last_visit_at"),
-            )
-            .join(ShopORM, ShopORM.id == CustomerORM.shop_id)
-            .outerjoin(ReservationORM, ReservationORM.customer_id == CustomerORM.id)
-            .where(CustomerORM.id == customer_id)
-            .group_by(
-                CustomerORM.id,
-                CustomerORM.email,
-                CustomerORM.name,
-                CustomerORM.status,
-                CustomerORM.created_at,
-                ShopORM.id,
-                ShopORM.name,
-            )
-        )
-
-        base_row = self._session.execute(base_query).mappings().first()
+        params = {"customer_id": customer_id}
+        base_row = self._session.execute(_CUSTOMER_DETAIL_SUMMARY_QUERY, params).mappings().first()
         if base_row is None:
             # 顧客自体が存在しない
             return None
@@ -166,28 +255,15 @@ class SqlAlchemyCustomerQueryRepository(CustomerQueryRepository):
             visit_count=base_row["visit_count"] or 0,
             last_visit_at=base_row["last_visit_at"],
             created_at=base_row["created_at"],
+            lifetime_value=float(base_row["lifetime_value"]),
+            sales_last_365d=float(base_row["sales_last_365d"]),
+            open_pipeline_amount=float(base_row["open_pipeline_amount"]),
         )
 
         # ===========================
         # 2. 最近の活動履歴（最新5件）
         # ===========================
-        RECENT_LIMIT = 5
-
-        activities_query = (
-            select(
-                ActivityORM.id,
-                ActivityORM.type,
-                ActivityORM.subject,
-                ActivityORM.scheduled_at,
-                ActivityORM.created_at,
-                ActivityORM.created_by_user_id,
-            )
-            .where(ActivityORM.customer_id == customer_id)
-            .order_by(ActivityORM.created_at.desc())
-            .limit(RECENT_LIMIT)
-        )
-
-        activity_rows = self._session.execute(activities_query).all()
+        activity_rows = self._session.execute(_RECENT_ACTIVITIES_QUERY, params).all()
 
         recent_activities = [
             ActivitySummaryReadModel(
@@ -204,19 +280,7 @@ class SqlAlchemyCustomerQueryRepository(CustomerQueryRepository):
         # ===========================
         # 3. 最近のメモ（最新5件）
         # ===========================
-        notes_query = (
-            select(
-                NoteORM.id,
-                NoteORM.body,
-                NoteORM.created_at,
-                NoteORM.created_by_user_id,
-            )
-            .where(NoteORM.customer_id == customer_id)
-            .order_by(NoteORM.created_at.desc())
-            .limit(RECENT_LIMIT)
-        )
-
-        note_rows = self._session.execute(notes_query).all()
+        note_rows = self._session.execute(_RECENT_NOTES_QUERY, params).all()
 
         recent_notes = [
             NoteSummaryReadModel(
@@ -231,29 +295,7 @@ class SqlAlchemyCustomerQueryRepository(CustomerQueryRepository):
         # ===========================
         # 4. 商談サマリ（最新5件）
         # ===========================
-        opportunities_query = (
-            select(
-                OpportunityORM.id,
-                OpportunityORM.title,
-                OpportunityORM.amount,
-                OpportunityORM.probability,
-                OpportunityORM.status,
-                OpportunityORM.expected_close_date,
-                OpportunityStageORM.id.label("stage_id"),
-                OpportunityStageORM.name.label("stage_name"),
-                OpportunityStageORM.is_won,
-                OpportunityStageORM.is_lost,
-            )
-            .outerjoin(
-                OpportunityStageORM,
-                OpportunityStageORM.id == OpportunityORM.stage_id,
-            )
-            .where(OpportunityORM.customer_id == customer_id)
-            .order_by(OpportunityORM.created_at.desc())
-            .limit(RECENT_LIMIT)
-        )
-
-        opp_rows = self._session.execute(opportunities_query).mappings().all()
+        opp_rows = self._session.execute(_RECENT_OPPORTUNITIES_QUERY, params).mappings().all()
 
         opportunities: list[OpportunitySummaryReadModel] = []
         for row in opp_rows:
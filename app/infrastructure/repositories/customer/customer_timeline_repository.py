@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import Select, and_, bindparam, or_, select
+from sqlalchemy.orm import Session
+
+from app.application.customer.ports import CustomerTimelineRepository
+from app.application.customer.read_models import TimelineCursor, TimelineEntryReadModel
+from app.domain.user.models import User
+from app.infrastructure.db.cold_archive import ARCHIVE_SOURCES, ColdArchiveStore
+from app.infrastructure.orm.activity import ActivityORM
+from app.infrastructure.orm.customer import CustomerORM
+from app.infrastructure.orm.note import NoteORM
+
+"""
+Title: 「顧客タイムライン（hot + コールドアーカイブ）を読むリポジトリ」
+
+Point:
+    - まず hot の activities / notes から before より前を limit 件ずつ取り、新しい順にマージする。
+    - hot だけで limit 件そろえば、アーカイブはその最古より新しいセグメントだけを展開する
+      （ふつうは索引を 1 回引いて 0 件で終わる。展開が要るのは hot が足りない場合か、
+      まだ hot に残っている古い行とアーカイブ済みの行が同じ期間に混ざる場合だけ）。
+    - アーカイブジョブが途中で落ちると同じ行が hot とアーカイブの両方にあり得るので、(kind, id) で重複を落とす。
+    - 並びとページ位置は (created_at, kind, id) の降順。同じ日時の行は、テーブルごとに id の上限（before_id）を
+      変えるだけで hot もアーカイブも同じ形の条件で続きから読める（_id_bound）。
+"""
+
+_CUSTOMER_EXISTS_QUERY: Select = select(CustomerORM.id).where(CustomerORM.id == bindparam("customer_id"))
+
+
+# 同じ日時の行をすべて含めるときの before_id
+_ALL_IDS = 2**63 - 1
+
+
+def _before(query: Select, created_at: Any, id_: Any) -> Select:
+    before = bindparam("before")
+    return query.where(or_(created_at < before, and_(created_at == before, id_ < bindparam("before_id"))))
+
+
+def _id_bound(kind: str, cursor: TimelineCursor) -> int:
+    """kind のテーブルで、created_at が cursor と同じ行のうち返すものの id の上限（この値未満）。"""
+    if cursor.kind is None or cursor.id is None or kind > cursor.kind:
+        return 0
+    if kind < cursor.kind:
+        return _ALL_IDS
+    return cursor.id
+
+
+_ACTIVITIES_QUERY: Select = (
+    select(
+        ActivityORM.id,
+        ActivityORM.type,
+        ActivityORM.subject,
+        ActivityORM.description,
+        ActivityORM.created_by_user_id,
+        ActivityORM.created_at,
+    )
+    .where(ActivityORM.customer_id == bindparam("customer_id"))
+    .order_by(ActivityORM.created_at.desc(), ActivityORM.id.desc())
+    .limit(bindparam("limit"))
+)
+_ACTIVITIES_BEFORE_QUERY: Select = _before(_ACTIVITIES_QUERY, ActivityORM.created_at, ActivityORM.id)
+
+_NOTES_QUERY: Select = (
+    select(
+        NoteORM.id,
+        NoteORM.body,
+        NoteORM.created_by_user_id,
+        NoteORM.created_at,
+    )
+    .where(NoteORM.customer_id == bindparam("customer_id"))
+    .order_by(NoteORM.created_at.desc(), NoteORM.id.desc())
+    .limit(bindparam("limit"))
+)
+_NOTES_BEFORE_QUERY: Select = _before(_NOTES_QUERY, NoteORM.created_at, NoteORM.id)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc) if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _activity_entry(row: Any, archived: bool) -> TimelineEntryReadModel:
+    return TimelineEntryReadModel(
+        kind="activity",
+        id=row["id"],
+        activity_type=row["type"],
+        subject=row["subject"],
+        body=row["description"],
+        created_by_user_id=row["created_by_user_id"],
+        created_at=_as_utc(row["created_at"]),
+        archived=archived,
+    )
+
+
+def _note_entry(row: Any, archived: bool) -> TimelineEntryReadModel:
+    return TimelineEntryReadModel(
+        kind="note",
+        id=row["id"],
+        activity_type=None,
+        subject=None,
+        body=row["body"],
+        created_by_user_id=row["created_by_user_id"],
+        created_at=_as_utc(row["created_at"]),
+        archived=archived,
+    )
+
+
+def _newest_first(entries: list[TimelineEntryReadModel], limit: int) -> list[TimelineEntryReadModel]:
+    unique: dict[tuple[str, int], TimelineEntryReadModel] = {}
+    for entry in entries:
+        # hot を先に入れているので、重複していれば hot 側が残る
+        unique.setdefault((entry.kind, entry.id), entry)
+    ordered = sorted(unique.values(), key=lambda entry: (entry.created_at, entry.kind, entry.id), reverse=True)
+    return ordered[:limit]
+
+
+class SqlAlchemyCustomerTimelineRepository(CustomerTimelineRepository):
+    """hot テーブルと ColdArchiveStore をまたいで顧客タイムラインを読む実装。"""
+
+    def __init__(self, session: Session, archive_store: ColdArchiveStore) -> None:
+        self._session = session
+        self._archive_store = archive_store
+
+    def fetch_customer_timeline(
+        self,
+        current_user: User,
+        customer_id: int,
+        before: Optional[TimelineCursor],
+        limit: int,
+    ) -> Optional[list[TimelineEntryReadModel]]:
+        params: dict[str, Any] = {"customer_id": customer_id, "limit": limit}
+        if self._session.execute(_CUSTOMER_EXISTS_QUERY, params).first() is None:
+            return None
+
+        # (kind, hot のクエリ, アーカイブのテーブル, 行 → エントリ)
+        sources = (
+            ("activity", _ACTIVITIES_QUERY, _ACTIVITIES_BEFORE_QUERY, "activities", _activity_entry),
+            ("note", _NOTES_QUERY, _NOTES_BEFORE_QUERY, "notes", _note_entry),
+        )
+        before_at = _as_utc(before.created_at) if before is not None else None
+
+        entries: list[TimelineEntryReadModel] = []
+        for kind, query, before_query, _, to_entry in sources:
+            if before is not None:
+                rows = self._session.execute(
+                    before_query, {**params, "before": before_at, "before_id": _id_bound(kind, before)}
+                )
+            else:
+                rows = self._session.execute(query, params)
+            entries += [to_entry(row, False) for row in rows.mappings()]
+        hot = _newest_first(entries, limit)
+
+        # hot だけで limit 件そろっていれば、その最古より新しいセグメントだけ見れば足りる
+        not_before = hot[-1].created_at if len(hot) == limit else None
+        for kind, _, _, source_name, to_entry in sources:
+            archived_rows = self._archive_store.read(
+                ARCHIVE_SOURCES[source_name],
+                customer_id,
+                before=before_at,
+                limit=limit,
+                not_before=not_before,
+                before_id=(_id_bound(kind, before) or None) if before is not None else None,
+            )
+            entries += [to_entry(row, True) for row in archived_rows]
+
+        return _newest_first(entries, limit)
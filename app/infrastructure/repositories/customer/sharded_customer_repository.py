@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import replace
+from typing import Optional, Sequence
+
+from app.application.customer.ports import CustomerQueryRepository, CustomerRepository, CustomerTimelineRepository
+from app.application.customer.query_filter import CustomerFilter
+from app.application.customer.read_models import (
+    CustomerDetailReadModel,
+    CustomerSummaryReadModel,
+    TimelineCursor,
+    TimelineEntryReadModel,
+)
+from app.domain.customer.models import Customer
+from app.domain.user.models import User
+from app.infrastructure.db.cold_archive import ColdArchiveStore
+from app.infrastructure.db.sharding import ShardRouter, ShardSessions
+from app.infrastructure.orm.customer import CustomerORM
+from app.infrastructure.repositories.customer.customer_command_repository import SqlAlchemyCustomerCommandRepository
+from app.infrastructure.repositories.customer.customer_query_repository import SqlAlchemyCustomerQueryRepository
+from app.infrastructure.repositories.customer.customer_timeline_repository import SqlAlchemyCustomerTimelineRepository
+
+"""
+Title: 「シャーディング時の顧客リポジトリ（ShardRouter からセッションを受け取る）」
+
+Point:
+    - 1 シャード分の SQL は既存の SqlAlchemy* リポジトリをそのまま使い、ここでは「どのシャードに投げるか」と
+      「複数シャードの結果をどうまとめるか」だけを書く。
+    - shop_id なしの一覧: 各シャードから先頭 offset + limit 件を id 順で取り、heapq.merge で id 順にマージして切り出す。
+      深いページほど各シャードから多く読むことになる（単一 DB の OFFSET と同じ性質）。
+    - customer_id だけの詳細・タイムライン・更新: 全シャードに並列で問い合わせ、見つかったシャードを使う。
+"""
+
+
+class ShardedCustomerQueryRepository(CustomerQueryRepository):
+    """ShardRouter 経由で顧客一覧・詳細を読む実装。"""
+
+    def __init__(self, router: ShardRouter) -> None:
+        self._router = router
+
+    def fetch_customer_summaries(
+        self,
+        current_user: User,
+        filters: CustomerFilter,
+        limit: int,
+        offset: int,
+    ) -> tuple[int, Sequence[CustomerSummaryReadModel]]:
+        if filters.shop_id is not None:
+            session = self._router.read_session_for_shop(filters.shop_id)
+            try:
+                return SqlAlchemyCustomerQueryRepository(session).fetch_customer_summaries(
+                    current_user, filters, limit, offset
+                )
+            finally:
+                session.close()
+
+        results = self._router.fan_out(
+            lambda session: SqlAlchemyCustomerQueryRepository(session, order_by_id=True).fetch_customer_summaries(
+                current_user, filters, offset + limit, 0
+            )
+        )
+        total_count = sum(count for count, _ in results)
+        merged = heapq.merge(*(summaries for _, summaries in results), key=lambda summary: summary.id)
+        return total_count, list(merged)[offset : offset + limit]
+
+    def fetch_customer_detail(self, current_user: User, customer_id: int) -> Optional[CustomerDetailReadModel]:
+        # 見つからないシャードでは最初の 1 本（顧客 + 来店サマリ）で None が返るだけ
+        details = self._router.fan_out(
+            lambda session: SqlAlchemyCustomerQueryRepository(session).fetch_customer_detail(current_user, customer_id)
+        )
+        return next((detail for detail in details if detail is not None), None)
+
+
+class ShardedCustomerTimelineRepository(CustomerTimelineRepository):
+    """顧客のいるシャードを探してから、そのシャードで顧客タイムラインを読む実装。"""
+
+    def __init__(self, router: ShardRouter, archive_store: ColdArchiveStore) -> None:
+        self._router = router
+        self._archive_store = archive_store
+
+    def fetch_customer_timeline(
+        self,
+        current_user: User,
+        customer_id: int,
+        before: Optional[TimelineCursor],
+        limit: int,
+    ) -> Optional[list[TimelineEntryReadModel]]:
+        shard = self._router.locate(CustomerORM.__table__, customer_id)
+        if shard is None:
+            return None
+        session = self._router.read_session(shard)
+        try:
+            return SqlAlchemyCustomerTimelineRepository(session, self._archive_store).fetch_customer_timeline(
+                current_user, customer_id, before, limit
+            )
+        finally:
+            session.close()
+
+
+class ShardedCustomerCommandRepository(CustomerRepository):
+    """顧客の作成・更新を、店舗のシャードのセッション（ShardSessions）で行う実装。"""
+
+    def __init__(self, sessions: ShardSessions) -> None:
+        self._sessions = sessions
+
+    def _for_shop(self, shop_id: int) -> SqlAlchemyCustomerCommandRepository:
+        return SqlAlchemyCustomerCommandRepository(self._sessions.for_shop(shop_id))
+
+    def exists_by_email(self, shop_id: int, email: str) -> bool:
+        return self._for_shop(shop_id).exists_by_email(shop_id, email)
+
+    def create(self, customer: Customer) -> Customer:
+        # シャードごとの自動採番は衝突するので、ID はディレクトリから払い出す
+        if customer.id is None:
+            customer = replace(customer, id=self._sessions.router.allocate_id(CustomerORM.__tablename__))
+        return self._for_shop(customer.shop_id).create(customer)
+
+    def get_by_id(self, customer_id: int) -> Optional[Customer]:
+        shard = self._sessions.router.locate(CustomerORM.__table__, customer_id)
+        if shard is None:
+            return None
+        return SqlAlchemyCustomerCommandRepository(self._sessions.for_shard(shard)).get_by_id(customer_id)
+
+    def update(self, customer: Customer) -> Customer:
+        return self._for_shop(customer.shop_id).update(customer)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.application.reservation.ports import ReservationCalendarCache, ReservationCalendarRepository
+from app.domain.reservation.enums import ReservationStatus
+from app.infrastructure.db.reservation_partitions import get_reservation_partitions
+
+if TYPE_CHECKING:
+    # NumPy は import app.main では読み込まない（最初にカレンダーを数えるときに import する）
+    import numpy as np
+
+"""
+Title: 「カレンダー用の、枠ごと・ステータス別の予約件数（1 クエリ + NumPy のビニング）」
+
+Point:
+    - 期間内の予約の (開始日時, ステータス) だけを 1 回の SELECT で読む（shop_id, start_datetime の複合索引で範囲を絞る）。
+      アーカイブ済みの期間は、重なる cold パーティションだけを UNION ALL する。
+    - 枠への振り分けは np.searchsorted（境目の配列に対する二分探索）、件数は np.bincount で「枠 × ステータス」を一度に数える。
+      境目は夏時間で間隔が一定でないので、割り算ではなく searchsorted を使う。
+    - ReservationCalendarDayCache は終わった日の 1 日分の件数を持つ LRU（プロセスで 1 つ。ProviderRegistry が持つ）。
+"""
+
+STATUSES = list(ReservationStatus)
+# ステータス値 → 件数表の列（定義にない値は -1）
+_STATUS_COLUMN = [-1] * (max(STATUSES) + 1)
+for _column, _status in enumerate(STATUSES):
+    _STATUS_COLUMN[_status.value] = _column
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # datetime64 はタイムゾーンを持たないので、UTC の壁時計にそろえてから渡す（SQLite はもともとタイムゾーンなし）
+    return value if value.tzinfo is None else value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def bin_by_slot(
+    starts: np.ndarray,
+    statuses: np.ndarray,
+    edges: np.ndarray,
+) -> np.ndarray:
+    """開始日時（datetime64）とステータス値を、枠（edges[i] <= t < edges[i + 1]）× ステータスの件数表にする。
+
+    edges は昇順（同じ値が続く長さ 0 の枠はあってよい）。
+
+    戻り値の形は (len(edges) - 1, len(ReservationStatus))。列は ReservationStatus の定義順。
+    """
+    import numpy as np
+
+    n_slots = len(edges) - 1
+    slot = np.searchsorted(edges.astype("datetime64[us]"), starts.astype("datetime64[us]"), side="right") - 1
+    column = np.full(len(statuses), -1, dtype=np.int64)
+    known = (statuses >= 0) & (statuses < len(_STATUS_COLUMN))
+    column[known] = np.asarray(_STATUS_COLUMN, dtype=np.int64)[statuses[known]]
+    valid = (slot >= 0) & (slot < n_slots) & (column >= 0)
+    flat = slot[valid] * len(STATUSES) + column[valid]
+    return np.bincount(flat, minlength=n_slots * len(STATUSES)).reshape(n_slots, len(STATUSES))
+
+
+class SqlAlchemyReservationCalendarRepository(ReservationCalendarRepository):
+    """枠ごとの予約件数の SQLAlchemy + NumPy 実装。"""
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+
+    def count_by_slot(
+        self,
+        shop_id: int,
+        slot_edges: Sequence[datetime],
+    ) -> list[dict[ReservationStatus, int]]:
+        import numpy as np
+
+        reservations = get_reservation_partitions(self._session).select_between(slot_edges[0], slot_edges[-1]).subquery()
+        rows = self._session.execute(
+            select(reservations.c.start_datetime, reservations.c.status).where(reservations.c.shop_id == shop_id)
+        ).all()
+
+        starts = np.array([_naive_utc(start) for start, _ in rows], dtype="datetime64[us]")
+        statuses = np.array([status for _, status in rows], dtype=np.int64)
+        edges = np.array([_naive_utc(edge) for edge in slot_edges], dtype="datetime64[us]")
+
+        table = bin_by_slot(starts, statuses, edges)
+        return [dict(zip(STATUSES, map(int, row))) for row in table]
+
+
+class ReservationCalendarDayCache(ReservationCalendarCache):
+    """終わった日の、1 日分の枠ごとの件数の LRU キャッシュ（スレッドセーフ）。
+
+    - max_days: 保持する最大件数（店舗 × タイムゾーン × 日 × 枠の長さ の組み合わせの数）
+    - 終わった日の予約を書き換えたら invalidate(shop_id) を呼ぶ
+    """
+
+    def __init__(self, max_days: int = 10_000) -> None:
+        self._max_days = max_days
+        self._entries: OrderedDict[tuple[int, str, date, int], list[dict[ReservationStatus, int]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, shop_id: int, timezone: str, day: date, slot_minutes: int
+    ) -> Optional[list[dict[ReservationStatus, int]]]:
+        key = (shop_id, timezone, day, slot_minutes)
+        with self._lock:
+            counts = self._entries.get(key)
+            if counts is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return counts
+
+    def put(
+        self, shop_id: int, timezone: str, day: date, slot_minutes: int, counts: list[dict[ReservationStatus, int]]
+    ) -> None:
+        key = (shop_id, timezone, day, slot_minutes)
+        with self._lock:
+            self._entries[key] = counts
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_days:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, shop_id: int) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == shop_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Sequence
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, UOWTransaction
+
+from app.application.reservation.ports import CohortCounts, ReservationCohortCache, ReservationCohortRepository
+from app.domain.reservation.enums import ReservationStatus
+from app.infrastructure.db.columnar import epoch_seconds, stream_arrays
+from app.infrastructure.db.reservation_partitions import get_reservation_partitions
+from app.infrastructure.orm.customer import CustomerORM
+from app.infrastructure.orm.reservation import ReservationORM
+
+if TYPE_CHECKING:
+    import numpy as np
+
+"""
+Title: 「月次コホートリテンションの件数（1 回のストリーミング読み取り + NumPy）と、コホートごとのキャッシュ」
+
+Point:
+    - 店舗の顧客（登録日時が期間内）に、期間内の来店済み / 会計済みの予約を LEFT JOIN した
+      (customer_id, 登録日時, 来店日時) を 1 回の SELECT で chunk ごとに読む。日時は SQL 側で epoch 秒にする。
+      アーカイブ済みの期間は、重なる cold パーティションだけを UNION ALL する。
+    - 月への振り分けは np.searchsorted（月の境目はタイムゾーンで長さが違う）。同じ顧客の同じ月の来店は np.unique で 1 回にし、
+      「コホート × 経過月数」の表を np.bincount で一度に数える。
+    - ReservationCohortCountCache はコホート 1 行分の TTL + LRU キャッシュ（プロセスで 1 つ。ProviderRegistry が持つ）。
+      track() した sessionmaker で来店済み / 会計済みの予約や顧客が書き込まれると、commit 後にその顧客のコホートだけを捨てる。
+      別プロセスでの書き込みは TTL が切れるまで見えない。
+"""
+
+COUNTED_STATUSES = (ReservationStatus.VISITED.value, ReservationStatus.PAID.value)
+
+
+def cohort_matrix(chunks: Iterable[np.ndarray], edges: np.ndarray, first_cohort: int) -> tuple[np.ndarray, np.ndarray]:
+    """(customer_id, 登録日時, 来店日時 or NaN) の配列の列から、コホートの顧客数と来店した顧客数の表を作る。
+
+    日時と edges（月の境目、昇順）は epoch 秒。コホートは edges の first_cohort 番目以降の月。
+
+    戻り値:
+        sizes:    形 (n,)    の各コホートの顧客数
+        retained: 形 (n, n)  の retained[c, k] = コホート c のうち、登録月から k か月後に来店した顧客数
+                  （n = コホートの数。期間の外になる k は 0）
+    """
+    import numpy as np
+
+    n = len(edges) - 1 - first_cohort
+    members: list[np.ndarray] = [np.zeros(0, dtype=np.int64)]
+    visits: list[np.ndarray] = [np.zeros(0, dtype=np.int64)]
+    for chunk in chunks:
+        customer_ids = chunk[:, 0].astype(np.int64)
+        cohort = np.searchsorted(edges, chunk[:, 1], side="right") - 1 - first_cohort
+        member = (cohort >= 0) & (cohort < n)
+        # JOIN で顧客は来店の数だけ重なって出てくるので、(顧客, コホート) / (顧客, コホート, 来店月) を一意にする
+        members.append(np.unique(customer_ids[member] * n + cohort[member]))
+
+        visited_at = chunk[:, 2]
+        month = np.searchsorted(edges, np.nan_to_num(visited_at, nan=-np.inf), side="right") - 1 - first_cohort
+        visited = member & ~np.isnan(visited_at) & (month >= cohort) & (month < n)
+        visits.append(np.unique((customer_ids[visited] * n + cohort[visited]) * n + month[visited]))
+
+    member_keys = np.unique(np.concatenate(members))
+    sizes = np.bincount(member_keys % n, minlength=n)
+
+    visit_keys = np.unique(np.concatenate(visits))
+    month = visit_keys % n
+    cohort = (visit_keys // n) % n
+    retained = np.bincount(cohort * n + (month - cohort), minlength=n * n).reshape(n, n)
+    return sizes, retained
+
+
+class SqlAlchemyReservationCohortRepository(ReservationCohortRepository):
+    """コホートリテンションの件数の SQLAlchemy + NumPy 実装。"""
+
+    def __init__(self, session: Session, chunk_size: int = 50_000) -> None:
+        self._session = session
+        self._chunk_size = chunk_size
+
+    def count_cohorts(
+        self,
+        shop_id: int,
+        month_edges: Sequence[datetime],
+        first_cohort: int,
+    ) -> list[CohortCounts]:
+        import numpy as np
+
+        start, end = month_edges[first_cohort], month_edges[-1]
+        dialect = self._session.get_bind().dialect.name
+
+        visits_query = get_reservation_partitions(self._session).select_between(start, end)
+        columns = visits_query.selected_columns
+        visits = visits_query.where(columns.shop_id == shop_id, columns.status.in_(COUNTED_STATUSES)).subquery()
+        customers = CustomerORM.__table__
+        query = (
+            select(
+                customers.c.id,
+                epoch_seconds(customers.c.created_at, dialect),
+                epoch_seconds(visits.c.start_datetime, dialect),
+            )
+            .select_from(customers.outerjoin(visits, visits.c.customer_id == customers.c.id))
+            .where(customers.c.shop_id == shop_id, customers.c.created_at >= start, customers.c.created_at < end)
+        )
+
+        edges = np.array([edge.timestamp() for edge in month_edges], dtype=np.float64)
+        sizes, retained = cohort_matrix(stream_arrays(self._session, query, self._chunk_size), edges, first_cohort)
+        n = len(sizes)
+        return [(int(sizes[c]), [int(count) for count in retained[c, : n - c]]) for c in range(n)]
+
+
+# ==========
+# キャッシュ
+# ==========
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite から読んだ日時はタイムゾーンなし（UTC）
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _history_values(obj: Any, name: str) -> list[Any]:
+    """flush 前後の値（読み込んでいなければ空）。"""
+    history = inspect(obj).attrs[name].history
+    return [*history.added, *history.deleted, *history.unchanged]
+
+
+def _changed_cohorts(session: Session) -> list[tuple[int, datetime]]:
+    """flush する行のうち、コホートの件数を変えうるものの (店舗, 顧客の登録日時)。"""
+    customer_ids: set[int] = set()
+    cohorts: list[tuple[int, datetime]] = []
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, ReservationORM):
+            if obj in session.dirty and not any(
+                inspect(obj).attrs[name].history.has_changes() for name in ("status", "start_datetime", "customer_id")
+            ):
+                continue
+            statuses = _history_values(obj, "status")
+            # 変更前が読み込まれていない（わからない）ときも捨てる側に倒す
+            if not statuses or any(status in COUNTED_STATUSES for status in statuses):
+                customer_ids.update(_history_values(obj, "customer_id") or [obj.customer_id])
+        elif isinstance(obj, CustomerORM):
+            if obj in session.dirty and not any(
+                inspect(obj).attrs[name].history.has_changes() for name in ("shop_id", "created_at")
+            ):
+                continue
+            for shop_id in _history_values(obj, "shop_id") or [obj.shop_id]:
+                for created_at in _history_values(obj, "created_at") or [obj.created_at]:
+                    cohorts.append((shop_id, created_at))
+    for customer_id in customer_ids:
+        customer = session.get(CustomerORM, customer_id)
+        if customer is not None:
+            cohorts.append((customer.shop_id, customer.created_at))
+    return cohorts
+
+
+@dataclass
+class _CohortEntry:
+    through_month: date
+    cohort_start: datetime
+    cohort_end: datetime
+    counts: CohortCounts
+    loaded_at: float
+
+
+def _months_between(start: date, end: date) -> int:
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+class ReservationCohortCountCache(ReservationCohortCache):
+    """(店舗, タイムゾーン, 登録月) → コホート 1 行分の件数の TTL + LRU キャッシュ（スレッドセーフ）。
+
+    - ttl_seconds: 別プロセスでの書き込みが見えるまでの最大遅延
+    - max_entries: 保持する最大コホート数
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 50_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[tuple[int, str, date], _CohortEntry] = OrderedDict()
+        self._keys_by_shop: dict[int, set[tuple[int, str, date]]] = {}
+        self._lock = threading.Lock()
+        self._pending_key = f"reservation_cohort_invalidations:{id(self)}"
+        self.hits = 0
+        self.misses = 0
+
+    def _remove(self, key: tuple[int, str, date]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_shop.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_shop[key[0]]
+
+    def get(self, shop_id: int, timezone: str, cohort_month: date, through_month: date) -> Optional[CohortCounts]:
+        key = (shop_id, timezone, cohort_month)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry.loaded_at >= self._ttl_seconds or entry.through_month < through_month:
+                if entry is not None and now - entry.loaded_at >= self._ttl_seconds:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            customers, retained = entry.counts
+            return customers, retained[: _months_between(cohort_month, through_month) + 1]
+
+    def put(
+        self,
+        shop_id: int,
+        timezone: str,
+        cohort_month: date,
+        through_month: date,
+        cohort_start: datetime,
+        cohort_end: datetime,
+        counts: CohortCounts,
+    ) -> None:
+        key = (shop_id, timezone, cohort_month)
+        with self._lock:
+            self._entries[key] = _CohortEntry(through_month, cohort_start, cohort_end, counts, self._clock())
+            self._entries.move_to_end(key)
+            self._keys_by_shop.setdefault(shop_id, set()).add(key)
+            while len(self._entries) > self._max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, shop_id: int, customer_created_at: datetime) -> None:
+        """customer_created_at に登録した顧客のコホート（どのタイムゾーンで区切ったものも）を捨てる。"""
+        created_at = _as_utc(customer_created_at)
+        with self._lock:
+            for key in list(self._keys_by_shop.get(shop_id, ())):
+                entry = self._entries[key]
+                if entry.cohort_start <= created_at < entry.cohort_end:
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_shop.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def track(self, target: Any) -> None:
+        """target（sessionmaker / Session）での来店・顧客の書き込みで、commit 後にそのコホートを捨てる。"""
+
+        def _collect(session: Session, flush_context: UOWTransaction, instances: Any) -> None:
+            cohorts = _changed_cohorts(session)
+            if cohorts:
+                session.info.setdefault(self._pending_key, []).extend(cohorts)
+
+        def _apply(session: Session) -> None:
+            for shop_id, created_at in session.info.pop(self._pending_key, []):
+                self.invalidate(shop_id, created_at)
+
+        def _discard(session: Session) -> None:
+            session.info.pop(self._pending_key, None)
+
+        event.listen(target, "before_flush", _collect)
+        event.listen(target, "after_commit", _apply)
+        event.listen(target, "after_rollback", _discard)
@@ -0,0 +1,100 @@
+# app/infrastructure/repositories/reservation/reservation_command_repository.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.application.reservation.ports import ReservationRepository
+from app.domain.reservation.enums import ReservationStatus
+from app.domain.reservation.models import Reservation
+from app.infrastructure.orm.customer import CustomerORM
+from app.infrastructure.orm.reservation import ReservationORM
+from app.infrastructure.orm.shop import ShopORM
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class SqlAlchemyReservationCommandRepository(ReservationRepository):
+    """予約の作成など、書き込み系ユースケース用の SQLAlchemy 実装。
+
+    - default_duration: 終了日時のない既存予約を、重なり判定でこの長さとして扱う
+    - max_duration: 予約の最大の長さ。重なり判定では start_datetime を [start - max_duration, end) に絞って読む
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        default_duration: timedelta = timedelta(minutes=60),
+        max_duration: timedelta = timedelta(hours=24),
+    ) -> None:
+        self._session = session
+        self._default_duration = default_duration
+        self._max_duration = max(max_duration, default_duration)
+
+    def get_customer_shop_id(self, customer_id: int) -> Optional[int]:
+        return self._session.execute(
+            select(CustomerORM.shop_id).where(CustomerORM.id == customer_id)
+        ).scalar_one_or_none()
+
+    def lock_shop(self, shop_id: int) -> None:
+        # 同じ店舗への予約作成は、店舗の行のロックを取った順に「重なりの確認 → INSERT」を行う
+        # （ロックは commit / rollback まで持つので、後の確認は先に作られた予約を必ず見る）
+        shops = ShopORM.__table__
+        if self._session.get_bind().dialect.name == "sqlite":
+            # SQLite に行ロックはないので、店舗の行への空の UPDATE でデータベースの書き込みロックを先に取る
+            # （ほかの書き込みは busy_timeout まで待つ）
+            self._session.execute(update(shops).where(shops.c.id == shop_id).values(id=shops.c.id))
+        else:
+            self._session.execute(select(shops.c.id).where(shops.c.id == shop_id).with_for_update())
+
+    def has_overlap(self, shop_id: int, start: datetime, end: datetime) -> bool:
+        # start_datetime の索引で範囲を絞った候補だけを読み、終了日時との比較は Python で行う
+        # （終了日時のない予約の扱いを DB 方言ごとの日時演算に持ち込まないため）
+        rows = self._session.execute(
+            select(ReservationORM.start_datetime, ReservationORM.end_datetime).where(
+                ReservationORM.shop_id == shop_id,
+                ReservationORM.start_datetime >= start - self._max_duration,
+                ReservationORM.start_datetime < end,
+                ReservationORM.status != ReservationStatus.CANCELED.value,
+            )
+        )
+        for other_start, other_end in rows:
+            other_start = _as_utc(other_start)
+            other_end = _as_utc(other_end) if other_end is not None else other_start + self._default_duration
+            if other_end > start:
+                return True
+        return False
+
+    def create(self, reservation: Reservation) -> Reservation:
+        """新規予約を永続化して、保存後の Reservation を返す。"""
+
+        orm = ReservationORM(
+            id=reservation.id,  # ふつうは None（DB の自動採番）。シャーディング時は ShardRouter で払い出した ID
+            shop_id=reservation.shop_id,
+            customer_id=reservation.customer_id,
+            start_datetime=reservation.start_datetime,
+            end_datetime=reservation.end_datetime,
+            status=reservation.status.value,
+            memo=reservation.memo,
+            created_at=reservation.created_at,
+            updated_at=reservation.updated_at,
+        )
+        self._session.add(orm)
+        self._session.flush()
+
+        return Reservation(
+            id=orm.id,
+            shop_id=reservation.shop_id,
+            customer_id=reservation.customer_id,
+            status=reservation.status,
+            start_datetime=reservation.start_datetime,
+            end_datetime=reservation.end_datetime,
+            memo=reservation.memo,
+            created_at=reservation.created_at,
+            updated_at=reservation.updated_at,
+        )
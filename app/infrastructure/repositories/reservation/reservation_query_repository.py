@@ -0,0 +1,55 @@
+# app/infrastructure/repositories/reservation/reservation_query_repository.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.application.reservation.ports import ReservationQueryRepository
+from app.application.reservation.read_models import ReservationReadModel
+from app.domain.reservation.enums import ReservationStatus
+from app.infrastructure.db.reservation_partitions import get_reservation_partitions
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _to_read_model(row: Any) -> ReservationReadModel:
+    return ReservationReadModel(
+        id=row.id,
+        shop_id=row.shop_id,
+        customer_id=row.customer_id,
+        status=ReservationStatus(row.status),
+        start_datetime=_as_utc(row.start_datetime),
+        end_datetime=_as_utc(row.end_datetime) if row.end_datetime is not None else None,
+        memo=row.memo,
+        created_at=_as_utc(row.created_at),
+    )
+
+
+class SqlAlchemyReservationQueryRepository(ReservationQueryRepository):
+    """店舗・期間で絞った予約一覧の SQLAlchemy 実装（期間に重なるパーティションだけを読む）。"""
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+
+    def fetch_reservations(
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        include_canceled: bool,
+        limit: int,
+    ) -> list[ReservationReadModel]:
+        reservations = get_reservation_partitions(self._session).select_between(start, end).subquery()
+        query = (
+            reservations.select()
+            .where(reservations.c.shop_id == shop_id)
+            .order_by(reservations.c.start_datetime, reservations.c.id)
+            .limit(limit)
+        )
+        if not include_canceled:
+            query = query.where(reservations.c.status != ReservationStatus.CANCELED.value)
+        return [_to_read_model(row) for row in self._session.execute(query)]
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.application.reservation.ports import ReservationSchedule
+from app.domain.reservation.enums import ReservationStatus
+from app.domain.reservation.models import Reservation
+from app.infrastructure.orm.reservation import ReservationORM
+
+"""
+Title: 「店舗ごとの予約の時間帯インデックス（重なり判定・空き枠探しをメモリ上で行う）」
+
+Description:
+    予約作成時の重なり判定や空き枠の検索のたびに reservations を読むと、予約が多い店舗ほど遅くなる。
+    ここでは店舗ごとに「埋まっている時間帯」をソート済みの配列で持ち、bisect で引く。
+
+        ShopIntervalIndex     : 1 店舗分。重なる予約はまとめて 1 つの時間帯にし、開始・終了の 2 本の配列で持つ
+        ReservationIndexCache : 店舗 ID → ShopIntervalIndex（TTL + LRU、プロセスで 1 つ。ProviderRegistry が持つ）
+        ReservationScheduleView: ReservationSchedule ポートの実装（リクエストごとに作る）
+
+Point:
+    - 時間帯は start <= t < end の半開区間。時間帯同士は重ならず、開始・終了とも昇順に並ぶ。
+      重なり判定は O(log n)、次の空き枠は O(log n + 読み飛ばした時間帯の数)。追加は list の挿入（memmove）。
+    - 店舗のインデックスは、その店舗に最初に問い合わせたときに読み込む（これから先の予約だけ。キャンセルは除く）。
+      終了日時のない予約は default_duration の長さとして扱う。
+    - このプロセスで作った予約は、トランザクションの確定後（after_commit）にインデックスへ足す。
+      ロールバックされた予約は足さない。
+    - 別プロセスのワーカーが作った予約は TTL が切れて読み直すまで見えない。
+      予約作成では DB でも重なりを確認するので二重予約にはならない（空き枠の表示が最大 TTL 秒古いだけ）。
+    - キャンセル・日時変更のように時間帯が空く変更をしたら ReservationIndexCache.invalidate(shop_id) を呼ぶ。
+"""
+
+_PENDING_KEY = "reservation_schedule_pending"
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite はタイムゾーンなしで返すので UTC とみなす
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class ShopIntervalIndex:
+    """1 店舗分の、埋まっている時間帯のソート済み配列（スレッドセーフ）。"""
+
+    def __init__(self, intervals: Iterable[tuple[datetime, datetime]] = ()) -> None:
+        self._starts: list[datetime] = []
+        self._ends: list[datetime] = []
+        self._lock = threading.Lock()
+        for start, end in sorted(intervals):
+            # 開始日時順に見ていけば、重なるものは直前の時間帯に吸収するだけでよい
+            if self._ends and start <= self._ends[-1]:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def intervals(self) -> list[tuple[datetime, datetime]]:
+        with self._lock:
+            return list(zip(self._starts, self._ends))
+
+    def add(self, start: datetime, end: datetime) -> None:
+        """[start, end) を埋まっている時間帯に加える（重なる・接する時間帯とはまとめる）。"""
+        with self._lock:
+            lo = bisect_left(self._ends, start)  # end >= start の最初の時間帯
+            hi = bisect_right(self._starts, end)  # start <= end の時間帯は [0, hi)
+            if lo < hi:
+                start = min(start, self._starts[lo])
+                end = max(end, self._ends[hi - 1])
+            self._starts[lo:hi] = [start]
+            self._ends[lo:hi] = [end]
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        with self._lock:
+            i = bisect_right(self._ends, start)  # end > start の最初の時間帯
+            return i < len(self._starts) and self._starts[i] < end
+
+    def next_free_start(
+        self, after: datetime, duration: timedelta, until: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        with self._lock:
+            candidate = after
+            i = bisect_right(self._ends, after)
+            while i < len(self._starts) and self._starts[i] < candidate + duration:
+                candidate = max(candidate, self._ends[i])
+                i += 1
+        if until is not None and candidate + duration > until:
+            return None
+        return candidate
+
+    def free_slots(
+        self, start: datetime, end: datetime, min_duration: timedelta
+    ) -> list[tuple[datetime, datetime]]:
+        slots = []
+        with self._lock:
+            cursor = start
+            i = bisect_right(self._ends, start)
+            while i < len(self._starts) and self._starts[i] < end:
+                if self._starts[i] - cursor >= min_duration:
+                    slots.append((cursor, self._starts[i]))
+                cursor = max(cursor, self._ends[i])
+                i += 1
+        if end - cursor >= min_duration:
+            slots.append((cursor, end))
+        return slots
+
+
+@dataclass
+class _CacheEntry:
+    index: ShopIntervalIndex
+    loaded_at: float
+
+
+class ReservationIndexCache:
+    """店舗 ID → ShopIntervalIndex の TTL + LRU キャッシュ（スレッドセーフ）。
+
+    - ttl_seconds: 店舗のインデックスを DB から読み直すまでの秒数（別プロセスの書き込みが見えるまでの最大遅延）
+    - max_shops: 保持する最大店舗数（超えたら最も使われていない店舗から捨てる）
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        max_shops: int = 1_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_shops = max_shops
+        self._clock = clock
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, shop_id: int) -> Optional[ShopIntervalIndex]:
+        """TTL 内のインデックスを返す。期限切れ・未読み込みなら None。"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(shop_id)
+            if entry is None or now - entry.loaded_at >= self._ttl_seconds:
+                if entry is not None:
+                    del self._entries[shop_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(shop_id)
+            self.hits += 1
+            return entry.index
+
+    def put(self, shop_id: int, index: ShopIntervalIndex) -> None:
+        with self._lock:
+            self._entries[shop_id] = _CacheEntry(index=index, loaded_at=self._clock())
+            self._entries.move_to_end(shop_id)
+            while len(self._entries) > self._max_shops:
+                self._entries.popitem(last=False)
+
+    def add(self, shop_id: int, start: datetime, end: datetime) -> None:
+        """確定した予約を反映する。まだ読み込んでいない店舗なら何もしない（次に読むとき DB から入る）。"""
+        with self._lock:
+            entry = self._entries.get(shop_id)
+        if entry is not None:
+            entry.index.add(start, end)
+
+    def invalidate(self, shop_id: int) -> None:
+        with self._lock:
+            self._entries.pop(shop_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def load_shop_index(
+    session: Session,
+    shop_id: int,
+    since: datetime,
+    default_duration: timedelta,
+) -> ShopIntervalIndex:
+    """since 以降に始まる、キャンセル以外の予約から店舗のインデックスを作る（hot テーブルだけを読む）。"""
+    table = ReservationORM.__table__
+    rows = session.execute(
+        select(table.c.start_datetime, table.c.end_datetime).where(
+            table.c.shop_id == shop_id,
+            table.c.start_datetime >= since,
+            table.c.status != ReservationStatus.CANCELED.value,
+        )
+    )
+    intervals = []
+    for start, end in rows:
+        start = _as_utc(start)
+        intervals.append((start, _as_utc(end) if end is not None else start + default_duration))
+    return ShopIntervalIndex(intervals)
+
+
+def _apply_pending(session: Session) -> None:
+    for cache, shop_id, start, end in session.info.pop(_PENDING_KEY, []):
+        cache.add(shop_id, start, end)
+
+
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class ReservationScheduleView(ReservationSchedule):
+    """ReservationSchedule の実装。店舗のインデックスはキャッシュから引き、なければ読み込む。
+
+    - cache が None なら毎回 DB から読み込む（インデックスを無効にした場合・比較用）。
+    - session_for_shop: 店舗の予約を読む Session を返す関数（シャーディング時は店舗のシャードの Session）。
+    - 読み込むのは「今 - max_duration」以降に始まる予約（今まさに進行中の予約も入るように）。
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ReservationIndexCache],
+        session_for_shop: Callable[[int], Session],
+        default_duration: timedelta = timedelta(minutes=60),
+        max_duration: timedelta = timedelta(hours=24),
+    ) -> None:
+        self._cache = cache
+        self._session_for_shop = session_for_shop
+        self._default_duration = default_duration
+        self._max_duration = max_duration
+
+    def _index(self, shop_id: int) -> ShopIntervalIndex:
+        index = self._cache.get(shop_id) if self._cache is not None else None
+        if index is None:
+            since = datetime.now(timezone.utc) - max(self._max_duration, self._default_duration)
+            index = load_shop_index(self._session_for_shop(shop_id), shop_id, since, self._default_duration)
+            if self._cache is not None:
+                self._cache.put(shop_id, index)
+        return index
+
+    def overlaps(self, shop_id: int, start: datetime, end: datetime) -> bool:
+        return self._index(shop_id).overlaps(start, end)
+
+    def next_free_start(
+        self,
+        shop_id: int,
+        after: datetime,
+        duration: timedelta,
+        until: Optional[datetime] = None,
+    ) -> Optional[datetime]:
+        return self._index(shop_id).next_free_start(after, duration, until)
+
+    def free_slots(
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        min_duration: timedelta,
+    ) -> list[tuple[datetime, datetime]]:
+        return self._index(shop_id).free_slots(start, end, min_duration)
+
+    def record(self, reservation: Reservation) -> None:
+        if self._cache is None:
+            return
+        session = self._session_for_shop(reservation.shop_id)
+        if not event.contains(session, "after_commit", _apply_pending):
+            event.listen(session, "after_commit", _apply_pending)
+            event.listen(session, "after_rollback", _discard_pending)
+        session.info.setdefault(_PENDING_KEY, []).append(
+            (self._cache, reservation.shop_id, reservation.start_datetime, reservation.end_datetime)
+        )
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+from app.application.reservation.ports import (
+    CohortCounts,
+    ReservationCalendarRepository,
+    ReservationCohortRepository,
+    ReservationQueryRepository,
+    ReservationRepository,
+)
+from app.application.reservation.read_models import ReservationReadModel
+from app.domain.reservation.enums import ReservationStatus
+from app.domain.reservation.models import Reservation
+from app.infrastructure.db.sharding import ShardRouter, ShardSessions
+from app.infrastructure.orm.customer import CustomerORM
+from app.infrastructure.orm.reservation import ReservationORM
+from app.infrastructure.repositories.reservation.reservation_calendar_repository import (
+    SqlAlchemyReservationCalendarRepository,
+)
+from app.infrastructure.repositories.reservation.reservation_cohort_repository import (
+    SqlAlchemyReservationCohortRepository,
+)
+from app.infrastructure.repositories.reservation.reservation_command_repository import (
+    SqlAlchemyReservationCommandRepository,
+)
+from app.infrastructure.repositories.reservation.reservation_query_repository import (
+    SqlAlchemyReservationQueryRepository,
+)
+
+"""
+Title: 「シャーディング時の予約リポジトリ（予約は常に店舗のシャードにある）」
+
+Point:
+    - 予約の操作はすべて shop_id が決まっているので、店舗のシャードの Session で既存のリポジトリを使うだけ。
+    - 顧客の所属店舗だけは customer_id しか分からないので、顧客のいるシャードを探してから読む。
+"""
+
+
+class ShardedReservationCommandRepository(ReservationRepository):
+    """予約の作成を、店舗のシャードのセッション（ShardSessions）で行う実装。"""
+
+    def __init__(
+        self,
+        sessions: ShardSessions,
+        default_duration: timedelta = timedelta(minutes=60),
+        max_duration: timedelta = timedelta(hours=24),
+    ) -> None:
+        self._sessions = sessions
+        self._default_duration = default_duration
+        self._max_duration = max_duration
+
+    def _for_shop(self, shop_id: int) -> SqlAlchemyReservationCommandRepository:
+        return SqlAlchemyReservationCommandRepository(
+            self._sessions.for_shop(shop_id), self._default_duration, self._max_duration
+        )
+
+    def get_customer_shop_id(self, customer_id: int) -> Optional[int]:
+        shard = self._sessions.router.locate(CustomerORM.__table__, customer_id)
+        if shard is None:
+            return None
+        return SqlAlchemyReservationCommandRepository(self._sessions.for_shard(shard)).get_customer_shop_id(
+            customer_id
+        )
+
+    def lock_shop(self, shop_id: int) -> None:
+        self._for_shop(shop_id).lock_shop(shop_id)
+
+    def has_overlap(self, shop_id: int, start: datetime, end: datetime) -> bool:
+        return self._for_shop(shop_id).has_overlap(shop_id, start, end)
+
+    def create(self, reservation: Reservation) -> Reservation:
+        # シャードごとの自動採番は衝突するので、ID はディレクトリから払い出す
+        if reservation.id is None:
+            reservation = replace(reservation, id=self._sessions.router.allocate_id(ReservationORM.__tablename__))
+        return self._for_shop(reservation.shop_id).create(reservation)
+
+
+class ShardedReservationQueryRepository(ReservationQueryRepository):
+    """店舗のシャードの読み取り専用セッションで予約一覧を読む実装。"""
+
+    def __init__(self, router: ShardRouter) -> None:
+        self._router = router
+
+    def fetch_reservations(
+        self,
+        shop_id: int,
+        start: datetime,
+        end: datetime,
+        include_canceled: bool,
+        limit: int,
+    ) -> list[ReservationReadModel]:
+        session = self._router.read_session_for_shop(shop_id)
+        try:
+            return SqlAlchemyReservationQueryRepository(session).fetch_reservations(
+                shop_id, start, end, include_canceled, limit
+            )
+        finally:
+            session.close()
+
+
+class ShardedReservationCalendarRepository(ReservationCalendarRepository):
+    """店舗のシャードの読み取り専用セッションでカレンダーの件数を数える実装。"""
+
+    def __init__(self, router: ShardRouter) -> None:
+        self._router = router
+
+    def count_by_slot(
+        self,
+        shop_id: int,
+        slot_edges: Sequence[datetime],
+    ) -> list[dict[ReservationStatus, int]]:
+        session = self._router.read_session_for_shop(shop_id)
+        try:
+            return SqlAlchemyReservationCalendarRepository(session).count_by_slot(shop_id, slot_edges)
+        finally:
+            session.close()
+
+
+class ShardedReservationCohortRepository(ReservationCohortRepository):
+    """店舗のシャードの読み取り専用セッションでコホートの件数を数える実装（顧客も予約も店舗のシャードにある）。"""
+
+    def __init__(self, router: ShardRouter, chunk_size: int = 50_000) -> None:
+        self._router = router
+        self._chunk_size = chunk_size
+
+    def count_cohorts(
+        self,
+        shop_id: int,
+        month_edges: Sequence[datetime],
+        first_cohort: int,
+    ) -> list[CohortCounts]:
+        session = self._router.read_session_for_shop(shop_id)
+        try:
+            return SqlAlchemyReservationCohortRepository(session, self._chunk_size).count_cohorts(
+                shop_id, month_edges, first_cohort
+            )
+        finally:
+            session.close()
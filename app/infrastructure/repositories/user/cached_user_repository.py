@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from app.application.auth.ports import UserRepository
+from app.domain.user.models import User
+
+"""
+Title: 「認証済みユーザーをプロセス内にキャッシュする UserRepository デコレータ」
+
+Description:
+    get_current_user → AuthService.get_user_from_token は、認証付きリクエストのたびに
+    users + roles を JOIN して User を組み立てている。
+    ここでは UserRepository ポートをそのまま実装したラッパーを用意し、
+    ドメインの User を user_id をキーに TTL + LRU でキャッシュする。
+
+Point:
+    - UserCache はプロセス（アプリ）単位で 1 つ持ち、リクエストをまたいで共有する。
+    - CachedUserRepository は Session に紐づく実リポジトリを包むので、リクエストごとに作る。
+    - is_active の反映遅れは active_staleness_seconds 以内に抑える。
+      それを過ぎたエントリは「version / updated_at / is_active だけの軽い SELECT」で再検証し、
+      変わっていればキャッシュを捨てて取り直す。
+    - ユーザーを無効化した場合は UserCache.invalidate(user_id) を呼べば即座に反映される。
+"""
+
+
+@dataclass(frozen=True)
+class UserVersionStamp:
+    """キャッシュの再検証に使う、ユーザー行の「版」を表す値。"""
+
+    version: int
+    updated_at: datetime
+    is_active: bool
+
+
+@dataclass
+class _CacheEntry:
+    user: User
+    loaded_at: float
+    validated_at: float
+
+
+class UserCache:
+    """ドメイン User の TTL + LRU キャッシュ（スレッドセーフ）。
+
+    - ttl_seconds: このエントリを DB から取り直すまでの最大寿命
+    - active_staleness_seconds: この秒数を過ぎたら version / is_active を再検証する
+    - max_size: 保持する最大ユーザー数（超えたら最も使われていないものから捨てる）
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        active_staleness_seconds: float = 30.0,
+        max_size: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._active_staleness_seconds = min(active_staleness_seconds, ttl_seconds)
+        self._max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[_CacheEntry]:
+        """TTL 内のエントリを返す。期限切れ・未登録なら None。"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or now - entry.loaded_at >= self._ttl_seconds:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry
+
+    def needs_validation(self, entry: _CacheEntry) -> bool:
+        return self._clock() - entry.validated_at >= self._active_staleness_seconds
+
+    def mark_validated(self, user_id: int) -> None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry.validated_at = self._clock()
+
+    def put(self, user: User) -> None:
+        now = self._clock()
+        with self._lock:
+            self._entries[user.id] = _CacheEntry(user=user, loaded_at=now, validated_at=now)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """明示的にエントリを捨てる（ユーザーの無効化・ロール変更時などに呼ぶ）。"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedUserRepository(UserRepository):
+    """UserCache を挟んで get_by_id を高速化する UserRepository のデコレータ実装。
+
+    - get_by_id: キャッシュにあればそれを返し、なければ inner から取得してキャッシュする
+    - get_by_email: ログイン用途なので常に inner から最新を取り、結果はキャッシュに載せる
+    """
+
+    def __init__(self, inner: UserRepository, cache: UserCache) -> None:
+        self._inner = inner
+        self._cache = cache
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        user = self._inner.get_by_email(email)
+        if user is not None:
+            self._cache.put(user)
+        return user
+
+    def get_by_id(self, user_id: int) -> Optional[User]:
+        entry = self._cache.get(user_id)
+        if entry is not None:
+            if not self._cache.needs_validation(entry):
+                return entry.user
+            if self._is_still_valid(entry.user):
+                self._cache.mark_validated(user_id)
+                return entry.user
+            self._cache.invalidate(user_id)
+
+        user = self._inner.get_by_id(user_id)
+        if user is not None:
+            self._cache.put(user)
+        return user
+
+    def update_hashed_password(self, user_id: int, hashed_password: str) -> None:
+        self._inner.update_hashed_password(user_id, hashed_password)
+        self._cache.invalidate(user_id)
+
+    def _is_still_valid(self, cached: User) -> bool:
+        """version / updated_at / is_active が変わっていなければ True。"""
+        # get_version_stamp は SqlAlchemyQueryUserRepository などが持つ任意メソッド
+        probe = getattr(self._inner, "get_version_stamp", None)
+        if probe is None:
+            # 再検証の手段がない実装では、staleness を過ぎたら素直に取り直す
+            return False
+
+        stamp: Optional[UserVersionStamp] = probe(cached.id)
+        if stamp is None:
+            return False
+        return (
+            stamp.version == cached.version
+            and stamp.updated_at == cached.updated_at
+            and stamp.is_active == cached.is_active
+        )
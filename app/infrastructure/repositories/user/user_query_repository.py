@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session, joinedload
 
 from app.application.auth.ports import UserRepository
@@ -11,6 +11,7 @@ from app.domain.auth.enums import UserRoleName
 
 from app.infrastructure.orm.user import UserORM
 from app.infrastructure.orm.role import RoleORM
+from app.infrastructure.repositories.user.cached_user_repository import UserVersionStamp
 
 
 class SqlAlchemyQueryUserRepository(UserRepository):
@@ -49,6 +50,28 @@ class SqlAlchemyQueryUserRepository(UserRepository):
             return None
         return self._to_domain_user(orm_user)
 
+    def get_version_stamp(self, user_id: int) -> Optional[UserVersionStamp]:
+        """キャッシュの再検証用に version / updated_at / is_active だけを取得する。
+
+        - roles の JOIN をしない主キー 1 行の SELECT なので、get_by_id よりずっと軽い。
+        - 見つからなければ None を返す。
+        """
+        stmt = select(UserORM.version, UserORM.updated_at, UserORM.is_active).where(UserORM.id == user_id)
+        row = self._session.execute(stmt).first()
+        if row is None:
+            return None
+        return UserVersionStamp(version=row.version, updated_at=row.updated_at, is_active=row.is_active)
+
+    def update_hashed_password(self, user_id: int, hashed_password: str) -> None:
+        """パスワードハッシュだけを差し替える。
+
+        - ログイン時の透過的な再ハッシュ用。パスワード自体は変わらないので
+          version / updated_at は動かさない（キャッシュやトークンを無効化しない）。
+        - commit は get_db 側で行う。
+        """
+        stmt = update(UserORM).where(UserORM.id == user_id).values(hashed_password=hashed_password)
+        self._session.execute(stmt)
+
     # ==========
     # マッピング
     # ==========
@@ -71,4 +94,5 @@ class SqlAlchemyQueryUserRepository(UserRepository):
             roles=role_names,
             created_at=orm_user.created_at,
             updated_at=orm_user.updated_at,
+            version=orm_user.version,
         )
@@ -0,0 +1,131 @@
+"""
+Title: 「Argon2id のコストを、このホストで目標レイテンシに合うよう計測して決めるコマンド」
+
+実行例:
+    python -m app.infrastructure.security.argon2_calibration --target-ms 250 --max-memory-mib 64
+    python -m app.infrastructure.security.argon2_calibration --target-ms 250 --write-env .env
+
+Description:
+    PasswordHash.recommended() はハードウェアに関係なく固定のコストを使うので、
+    小さいコンテナでは遅すぎ、大きいホストでは必要以上に弱い。
+    ここでは実際に verify を計測しながら、
+      1. メモリ予算内で、time_cost=1 で目標に収まる最大の memory_cost を選ぶ
+      2. そのメモリで、目標を超えない最大の time_cost まで上げる
+    という順でパラメータを決める（メモリハードネスを優先する RFC 9106 の推奨に沿った順序）。
+
+Point:
+    - 結果は APP_ARGON2_* として .env に書き出し、Settings から読み込む。
+    - パラメータを変えると、古いハッシュは次回ログイン成功時に AuthService が透過的に作り直す。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.infrastructure.security.password_hasher import Argon2Params, build_password_hash
+
+# これより小さいメモリコストは Argon2 として弱すぎるので候補にしない
+MIN_MEMORY_KIB = 8 * 1024
+MAX_TIME_COST = 10
+
+
+def measure_verify_seconds(params: Argon2Params, samples: int = 5) -> float:
+    """指定パラメータでの verify 1 回あたりの所要時間（中央値, 秒）を計測する。"""
+    hasher = build_password_hash(params)
+    hashed = hasher.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.verify("calibration-password", hashed)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(
+    target_seconds: float,
+    max_memory_kib: int,
+    parallelism: int,
+    measure: Optional[Callable[[Argon2Params], float]] = None,
+) -> Argon2Params:
+    """目標レイテンシとメモリ予算を満たす Argon2Params を選ぶ。"""
+    measure = measure or measure_verify_seconds
+
+    # 1. time_cost=1 で目標に収まるまでメモリを半分ずつ減らす
+    memory_kib = max_memory_kib
+    while memory_kib > MIN_MEMORY_KIB:
+        if measure(Argon2Params(time_cost=1, memory_cost=memory_kib, parallelism=parallelism)) <= target_seconds:
+            break
+        memory_kib //= 2
+    memory_kib = max(memory_kib, MIN_MEMORY_KIB)
+
+    # 2. そのメモリで目標を超えない範囲まで time_cost を上げる
+    time_cost = 1
+    while time_cost < MAX_TIME_COST:
+        candidate = Argon2Params(time_cost=time_cost + 1, memory_cost=memory_kib, parallelism=parallelism)
+        if measure(candidate) > target_seconds:
+            break
+        time_cost += 1
+
+    return Argon2Params(time_cost=time_cost, memory_cost=memory_kib, parallelism=parallelism)
+
+
+def to_env_lines(params: Argon2Params) -> dict[str, str]:
+    return {
+        "APP_ARGON2_TIME_COST": str(params.time_cost),
+        "APP_ARGON2_MEMORY_COST": str(params.memory_cost),
+        "APP_ARGON2_PARALLELISM": str(params.parallelism),
+    }
+
+
+def write_env_file(path: Path, values: dict[str, str]) -> None:
+    """既存の .env を保ったまま、該当キーだけを上書き（なければ追記）する。"""
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+    remaining = dict(values)
+    updated: list[str] = []
+    for line in lines:
+        key = line.split("=", 1)[0].strip()
+        if key in remaining:
+            updated.append(f"{key}={remaining.pop(key)}")
+        else:
+            updated.append(line)
+    updated.extend(f"{key}={value}" for key, value in remaining.items())
+    path.write_text("\n".join(updated) + "\n", encoding="utf-8")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Calibrate Argon2id cost parameters for this host.")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="目標とする verify 1 回の時間（ms）")
+    parser.add_argument("--max-memory-mib", type=int, default=64, help="1 回のハッシュに使ってよいメモリ（MiB）")
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        default=min(os.cpu_count() or 1, 4),
+        help="Argon2 の並列度（デフォルトは CPU 数、最大 4）",
+    )
+    parser.add_argument("--write-env", type=Path, default=None, help="結果を書き込む .env ファイル")
+    args = parser.parse_args(argv)
+
+    params = calibrate(
+        target_seconds=args.target_ms / 1000,
+        max_memory_kib=args.max_memory_mib * 1024,
+        parallelism=args.parallelism,
+    )
+    verify_ms = measure_verify_seconds(params) * 1000
+
+    values = to_env_lines(params)
+    for key, value in values.items():
+        print(f"{key}={value}")
+    print(f"# verify: {verify_ms:.1f} ms (target {args.target_ms:.0f} ms)")
+
+    if args.write_env is not None:
+        write_env_file(args.write_env, values)
+        print(f"# written to {args.write_env}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from app.application.auth.ports import PasswordHasher, PasswordHasherBusyError
+from app.infrastructure.security.password_hasher import Argon2Params, build_password_hash, needs_rehash
+
+"""
+Title: 「Argon2 のハッシュ/検証を専用プロセスプールに逃がす PasswordHasher 実装」
+
+Description:
+    Argon2id はメモリハードで 1 回あたり数十〜数百 ms かかる。
+    これを login ルートのスレッド内で実行すると、デプロイ直後のログイン集中で
+    Starlette のスレッドプールが埋まり、無関係な顧客 API まで詰まってしまう。
+
+Point:
+    - 計算は専用の ProcessPoolExecutor（max_workers）で行い、GIL やスレッドプールを占有しない。
+    - 「実行中 + 待ち」の上限を max_workers + max_queue に制限する。
+      上限を超えた要求は待たせずに PasswordHasherBusyError で即座に断る（→ 503 + Retry-After）。
+      これにより、ハッシュ待ちでブロックされるリクエストスレッドの数も同じ上限に収まる。
+    - stats() でキュー長・処理中件数・拒否件数・ハッシュ処理時間を参照できる。
+"""
+
+
+# ==========
+# ワーカープロセス側の処理
+# ==========
+
+_worker_hashers: dict[Optional[Argon2Params], Any] = {}
+
+
+def _get_worker_hasher(params: Optional[Argon2Params]) -> Any:
+    """ワーカープロセスごと・パラメータごとに 1 回だけ PasswordHash を組み立てる。"""
+    hasher = _worker_hashers.get(params)
+    if hasher is None:
+        hasher = _worker_hashers[params] = build_password_hash(params)
+    return hasher
+
+
+def _hash_in_worker(params: Optional[Argon2Params], plain_password: str) -> tuple[str, float]:
+    start = time.perf_counter()
+    hashed = _get_worker_hasher(params).hash(plain_password)
+    return hashed, time.perf_counter() - start
+
+
+def _verify_in_worker(
+    params: Optional[Argon2Params], plain_password: str, hashed_password: str
+) -> tuple[bool, float]:
+    start = time.perf_counter()
+    try:
+        ok = _get_worker_hasher(params).verify(plain_password, hashed_password)
+    except Exception:
+        # ハッシュ形式がおかしいなどの場合は False 扱い（Argon2PasswordHasher と同じ）
+        ok = False
+    return ok, time.perf_counter() - start
+
+
+def _default_executor_factory(max_workers: int) -> Executor:
+    # fork だと親プロセスのスレッドやロック状態まで引き継ぐので spawn を使う
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+# ==========
+# メトリクス
+# ==========
+
+
+@dataclass(frozen=True)
+class HashingPoolStats:
+    """プロセスプールの状態のスナップショット。"""
+
+    max_workers: int
+    max_queue: int
+    in_flight: int
+    queue_length: int
+    rejected_total: int
+    completed_total: int
+    hash_seconds_total: float
+    hash_seconds_max: float
+    wait_seconds_total: float
+
+    @property
+    def hash_seconds_avg(self) -> float:
+        return self.hash_seconds_total / self.completed_total if self.completed_total else 0.0
+
+
+class PooledPasswordHasher(PasswordHasher):
+    """プロセスプール + 待ち行列上限つきの PasswordHasher 実装。"""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 16,
+        retry_after_seconds: int = 1,
+        params: Optional[Argon2Params] = None,
+        executor_factory: Optional[Callable[[int], Executor]] = None,
+    ) -> None:
+        # params はタスクごとにワーカーへ渡す（None なら pwdlib の推奨値）
+        self._params = params
+        # needs_rehash はハッシュ文字列のパラメータを見るだけなので、親プロセスで判定する
+        self._local_hasher = build_password_hash(params)
+        self._max_workers = max_workers
+        self._max_queue = max_queue
+        self._retry_after_seconds = retry_after_seconds
+        self._executor_factory = executor_factory or _default_executor_factory
+        self._executor: Optional[Executor] = None
+
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected_total = 0
+        self._completed_total = 0
+        self._hash_seconds_total = 0.0
+        self._hash_seconds_max = 0.0
+        self._wait_seconds_total = 0.0
+
+    def hash(self, plain_password: str) -> str:
+        """平文パスワードからハッシュを生成する。"""
+        return self._run(_hash_in_worker, self._params, plain_password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """平文とハッシュを比較し、一致していれば True を返す。"""
+        return self._run(_verify_in_worker, self._params, plain_password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """古いパラメータで作られたハッシュなら True を返す。"""
+        return needs_rehash(self._local_hasher, hashed_password)
+
+    def stats(self) -> HashingPoolStats:
+        with self._lock:
+            return HashingPoolStats(
+                max_workers=self._max_workers,
+                max_queue=self._max_queue,
+                in_flight=self._in_flight,
+                queue_length=max(self._in_flight - self._max_workers, 0),
+                rejected_total=self._rejected_total,
+                completed_total=self._completed_total,
+                hash_seconds_total=self._hash_seconds_total,
+                hash_seconds_max=self._hash_seconds_max,
+                wait_seconds_total=self._wait_seconds_total,
+            )
+
+    def shutdown(self) -> None:
+        """アプリ終了時にワーカープロセスを止める。"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # ==========
+    # 内部処理
+    # ==========
+
+    def _get_executor(self) -> Executor:
+        # プロセス起動は重いので、最初に使われたときに作る
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._executor_factory(self._max_workers)
+            return self._executor
+
+    def _run(self, fn: Callable[..., tuple[Any, float]], *args: Any) -> Any:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected_total += 1
+            raise PasswordHasherBusyError(retry_after_seconds=self._retry_after_seconds)
+
+        with self._lock:
+            self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            result, hash_seconds = self._get_executor().submit(fn, *args).result()
+            total_seconds = time.perf_counter() - start
+            with self._lock:
+                self._completed_total += 1
+                self._hash_seconds_total += hash_seconds
+                self._hash_seconds_max = max(self._hash_seconds_max, hash_seconds)
+                self._wait_seconds_total += max(total_seconds - hash_seconds, 0.0)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
@@ -6,7 +6,7 @@ from typing import Any, Mapping
 import jwt
 
 from app.application.auth.ports import TokenProvider
-from app.core.config import settings  # 既存の Settings を利用
+from app.core.config import get_settings  # 既存の Settings を利用
 
 
 class JwtTokenProvider(TokenProvider):
@@ -19,7 +19,7 @@ class JwtTokenProvider(TokenProvider):
     ) -> None:
         # デフォルトは Settings から取る。本番で key を変えたい場合は
         # DI で secret_key/algorithm を明示的に渡してもよい。
-        self._secret_key = secret_key or settings.secret_key
+        self._secret_key = secret_key or get_settings().secret_key
         self._algorithm = algorithm or "HS256"
 
     def encode(
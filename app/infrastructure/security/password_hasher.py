@@ -1,18 +1,58 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Optional
 
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 
 from app.application.auth.ports import PasswordHasher
 
 
+@dataclass(frozen=True)
+class Argon2Params:
+    """Argon2id のコストパラメータ（calibrate_argon2 で求めて Settings に保存する）"""
+
+    time_cost: int
+    memory_cost: int  # KiB
+    parallelism: int
+
+
+def build_password_hash(params: Optional[Argon2Params] = None) -> PasswordHash:
+    """Argon2Params から PasswordHash を組み立てる。None なら pwdlib の推奨値を使う。"""
+    if params is None:
+        # recommended() は Argon2id ベースの安全なデフォルト設定を返してくれる
+        return PasswordHash.recommended()
+    return PasswordHash(
+        (
+            Argon2Hasher(
+                time_cost=params.time_cost,
+                memory_cost=params.memory_cost,
+                parallelism=params.parallelism,
+            ),
+        )
+    )
+
+
+def needs_rehash(hasher: PasswordHash, hashed_password: str) -> bool:
+    """現在のパラメータと異なる設定で作られたハッシュなら True を返す。"""
+    try:
+        current = hasher.current_hasher
+        return not current.identify(hashed_password) or current.check_needs_rehash(hashed_password)
+    except Exception:
+        # 形式不正なハッシュは verify の時点で失敗しているので、ここでは何もしない
+        return False
+
+
 class Argon2PasswordHasher(PasswordHasher):
     """pwdlib[argon2] を使った PasswordHasher 実装"""
 
-    def __init__(self, hasher: Optional[PasswordHash] = None) -> None:
-        # recommended() は Argon2id ベースの安全なデフォルト設定を返してくれる
-        self._hasher = hasher or PasswordHash.recommended()
+    def __init__(
+        self,
+        hasher: Optional[PasswordHash] = None,
+        params: Optional[Argon2Params] = None,
+    ) -> None:
+        self._hasher = hasher or build_password_hash(params)
 
     def hash(self, plain_password: str) -> str:
         """平文パスワードからハッシュを生成する。"""
@@ -25,3 +65,7 @@ class Argon2PasswordHasher(PasswordHasher):
         except Exception:
             # ハッシュ形式がおかしいなどの場合は False 扱い
             return False
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """古いパラメータで作られたハッシュなら True を返す。"""
+        return needs_rehash(self._hasher, hashed_password)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.application.auth.ports import TokenRevocationChecker
+from app.infrastructure.orm.user import UserORM
+
+"""
+Title: 「ステートレストークン用の、メモリ上の失効リスト」
+
+Description:
+    ステートレスモードでは get_current_user が DB を見ずに claims だけで User を組み立てる。
+    そのかわり「無効化されたユーザー」「ロール変更などで version が上がったユーザー」の
+    トークンを弾くために、ここで小さな失効リストを持つ。
+
+Point:
+    - 持つのは次の 2 つだけなので、ユーザー数が多くてもコンパクト。
+        - inactive_user_ids: is_active=False のユーザー ID
+        - version_floors: version > 1 のユーザーの「有効な最小 version」
+      トークンの ver がフロア未満なら失効とみなす。
+    - DB からの読み込みはバックグラウンドスレッドで refresh_interval_seconds ごとに行い、
+      リクエスト処理中は辞書と集合を引くだけ。
+    - 無効化した直後に反映したい場合は revoke_user() でこのプロセスに即時反映できる。
+    - 一度も読み込めていない間は loaded が False。AuthService はその間 claims を信用せず DB から User を読む
+      （初回の読み込みに失敗しても起動は止めず、バックグラウンドで読み直す）。
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryRevocationList(TokenRevocationChecker):
+    """user_id / version フロアによるトークン失効リスト。"""
+
+    def __init__(self) -> None:
+        self._inactive_user_ids: frozenset[int] = frozenset()
+        self._version_floors: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.loaded = False
+
+    def is_revoked(self, user_id: int, version: int) -> bool:
+        # 参照は差し替え済みの不変オブジェクトを読むだけなのでロック不要
+        if user_id in self._inactive_user_ids:
+            return True
+        return version < self._version_floors.get(user_id, 1)
+
+    def revoke_user(self, user_id: int, version_floor: Optional[int] = None) -> None:
+        """このプロセスで即座に失効させる（次回の refresh で DB の状態に揃う）。"""
+        with self._lock:
+            if version_floor is None:
+                self._inactive_user_ids = self._inactive_user_ids | {user_id}
+            else:
+                floors = dict(self._version_floors)
+                floors[user_id] = max(floors.get(user_id, 1), version_floor)
+                self._version_floors = floors
+
+    def refresh(self, session: Session) -> None:
+        """DB から非アクティブユーザーと version フロアを読み直す。"""
+        stmt = select(UserORM.id, UserORM.version, UserORM.is_active).where(
+            or_(UserORM.is_active.is_(False), UserORM.version > 1)
+        )
+        inactive: set[int] = set()
+        floors: dict[int, int] = {}
+        for row in session.execute(stmt):
+            if not row.is_active:
+                inactive.add(row.id)
+            if row.version > 1:
+                floors[row.id] = row.version
+
+        with self._lock:
+            self._inactive_user_ids = frozenset(inactive)
+            self._version_floors = floors
+            self.loaded = True
+
+    def start_background_refresh(
+        self,
+        session_factory: Callable[[], Session],
+        interval_seconds: float,
+    ) -> None:
+        """初回は同期で読み込み、以降は interval_seconds ごとにバックグラウンドで読み直す。"""
+        try:
+            self._refresh_with(session_factory)
+        except Exception:
+            # loaded は False のまま（その間の認証は DB を見る）。次の周期で読み直す
+            logger.exception("Failed to load token revocation list")
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(session_factory, interval_seconds),
+            name="token-revocation-refresh",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self, session_factory: Callable[[], Session], interval_seconds: float) -> None:
+        while not self._stop.wait(interval_seconds):
+            try:
+                self._refresh_with(session_factory)
+            except Exception:
+                # 読み込みに失敗しても直前のリストで動き続ける
+                logger.exception("Failed to refresh token revocation list")
+
+    def _refresh_with(self, session_factory: Callable[[], Session]) -> None:
+        session = session_factory()
+        try:
+            self.refresh(session)
+        finally:
+            session.close()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Mapping, Optional
+
+from app.application.auth.ports import TokenProvider
+
+"""
+Title: 「検証済みトークンのキャッシュ（JWT の署名検証を毎回やり直さないための TokenProvider デコレータ）」
+
+Description:
+    同じアクセストークンはセッション中に何百回も送られてくるが、JwtTokenProvider.decode は
+    毎回 base64 デコード + JSON パース + HMAC 検証をやり直している。
+    ここでは「検証に成功したトークン」のペイロードを、トークンのダイジェストをキーに保持する。
+
+Point:
+    - キーは SHA-256 ダイジェスト。生のトークンはメモリに残さない。
+      辞書の探索はダイジェスト同士の比較になるので、トークン文字列の一致判定で
+      タイミング差が漏れることはない（キャッシュに載るのは署名検証に成功したものだけ）。
+    - 各エントリはトークン自身の exp で失効する。失効後は inner.decode に委ねるので、
+      期限切れの例外（jwt.ExpiredSignatureError など）はこれまでどおり上に上がる。
+    - 最大件数を超えたら LRU で捨てるので、トークンを大量に投げられてもメモリは増え続けない。
+"""
+
+
+class VerifiedTokenCache:
+    """トークンダイジェスト → 検証済みペイロード の LRU キャッシュ（スレッドセーフ）。"""
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, Mapping[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, key: bytes) -> Optional[Mapping[str, Any]]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry[0]:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: bytes, payload: Mapping[str, Any]) -> None:
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            # exp の無いトークンは失効タイミングが分からないのでキャッシュしない
+            return
+        with self._lock:
+            self._entries[key] = (float(exp), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachingTokenProvider(TokenProvider):
+    """VerifiedTokenCache を挟んで decode を高速化する TokenProvider のデコレータ実装。
+
+    - encode: そのまま inner に委譲する
+    - decode: 検証済みのトークンならキャッシュからペイロードを返す
+    """
+
+    def __init__(self, inner: TokenProvider, cache: VerifiedTokenCache) -> None:
+        self._inner = inner
+        self._cache = cache
+
+    def encode(
+        self,
+        payload: Mapping[str, Any],
+        expires_in_minutes: int,
+    ) -> str:
+        return self._inner.encode(payload=payload, expires_in_minutes=expires_in_minutes)
+
+    def decode(self, token: str) -> Mapping[str, Any]:
+        key = self._cache.digest(token)
+        cached = self._cache.get(key)
+        if cached is not None:
+            # 呼び出し側で書き換えられてもキャッシュが汚れないようにコピーを返す
+            return dict(cached)
+
+        payload = self._inner.decode(token)  # 不正・期限切れならここで例外
+        self._cache.put(key, dict(payload))
+        return payload
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Annotated, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.domain.user.models import User
+
+from app.infrastructure.db.session import get_database, get_read_db
+from app.infrastructure.repositories.audit_log.audit_log_query_repository import SqlAlchemyAuditLogQueryRepository
+from app.interface.api.auth.deps import get_current_superuser
+from app.interface.api.registry import ProviderRegistry, get_registry
+from app.interface.api.admin.schemas import AuditLogPageResponse, DbPoolStatsResponse, SlowQueryResponse
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["admin"],
+)
+
+
+@router.get(
+    "/db-pool",
+    response_model=DbPoolStatsResponse,
+)
+def get_db_pool_stats(
+    current_user: Annotated[User, Depends(get_current_superuser)],
+    registry: Annotated[ProviderRegistry, Depends(get_registry)],
+) -> DbPoolStatsResponse:
+    """
+    DB コネクションプールの状態（使用中本数 / overflow / チェックアウト待ち時間など）を返す。
+    """
+
+    if registry.pool_metrics is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pool metrics are not enabled",
+        )
+    return DbPoolStatsResponse.from_stats(registry.pool_metrics.stats())
+
+
+@router.get(
+    "/slow-queries",
+    response_model=List[SlowQueryResponse],
+)
+def get_slow_queries(
+    current_user: Annotated[User, Depends(get_current_superuser)],
+    registry: Annotated[ProviderRegistry, Depends(get_registry)],
+    limit: int = Query(10, ge=1, le=100),
+) -> List[SlowQueryResponse]:
+    """
+    スロークエリを合計時間の多い順に返す（正規化 SQL / 呼び出し元 / 実行計画つき）。
+    """
+
+    if registry.slow_query_log is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slow query log is not enabled",
+        )
+    return [SlowQueryResponse.from_entry(entry) for entry in registry.slow_query_log.report(limit)]
+
+
+@router.get(
+    "/audit-logs",
+    response_model=AuditLogPageResponse,
+)
+def get_audit_logs(
+    current_user: Annotated[User, Depends(get_current_superuser)],
+    db: Annotated[Session, Depends(get_read_db)],
+    user_id: int = Query(..., ge=1),
+    before: Optional[datetime] = Query(None, description="この日時より前の監査ログを返す（ページング用）"),
+    before_id: Optional[int] = Query(
+        None,
+        ge=1,
+        description="before と同じ日時の監査ログは、この id より前のものを返す（前のページの next_before_id）",
+    ),
+    limit: int = Query(50, ge=1, le=200),
+) -> AuditLogPageResponse:
+    """
+    ユーザーの監査ログを新しい順に返す。保持期間を過ぎてアーカイブされた分もさかのぼって読む（archived=true）。
+
+    - 次のページは、レスポンスの next_before / next_before_id を before / before_id に渡す
+      （同じ日時の監査ログがページの境目にあっても飛ばさない）
+    """
+
+    repository = SqlAlchemyAuditLogQueryRepository(db, get_database().archive_store)
+    entries = repository.fetch_user_audit_logs(user_id, before, limit, before_id=before_id)
+    return AuditLogPageResponse.from_entries(entries, limit)
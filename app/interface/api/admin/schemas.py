@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel
+
+from app.infrastructure.db.pool_metrics import PoolStats
+from app.infrastructure.db.slow_query_log import SlowQueryEntry
+from app.infrastructure.repositories.audit_log.audit_log_query_repository import AuditLogEntry
+
+
+# GET /api/admin/db-pool のレスポンス
+class DbPoolStatsResponse(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checked_out_max: int
+    checkouts_total: int
+    timeouts_total: int
+    connections_created_total: int
+    invalidations_total: int
+    wait_ms_avg: float
+    wait_ms_max: float
+
+    @classmethod
+    def from_stats(cls, stats: PoolStats) -> "DbPoolStatsResponse":
+        return cls(
+            pool_size=stats.pool_size,
+            max_overflow=stats.max_overflow,
+            checked_out=stats.checked_out,
+            checked_in=stats.checked_in,
+            overflow=stats.overflow,
+            checked_out_max=stats.checked_out_max,
+            checkouts_total=stats.checkouts_total,
+            timeouts_total=stats.timeouts_total,
+            connections_created_total=stats.connections_created_total,
+            invalidations_total=stats.invalidations_total,
+            wait_ms_avg=stats.wait_seconds_avg * 1000,
+            wait_ms_max=stats.wait_seconds_max * 1000,
+        )
+
+
+# GET /api/admin/slow-queries の 1 件分
+class SlowQueryResponse(BaseModel):
+    fingerprint: str
+    normalized_sql: str
+    parameter_shape: Any
+    caller: Optional[str]
+    count: int
+    total_ms: float
+    avg_ms: float
+    max_ms: float
+    plan: Optional[List[str]]
+
+    @classmethod
+    def from_entry(cls, entry: SlowQueryEntry) -> "SlowQueryResponse":
+        return cls(
+            fingerprint=entry.fingerprint,
+            normalized_sql=entry.normalized_sql,
+            parameter_shape=entry.parameter_shape,
+            caller=entry.caller,
+            count=entry.count,
+            total_ms=entry.total_ms,
+            avg_ms=entry.avg_ms,
+            max_ms=entry.max_ms,
+            plan=entry.plan,
+        )
+
+
+# GET /api/admin/audit-logs の 1 件分
+class AuditLogResponse(BaseModel):
+    id: int
+    user_id: Optional[int]
+    action: str
+    entity_type: Optional[str]
+    entity_id: Optional[int]
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    created_at: datetime
+    archived: bool
+
+    @classmethod
+    def from_entry(cls, entry: AuditLogEntry) -> "AuditLogResponse":
+        return cls(**entry.__dict__)
+
+
+# GET /api/admin/audit-logs のレスポンス
+class AuditLogPageResponse(BaseModel):
+    audit_logs: List[AuditLogResponse]
+    # 次のページの位置（before / before_id にそのまま渡す。これ以上なければ None）
+    next_before: Optional[datetime]
+    next_before_id: Optional[int]
+
+    @classmethod
+    def from_entries(cls, entries: List[AuditLogEntry], limit: int) -> "AuditLogPageResponse":
+        last = entries[-1] if len(entries) == limit else None
+        return cls(
+            audit_logs=[AuditLogResponse.from_entry(entry) for entry in entries],
+            next_before=last.created_at if last is not None else None,
+            next_before_id=last.id if last is not None else None,
+        )
@@ -15,23 +15,22 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from sqlalchemy.orm import Session
 
-from app.core.config import settings
 from app.domain.user.models import User
 
 from app.application.auth.services import (
     AuthService,
-    AuthSettings,
     AuthenticationError,
     TokenError,
 )
-from app.application.auth.ports import UserRepository, PasswordHasher, TokenProvider
+from app.application.auth.ports import UserRepository
 
 
 from app.infrastructure.repositories.user.user_query_repository import SqlAlchemyQueryUserRepository
-from app.infrastructure.security.password_hasher import Argon2PasswordHasher
-from app.infrastructure.security.jwt_token_provider import JwtTokenProvider
+from app.infrastructure.repositories.user.cached_user_repository import CachedUserRepository
+from app.infrastructure.repositories.auth.refresh_token_repository import SqlAlchemyRefreshTokenRepository
 
 from app.infrastructure.db.session import get_db
+from app.interface.api.registry import ProviderRegistry, get_registry
 
 # OAuth2 の Bearer スキームを使う場合（ex: Cognito）
 # FastAPI が Authorization: Bearer <token> から token だけ抜き出してくれる仕組み
@@ -44,37 +43,29 @@ bearer_scheme = HTTPBearer()
 
 def get_auth_service(
     db: Annotated[Session, Depends(get_db)],
+    registry: Annotated[ProviderRegistry, Depends(get_registry)],
 ) -> AuthService:
     """
     AuthService を組み立てて返す依存関数。
     ここが「オニオンの外側 → 内側」へのDI のハブになるイメージ
 
-    - DB セッション
-    - UserRepository 実装
-    - PasswordHasher 実装
-    - TokenProvider 実装
-    - AuthSettings（有効期限など）
-
-    をまとめて AuthService に注入する。
+    - PasswordHasher / TokenProvider / AuthSettings / キャッシュ類は
+      起動時に組み立てた ProviderRegistry（app.state.registry）のものを使い回す
+    - リクエストごとに作るのは DB セッションに紐づくリポジトリだけ
     """
+    app_settings = registry.settings
 
     user_repo: UserRepository = SqlAlchemyQueryUserRepository(db)
-    password_hasher: PasswordHasher = Argon2PasswordHasher()
-    token_provider: TokenProvider = JwtTokenProvider(
-        secret_key=settings.secret_key,
-        # algorithm を変えたい場合は Settings にフィールドを足してここで渡す
-        # algorithm=settings.jwt_algorithm,
-    )
-
-    auth_settings = AuthSettings(
-        access_token_expires_minutes=settings.access_token_expire_minutes,
-    )
+    if registry.user_cache is not None:
+        user_repo = CachedUserRepository(user_repo, cache=registry.user_cache)
 
     return AuthService(
         user_repo=user_repo,
-        password_hasher=password_hasher,
-        token_provider=token_provider,
-        settings=auth_settings,
+        password_hasher=registry.password_hasher,
+        token_provider=registry.token_provider,
+        settings=registry.auth_settings,
+        revocations=registry.revocation_list,
+        refresh_tokens=SqlAlchemyRefreshTokenRepository(db) if app_settings.refresh_tokens_enabled else None,
     )
 
 
@@ -103,3 +94,15 @@ def get_current_user(
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+def get_current_superuser(
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> User:
+    """管理用エンドポイント向け: スーパーユーザー以外は 403。"""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Superuser privileges are required",
+        )
+    return current_user
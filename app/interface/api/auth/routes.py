@@ -3,15 +3,18 @@ from __future__ import annotations
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
 
 from app.domain.user.models import User
 
-from app.application.auth.services import AuthService, AuthenticationError
+from app.application.auth.services import AuthService, AuthenticationError, TokenError
+from app.application.auth.ports import PasswordHasherBusyError
 from app.application.auth.read_models import CurrentUserReadModel
 
 from app.interface.api.auth.deps import get_auth_service, get_current_user
 from app.interface.api.auth.schemas import (
     LoginRequest,
+    RefreshRequest,
     TokenResponse,
     CurrentUserResponse,
 )
@@ -44,12 +47,53 @@ def login(
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except PasswordHasherBusyError as exc:
+        # パスワード検証の待ち行列が一杯 → 待たせずに 503 で断る
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts. Please retry later.",
+            headers={"Retry-After": str(exc.retry_after_seconds)},
+        )
 
     token = auth_service.create_access_token(user)
 
     return TokenResponse(
         access_token=token.access_token,
         token_type=token.token_type,
+        refresh_token=token.refresh_token,
+    )
+
+
+@router.post(
+    "/refresh",
+    response_model=TokenResponse,
+    status_code=status.HTTP_200_OK,
+)
+def refresh(
+    body: RefreshRequest,
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+):
+    """
+    リフレッシュトークンで新しいアクセストークンを発行する（パスワード検証なし）。
+
+    使ったリフレッシュトークンは失効し、新しいリフレッシュトークンが返る。
+    """
+
+    try:
+        token = auth_service.refresh_access_token(body.refresh_token)
+    except (TokenError, AuthenticationError):
+        # HTTPException を投げると get_db が rollback してしまい、
+        # 再利用検知で行った「系列ごとの失効」まで取り消されるので、レスポンスとして返す
+        return JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"detail": "Invalid refresh token"},
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return TokenResponse(
+        access_token=token.access_token,
+        token_type=token.token_type,
+        refresh_token=token.refresh_token,
     )
 
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
 from pydantic import BaseModel
 
@@ -19,6 +19,13 @@ class LoginRequest(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    # リフレッシュトークンが有効な場合のみ返す（/api/auth/refresh に渡す）
+    refresh_token: Optional[str] = None
+
+
+# POST /api/auth/refresh の Body { "refresh_token": "..." }
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 # /api/auth/me のレスポンス用
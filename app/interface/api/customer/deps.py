@@ -3,18 +3,29 @@ from sqlalchemy.orm import Session
 
 from typing import Optional
 
-from app.infrastructure.db.session import get_db
+from app.infrastructure.db.session import get_database, get_db, get_read_db, get_shard_sessions
+from app.infrastructure.db.sharding import ShardSessions
 from app.infrastructure.repositories.customer.customer_query_repository import (
     SqlAlchemyCustomerQueryRepository,
 )
+from app.infrastructure.repositories.customer.customer_timeline_repository import (
+    SqlAlchemyCustomerTimelineRepository,
+)
 from app.infrastructure.repositories.customer.customer_command_repository import (
     SqlAlchemyCustomerCommandRepository,
 )
+from app.infrastructure.repositories.customer.sharded_customer_repository import (
+    ShardedCustomerCommandRepository,
+    ShardedCustomerQueryRepository,
+    ShardedCustomerTimelineRepository,
+)
 from app.infrastructure.repositories.shop.shop_query_repository import (
     SqlAlchemyQueryShopRepository,
 )
 
+from app.application.customer.ports import CustomerQueryRepository, CustomerRepository, CustomerTimelineRepository
 from app.application.customer.queries.get_customer_detail_service import GetCustomerDetailQueryService
+from app.application.customer.queries.get_customer_timeline_service import GetCustomerTimelineQueryService
 from app.application.customer.queries.list_customers_service import ListCustomersQueryService
 from app.application.customer.query_filter import CustomerFilter
 from app.application.customer.commands.create_customer_service import CreateCustomerCommandService
@@ -23,30 +34,71 @@ from app.application.customer.commands.update_customer_service import UpdateCust
 from app.domain.customer.enums import CustomerStatus
 
 
-def get_customer_list_query_service(
+def get_customer_query_repository(
+    db: Session = Depends(get_read_db),
+) -> CustomerQueryRepository:
+    """
+    顧客の参照系リポジトリ。
+
+    - シャーディングが有効なら ShardRouter 経由（店舗のシャードだけ、または全シャードに並列）で読む。
+    - 無効なら読み取り専用 Session の SQLAlchemyCustomerQueryRepository。
+    """
+    router = get_database().shard_router
+    if router is not None:
+        return ShardedCustomerQueryRepository(router)
+    return SqlAlchemyCustomerQueryRepository(session=db)
+
+
+def get_customer_command_repository(
     db: Session = Depends(get_db),
+    shard_sessions: Optional[ShardSessions] = Depends(get_shard_sessions),
+) -> CustomerRepository:
+    """顧客の書き込み系リポジトリ（シャーディング時は店舗のシャードのセッションで書く）。"""
+    if shard_sessions is not None:
+        return ShardedCustomerCommandRepository(shard_sessions)
+    return SqlAlchemyCustomerCommandRepository(db)
+
+
+def get_customer_list_query_service(
+    repo: CustomerQueryRepository = Depends(get_customer_query_repository),
 ) -> ListCustomersQueryService:
     """
     FastAPI から DI するための CustomerQueryService ファクトリ。
 
     - SQLAlchemyCustomerQueryRepository(infrastructure) を注入した CustomerQueryService(application) を返す。
     """
-    repo = SqlAlchemyCustomerQueryRepository(session=db)
     return ListCustomersQueryService(customer_query_repo=repo)
 
 
 def get_customer_detail_query_service(
-    db: Session = Depends(get_db),
+    repo: CustomerQueryRepository = Depends(get_customer_query_repository),
 ) -> GetCustomerDetailQueryService:
     """
     FastAPI から DI するための CustomerQueryService ファクトリ。
 
     - SQLAlchemyCustomerQueryRepository(infrastructure) を注入した CustomerQueryService(application) を返す。
     """
-    repo = SqlAlchemyCustomerQueryRepository(session=db)
     return GetCustomerDetailQueryService(customer_query_repo=repo)
 
 
+def get_customer_timeline_query_service(
+    db: Session = Depends(get_read_db),
+) -> GetCustomerTimelineQueryService:
+    """
+    顧客タイムライン用の Service を組み立てる。
+
+    - hot テーブルの Session と、プロセスで共有のコールドアーカイブ（Database.archive_store）を渡す。
+    - シャーディング有効時もアーカイブは全シャードで 1 か所（APP_ARCHIVE_DATABASE_URL）なので、同じストアから読む。
+    """
+    database = get_database()
+    repo: CustomerTimelineRepository
+    if database.shard_router is not None:
+        repo = ShardedCustomerTimelineRepository(database.shard_router, database.archive_store)
+    else:
+        repo = SqlAlchemyCustomerTimelineRepository(session=db, archive_store=database.archive_store)
+    return GetCustomerTimelineQueryService(customer_timeline_repo=repo)
+
+
 def get_customer_list_filter(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
@@ -87,10 +139,11 @@ def get_customer_list_filter(
 # 顧客作成用の Service を組み立てる Depends
 def get_create_customer_service(
     db: Session = Depends(get_db),
+    customer_repo: CustomerRepository = Depends(get_customer_command_repository),
 ) -> CreateCustomerCommandService:
     """顧客作成ユースケース用の CreateCustomerService を組み立てる."""
 
-    customer_repo = SqlAlchemyCustomerCommandRepository(db)
+    # shops は全シャードに複製しているので、存在確認はシャード 0（get_db）で足りる
     shop_repo = SqlAlchemyQueryShopRepository(db)
 
     return CreateCustomerCommandService(
@@ -101,12 +154,10 @@ def get_create_customer_service(
 
 # 顧客更新用の Service を組み立てる Depends
 def get_update_customer_service(
-    db: Session = Depends(get_db),
+    customer_repo: CustomerRepository = Depends(get_customer_command_repository),
 ) -> UpdateCustomerCommandService:
     """顧客更新ユースケース用の UpdateCustomerCommandService を組み立てる."""
 
-    customer_repo = SqlAlchemyCustomerCommandRepository(db)
-
     return UpdateCustomerCommandService(
         customer_repo=customer_repo,
     )
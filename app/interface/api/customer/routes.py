@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, Path, HTTPException, status
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Path, HTTPException, Query, status
 
 from app.application.customer.commands.create_customer_service import CreateCustomerCommandService
 from app.application.customer.command_inputs import CreateCustomerInput, UpdateCustomerInput
 from app.application.customer.query_filter import CustomerFilter
+from app.application.customer.read_models import TimelineCursor
 from app.application.customer.queries.get_customer_detail_service import GetCustomerDetailQueryService
+from app.application.customer.queries.get_customer_timeline_service import GetCustomerTimelineQueryService
 from app.application.customer.queries.list_customers_service import ListCustomersQueryService
 from app.application.customer.commands.update_customer_service import UpdateCustomerCommandService
 from app.application.customer.errors import DuplicateCustomerEmailError, InvalidCustomerInputError
@@ -14,6 +19,7 @@ from app.domain.user.models import User
 from app.interface.api.customer.deps import (
     get_customer_detail_query_service,
     get_customer_list_filter,
+    get_customer_timeline_query_service,
     get_customer_list_query_service,
     get_create_customer_service,
     get_update_customer_service,
@@ -23,6 +29,7 @@ from app.interface.api.customer.schemas import (
     CustomerListResponse,
     CustomerSummaryResponse,
     CustomerDetailResponse,
+    CustomerTimelineResponse,
     CreateCustomerRequest,
     CustomerBasicResponse,
     UpdateCustomerRequest,
@@ -88,6 +95,52 @@ def get_customer_detail(
     return CustomerDetailResponse.from_read_model(detail_rm)
 
 
+@router.get(
+    "/{customer_id}/timeline",
+    response_model=CustomerTimelineResponse,
+)
+def get_customer_timeline(
+    customer_id: int = Path(..., ge=1),
+    before: Optional[datetime] = Query(None, description="この位置より後ろ（古い）のエントリを返す（next_before を渡す）"),
+    before_kind: Optional[Literal["activity", "note"]] = Query(None, description="next_before_kind を渡す"),
+    before_id: Optional[int] = Query(None, ge=1, description="next_before_id を渡す"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    service: GetCustomerTimelineQueryService = Depends(get_customer_timeline_query_service),
+) -> CustomerTimelineResponse:
+    """顧客の活動履歴・メモを新しい順に返すエンドポイント。
+
+    - 顧客詳細の「最近 5 件」より前は、ここから next_before でさかのぼる
+    - 保持期間を過ぎてアーカイブされたエントリも返す（archived=true、詳細より遅い経路）
+    - before だけを渡した場合は、その日時より前のエントリすべてが対象
+    """
+
+    cursor: Optional[TimelineCursor] = None
+    if before is not None and before_kind is not None and before_id is not None:
+        cursor = TimelineCursor(created_at=before, kind=before_kind, id=before_id)
+    elif before is not None:
+        cursor = TimelineCursor(created_at=before)
+    try:
+        timeline_rm = service.get_customer_timeline(
+            current_user=current_user,
+            customer_id=customer_id,
+            before=cursor,
+            limit=limit,
+        )
+    except AuthorizationError as exc:
+        raise HTTPException(
+            status_code=401,
+            detail="You are not allowed to view this customer.",
+        ) from exc
+    except NotFoundError as exc:
+        raise HTTPException(
+            status_code=404,
+            detail="Customer not found.",
+        ) from exc
+
+    return CustomerTimelineResponse.from_read_model(timeline_rm)
+
+
 # --- 顧客作成 ---
 @router.post(
     "/",
@@ -8,12 +8,12 @@ from app.application.customer.read_models import CustomerDetailReadModel
 from app.domain.customer.enums import CustomerStatus
 from app.domain.activity.enums import ActivityType
 from app.domain.opportunity.enums import OpportunityStatus
-from app.application.customer.read_models import CustomerBasicReadModel
+from app.application.customer.read_models import CustomerBasicReadModel, CustomerTimelineReadModel
 
 
 class CustomerSummaryResponse(BaseModel):
     id: int
-    email: str
+    email: Optional[str]
     name: str
     status: CustomerStatus
     shop_id: int
@@ -23,6 +23,9 @@ class CustomerSummaryResponse(BaseModel):
     visit_count: int
     last_visit_at: Optional[datetime]
     created_at: datetime
+    lifetime_value: float
+    sales_last_365d: float
+    open_pipeline_amount: float
 
 
 class CustomerListResponse(BaseModel):
@@ -67,7 +70,7 @@ class OpportunitySummaryResponse(BaseModel):
 
 class CustomerDetailResponse(BaseModel):
     id: int
-    email: str
+    email: Optional[str]
     name: str
     status: str
     created_at: datetime
@@ -78,6 +81,10 @@ class CustomerDetailResponse(BaseModel):
     visit_count: int
     last_visit_at: Optional[datetime]
 
+    lifetime_value: float
+    sales_last_365d: float
+    open_pipeline_amount: float
+
     recent_activities: list[ActivitySummaryResponse]
     recent_notes: list[NoteSummaryResponse]
     opportunities: list[OpportunitySummaryResponse]
@@ -96,6 +103,9 @@ class CustomerDetailResponse(BaseModel):
             shop_name=s.shop_name,
             visit_count=s.visit_count,
             last_visit_at=s.last_visit_at,
+            lifetime_value=s.lifetime_value,
+            sales_last_365d=s.sales_last_365d,
+            open_pipeline_amount=s.open_pipeline_amount,
             recent_activities=[
                 ActivitySummaryResponse(
                     id=a.id,
@@ -227,3 +237,34 @@ class CustomerBasicResponse(BaseModel):
             created_at=rm.created_at,
             updated_at=rm.updated_at,
         )
+
+
+class TimelineEntryResponse(BaseModel):
+    kind: str
+    id: int
+    activity_type: Optional[ActivityType]
+    subject: Optional[str]
+    body: Optional[str]
+    created_by_user_id: int
+    created_at: datetime
+    archived: bool
+
+
+class CustomerTimelineResponse(BaseModel):
+    customer_id: int
+    entries: list[TimelineEntryResponse]
+    # 次のページの位置（before / before_kind / before_id にそのまま渡す。これ以上なければ None）
+    next_before: Optional[datetime]
+    next_before_kind: Optional[str]
+    next_before_id: Optional[int]
+
+    @classmethod
+    def from_read_model(cls, rm: CustomerTimelineReadModel) -> "CustomerTimelineResponse":
+        cursor = rm.next_before
+        return cls(
+            customer_id=rm.customer_id,
+            entries=[TimelineEntryResponse(**entry.__dict__) for entry in rm.entries],
+            next_before=cursor.created_at if cursor is not None else None,
+            next_before_kind=cursor.kind if cursor is not None else None,
+            next_before_id=cursor.id if cursor is not None else None,
+        )
@@ -0,0 +1,172 @@
+"""
+Title: 「/metrics（Prometheus テキスト形式）とリクエスト計測ミドルウェア」
+
+Description:
+    - ルートごとのレイテンシヒストグラム（HDR 風バケット、秒）
+    - 処理中リクエスト数（in-flight）
+    - ルート / メソッド / ステータスごとのレスポンス数
+    - DB コネクションプール、認証キャッシュのヒット率、パスワードハッシュ用プロセスプールの状態
+    を GET /metrics で返す。
+
+Point:
+    - ルートのラベルは実際のパスではなくテンプレート（/api/customers/{customer_id}）にして、
+      ラベルの種類が増えすぎないようにする。どのルートにもマッチしなければ "<unmatched>"。
+    - プールやキャッシュの値は記録せず、/metrics の読み出し時に ProviderRegistry から集める。
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Annotated, Iterable, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import CallbackCounter, CallbackGauge, Counter, Gauge, Histogram, Labels, MetricsRegistry
+from app.interface.api.registry import ProviderRegistry, get_registry
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class HttpMetrics:
+    """HTTP リクエストのメトリクス一式。"""
+
+    def __init__(self) -> None:
+        self.registry = MetricsRegistry()
+        self.latency = self.registry.register(
+            Histogram("http_request_duration_seconds", "HTTP request latency by route template.")
+        )
+        self.in_flight = self.registry.register(Gauge("http_requests_in_flight", "HTTP requests being processed."))
+        self.responses = self.registry.register(
+            Counter("http_responses_total", "HTTP responses by route template, method and status code.")
+        )
+
+
+http_metrics = HttpMetrics()
+
+
+class MetricsMiddleware:
+    """リクエストごとにレイテンシ・ステータス・in-flight を記録する ASGI ミドルウェア。"""
+
+    def __init__(self, app: ASGIApp, metrics: HttpMetrics = http_metrics, enabled: Optional[bool] = None) -> None:
+        self.app = app
+        self.metrics = metrics
+        # None なら最初のリクエストで Settings を見て決める（import 時に Settings を作らない）
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.enabled is None:
+            self.enabled = get_settings().metrics_enabled
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status_code = 500
+        started_at = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight.dec()
+            # ルーティング後は scope["route"] にマッチしたルートが入っている
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            method = scope.get("method", "")
+            metrics.latency.observe(time.perf_counter() - started_at, (("method", method), ("route", route)))
+            metrics.responses.inc((("method", method), ("route", route), ("status", str(status_code))))
+
+
+def _provider_gauges(registry: ProviderRegistry) -> list[CallbackGauge]:
+    """ProviderRegistry が持つプール・キャッシュの状態を読み出し時に集めるゲージ（累計値はカウンタ）。"""
+
+    def pool() -> Iterable[tuple[Labels, float]]:
+        if registry.pool_metrics is None:
+            return []
+        stats = registry.pool_metrics.stats()
+        return [
+            ((("state", "checked_out"),), stats.checked_out),
+            ((("state", "checked_in"),), stats.checked_in),
+            ((("state", "overflow"),), stats.overflow),
+            ((("state", "size"),), stats.pool_size),
+        ]
+
+    def pool_wait() -> Iterable[tuple[Labels, float]]:
+        if registry.pool_metrics is None:
+            return []
+        stats = registry.pool_metrics.stats()
+        return [
+            ((("stat", "avg"),), stats.wait_seconds_avg),
+            ((("stat", "max"),), stats.wait_seconds_max),
+        ]
+
+    def cache_hit_ratio() -> Iterable[tuple[Labels, float]]:
+        samples = []
+        for name, cache in (("user", registry.user_cache), ("token", registry.token_cache)):
+            if cache is None:
+                continue
+            total = cache.hits + cache.misses
+            samples.append(((("cache", name),), cache.hits / total if total else 0.0))
+        return samples
+
+    def cache_entries() -> Iterable[tuple[Labels, float]]:
+        return [
+            ((("cache", name),), len(cache))
+            for name, cache in (("user", registry.user_cache), ("token", registry.token_cache))
+            if cache is not None
+        ]
+
+    def hashing_pool() -> Iterable[tuple[Labels, float]]:
+        if registry.password_hashing_pool is None:
+            return []
+        stats = registry.password_hashing_pool.stats()
+        return [
+            ((("state", "in_flight"),), stats.in_flight),
+            ((("state", "queued"),), stats.queue_length),
+        ]
+
+    def hashing_pool_rejected() -> Iterable[tuple[Labels, float]]:
+        if registry.password_hashing_pool is None:
+            return []
+        return [((), registry.password_hashing_pool.stats().rejected_total)]
+
+    return [
+        CallbackGauge("db_pool_connections", "DB connection pool connections by state.", pool),
+        CallbackGauge("db_pool_checkout_wait_seconds", "DB connection pool checkout wait.", pool_wait),
+        CallbackGauge("auth_cache_hit_ratio", "Hit ratio of the authentication caches.", cache_hit_ratio),
+        CallbackGauge("auth_cache_entries", "Entries held by the authentication caches.", cache_entries),
+        CallbackGauge("password_hashing_pool", "Password hashing process pool state.", hashing_pool),
+        CallbackCounter(
+            "password_hashing_pool_rejected_total",
+            "Password hashing requests rejected because the pool queue was full.",
+            hashing_pool_rejected,
+        ),
+    ]
+
+
+def render_metrics(registry: ProviderRegistry, metrics: HttpMetrics = http_metrics) -> str:
+    lines = [metrics.registry.render().rstrip("\n")]
+    for gauge in _provider_gauges(registry):
+        lines.extend(gauge.render())
+    return "\n".join(lines) + "\n"
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics(
+    registry: Annotated[ProviderRegistry, Depends(get_registry)],
+) -> PlainTextResponse:
+    """Prometheus のスクレイプ用エンドポイント。"""
+    if not registry.settings.metrics_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return PlainTextResponse(render_metrics(registry), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,224 @@
+"""
+Title: 「アプリ起動時に 1 回だけ組み立てる、ステートレスな部品の置き場（ProviderRegistry）」
+
+Description:
+    PasswordHasher / TokenProvider / AuthSettings / 各種キャッシュ / sessionmaker などは
+    リクエストごとに作り直す必要がない（状態を持たない、または全リクエストで共有したい）。
+    これらを起動時に組み立てて app.state.registry に載せ、Depends からは参照するだけにする。
+
+Point:
+    - リクエストごとに作るのは Session と、それに紐づくリポジトリだけ。
+    - lifespan を通らない起動（TestClient を with なしで使う場合など）でも動くように、
+      get_registry は未構築なら初回アクセス時に組み立てて start() する（失効リストの読み込みなど）。
+      start() は 2 回目以降は何もしない。
+    - Settings の読み込み・engine の作成・pwdlib / PyJWT の import は build 時まで遅らせる
+      （import app.main だけなら何も起きないので、起動や CLI ジョブが速い）。
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import FastAPI, Request
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.application.auth.ports import PasswordHasher, TokenProvider
+from app.application.auth.services import AuthSettings
+from app.core.config import Settings, get_settings
+from app.infrastructure.db.session import get_database
+from app.infrastructure.db.pool_metrics import PoolMetrics
+from app.infrastructure.db.slow_query_log import SlowQueryLog
+from app.infrastructure.db.sqlite_profile import SqliteOptimizer
+from app.infrastructure.repositories.reservation.reservation_calendar_repository import ReservationCalendarDayCache
+from app.infrastructure.repositories.reservation.reservation_cohort_repository import ReservationCohortCountCache
+from app.infrastructure.repositories.reservation.reservation_schedule import ReservationIndexCache
+from app.infrastructure.repositories.user.cached_user_repository import UserCache
+from app.infrastructure.security.token_cache import CachingTokenProvider, VerifiedTokenCache
+
+if TYPE_CHECKING:
+    # pwdlib / argon2 / PyJWT は重いので、build() の中で初めて import する
+    from app.infrastructure.security.hashing_pool import PooledPasswordHasher
+    from app.infrastructure.security.revocation import InMemoryRevocationList
+
+
+@dataclass
+class ProviderRegistry:
+    """アプリケーション単位で共有する部品の集まり。"""
+
+    settings: Settings
+    session_factory: sessionmaker[Session]
+    auth_settings: AuthSettings
+    password_hasher: PasswordHasher
+    token_provider: TokenProvider
+    user_cache: Optional[UserCache]
+    token_cache: Optional[VerifiedTokenCache]
+    revocation_list: Optional[InMemoryRevocationList]
+    password_hashing_pool: Optional[PooledPasswordHasher]
+    pool_metrics: Optional[PoolMetrics] = None
+    sqlite_optimizer: Optional[SqliteOptimizer] = None
+    slow_query_log: Optional[SlowQueryLog] = None
+    reservation_index: Optional[ReservationIndexCache] = None
+    reservation_calendar_cache: Optional[ReservationCalendarDayCache] = None
+    reservation_cohort_cache: Optional[ReservationCohortCountCache] = None
+    _started: bool = field(default=False, init=False, repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        settings: Settings,
+        session_factory: sessionmaker[Session],
+        pool_metrics: Optional[PoolMetrics] = None,
+        sqlite_optimizer: Optional[SqliteOptimizer] = None,
+        slow_query_log: Optional[SlowQueryLog] = None,
+    ) -> "ProviderRegistry":
+        from app.infrastructure.security.hashing_pool import PooledPasswordHasher
+        from app.infrastructure.security.jwt_token_provider import JwtTokenProvider
+        from app.infrastructure.security.password_hasher import Argon2Params, Argon2PasswordHasher
+        from app.infrastructure.security.revocation import InMemoryRevocationList
+
+        # Settings に計測済みのコストがあればそれを使い、なければ pwdlib の推奨値
+        argon2_params = (
+            Argon2Params(
+                time_cost=settings.argon2_time_cost,
+                memory_cost=settings.argon2_memory_cost,
+                parallelism=settings.argon2_parallelism or 4,  # argon2-cffi のデフォルト
+            )
+            if settings.argon2_time_cost and settings.argon2_memory_cost
+            else None
+        )
+
+        # Argon2 の計算はスレッドプールではなく専用プロセスプールで行う（プロセスは初回利用時に起動）
+        password_hashing_pool: Optional[PooledPasswordHasher] = None
+        password_hasher: PasswordHasher
+        if settings.password_hash_pool_enabled:
+            password_hasher = password_hashing_pool = PooledPasswordHasher(
+                max_workers=settings.password_hash_workers,
+                max_queue=settings.password_hash_max_queue,
+                retry_after_seconds=settings.password_hash_retry_after_seconds,
+                params=argon2_params,
+            )
+        else:
+            password_hasher = Argon2PasswordHasher(params=argon2_params)
+
+        token_cache: Optional[VerifiedTokenCache] = None
+        token_provider: TokenProvider = JwtTokenProvider(
+            secret_key=settings.secret_key,
+            # algorithm を変えたい場合は Settings にフィールドを足してここで渡す
+            # algorithm=settings.jwt_algorithm,
+        )
+        if settings.token_cache_enabled:
+            token_cache = VerifiedTokenCache(max_size=settings.token_cache_max_size)
+            token_provider = CachingTokenProvider(token_provider, cache=token_cache)
+
+        user_cache = (
+            UserCache(
+                ttl_seconds=settings.user_cache_ttl_seconds,
+                active_staleness_seconds=settings.user_cache_active_staleness_seconds,
+                max_size=settings.user_cache_max_size,
+            )
+            if settings.user_cache_enabled
+            else None
+        )
+
+        # 予約の重なり判定・空き枠検索用のインデックス（店舗ごとに最初の問い合わせで読み込む）
+        reservation_index = (
+            ReservationIndexCache(
+                ttl_seconds=settings.reservation_index_ttl_seconds,
+                max_shops=settings.reservation_index_max_shops,
+            )
+            if settings.reservation_index_enabled
+            else None
+        )
+
+        return cls(
+            settings=settings,
+            session_factory=session_factory,
+            auth_settings=AuthSettings(
+                access_token_expires_minutes=settings.access_token_expire_minutes,
+                stateless_tokens=settings.stateless_tokens_enabled,
+                refresh_token_expires_days=settings.refresh_token_expire_days,
+            ),
+            password_hasher=password_hasher,
+            token_provider=token_provider,
+            user_cache=user_cache,
+            token_cache=token_cache,
+            # ステートレストークン用の失効リスト（DB からのリフレッシュは start() で開始する）
+            revocation_list=InMemoryRevocationList() if settings.stateless_tokens_enabled else None,
+            password_hashing_pool=password_hashing_pool,
+            pool_metrics=pool_metrics,
+            sqlite_optimizer=sqlite_optimizer,
+            slow_query_log=slow_query_log,
+            reservation_index=reservation_index,
+            reservation_calendar_cache=ReservationCalendarDayCache(
+                max_days=settings.reservation_calendar_cache_max_days
+            ),
+            reservation_cohort_cache=ReservationCohortCountCache(
+                ttl_seconds=settings.reservation_cohort_cache_ttl_seconds,
+                max_entries=settings.reservation_cohort_cache_max_entries,
+            ),
+        )
+
+    def start(self) -> None:
+        """起動時の処理（lifespan、または lifespan を通らなかったときは get_registry から呼ぶ）。"""
+        with _start_lock:
+            if self._started:
+                return
+            self._started = True
+        if self.revocation_list is not None:
+            self.revocation_list.start_background_refresh(
+                self.session_factory,
+                interval_seconds=self.settings.token_revocation_refresh_seconds,
+            )
+        if self.sqlite_optimizer is not None:
+            self.sqlite_optimizer.start()
+
+    def shutdown(self) -> None:
+        """終了時: パスワードハッシュ用のワーカープロセスやバックグラウンドスレッドを止める。"""
+        if self.password_hashing_pool is not None:
+            self.password_hashing_pool.shutdown()
+        if self.revocation_list is not None:
+            self.revocation_list.stop()
+        if self.sqlite_optimizer is not None:
+            self.sqlite_optimizer.stop()
+        if self.slow_query_log is not None:
+            self.slow_query_log.shutdown()
+        self._started = False
+
+
+_build_lock = threading.Lock()
+_start_lock = threading.Lock()
+
+
+def init_registry(app: FastAPI) -> ProviderRegistry:
+    """app.state.registry を組み立てる（既にあればそれを返す）。"""
+    with _build_lock:
+        registry = getattr(app.state, "registry", None)
+        if registry is None:
+            # Settings と engine はここで初めて作られる（import 時には作らない）
+            database = get_database()
+            registry = ProviderRegistry.build(
+                get_settings(),
+                database.session_factory,
+                pool_metrics=database.pool_metrics,
+                sqlite_optimizer=database.sqlite_optimizer,
+                slow_query_log=database.slow_query_log,
+            )
+            # 来店の記録・顧客の追加で、そのコホートのキャッシュを commit 後に捨てる（シャードごとの書き込み用 Session も）
+            if registry.reservation_cohort_cache is not None:
+                registry.reservation_cohort_cache.track(database.session_factory)
+                if database.shard_router is not None:
+                    for shard in database.shard_router.shards[1:]:
+                        registry.reservation_cohort_cache.track(shard.session_factory)
+            app.state.registry = registry
+        return registry
+
+
+def get_registry(request: Request) -> ProviderRegistry:
+    """FastAPI Depends 用: app.state に載っている ProviderRegistry を返す。"""
+    registry = getattr(request.app.state, "registry", None)
+    if registry is None:
+        registry = init_registry(request.app)
+        registry.start()
+    return registry
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Callable, Optional
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app.application.reservation.commands.create_reservation_service import CreateReservationCommandService
+from app.application.reservation.ports import (
+    ReservationCalendarRepository,
+    ReservationCohortRepository,
+    ReservationQueryRepository,
+    ReservationRepository,
+    ReservationSchedule,
+)
+from app.application.reservation.queries.get_availability_service import GetAvailabilityQueryService
+from app.application.reservation.queries.get_cohort_retention_service import GetCohortRetentionQueryService
+from app.application.reservation.queries.get_reservation_calendar_service import GetReservationCalendarQueryService
+from app.application.reservation.queries.list_reservations_service import ListReservationsQueryService
+from app.infrastructure.db.session import get_database, get_db, get_read_db, get_shard_sessions
+from app.infrastructure.db.sharding import ShardSessions
+from app.infrastructure.repositories.reservation.reservation_calendar_repository import (
+    SqlAlchemyReservationCalendarRepository,
+)
+from app.infrastructure.repositories.reservation.reservation_cohort_repository import (
+    SqlAlchemyReservationCohortRepository,
+)
+from app.infrastructure.repositories.reservation.reservation_command_repository import (
+    SqlAlchemyReservationCommandRepository,
+)
+from app.infrastructure.repositories.reservation.reservation_query_repository import (
+    SqlAlchemyReservationQueryRepository,
+)
+from app.infrastructure.repositories.reservation.reservation_schedule import ReservationScheduleView
+from app.infrastructure.repositories.reservation.sharded_reservation_repository import (
+    ShardedReservationCalendarRepository,
+    ShardedReservationCohortRepository,
+    ShardedReservationCommandRepository,
+    ShardedReservationQueryRepository,
+)
+from app.interface.api.registry import ProviderRegistry, get_registry
+
+
+def _durations(registry: ProviderRegistry) -> tuple[timedelta, timedelta]:
+    settings = registry.settings
+    return (
+        timedelta(minutes=settings.reservation_default_duration_minutes),
+        timedelta(minutes=settings.reservation_max_duration_minutes),
+    )
+
+
+def _max_window(registry: ProviderRegistry) -> timedelta:
+    return timedelta(days=registry.settings.reservation_max_window_days)
+
+
+def _schedule(registry: ProviderRegistry, session_for_shop: Callable[[int], Session]) -> ReservationSchedule:
+    default_duration, max_duration = _durations(registry)
+    return ReservationScheduleView(
+        registry.reservation_index,
+        session_for_shop,
+        default_duration=default_duration,
+        max_duration=max_duration,
+    )
+
+
+def get_create_reservation_service(
+    db: Session = Depends(get_db),
+    shard_sessions: Optional[ShardSessions] = Depends(get_shard_sessions),
+    registry: ProviderRegistry = Depends(get_registry),
+) -> CreateReservationCommandService:
+    """
+    予約作成ユースケース用の Service を組み立てる。
+
+    - インデックスの読み込み・作成後の反映は、予約を書き込むのと同じ Session（店舗のシャード）で行う。
+      反映はその Session の commit 後なので、ロールバックされた予約はインデックスに入らない。
+    """
+    default_duration, max_duration = _durations(registry)
+    repo: ReservationRepository
+    session_for_shop: Callable[[int], Session]
+    if shard_sessions is not None:
+        repo = ShardedReservationCommandRepository(shard_sessions, default_duration, max_duration)
+        session_for_shop = shard_sessions.for_shop
+    else:
+        repo = SqlAlchemyReservationCommandRepository(db, default_duration, max_duration)
+        session_for_shop = lambda shop_id: db  # noqa: E731
+    return CreateReservationCommandService(
+        reservation_repo=repo,
+        schedule=_schedule(registry, session_for_shop),
+        max_duration=max_duration,
+    )
+
+
+def get_reservation_query_repository(
+    db: Session = Depends(get_read_db),
+) -> ReservationQueryRepository:
+    """予約の参照系リポジトリ（シャーディング時は店舗のシャードの読み取り専用 Session で読む）。"""
+    router = get_database().shard_router
+    if router is not None:
+        return ShardedReservationQueryRepository(router)
+    return SqlAlchemyReservationQueryRepository(db)
+
+
+def get_list_reservations_service(
+    repo: ReservationQueryRepository = Depends(get_reservation_query_repository),
+    registry: ProviderRegistry = Depends(get_registry),
+) -> ListReservationsQueryService:
+    return ListReservationsQueryService(reservation_query_repo=repo, max_window=_max_window(registry))
+
+
+def get_availability_service(
+    db: Session = Depends(get_read_db),
+    shard_sessions: Optional[ShardSessions] = Depends(get_shard_sessions),
+    registry: ProviderRegistry = Depends(get_registry),
+) -> GetAvailabilityQueryService:
+    """
+    空き枠検索用の Service を組み立てる。
+
+    - インデックスが読み込み済みなら DB には行かない。未読み込みの店舗だけ、読み取り専用 Session から読み込む。
+    """
+    session_for_shop: Callable[[int], Session]
+    if shard_sessions is not None:
+        session_for_shop = shard_sessions.for_shop
+    else:
+        session_for_shop = lambda shop_id: db  # noqa: E731
+    return GetAvailabilityQueryService(
+        schedule=_schedule(registry, session_for_shop),
+        max_window=_max_window(registry),
+    )
+
+
+def get_reservation_calendar_service(
+    db: Session = Depends(get_read_db),
+    registry: ProviderRegistry = Depends(get_registry),
+) -> GetReservationCalendarQueryService:
+    """
+    カレンダー用の Service を組み立てる。
+
+    - 終わった日の件数はプロセスで共有のキャッシュ（registry.reservation_calendar_cache）から返す。
+    """
+    router = get_database().shard_router
+    repo: ReservationCalendarRepository
+    if router is not None:
+        repo = ShardedReservationCalendarRepository(router)
+    else:
+        repo = SqlAlchemyReservationCalendarRepository(db)
+    return GetReservationCalendarQueryService(calendar_repo=repo, cache=registry.reservation_calendar_cache)
+
+
+def get_cohort_retention_service(
+    db: Session = Depends(get_read_db),
+    registry: ProviderRegistry = Depends(get_registry),
+) -> GetCohortRetentionQueryService:
+    """
+    コホートリテンション用の Service を組み立てる。
+
+    - コホートごとの件数はプロセスで共有のキャッシュ（registry.reservation_cohort_cache）から返す。
+    """
+    settings = registry.settings
+    router = get_database().shard_router
+    repo: ReservationCohortRepository
+    if router is not None:
+        repo = ShardedReservationCohortRepository(router, chunk_size=settings.reservation_cohort_chunk_size)
+    else:
+        repo = SqlAlchemyReservationCohortRepository(db, chunk_size=settings.reservation_cohort_chunk_size)
+    return GetCohortRetentionQueryService(
+        cohort_repo=repo,
+        cache=registry.reservation_cohort_cache,
+        max_months=settings.reservation_cohort_max_months,
+    )
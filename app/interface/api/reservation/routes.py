@@ -0,0 +1,184 @@
+from datetime import date, datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.application.common.errors import AuthorizationError, NotFoundError
+from app.application.reservation.command_inputs import CreateReservationInput
+from app.application.reservation.commands.create_reservation_service import CreateReservationCommandService
+from app.application.reservation.errors import InvalidReservationInputError, ReservationConflictError
+from app.application.reservation.queries.get_availability_service import GetAvailabilityQueryService
+from app.application.reservation.queries.get_cohort_retention_service import GetCohortRetentionQueryService
+from app.application.reservation.queries.get_reservation_calendar_service import GetReservationCalendarQueryService
+from app.application.reservation.queries.list_reservations_service import ListReservationsQueryService
+from app.domain.user.models import User
+from app.interface.api.auth.deps import get_current_user
+from app.interface.api.reservation.deps import (
+    get_availability_service,
+    get_cohort_retention_service,
+    get_create_reservation_service,
+    get_list_reservations_service,
+    get_reservation_calendar_service,
+)
+from app.interface.api.reservation.schemas import (
+    AvailabilityResponse,
+    CohortRetentionResponse,
+    CreateReservationRequest,
+    ReservationCalendarResponse,
+    ReservationListResponse,
+    ReservationResponse,
+)
+
+router = APIRouter(prefix="/api/reservations", tags=["reservations"])
+
+
+@router.post(
+    "/",
+    summary="予約の新規作成",
+    description="指定した店舗・時間帯に予約を作成します。同じ店舗の既存の予約と重なる場合は 409 を返します。",
+    response_model=ReservationResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_reservation(
+    body: CreateReservationRequest,
+    current_user: User = Depends(get_current_user),
+    service: CreateReservationCommandService = Depends(get_create_reservation_service),
+) -> ReservationResponse:
+    """予約を新規作成するエンドポイント."""
+
+    create_input = CreateReservationInput(
+        shop_id=body.shop_id,
+        customer_id=body.customer_id,
+        start_datetime=body.start_datetime,
+        end_datetime=body.end_datetime,
+        memo=body.memo,
+    )
+
+    try:
+        result = service.create_reservation(current_user=current_user, data=create_input)
+    except AuthorizationError as exc:
+        raise HTTPException(status_code=401, detail="You are not allowed to create reservations.") from exc
+    except NotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="指定された顧客が見つかりません。") from exc
+    except InvalidReservationInputError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except ReservationConflictError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+    return ReservationResponse.from_read_model(result)
+
+
+@router.get("/", response_model=ReservationListResponse)
+def list_reservations(
+    shop_id: int = Query(..., ge=1),
+    start: datetime = Query(..., description="この日時以降に始まる予約を返す"),
+    end: datetime = Query(..., description="この日時より前に始まる予約を返す"),
+    include_canceled: bool = Query(False),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    service: ListReservationsQueryService = Depends(get_list_reservations_service),
+) -> ReservationListResponse:
+    """店舗の予約を開始日時の昇順に返すエンドポイント。"""
+
+    try:
+        result = service.list_reservations(
+            current_user=current_user,
+            shop_id=shop_id,
+            start=start,
+            end=end,
+            include_canceled=include_canceled,
+            limit=limit,
+        )
+    except AuthorizationError as exc:
+        raise HTTPException(status_code=401, detail="You are not allowed to view reservations.") from exc
+    except InvalidReservationInputError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return ReservationListResponse.from_result(result)
+
+
+@router.get("/availability", response_model=AvailabilityResponse)
+def get_availability(
+    shop_id: int = Query(..., ge=1),
+    start: datetime = Query(..., description="空き枠を探す期間の開始（タイムゾーン付き）"),
+    end: datetime = Query(..., description="空き枠を探す期間の終了（タイムゾーン付き）"),
+    duration_minutes: int = Query(60, ge=5, le=24 * 60, description="取りたい予約の長さ（分）"),
+    current_user: User = Depends(get_current_user),
+    service: GetAvailabilityQueryService = Depends(get_availability_service),
+) -> AvailabilityResponse:
+    """店舗の空き枠と、期間の先頭以降で最初に取れる開始日時を返すエンドポイント。"""
+
+    try:
+        result = service.get_availability(
+            current_user=current_user,
+            shop_id=shop_id,
+            start=start,
+            end=end,
+            duration_minutes=duration_minutes,
+        )
+    except AuthorizationError as exc:
+        raise HTTPException(status_code=401, detail="You are not allowed to view reservations.") from exc
+    except InvalidReservationInputError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return AvailabilityResponse.from_read_model(result)
+
+
+@router.get("/calendar", response_model=ReservationCalendarResponse)
+def get_reservation_calendar(
+    shop_id: int = Query(..., ge=1),
+    day: date = Query(..., alias="date", description="表示する日（week の場合はその日から 7 日間）"),
+    view: Literal["day", "week"] = Query("day"),
+    slot_minutes: int = Query(30, ge=5, le=24 * 60, description="枠の長さ（分）。1440 を割り切れる値"),
+    current_user: User = Depends(get_current_user),
+    service: GetReservationCalendarQueryService = Depends(get_reservation_calendar_service),
+) -> ReservationCalendarResponse:
+    """店舗の日・週カレンダー（枠ごと・ステータス別の予約件数）を返すエンドポイント。
+
+    - 枠はログインユーザーのタイムゾーン（User.timezone）で区切る
+    - 予約は開始日時の入っている枠に数える（キャンセル済みも CANCELED として数える）
+    """
+
+    try:
+        result = service.get_calendar(
+            current_user=current_user,
+            shop_id=shop_id,
+            start_date=day,
+            days=7 if view == "week" else 1,
+            slot_minutes=slot_minutes,
+        )
+    except AuthorizationError as exc:
+        raise HTTPException(status_code=401, detail="You are not allowed to view reservations.") from exc
+    except InvalidReservationInputError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return ReservationCalendarResponse.from_read_model(result, view)
+
+
+@router.get("/cohorts", response_model=CohortRetentionResponse)
+def get_cohort_retention(
+    shop_id: int = Query(..., ge=1),
+    start_month: date = Query(..., description="最初のコホートの月（日付は無視して月初にそろえる）"),
+    months: int = Query(12, ge=1, description="コホート・集計の月数"),
+    current_user: User = Depends(get_current_user),
+    service: GetCohortRetentionQueryService = Depends(get_cohort_retention_service),
+) -> CohortRetentionResponse:
+    """店舗の月次コホートリテンション（登録月ごとの顧客が、その後の各月に来店した割合）を返すエンドポイント。
+
+    - 月はログインユーザーのタイムゾーン（User.timezone）で区切る
+    - 来店済み・会計済みの予約を、その開始日時の月の来店として数える（同じ月の複数回の来店は 1 人）
+    """
+
+    try:
+        result = service.get_cohort_retention(
+            current_user=current_user,
+            shop_id=shop_id,
+            start_month=start_month,
+            months=months,
+        )
+    except AuthorizationError as exc:
+        raise HTTPException(status_code=401, detail="You are not allowed to view reservations.") from exc
+    except InvalidReservationInputError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return CohortRetentionResponse.from_read_model(result)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.application.reservation.read_models import (
+    AvailabilityReadModel,
+    CohortRetentionReadModel,
+    ReservationCalendarReadModel,
+    ReservationListResult,
+    ReservationReadModel,
+)
+
+
+class CreateReservationRequest(BaseModel):
+    """予約作成用のリクエストボディ."""
+
+    shop_id: int = Field(..., ge=1, description="予約先の店舗ID")
+    customer_id: int = Field(..., ge=1, description="予約する顧客ID（予約先の店舗の顧客）")
+    start_datetime: datetime = Field(..., description="開始日時（タイムゾーン付き）")
+    end_datetime: datetime = Field(..., description="終了日時（タイムゾーン付き。開始日時より後）")
+    memo: Optional[str] = Field(default=None, max_length=2000, description="メモ（任意）")
+
+
+class ReservationResponse(BaseModel):
+    id: int
+    shop_id: int
+    customer_id: int
+    status: str
+    start_datetime: datetime
+    end_datetime: Optional[datetime]
+    memo: Optional[str]
+    created_at: datetime
+
+    @classmethod
+    def from_read_model(cls, rm: ReservationReadModel) -> "ReservationResponse":
+        return cls(
+            id=rm.id,
+            shop_id=rm.shop_id,
+            customer_id=rm.customer_id,
+            status=rm.status.name,
+            start_datetime=rm.start_datetime,
+            end_datetime=rm.end_datetime,
+            memo=rm.memo,
+            created_at=rm.created_at,
+        )
+
+
+class ReservationListResponse(BaseModel):
+    shop_id: int
+    start: datetime
+    end: datetime
+    reservations: list[ReservationResponse]
+
+    @classmethod
+    def from_result(cls, result: ReservationListResult) -> "ReservationListResponse":
+        return cls(
+            shop_id=result.shop_id,
+            start=result.start,
+            end=result.end,
+            reservations=[ReservationResponse.from_read_model(r) for r in result.reservations],
+        )
+
+
+class FreeSlotResponse(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class AvailabilityResponse(BaseModel):
+    shop_id: int
+    start: datetime
+    end: datetime
+    duration_minutes: int
+    free_slots: list[FreeSlotResponse]
+    next_free_start: Optional[datetime]
+
+    @classmethod
+    def from_read_model(cls, rm: AvailabilityReadModel) -> "AvailabilityResponse":
+        return cls(
+            shop_id=rm.shop_id,
+            start=rm.start,
+            end=rm.end,
+            duration_minutes=rm.duration_minutes,
+            free_slots=[FreeSlotResponse(start=s.start, end=s.end) for s in rm.free_slots],
+            next_free_start=rm.next_free_start,
+        )
+
+
+class CalendarSlotResponse(BaseModel):
+    start: datetime
+    end: datetime
+    # ステータス名（BEFORE_VISIT / VISITED / PAID / CANCELED）→ 件数
+    counts: dict[str, int]
+    total: int
+
+
+class CalendarDayResponse(BaseModel):
+    date: date
+    slots: list[CalendarSlotResponse]
+    totals: dict[str, int]
+
+
+class ReservationCalendarResponse(BaseModel):
+    shop_id: int
+    view: Literal["day", "week"]
+    timezone: str
+    slot_minutes: int
+    days: list[CalendarDayResponse]
+
+    @classmethod
+    def from_read_model(cls, rm: ReservationCalendarReadModel, view: Literal["day", "week"]) -> "ReservationCalendarResponse":
+        return cls(
+            shop_id=rm.shop_id,
+            view=view,
+            timezone=rm.timezone,
+            slot_minutes=rm.slot_minutes,
+            days=[
+                CalendarDayResponse(
+                    date=d.date,
+                    slots=[
+                        CalendarSlotResponse(
+                            start=s.start,
+                            end=s.end,
+                            counts={status.name: count for status, count in s.counts.items()},
+                            total=sum(s.counts.values()),
+                        )
+                        for s in d.slots
+                    ],
+                    totals={status.name: count for status, count in d.totals.items()},
+                )
+                for d in rm.days
+            ],
+        )
+
+
+class CohortRowResponse(BaseModel):
+    cohort_month: date
+    customers: int
+    # 登録月から k か月後（k = 0, 1, ...）に来店した顧客数 / その割合
+    retained: list[int]
+    retention_rates: list[float]
+
+
+class CohortRetentionResponse(BaseModel):
+    shop_id: int
+    timezone: str
+    start_month: date
+    months: int
+    cohorts: list[CohortRowResponse]
+
+    @classmethod
+    def from_read_model(cls, rm: CohortRetentionReadModel) -> "CohortRetentionResponse":
+        return cls(
+            shop_id=rm.shop_id,
+            timezone=rm.timezone,
+            start_month=rm.start_month,
+            months=rm.months,
+            cohorts=[
+                CohortRowResponse(
+                    cohort_month=c.cohort_month,
+                    customers=c.customers,
+                    retained=c.retained,
+                    retention_rates=c.retention_rates,
+                )
+                for c in rm.cohorts
+            ],
+        )
@@ -0,0 +1,81 @@
+"""
+Title: 「リクエストごとの SQL 件数・DB 時間を Server-Timing ヘッダーと構造化ログに出すミドルウェア」
+
+Description:
+    infrastructure 側（QueryInstrumentation）が積み上げた RequestQueryStats を、
+    レスポンスヘッダー開始のタイミングで読み出して
+
+        Server-Timing: db;dur=12.34;desc="5 queries"
+
+    を付け、レスポンス送信後に 1 行の JSON ログを出す。
+
+Point:
+    - BaseHTTPMiddleware ではなく素の ASGI ミドルウェアにして、ボディのバッファリングやタスク生成を避ける。
+    - get_db の commit は依存関数の後処理としてレスポンス開始前に走るので、ヘッダーの値に含まれる。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.infrastructure.db.query_stats import begin_request_stats, end_request_stats
+
+logger = logging.getLogger("app.request.sql")
+
+
+class SqlTimingMiddleware:
+    def __init__(self, app: ASGIApp, enabled: Optional[bool] = None) -> None:
+        self.app = app
+        # None なら最初のリクエストで Settings を見て決める（import 時に Settings を作らない）
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.enabled is None:
+            self.enabled = get_settings().sql_instrumentation_enabled
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = begin_request_stats()
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_server_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (
+                        b"server-timing",
+                        f'db;dur={stats.total_ms:.2f};desc="{stats.query_count} queries"'.encode("latin-1"),
+                    )
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            end_request_stats(token)
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "request_sql",
+                        "method": scope.get("method"),
+                        "path": scope.get("path"),
+                        "status": status_code,
+                        "query_count": stats.query_count,
+                        "db_ms": round(stats.total_ms, 2),
+                        "request_ms": round((time.perf_counter() - started_at) * 1000, 2),
+                        "n_plus_one": len(stats.n_plus_one_statements),
+                    },
+                    ensure_ascii=False,
+                )
+            )
@@ -1,13 +1,42 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.interface.api.customer.routes import router as customers_router
 from app.interface.api.auth.routes import router as auth_router
+from app.interface.api.admin.routes import router as admin_router
+from app.interface.api.reservation.routes import router as reservations_router
+from app.interface.api.registry import init_registry
+from app.infrastructure.db.session import dispose_database
+from app.interface.api.sql_timing import SqlTimingMiddleware
+from app.interface.api.metrics import MetricsMiddleware, router as metrics_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 起動時: Settings / engine / ハッシャー / トークンプロバイダ / キャッシュなどを
+    # 1 回だけ組み立てて app.state に載せる（import 時には作らない）
+    registry = init_registry(app)
+    registry.start()
+    yield
+    registry.shutdown()
+    app.state.registry = None
+    dispose_database()
+
+
+app = FastAPI(title="FastAPI Onion Architecture Example", lifespan=lifespan)
 
-app = FastAPI(title="FastAPI Onion Architecture Example")
+# どちらも APP_SQL_INSTRUMENTATION_ENABLED / APP_METRICS_ENABLED を最初のリクエストで見て、無効なら素通しする
+app.add_middleware(SqlTimingMiddleware)
+# 最後に追加したものが一番外側になる（SQL 計測も含めたレイテンシを測る）
+app.add_middleware(MetricsMiddleware)
 
 
 # ルーターを登録
 app.include_router(customers_router)
 app.include_router(auth_router)
+app.include_router(admin_router)
+app.include_router(reservations_router)
+app.include_router(metrics_router)
@@ -0,0 +1,80 @@
+"""
+Title: 「認証まわりの依存解決コストのマイクロベンチマーク」
+
+実行: python -m benchmarks.bench_dependency_resolution
+
+1 リクエストで get_auth_service が行う組み立てを N 回繰り返し、
+  - legacy:   リクエストごとに Argon2PasswordHasher / JwtTokenProvider / AuthSettings を作る（以前の実装）
+  - registry: ProviderRegistry から使い回し、Session に紐づくリポジトリだけを作る（現在の実装）
+の 1 リクエストあたり CPU 時間を比較する。
+（Session は実際の DB には触らないので、組み立てのコストだけを見る）
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+os.environ.setdefault("APP_DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("APP_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.application.auth.services import AuthService, AuthSettings  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.infrastructure.db.session import SessionLocal  # noqa: E402
+from app.infrastructure.repositories.auth.refresh_token_repository import (  # noqa: E402
+    SqlAlchemyRefreshTokenRepository,
+)
+from app.infrastructure.repositories.user.user_query_repository import SqlAlchemyQueryUserRepository  # noqa: E402
+from app.infrastructure.security.jwt_token_provider import JwtTokenProvider  # noqa: E402
+from app.infrastructure.security.password_hasher import Argon2PasswordHasher  # noqa: E402
+from app.interface.api.auth.deps import get_auth_service  # noqa: E402
+from app.interface.api.registry import ProviderRegistry  # noqa: E402
+
+N = 20_000
+
+
+def _legacy_get_auth_service(db: Session) -> AuthService:
+    """registry 導入前の get_auth_service と同じ組み立て方（比較用）。"""
+    return AuthService(
+        user_repo=SqlAlchemyQueryUserRepository(db),
+        password_hasher=Argon2PasswordHasher(),
+        token_provider=JwtTokenProvider(secret_key=settings.secret_key),
+        settings=AuthSettings(
+            access_token_expires_minutes=settings.access_token_expire_minutes,
+            stateless_tokens=settings.stateless_tokens_enabled,
+            refresh_token_expires_days=settings.refresh_token_expire_days,
+        ),
+        refresh_tokens=SqlAlchemyRefreshTokenRepository(db) if settings.refresh_tokens_enabled else None,
+    )
+
+
+def _run(label: str, resolve) -> float:
+    db = SessionLocal()
+    try:
+        start = time.process_time()
+        for _ in range(N):
+            resolve(db)
+        elapsed = time.process_time() - start
+    finally:
+        db.close()
+
+    per_request_us = elapsed / N * 1_000_000
+    print(f"{label:<10} {per_request_us:8.2f} us/request (CPU)")
+    return per_request_us
+
+
+def main() -> None:
+    registry = ProviderRegistry.build(settings, SessionLocal)
+    try:
+        print(f"get_auth_service x {N}")
+        legacy = _run("legacy", _legacy_get_auth_service)
+        current = _run("registry", lambda db: get_auth_service(db=db, registry=registry))
+        print(f"speedup: x{legacy / current:.1f}")
+    finally:
+        registry.shutdown()
+
+
+if __name__ == "__main__":
+    main()
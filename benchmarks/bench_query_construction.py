@@ -0,0 +1,108 @@
+"""
+Title: 「顧客一覧クエリの Python 側の構築コストのマイクロベンチマーク」
+
+実行: python -m benchmarks.bench_query_construction
+
+fetch_customer_summaries 1 回分の「SQL を実行する直前まで」の Python 側のコストを比較する。
+  - legacy:   毎回 select(...).join(...).group_by(...) とフィルタ・件数クエリを組み立て、
+              SQLAlchemy がコンパイルキャッシュを引くためのキャッシュキーを導く（以前の実装）
+  - prebuilt: フィルタの組み合わせごとに組み立て済みのステートメントを取り出し、params を詰めるだけ
+（DB とのやりとりは含まない）
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+os.environ.setdefault("APP_DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("APP_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+
+from sqlalchemy import func, or_, select  # noqa: E402
+
+from app.domain.customer.enums import CustomerStatus  # noqa: E402
+from app.infrastructure.orm.customer import CustomerORM  # noqa: E402
+from app.infrastructure.orm.reservation import ReservationORM  # noqa: E402
+from app.infrastructure.orm.shop import ShopORM  # noqa: E402
+from app.infrastructure.repositories.customer.customer_query_repository import (  # noqa: E402
+    _customer_summary_statements,
+)
+
+N = 5_000
+
+STATUS = CustomerStatus.ACTIVE
+SHOP_ID = 1
+KEYWORD = "yamada"
+
+
+def _legacy() -> None:
+    base_query = (
+        select(
+            CustomerORM.id,
+            CustomerORM.email,
+            CustomerORM.name,
+            CustomerORM.status,
+            ShopORM.id.label("shop_id"),
+            ShopORM.name.label("shop_name"),
+            func.count(ReservationORM.id).label("visit_count"),
+            func.max(ReservationORM.start_datetime).label("last_visit_at"),
+            CustomerORM.created_at,
+        )
+        .join(ShopORM, ShopORM.id == CustomerORM.shop_id)
+        .outerjoin(ReservationORM, ReservationORM.customer_id == CustomerORM.id)
+        .group_by(
+            CustomerORM.id,
+            CustomerORM.email,
+            CustomerORM.name,
+            CustomerORM.status,
+            CustomerORM.created_at,
+            ShopORM.id,
+            ShopORM.name,
+        )
+    )
+    base_query = base_query.where(CustomerORM.status == STATUS)
+    base_query = base_query.where(CustomerORM.shop_id == SHOP_ID)
+    like = f"%{KEYWORD}%"
+    base_query = base_query.where(or_(CustomerORM.name.ilike(like), CustomerORM.email.ilike(like)))
+
+    count_query = select(func.count()).select_from(base_query.subquery())
+    rows_query = base_query.limit(20).offset(0)
+    # execute() のたびに SQLAlchemy が行うキャッシュキーの導出
+    count_query._generate_cache_key()
+    rows_query._generate_cache_key()
+
+
+def _prebuilt() -> None:
+    rows_query, count_query = _customer_summary_statements(
+        has_status=True,
+        has_shop_id=True,
+        has_assigned_to=False,
+        has_keyword=True,
+    )
+    params = {"limit": 20, "offset": 0, "status": STATUS, "shop_id": SHOP_ID, "keyword_like": f"%{KEYWORD}%"}
+    count_query._generate_cache_key()
+    rows_query._generate_cache_key()
+    del params
+
+
+def _run(label: str, fn) -> float:
+    fn()  # ウォームアップ
+    start = time.process_time()
+    for _ in range(N):
+        fn()
+    elapsed = time.process_time() - start
+
+    per_request_us = elapsed / N * 1_000_000
+    print(f"{label:<10} {per_request_us:8.1f} us/request (CPU)")
+    return per_request_us
+
+
+def main() -> None:
+    print(f"fetch_customer_summaries statement setup x {N}")
+    legacy = _run("legacy", _legacy)
+    prebuilt = _run("prebuilt", _prebuilt)
+    print(f"speedup: x{legacy / prebuilt:.1f}")
+
+
+if __name__ == "__main__":
+    main()
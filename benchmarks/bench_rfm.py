@@ -0,0 +1,87 @@
+"""
+Title: 「RFM セグメント集計ジョブのベンチマーク」
+
+実行: python -m benchmarks.bench_rfm [--profile tiny|small|large] [--db PATH] [--chunk-size 100000]
+
+benchmarks.datagen のデータを SQLite ファイルに投入し、app.infrastructure.db.rfm_segmentation を
+  - 1 回目: rank がすべて NULL の状態から（全顧客を書き戻す）
+  - 2 回目: 同じ基準日時でもう一度（変わる顧客がいないので書き戻しなし = 読み取りと集計だけの時間）
+実行して、読み取り・集計の行数 / 秒、書き戻し件数と時間、プロセスのピーク RSS を出す。
+
+Point:
+    - 基準日時は datagen の NOW（2026-01-01）に固定する（実行日によって結果が変わらないように）。
+    - 投入は bench_scale と同じく別プロセスで行う。--db に既存ファイルを渡すと投入を飛ばす
+      （2 回目以降も rank は書き戻し済みなので、1 回目から書き戻しなしになる）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import resource
+import tempfile
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.datagen import Volumes, add_volume_arguments, generate, volumes_from_args
+
+AS_OF = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _seed(path: Path, volumes: Volumes, seed: int) -> None:
+    from sqlalchemy import create_engine
+
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        generate(engine, volumes, seed=seed)
+    finally:
+        engine.dispose()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_volume_arguments(parser)
+    parser.add_argument("--db", type=Path, default=None, help="既存の SQLite ファイル（無ければここに投入する）")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--window-days", type=int, default=365)
+    args = parser.parse_args(argv)
+
+    volumes = volumes_from_args(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or Path(tmp) / "rfm.db"
+        if not path.exists():
+            print(f"profile={args.profile} seed={args.seed} {asdict(volumes)}")
+            seeder = multiprocessing.get_context("spawn").Process(target=_seed, args=(path, volumes, args.seed))
+            seeder.start()
+            seeder.join()
+            if seeder.exitcode != 0:
+                raise SystemExit(f"seeding failed (exit code {seeder.exitcode})")
+
+        from sqlalchemy import create_engine
+
+        from app.infrastructure.db.rfm_segmentation import RfmSegmentation
+
+        engine = create_engine(f"sqlite:///{path}")
+        try:
+            job = RfmSegmentation([engine], chunk_size=args.chunk_size)
+            for label in ("first run", "second run"):
+                result = job.run(as_of=AS_OF, window_days=args.window_days)
+                print(
+                    f"{label:<11} customers={result.customers:,} scored={result.scored:,} events={result.events:,} "
+                    f"read {result.read_seconds:.2f} s ({result.events_per_second:,.0f} events/s) "
+                    f"updated={result.updated:,} in {result.write_seconds:.2f} s"
+                )
+        finally:
+            engine.dispose()
+
+    for segment, count in result.segments.items():
+        print(f"  {segment:<16} {count:>10,}")
+    # Linux の ru_maxrss は KiB
+    print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Title: 「本番規模のデータでの顧客一覧 / 詳細のベンチマーク（スケールスイート）」
+
+実行: python -m benchmarks.bench_scale [--profile tiny|small|large] [--db PATH] [--iterations 50]
+                                      [--save-baseline] [--no-compare]
+
+benchmarks.datagen で偏りのあるデータ（店舗ごとの顧客数・顧客ごとの予約数は Zipf 風）を SQLite ファイルに投入し、
+  - リポジトリ: fetch_customer_summaries / fetch_customer_detail を直接
+  - エンドポイント: GET /api/customers, GET /api/customers/{id} をプロセス内の ASGI クライアント（TestClient）で
+それぞれ繰り返し実行して、p50 / p95 / p99、1 回あたりの SQL 本数、プロセスのピーク RSS を出す。
+
+ベースラインは benchmarks/baselines/scale-<profile>.json に保存し（--save-baseline）、
+次回以降の実行では自動で比較して差分（%）を表示する。
+
+Point:
+    - 投入は別プロセスで行う（ピーク RSS に投入時のメモリを混ぜない）。--db に既存ファイルを渡すと投入を飛ばす。
+    - 件数は --shops / --customers / --reservations などでプロファイルの値を上書きできる。
+      large（1k 店舗 / 200 万顧客 / 2,000 万予約）は投入に時間がかかるので、
+      python -m benchmarks.datagen で作ったファイルを --db で使い回す前提。
+    - SQL 本数はリポジトリ呼び出しでは RequestQueryStats、エンドポイントでは Server-Timing ヘッダーから取る。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from benchmarks.datagen import Volumes, add_volume_arguments, generate, volumes_from_args
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+def _seed(path: Path, volumes: Volumes, seed: int) -> None:
+    from sqlalchemy import create_engine
+
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        generate(engine, volumes, seed=seed)
+    finally:
+        engine.dispose()
+
+
+# ==========
+# 計測
+# ==========
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries: float
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _measure(name: str, iterations: int, call: Callable[[], int]) -> ScenarioResult:
+    """call() を繰り返し実行する。call は実行した SQL の本数を返す。"""
+    call()  # ウォームアップ（ステートメントのコンパイルキャッシュ・ページキャッシュ）
+    timings: list[float] = []
+    query_counts: list[int] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        query_counts.append(call())
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return ScenarioResult(
+        name=name,
+        p50_ms=_percentile(timings, 0.50),
+        p95_ms=_percentile(timings, 0.95),
+        p99_ms=_percentile(timings, 0.99),
+        queries=sum(query_counts) / len(query_counts),
+    )
+
+
+def _peak_rss_mib() -> float:
+    # Linux の ru_maxrss は KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _pick_targets(session: Any) -> dict[str, Any]:
+    """ベンチマーク対象の店舗・顧客（最大の店舗、予約の最も多い顧客、ふつうの顧客）を選ぶ。"""
+    from sqlalchemy import text
+
+    top_shop = session.execute(
+        text("SELECT shop_id FROM customers GROUP BY shop_id ORDER BY COUNT(*) DESC LIMIT 1")
+    ).scalar_one()
+    heavy_customer = session.execute(
+        text("SELECT customer_id FROM reservations GROUP BY customer_id ORDER BY COUNT(*) DESC LIMIT 1")
+    ).scalar_one()
+    customer_count = session.execute(text("SELECT MAX(id) FROM customers")).scalar_one()
+    return {"top_shop": top_shop, "heavy_customer": heavy_customer, "customer_count": customer_count}
+
+
+def run_scenarios(iterations: int) -> list[ScenarioResult]:
+    from fastapi.testclient import TestClient
+
+    from app.application.customer.query_filter import CustomerFilter
+    from app.domain.user.models import User
+    from app.infrastructure.db.query_stats import begin_request_stats, end_request_stats
+    from app.infrastructure.db.session import get_database
+    from app.infrastructure.repositories.customer.customer_query_repository import SqlAlchemyCustomerQueryRepository
+    from app.interface.api.auth.deps import get_current_user
+    from app.main import app
+
+    now = datetime.now(timezone.utc)
+    user = User(
+        id=1,
+        email="user1@example.com",
+        full_name="User 1",
+        hashed_password="x",
+        is_active=True,
+        is_superuser=True,
+        timezone="Asia/Tokyo",
+        roles=[],
+        created_at=now,
+        updated_at=now,
+    )
+    rng = random.Random(0)
+    results: list[ScenarioResult] = []
+
+    session = get_database().read_session_factory()
+    try:
+        targets = _pick_targets(session)
+        repository = SqlAlchemyCustomerQueryRepository(session)
+
+        def repo_call(fn: Callable[[], Any]) -> Callable[[], int]:
+            def call() -> int:
+                stats, token = begin_request_stats()
+                try:
+                    fn()
+                finally:
+                    end_request_stats(token)
+                return stats.query_count
+
+            return call
+
+        def random_customer() -> int:
+            return rng.randint(1, targets["customer_count"])
+
+        repo_scenarios: list[tuple[str, Callable[[], Any]]] = [
+            ("repo summaries page=1", lambda: repository.fetch_customer_summaries(user, CustomerFilter(), 20, 0)),
+            (
+                "repo summaries top shop",
+                lambda: repository.fetch_customer_summaries(user, CustomerFilter(shop_id=targets["top_shop"]), 20, 0),
+            ),
+            (
+                "repo summaries keyword",
+                lambda: repository.fetch_customer_summaries(user, CustomerFilter(keyword="12345"), 20, 0),
+            ),
+            ("repo summaries deep page", lambda: repository.fetch_customer_summaries(user, CustomerFilter(), 20, 2_000)),
+            ("repo detail heavy", lambda: repository.fetch_customer_detail(user, targets["heavy_customer"])),
+            ("repo detail random", lambda: repository.fetch_customer_detail(user, random_customer())),
+        ]
+        for name, fn in repo_scenarios:
+            results.append(_measure(name, iterations, repo_call(fn)))
+    finally:
+        session.close()
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        with TestClient(app) as client:
+
+            def endpoint_call(path: Callable[[], str]) -> Callable[[], int]:
+                def call() -> int:
+                    response = client.get(path())
+                    response.raise_for_status()
+                    # Server-Timing: db;dur=12.34;desc="5 queries"
+                    desc = response.headers.get("server-timing", "").rpartition('desc="')[2]
+                    return int(desc.split()[0]) if desc else 0
+
+                return call
+
+            endpoint_scenarios: list[tuple[str, Callable[[], str]]] = [
+                ("GET /api/customers", lambda: "/api/customers/?page=1&page_size=20"),
+                ("GET /api/customers?shop_id", lambda: f"/api/customers/?shop_id={targets['top_shop']}&page_size=20"),
+                ("GET /api/customers?keyword", lambda: "/api/customers/?keyword=12345&page_size=20"),
+                ("GET /api/customers/{id} heavy", lambda: f"/api/customers/{targets['heavy_customer']}"),
+                ("GET /api/customers/{id} random", lambda: f"/api/customers/{random_customer()}"),
+            ]
+            for name, path in endpoint_scenarios:
+                results.append(_measure(name, iterations, endpoint_call(path)))
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    return results
+
+
+# ==========
+# ベースライン
+# ==========
+
+
+def _baseline_path(profile: str) -> Path:
+    return BASELINE_DIR / f"scale-{profile}.json"
+
+
+def _report(results: list[ScenarioResult], peak_rss_mib: float, baseline: Optional[dict[str, Any]]) -> None:
+    previous = {r["name"]: r for r in baseline["results"]} if baseline else {}
+
+    def delta(name: str, key: str, value: float) -> str:
+        old = previous.get(name, {}).get(key)
+        if not old:
+            return ""
+        return f" ({(value - old) / old * 100:+.0f}%)"
+
+    def cell(r: ScenarioResult, key: str) -> str:
+        value = getattr(r, key)
+        return f"{value:.2f}{delta(r.name, key, value)}"
+
+    print(f"{'scenario':<34} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} {'queries':>8}")
+    for r in results:
+        print(
+            f"{r.name:<34} {cell(r, 'p50_ms'):>16} {cell(r, 'p95_ms'):>16} {cell(r, 'p99_ms'):>16} {r.queries:>8.1f}"
+        )
+    rss_delta = ""
+    if baseline and baseline.get("peak_rss_mib"):
+        rss_delta = f" ({(peak_rss_mib - baseline['peak_rss_mib']) / baseline['peak_rss_mib'] * 100:+.0f}%)"
+    print(f"peak RSS: {peak_rss_mib:.1f} MiB{rss_delta}")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_volume_arguments(parser)
+    parser.add_argument("--db", type=Path, default=None, help="既存の SQLite ファイル（無ければここに投入する）")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--no-compare", action="store_true")
+    args = parser.parse_args(argv)
+
+    volumes = volumes_from_args(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or Path(tmp) / "scale.db"
+        if not path.exists():
+            print(f"profile={args.profile} seed={args.seed} {asdict(volumes)}")
+            seeder = multiprocessing.get_context("spawn").Process(target=_seed, args=(path, volumes, args.seed))
+            seeder.start()
+            seeder.join()
+            if seeder.exitcode != 0:
+                raise SystemExit(f"seeding failed (exit code {seeder.exitcode})")
+
+        # app を import する前に、投入したファイルを向くよう環境変数を決める
+        os.environ["APP_DATABASE_URL"] = f"sqlite:///{path}"
+        os.environ.setdefault("APP_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+        os.environ["APP_SQL_INSTRUMENTATION_ENABLED"] = "true"
+        os.environ["APP_SQL_N_PLUS_ONE_MODE"] = "log"
+        os.environ["APP_SLOW_QUERY_LOG_ENABLED"] = "false"
+        os.environ["APP_METRICS_ENABLED"] = "false"
+
+        results = run_scenarios(args.iterations)
+
+        from app.infrastructure.db.session import dispose_database
+
+        dispose_database()
+
+    peak_rss = _peak_rss_mib()
+    baseline_path = _baseline_path(args.profile)
+    baseline = None
+    if not args.no_compare and baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        if baseline.get("volumes") != asdict(volumes):
+            print(f"baseline {baseline_path.name} was recorded with different volumes; not comparing")
+            baseline = None
+
+    _report(results, peak_rss, baseline)
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(
+            json.dumps(
+                {
+                    "profile": args.profile,
+                    "volumes": asdict(volumes),
+                    "iterations": args.iterations,
+                    "peak_rss_mib": round(peak_rss, 1),
+                    "results": [
+                        {k: round(v, 3) if isinstance(v, float) else v for k, v in asdict(r).items()} for r in results
+                    ],
+                },
+                ensure_ascii=False,
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"saved baseline -> {baseline_path.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Title: 「コールドスタートのベンチマーク」
+
+実行: python -m benchmarks.bench_startup [--runs 5]
+
+新しい Python プロセスで
+  - import:    import app.main だけ（Settings / engine / pwdlib / PyJWT は作らない・読まない）
+  - lifespan:  import + lifespan の起動（Settings・engine・ProviderRegistry の組み立て）
+にかかる時間を計測し、中央値を出す。最後に -X importtime で自前モジュールの重い順に上位を表示する。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_ONLY = "import app.main"
+WITH_LIFESPAN = (
+    "from fastapi.testclient import TestClient\n"
+    "from app.main import app\n"
+    "with TestClient(app):\n"
+    "    pass\n"
+)
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("APP_DATABASE_URL", "sqlite:///:memory:")
+    env.setdefault("APP_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+    env["PYTHONPATH"] = str(ROOT)
+    return env
+
+
+def _time_process(code: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=_env(), check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _top_app_modules(limit: int) -> list[tuple[int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_ONLY],
+        env=_env(),
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.split(":", 1)[1].split("|")
+        if name.strip().startswith("app"):
+            modules.append((int(self_us), name.strip()))
+    return sorted(modules, reverse=True)[:limit]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Cold start benchmark.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    baseline = _time_process("pass", args.runs)
+    print(f"interpreter   {baseline * 1000:8.1f} ms")
+    print(f"import        {_time_process(IMPORT_ONLY, args.runs) * 1000:8.1f} ms")
+    print(f"lifespan      {_time_process(WITH_LIFESPAN, args.runs) * 1000:8.1f} ms")
+
+    print("\nslowest app modules (self time):")
+    for self_us, name in _top_app_modules(10):
+        print(f"  {self_us / 1000:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
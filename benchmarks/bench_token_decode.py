@@ -0,0 +1,85 @@
+"""
+Title: 「JWT 検証キャッシュのマイクロベンチマーク」
+
+実行: python -m benchmarks.bench_token_decode
+
+同じアクセストークンを N 回 AuthService.get_user_from_token に通したときの
+1 リクエストあたり CPU 時間を、キャッシュなし / ありで比較する。
+（ユーザー取得はインメモリのフェイクにして、トークン検証のコストだけを見る）
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("APP_DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("APP_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+
+from app.application.auth.services import AuthService, AuthSettings  # noqa: E402
+from app.domain.user.models import User  # noqa: E402
+from app.infrastructure.security.jwt_token_provider import JwtTokenProvider  # noqa: E402
+from app.infrastructure.security.token_cache import CachingTokenProvider, VerifiedTokenCache  # noqa: E402
+
+N = 20_000
+
+
+class _InMemoryUserRepository:
+    def __init__(self, user: User) -> None:
+        self._user = user
+
+    def get_by_email(self, email: str) -> User | None:
+        return self._user
+
+    def get_by_id(self, user_id: int) -> User | None:
+        return self._user
+
+
+def _make_user() -> User:
+    now = datetime.now(timezone.utc)
+    return User(
+        id=1,
+        email="bench@example.com",
+        full_name="Bench User",
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        timezone="Asia/Tokyo",
+        roles=[],
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def _run(label: str, token_provider) -> float:
+    service = AuthService(
+        user_repo=_InMemoryUserRepository(_make_user()),
+        password_hasher=None,  # type: ignore[arg-type]  ログインは計測対象外
+        token_provider=token_provider,
+        settings=AuthSettings(access_token_expires_minutes=30),
+    )
+    token = service.create_access_token(_make_user()).access_token
+
+    start = time.process_time()
+    for _ in range(N):
+        service.get_user_from_token(token)
+    elapsed = time.process_time() - start
+
+    per_request_us = elapsed / N * 1_000_000
+    print(f"{label:<24} {per_request_us:8.2f} us/request (CPU)")
+    return per_request_us
+
+
+def main() -> None:
+    print(f"get_user_from_token x {N}")
+    base = _run("JwtTokenProvider", JwtTokenProvider())
+    cached = _run(
+        "CachingTokenProvider",
+        CachingTokenProvider(JwtTokenProvider(), cache=VerifiedTokenCache()),
+    )
+    print(f"speedup: x{base / cached:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,532 @@
+"""
+Title: 「全 ORM テーブルの合成データ生成 CLI（NumPy でまとめて生成 → executemany で一括投入）」
+
+実行: python -m benchmarks.datagen --url sqlite:///./scale.db [--profile tiny|small|large] [--seed 42]
+                                  [--customers 2000000 ...] [--chunk-size 100000]
+
+shops / users / roles / user_roles / customers / reservations / activities / notes /
+opportunity_stages / opportunities / tasks / audit_logs に、互いに整合する行を投入する。
+顧客ごとの商談金額の集計（customer_value_aggregates）は、投入後に商談から作る。
+  - id は 1 からの連番。外部キーは必ず存在する行を指す（メモ・タスクの商談は、その商談の顧客に付く）。
+  - 店舗ごとの顧客数、顧客ごとの予約・活動・メモ・商談の数は Zipf 風に偏らせる（大型店・常連ほど多い）。
+  - 予約・活動などの日時は顧客の登録日時より後。未来の予約は「来店前」、過去の予約は来店済み / 会計済み / キャンセル。
+
+Point:
+    - ORM オブジェクトを 1 件ずつ作らず、列ごとに NumPy 配列で生成する（id・日時・偏りのある分布）。
+    - 乱数は (seed, テーブル, チャンク) から作るので、同じ seed なら何度実行しても同じ行になる。
+    - SQLite は型変換を通さず DBAPI の executemany に直接流す（日時は SQLAlchemy の SQLite 保存形式の文字列にする）。
+      それ以外の DB は Core の insert().executemany。
+    - テーブルごと・全体の rows/sec を出す。
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import zlib
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, Optional
+
+import numpy as np
+from sqlalchemy import Engine, Table, create_engine, insert
+
+from app.domain.activity.enums import ActivityType
+from app.domain.auth.enums import UserRoleName
+from app.domain.customer.enums import CustomerStatus
+from app.domain.opportunity.enums import OpportunityStatus
+from app.domain.reservation.enums import ReservationStatus
+from app.domain.shop.enums import ShopStatus
+from app.domain.task.enums import TaskStatus
+from app.infrastructure.db.customer_value import CustomerValueJob
+from app.infrastructure.orm import Base
+
+# 生成データの「現在時刻」（これより後は未来の予約）と、データの期間
+NOW = np.datetime64("2026-01-01T00:00:00", "us")
+HISTORY = np.timedelta64(3 * 365, "D")
+FUTURE = np.timedelta64(30, "D")
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+@dataclass(frozen=True)
+class Volumes:
+    """テーブルごとの件数（roles / opportunity_stages は固定）。"""
+
+    users: int
+    shops: int
+    customers: int
+    reservations: int
+    activities: int
+    notes: int
+    opportunities: int
+    tasks: int
+    audit_logs: int
+
+
+PROFILES: dict[str, Volumes] = {
+    "tiny": Volumes(
+        users=200,
+        shops=20,
+        customers=5_000,
+        reservations=50_000,
+        activities=10_000,
+        notes=10_000,
+        opportunities=2_000,
+        tasks=5_000,
+        audit_logs=20_000,
+    ),
+    "small": Volumes(
+        users=1_000,
+        shops=100,
+        customers=100_000,
+        reservations=1_000_000,
+        activities=200_000,
+        notes=200_000,
+        opportunities=50_000,
+        tasks=100_000,
+        audit_logs=500_000,
+    ),
+    "large": Volumes(
+        users=10_000,
+        shops=1_000,
+        customers=2_000_000,
+        reservations=20_000_000,
+        activities=4_000_000,
+        notes=4_000_000,
+        opportunities=1_000_000,
+        tasks=2_000_000,
+        audit_logs=10_000_000,
+    ),
+}
+
+OPPORTUNITY_STAGES = [
+    # (name, display_order, is_won, is_lost)
+    ("Lead", 1, False, False),
+    ("Qualified", 2, False, False),
+    ("Proposal", 3, False, False),
+    ("Won", 4, True, False),
+    ("Lost", 5, False, True),
+]
+
+Columns = dict[str, np.ndarray]
+
+
+# ==========
+# 分布
+# ==========
+
+
+def _choice(rng: np.random.Generator, values: list[str], p: list[float], size: int) -> np.ndarray:
+    """カテゴリ値（Enum の name など）を確率 p で size 個選ぶ。"""
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=p)]
+
+
+def _names(prefix: str, ids: np.ndarray, width: int = 0) -> np.ndarray:
+    digits = ids.astype(str)
+    if width:
+        digits = np.char.zfill(digits, width)
+    return np.char.add(prefix, digits).astype(object)
+
+
+def _nullable(values: np.ndarray, rng: np.random.Generator, null_ratio: float) -> np.ma.MaskedArray:
+    return np.ma.masked_array(values, mask=rng.random(len(values)) < null_ratio)
+
+
+class _ZipfSampler:
+    """1..n の id を、順位 k の重みが 1 / k^s になるように選ぶ（どの id が上位かはランダムに決める）。"""
+
+    def __init__(self, n: int, s: float, rng: np.random.Generator) -> None:
+        weights = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** s
+        self._cdf = np.cumsum(weights)
+        self._cdf /= self._cdf[-1]
+        self._ids = rng.permutation(n) + 1
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        index = np.searchsorted(self._cdf, rng.random(size), side="right")
+        return self._ids[np.minimum(index, len(self._ids) - 1)]
+
+
+def _between(rng: np.random.Generator, start: np.ndarray, end: np.datetime64) -> np.ndarray:
+    """start（配列）〜 end の一様な日時。"""
+    span = (end - start).astype(np.int64)
+    return start + (rng.random(len(start)) * span).astype("timedelta64[us]")
+
+
+# ==========
+# テーブルごとの生成
+# ==========
+
+
+class DataGenerator:
+    """Volumes と seed から、各テーブルの行を列ごとの NumPy 配列（チャンク単位）で作る。"""
+
+    def __init__(self, volumes: Volumes, seed: int = 42) -> None:
+        self.volumes = volumes
+        self.seed = seed
+        rng = self._rng("entities")
+
+        # テーブルをまたいで整合させる属性は先に全件分作っておく
+        self.user_roles = _choice(
+            rng, [UserRoleName.SALES.name, UserRoleName.MANAGER.name], [0.9, 0.1], volumes.users
+        )
+        self.user_roles[0] = UserRoleName.ADMIN.name
+        self.manager_ids = np.flatnonzero(self.user_roles != UserRoleName.SALES.name) + 1
+
+        self.customer_shop_id = _ZipfSampler(volumes.shops, 1.1, rng).sample(rng, volumes.customers)
+        self.customer_created_at = NOW - HISTORY + (rng.random(volumes.customers) * HISTORY).astype("timedelta64[us]")
+
+        # 予約・活動・メモ・商談が集中する「常連」の分布
+        self.customer_sampler = _ZipfSampler(volumes.customers, 0.8, rng)
+        self.opportunity_customer_id = self.customer_sampler.sample(rng, volumes.opportunities)
+
+    def _rng(self, *key: Any) -> np.random.Generator:
+        words = [self.seed] + [zlib.crc32(k.encode()) if isinstance(k, str) else int(k) for k in key]
+        return np.random.default_rng(words)
+
+    def tables(self) -> list[tuple[str, int, Callable[[np.random.Generator, int, int], Columns]]]:
+        """(テーブル名, 件数, チャンク生成関数) を外部キーの依存順に返す。"""
+        v = self.volumes
+        return [
+            ("users", v.users, self._users),
+            ("roles", len(UserRoleName), self._roles),
+            ("user_roles", v.users, self._user_roles_rows),
+            ("shops", v.shops, self._shops),
+            ("opportunity_stages", len(OPPORTUNITY_STAGES), self._stages),
+            ("customers", v.customers, self._customers),
+            ("reservations", v.reservations, self._reservations),
+            ("activities", v.activities, self._activities),
+            ("opportunities", v.opportunities, self._opportunities),
+            ("notes", v.notes, self._notes),
+            ("tasks", v.tasks, self._tasks),
+            ("audit_logs", v.audit_logs, self._audit_logs),
+        ]
+
+    def chunks(self, table: str, total: int, make: Callable, chunk_size: int) -> Iterator[Columns]:
+        for index, lo in enumerate(range(0, total, chunk_size)):
+            yield make(self._rng(table, index), lo, min(lo + chunk_size, total))
+
+    # ---------- マスタ ----------
+
+    def _users(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        ids = np.arange(lo + 1, hi + 1)
+        created_at = NOW - HISTORY + (rng.random(hi - lo) * HISTORY).astype("timedelta64[us]")
+        return {
+            "id": ids,
+            "email": np.char.add(_names("user", ids), "@example.com").astype(object),
+            "full_name": _names("User ", ids),
+            "hashed_password": np.full(hi - lo, "!", dtype=object),
+            "is_active": rng.random(hi - lo) < 0.97,
+            "is_superuser": ids == 1,
+            "timezone": _choice(rng, ["Asia/Tokyo", "UTC", "America/New_York"], [0.9, 0.05, 0.05], hi - lo),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "version": np.ones(hi - lo, dtype=np.int64),
+        }
+
+    def _roles(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        names = [role.name for role in UserRoleName][lo:hi]
+        return {"id": np.arange(lo + 1, hi + 1), "name": np.asarray(names, dtype=object)}
+
+    def _user_roles_rows(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        role_ids = {role.name: i + 1 for i, role in enumerate(UserRoleName)}
+        return {
+            "id": np.arange(lo + 1, hi + 1),
+            "user_id": np.arange(lo + 1, hi + 1),
+            "role_id": np.vectorize(role_ids.__getitem__, otypes=[np.int64])(self.user_roles[lo:hi]),
+        }
+
+    def _shops(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        ids = np.arange(lo + 1, hi + 1)
+        created_at = NOW - HISTORY - (rng.random(hi - lo) * HISTORY).astype("timedelta64[us]")
+        return {
+            "id": ids,
+            "code": _names("S", ids, 6),
+            "name": _names("Shop ", ids),
+            "address": _nullable(_names("Address ", ids), rng, 0.1),
+            "phone_number": _nullable(_names("03-", rng.integers(10_000_000, 99_999_999, hi - lo)), rng, 0.2),
+            "status": _choice(rng, [s.name for s in ShopStatus], [0.9, 0.07, 0.03], hi - lo),
+            "owner_user_id": self.manager_ids[rng.integers(0, len(self.manager_ids), hi - lo)],
+            "created_at": created_at,
+            "updated_at": created_at,
+            "version": np.ones(hi - lo, dtype=np.int64),
+        }
+
+    def _stages(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        rows = OPPORTUNITY_STAGES[lo:hi]
+        return {
+            "id": np.arange(lo + 1, hi + 1),
+            "name": np.asarray([r[0] for r in rows], dtype=object),
+            "display_order": np.asarray([r[1] for r in rows]),
+            "is_won": np.asarray([r[2] for r in rows]),
+            "is_lost": np.asarray([r[3] for r in rows]),
+        }
+
+    # ---------- 顧客とその周辺 ----------
+
+    def _customers(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        ids = np.arange(lo + 1, hi + 1)
+        created_at = self.customer_created_at[lo:hi]
+        return {
+            "id": ids,
+            "shop_id": self.customer_shop_id[lo:hi],
+            "external_code": _nullable(_names("EXT", ids, 8), rng, 0.5),
+            "name": _names("Customer ", ids, 7),
+            "email": _nullable(np.char.add(_names("c", ids), "@example.com").astype(object), rng, 0.1),
+            "phone_number": _nullable(_names("090-", rng.integers(10_000_000, 99_999_999, hi - lo)), rng, 0.3),
+            "status": _choice(rng, [s.name for s in CustomerStatus], [0.8, 0.12, 0.08], hi - lo),
+            "rank": np.ma.masked_all(hi - lo, dtype=object),
+            "assigned_to_user_id": _nullable(rng.integers(1, self.volumes.users + 1, hi - lo), rng, 0.3),
+            "created_at": created_at,
+            "updated_at": _between(rng, created_at, NOW),
+            "version": np.ones(hi - lo, dtype=np.int64),
+        }
+
+    def _reservations(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        customer_id = self.customer_sampler.sample(rng, hi - lo)
+        # 30 分単位の枠に丸める
+        start = _between(rng, self.customer_created_at[customer_id - 1], NOW + FUTURE)
+        start = start.astype("datetime64[m]")
+        start = (start - (start.astype(np.int64) % 30).astype("timedelta64[m]")).astype("datetime64[us]")
+        duration = rng.choice(np.array([30, 60, 90, 120]), size=hi - lo, p=[0.2, 0.5, 0.2, 0.1])
+        past_status = rng.choice(
+            np.array([ReservationStatus.VISITED, ReservationStatus.PAID, ReservationStatus.CANCELED], dtype=np.int64),
+            size=hi - lo,
+            p=[0.25, 0.65, 0.1],
+        )
+        created_at = start - (rng.random(hi - lo) * np.timedelta64(14, "D")).astype("timedelta64[us]")
+        return {
+            "id": np.arange(lo + 1, hi + 1),
+            "shop_id": self.customer_shop_id[customer_id - 1],
+            "customer_id": customer_id,
+            "start_datetime": start,
+            "end_datetime": start + duration.astype("timedelta64[m]"),
+            "status": np.where(start > NOW, int(ReservationStatus.BEFORE_VISIT), past_status),
+            "memo": np.ma.masked_all(hi - lo, dtype=object),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "version": np.ones(hi - lo, dtype=np.int64),
+        }
+
+    def _activities(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        ids = np.arange(lo + 1, hi + 1)
+        customer_id = self.customer_sampler.sample(rng, hi - lo)
+        created_at = _between(rng, self.customer_created_at[customer_id - 1], NOW)
+        return {
+            "id": ids,
+            "customer_id": customer_id,
+            "type": _choice(rng, [t.name for t in ActivityType], [0.35, 0.2, 0.3, 0.1, 0.05], hi - lo),
+            "subject": _names("Activity ", ids),
+            "description": np.ma.masked_all(hi - lo, dtype=object),
+            "scheduled_at": np.ma.masked_array(
+                created_at + (rng.random(hi - lo) * FUTURE).astype("timedelta64[us]"), mask=rng.random(hi - lo) < 0.5
+            ),
+            "created_by_user_id": rng.integers(1, self.volumes.users + 1, hi - lo),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def _opportunities(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        ids = np.arange(lo + 1, hi + 1)
+        customer_id = self.opportunity_customer_id[lo:hi]
+        created_at = _between(rng, self.customer_created_at[customer_id - 1], NOW)
+        stage_id = rng.choice(np.arange(1, len(OPPORTUNITY_STAGES) + 1), size=hi - lo, p=[0.3, 0.2, 0.15, 0.2, 0.15])
+        # ステータスはステージと矛盾しないようにする（Won → WON, Lost → LOST、それ以外は OPEN / ON_HOLD）
+        status = np.where(rng.random(hi - lo) < 0.9, OpportunityStatus.OPEN.name, OpportunityStatus.ON_HOLD.name)
+        status = np.where(stage_id == 4, OpportunityStatus.WON.name, status)
+        status = np.where(stage_id == 5, OpportunityStatus.LOST.name, status).astype(object)
+        return {
+            "id": ids,
+            "customer_id": customer_id,
+            "title": _names("Deal ", ids),
+            "amount": np.round(rng.lognormal(mean=12.0, sigma=1.0, size=hi - lo), -3),
+            "probability": (rng.integers(0, 11, hi - lo) * 10),
+            "status": status,
+            "expected_close_date": _nullable(
+                created_at + (rng.random(hi - lo) * np.timedelta64(180, "D")).astype("timedelta64[us]"), rng, 0.2
+            ),
+            "stage_id": stage_id,
+            "owner_user_id": rng.integers(1, self.volumes.users + 1, hi - lo),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "version": np.ones(hi - lo, dtype=np.int64),
+        }
+
+    def _linked_opportunities(self, rng: np.random.Generator, size: int, ratio: float) -> tuple[np.ndarray, np.ndarray]:
+        """(customer_id, opportunity_id のマスク付き配列)。商談付きの行は、その商談の顧客に付ける。"""
+        customer_id = self.customer_sampler.sample(rng, size)
+        opportunity_id = np.ma.masked_all(size, dtype=np.int64)
+        if self.volumes.opportunities:
+            linked = rng.random(size) < ratio
+            picked = rng.integers(1, self.volumes.opportunities + 1, int(linked.sum()))
+            opportunity_id[linked] = picked
+            customer_id[linked] = self.opportunity_customer_id[picked - 1]
+        return customer_id, opportunity_id
+
+    def _notes(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        ids = np.arange(lo + 1, hi + 1)
+        customer_id, opportunity_id = self._linked_opportunities(rng, hi - lo, 0.2)
+        return {
+            "id": ids,
+            "customer_id": customer_id,
+            "opportunity_id": opportunity_id,
+            "body": _names("Note ", ids),
+            "created_by_user_id": rng.integers(1, self.volumes.users + 1, hi - lo),
+            "created_at": _between(rng, self.customer_created_at[customer_id - 1], NOW),
+        }
+
+    def _tasks(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        ids = np.arange(lo + 1, hi + 1)
+        customer_id, opportunity_id = self._linked_opportunities(rng, hi - lo, 0.3)
+        created_at = _between(rng, self.customer_created_at[customer_id - 1], NOW)
+        due = created_at + (rng.random(hi - lo) * np.timedelta64(60, "D")).astype("timedelta64[us]")
+        status = _choice(rng, [s.name for s in TaskStatus], [0.2, 0.1, 0.6, 0.1], hi - lo)
+        return {
+            "id": ids,
+            "title": _names("Task ", ids),
+            "description": np.ma.masked_all(hi - lo, dtype=object),
+            "status": status,
+            "due_date": _nullable(due, rng, 0.2),
+            "customer_id": np.ma.masked_array(customer_id, mask=rng.random(hi - lo) < 0.1),
+            "opportunity_id": opportunity_id,
+            "assigned_to_user_id": _nullable(rng.integers(1, self.volumes.users + 1, hi - lo), rng, 0.1),
+            "created_by_user_id": rng.integers(1, self.volumes.users + 1, hi - lo),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def _audit_logs(self, rng: np.random.Generator, lo: int, hi: int) -> Columns:
+        action = _choice(
+            rng, ["login", "customer.view", "customer.update", "reservation.create"], [0.3, 0.5, 0.1, 0.1], hi - lo
+        )
+        is_login = action == "login"
+        entity_type = np.where(is_login, None, np.where(action == "reservation.create", "reservation", "customer"))
+        max_entity = np.where(
+            action == "reservation.create", max(self.volumes.reservations, 1), max(self.volumes.customers, 1)
+        )
+        entity_id = (rng.random(hi - lo) * max_entity).astype(np.int64) + 1
+        return {
+            "id": np.arange(lo + 1, hi + 1),
+            "user_id": rng.integers(1, self.volumes.users + 1, hi - lo),
+            "action": action,
+            "entity_type": np.ma.masked_array(entity_type.astype(object), mask=is_login),
+            "entity_id": np.ma.masked_array(entity_id, mask=is_login),
+            "ip_address": _names("10.0.0.", rng.integers(1, 255, hi - lo)),
+            "user_agent": np.full(hi - lo, "datagen", dtype=object),
+            "created_at": NOW - (rng.random(hi - lo) * HISTORY).astype("timedelta64[us]"),
+        }
+
+
+# ==========
+# 一括投入
+# ==========
+
+
+def _python_values(column: np.ndarray, sqlite: bool) -> list[Any]:
+    """列の配列を DBAPI に渡す Python 値のリストにする（マスクされた要素は None）。"""
+    mask = np.ma.getmaskarray(column) if np.ma.isMaskedArray(column) else None
+    data = np.ma.getdata(column)
+    if data.dtype.kind == "M":
+        if sqlite:
+            # SQLAlchemy の SQLite DateTime と同じ保存形式（YYYY-MM-DD HH:MM:SS.ffffff）
+            data = np.datetime_as_string(data.astype("datetime64[us]"), unit="us")
+            if len(data):
+                # 10 文字目の "T" を文字単位のビューで空白に置き換える（NaT はマスクで None になる）
+                chars = data.view("U1").reshape(len(data), -1)
+                chars[:, 10] = " "
+        else:
+            data = data.astype("datetime64[us]").astype(object)
+    values = data.tolist()
+    if mask is not None and mask.any():
+        for i in np.flatnonzero(mask).tolist():
+            values[i] = None
+    return values
+
+
+def load_chunk(conn: Any, table: Table, columns: Columns) -> int:
+    """1 チャンク分を executemany で投入し、件数を返す。"""
+    names = list(columns)
+    sqlite = conn.dialect.name == "sqlite"
+    values = [_python_values(columns[name], sqlite) for name in names]
+    rows = list(zip(*values))
+    if sqlite:
+        # 型変換を通さず DBAPI の executemany に直接渡す
+        placeholders = ", ".join("?" for _ in names)
+        conn.exec_driver_sql(f"INSERT INTO {table.name} ({', '.join(names)}) VALUES ({placeholders})", rows)
+    else:
+        conn.execute(insert(table), [dict(zip(names, row)) for row in rows])
+    return len(rows)
+
+
+def generate(
+    engine: Engine,
+    volumes: Volumes,
+    seed: int = 42,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    report: Optional[Callable[[str], None]] = print,
+) -> dict[str, float]:
+    """テーブルを作って全テーブルを投入する。テーブルごとの rows/sec を返す（"total" は全体）。"""
+    Base.metadata.create_all(engine)
+    generator = DataGenerator(volumes, seed)
+    throughput: dict[str, float] = {}
+    total_rows = 0
+    started_at = time.perf_counter()
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        for name, count, make in generator.tables():
+            table = Base.metadata.tables[name]
+            table_started_at = time.perf_counter()
+            rows = sum(load_chunk(conn, table, columns) for columns in generator.chunks(name, count, make, chunk_size))
+            elapsed = time.perf_counter() - table_started_at
+            throughput[name] = rows / elapsed if elapsed else 0.0
+            total_rows += rows
+            if report:
+                report(f"{name:<20} {rows:>12,} rows {elapsed:>8.2f} s {throughput[name]:>12,.0f} rows/s")
+
+    # 一括投入は flush のフックを通らないので、顧客ごとの商談金額の集計はまとめて作る
+    CustomerValueJob(engine).rebuild(as_of=NOW.astype(datetime).replace(tzinfo=timezone.utc))
+
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE")
+
+    elapsed = time.perf_counter() - started_at
+    throughput["total"] = total_rows / elapsed if elapsed else 0.0
+    if report:
+        report(f"{'total':<20} {total_rows:>12,} rows {elapsed:>8.2f} s {throughput['total']:>12,.0f} rows/s")
+    return throughput
+
+
+def volumes_from_args(args: argparse.Namespace) -> Volumes:
+    overrides = {f.name: getattr(args, f.name) for f in fields(Volumes) if getattr(args, f.name, None) is not None}
+    return replace(PROFILES[args.profile], **overrides)
+
+
+def add_volume_arguments(parser: argparse.ArgumentParser, default_profile: str = "tiny") -> None:
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=default_profile)
+    for f in fields(Volumes):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", dest=f.name, type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="投入先の DB URL（空のデータベース）")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    add_volume_arguments(parser)
+    args = parser.parse_args(argv)
+
+    volumes = volumes_from_args(args)
+    print(f"profile={args.profile} seed={args.seed} {asdict(volumes)}")
+    engine = create_engine(args.url)
+    try:
+        generate(engine, volumes, seed=args.seed, chunk_size=args.chunk_size)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -241,3 +241,136 @@ def test_get_user_from_token_invalid_token() -> None:
     # Act & Assert: 存在しないトークン文字列を渡すと TokenError が送出される
     with pytest.raises(TokenError):
         service.get_user_from_token("invalid-token")
+
+
+"""
+概要：古いパラメータのハッシュはログイン成功時に作り直される
+条件：
+  - パスワード検証は成功する
+  - PasswordHasher.needs_rehash が True を返す
+期待：
+  - 新しいハッシュが UserRepository.update_hashed_password で保存される
+"""
+
+
+class RehashingPasswordHasher(FakePasswordHasher):
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return not hashed_password.startswith("hashed:")
+
+
+class RecordingUserRepository(FakeUserRepository):
+    def __init__(self, users_by_email: dict[str, User]) -> None:
+        super().__init__(users_by_email)
+        self.updated_hashes: dict[int, str] = {}
+
+    def update_hashed_password(self, user_id: int, hashed_password: str) -> None:
+        self.updated_hashes[user_id] = hashed_password
+
+
+def test_authenticate_rehashes_outdated_hash() -> None:
+    """needs_rehash なハッシュはログイン成功時に新しいハッシュで保存されること"""
+
+    user = make_active_user()
+    user_repo = RecordingUserRepository({user.email: user})
+    service = AuthService(
+        user_repo=user_repo,
+        password_hasher=RehashingPasswordHasher(should_match=True),
+        token_provider=FakeTokenProvider(),
+        settings=AuthSettings(access_token_expires_minutes=60),
+    )
+
+    service.authenticate(email=user.email, password="new-password")
+    assert user_repo.updated_hashes == {user.id: "hashed:new-password"}
+
+    # 2 回目は新しいハッシュなので作り直さない
+    user_repo.updated_hashes.clear()
+    service.authenticate(email=user.email, password="new-password")
+    assert user_repo.updated_hashes == {}
+
+
+"""
+概要：ステートレストークンモード
+条件：
+  - AuthSettings.stateless_tokens=True
+  - UserRepository は get_by_id を呼ばれたら失敗する
+期待：
+  - claims だけで User が復元される（DB アクセスなし）
+  - 失効リストに載っていれば AuthenticationError
+"""
+
+
+class NoLookupUserRepository(FakeUserRepository):
+    def get_by_id(self, user_id: int) -> User | None:
+        raise AssertionError("stateless mode must not hit the user repository")
+
+
+class FakeRevocationChecker:
+    def __init__(self, revoked: set[tuple[int, int]] | None = None, loaded: bool = True) -> None:
+        self.revoked = revoked or set()
+        self.loaded = loaded
+
+    def is_revoked(self, user_id: int, version: int) -> bool:
+        return (user_id, version) in self.revoked
+
+
+def make_stateless_auth_service(user: User, revocations: FakeRevocationChecker) -> AuthService:
+    return AuthService(
+        user_repo=NoLookupUserRepository({user.email: user}),
+        password_hasher=FakePasswordHasher(),
+        token_provider=FakeTokenProvider(),
+        settings=AuthSettings(access_token_expires_minutes=60, stateless_tokens=True),
+        revocations=revocations,
+    )
+
+
+def test_stateless_token_builds_user_from_claims() -> None:
+    """ステートレスモードでは claims から User が組み立てられること"""
+
+    user = make_active_user()
+    service = make_stateless_auth_service(user, FakeRevocationChecker())
+
+    token = service.create_access_token(user)
+    result = service.get_user_from_token(token.access_token)
+
+    assert result.id == user.id
+    assert result.email == user.email
+    assert list(result.roles) == [UserRoleName.ADMIN]
+    assert result.is_superuser is True
+    assert result.version == user.version
+    # 作成日時はトークンの発行時刻ではなく User の値
+    assert result.created_at == user.created_at
+    assert result.updated_at == user.updated_at
+
+
+def test_stateless_token_without_created_at_claim_falls_back_to_repository() -> None:
+    """created_at の claims がない（古い）トークンは、claims からではなく DB から User を読むこと"""
+
+    user = make_active_user()
+    service = make_stateless_auth_service(user, FakeRevocationChecker())
+    token = service.create_access_token(user)
+    del service._token_provider._stored_payload[token.access_token]["created_at"]
+
+    with pytest.raises(AssertionError, match="must not hit the user repository"):
+        service.get_user_from_token(token.access_token)
+
+
+def test_stateless_token_is_checked_against_repository_until_revocations_are_loaded() -> None:
+    """失効リストを読み込めていない間は claims を信用せず、DB から User を読むこと（失効を素通りさせない）"""
+
+    user = make_active_user()
+    service = make_stateless_auth_service(user, FakeRevocationChecker(loaded=False))
+    token = service.create_access_token(user)
+
+    with pytest.raises(AssertionError, match="must not hit the user repository"):
+        service.get_user_from_token(token.access_token)
+
+
+def test_stateless_token_revoked() -> None:
+    """失効リストに載っているユーザー / version のトークンは AuthenticationError になること"""
+
+    user = make_active_user()
+    service = make_stateless_auth_service(user, FakeRevocationChecker({(user.id, user.version)}))
+
+    token = service.create_access_token(user)
+    with pytest.raises(AuthenticationError):
+        service.get_user_from_token(token.access_token)
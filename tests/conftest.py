@@ -0,0 +1,4 @@
+import os
+
+# テストでは N+1 の疑いがあるクエリを見逃さないよう、警告ではなく例外にする
+os.environ.setdefault("APP_SQL_N_PLUS_ONE_MODE", "raise")
@@ -0,0 +1,72 @@
+# tests/infrastructure/conftest.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Iterator, Mapping, Union
+
+import pytest
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session
+
+from app.domain.customer.enums import CustomerStatus
+from app.infrastructure.db.reservation_partitions import attach_sqlite_reservation_archives
+from app.infrastructure.orm import Base, CustomerORM, ShopORM, UserORM
+
+SEEDED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def make_shop_engine(tmp_path) -> Iterator[Callable[..., Engine]]:
+    """店舗・顧客を入れた SQLite ファイル DB の engine を作る（予約や商談は各テストモジュールで足す）。
+
+    - customers: 顧客 id の列、または 顧客 id → 上書きする列（shop_id は既定で 1、created_at / updated_at は now）
+    - shops: 店舗 id（code / name は S<id> / Shop <id>）
+    - now: 行の作成日時
+    - archives: True なら予約の cold パーティション（年ごとのファイル）を ATTACH する
+    ユーザー id=1（担当者・作成者の外部キー用）も入れる。engine はテストの終わりに dispose する。
+    """
+    engines: list[Engine] = []
+
+    def make(
+        customers: Union[Iterable[int], Mapping[int, Mapping[str, Any]]] = (1,),
+        shops: Iterable[int] = (1,),
+        now: datetime = SEEDED_AT,
+        archives: bool = False,
+    ) -> Engine:
+        engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        engines.append(engine)
+        if archives:
+            attach_sqlite_reservation_archives(engine)
+        Base.metadata.create_all(engine)
+        overrides = customers if isinstance(customers, Mapping) else {customer_id: {} for customer_id in customers}
+        with Session(engine) as session:
+            session.add(UserORM(id=1, email="u@example.com", hashed_password="x", created_at=now, updated_at=now))
+            session.add_all(
+                [
+                    ShopORM(id=shop_id, code=f"S{shop_id}", name=f"Shop {shop_id}", created_at=now, updated_at=now)
+                    for shop_id in shops
+                ]
+            )
+            session.flush()
+            session.add_all(
+                [
+                    CustomerORM(
+                        **{
+                            "id": customer_id,
+                            "shop_id": 1,
+                            "name": f"C{customer_id}",
+                            "status": CustomerStatus.ACTIVE,
+                            "created_at": now,
+                            "updated_at": now,
+                            **columns,
+                        }
+                    )
+                    for customer_id, columns in overrides.items()
+                ]
+            )
+            session.commit()
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
@@ -0,0 +1,51 @@
+# tests/infrastructure/test_argon2_calibration.py
+from __future__ import annotations
+
+from app.infrastructure.security.argon2_calibration import calibrate, write_env_file
+from app.infrastructure.security.password_hasher import Argon2Params, Argon2PasswordHasher
+
+
+def fake_measure(params: Argon2Params) -> float:
+    """メモリ 1 MiB・反復 1 回あたり 1ms かかるホストを模したフェイク。"""
+    return params.time_cost * (params.memory_cost / 1024) / 1000
+
+
+def test_calibrate_prefers_memory_then_time_cost() -> None:
+    """メモリ予算内で目標に収まる最大のメモリを選び、残りを time_cost に回すこと"""
+    params = calibrate(target_seconds=0.1, max_memory_kib=64 * 1024, parallelism=2, measure=fake_measure)
+
+    # 64MiB x 1 = 64ms <= 100ms、64MiB x 2 = 128ms > 100ms
+    assert params == Argon2Params(time_cost=1, memory_cost=64 * 1024, parallelism=2)
+
+
+def test_calibrate_reduces_memory_on_slow_host() -> None:
+    """予算いっぱいのメモリでは目標を超える場合、メモリを半分ずつ減らすこと"""
+    params = calibrate(target_seconds=0.05, max_memory_kib=128 * 1024, parallelism=1, measure=fake_measure)
+
+    # 128MiB=128ms, 64MiB=64ms は超過、32MiB=32ms で収まる
+    assert params.memory_cost == 32 * 1024
+    assert params.time_cost == 1
+
+
+def test_write_env_file_keeps_other_keys(tmp_path) -> None:
+    env = tmp_path / ".env"
+    env.write_text("APP_SECRET_KEY=abc\nAPP_ARGON2_TIME_COST=1\n", encoding="utf-8")
+
+    write_env_file(env, {"APP_ARGON2_TIME_COST": "3", "APP_ARGON2_MEMORY_COST": "32768"})
+
+    assert env.read_text(encoding="utf-8").splitlines() == [
+        "APP_SECRET_KEY=abc",
+        "APP_ARGON2_TIME_COST=3",
+        "APP_ARGON2_MEMORY_COST=32768",
+    ]
+
+
+def test_needs_rehash_when_params_change() -> None:
+    """古いパラメータで作ったハッシュは needs_rehash が True になること"""
+    old = Argon2PasswordHasher(params=Argon2Params(time_cost=1, memory_cost=8 * 1024, parallelism=1))
+    new = Argon2PasswordHasher(params=Argon2Params(time_cost=2, memory_cost=8 * 1024, parallelism=1))
+    hashed = old.hash("password")
+
+    assert old.needs_rehash(hashed) is False
+    assert new.needs_rehash(hashed) is True
+    assert new.verify("password", hashed) is True
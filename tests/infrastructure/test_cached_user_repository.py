@@ -0,0 +1,129 @@
+# tests/infrastructure/test_cached_user_repository.py
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.domain.user.models import User
+from app.infrastructure.repositories.user.cached_user_repository import (
+    CachedUserRepository,
+    UserCache,
+    UserVersionStamp,
+)
+
+
+# ==========
+# テスト用の Fake 実装
+# ==========
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingUserRepository:
+    """get_by_id / get_version_stamp の呼び出し回数を数えるフェイク。"""
+
+    def __init__(self, user: User) -> None:
+        self.user = user
+        self.get_by_id_calls = 0
+        self.stamp_calls = 0
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        return self.user if self.user.email == email else None
+
+    def get_by_id(self, user_id: int) -> Optional[User]:
+        self.get_by_id_calls += 1
+        return self.user if self.user.id == user_id else None
+
+    def get_version_stamp(self, user_id: int) -> Optional[UserVersionStamp]:
+        self.stamp_calls += 1
+        return UserVersionStamp(
+            version=self.user.version,
+            updated_at=self.user.updated_at,
+            is_active=self.user.is_active,
+        )
+
+
+def make_user(user_id: int = 1) -> User:
+    now = datetime(2025, 1, 1, 10, 0, 0, tzinfo=timezone.utc)
+    return User(
+        id=user_id,
+        email=f"user{user_id}@example.com",
+        full_name="山田 太郎",
+        hashed_password="hashed",
+        is_active=True,
+        is_superuser=False,
+        timezone="Asia/Tokyo",
+        roles=[],
+        created_at=now,
+        updated_at=now,
+        version=1,
+    )
+
+
+def make_repo(user: User, clock: FakeClock, **cache_kwargs) -> tuple[CachedUserRepository, CountingUserRepository]:
+    inner = CountingUserRepository(user)
+    cache = UserCache(clock=clock, **cache_kwargs)
+    return CachedUserRepository(inner, cache=cache), inner
+
+
+def test_get_by_id_is_served_from_cache() -> None:
+    """2 回目以降の get_by_id は inner に問い合わせないこと"""
+    clock = FakeClock()
+    repo, inner = make_repo(make_user(), clock, ttl_seconds=300, active_staleness_seconds=30)
+
+    assert repo.get_by_id(1) is not None
+    assert repo.get_by_id(1) is not None
+
+    assert inner.get_by_id_calls == 1
+    assert inner.stamp_calls == 0
+
+
+def test_deactivation_is_picked_up_after_staleness_window() -> None:
+    """staleness を過ぎたら軽い再検証で is_active の変更を拾うこと"""
+    clock = FakeClock()
+    repo, inner = make_repo(make_user(), clock, ttl_seconds=300, active_staleness_seconds=30)
+    repo.get_by_id(1)
+
+    # DB 側で無効化される（version も上がる）
+    inner.user = replace(inner.user, is_active=False, version=2)
+
+    clock.now = 10
+    assert repo.get_by_id(1).is_active is True  # staleness 内なのでまだ古い値
+
+    clock.now = 31
+    assert repo.get_by_id(1).is_active is False
+    assert inner.stamp_calls == 1
+    assert inner.get_by_id_calls == 2
+
+
+def test_unchanged_user_is_revalidated_without_full_reload() -> None:
+    """version が変わっていなければ JOIN 付きの get_by_id はやり直さないこと"""
+    clock = FakeClock()
+    repo, inner = make_repo(make_user(), clock, ttl_seconds=300, active_staleness_seconds=30)
+    repo.get_by_id(1)
+
+    clock.now = 31
+    repo.get_by_id(1)
+
+    assert inner.stamp_calls == 1
+    assert inner.get_by_id_calls == 1
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    """max_size を超えたら最も使われていないユーザーから捨てること"""
+    cache = UserCache(max_size=2, clock=FakeClock())
+    cache.put(make_user(1))
+    cache.put(make_user(2))
+    cache.get(1)
+    cache.put(make_user(3))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.get(3) is not None
@@ -0,0 +1,266 @@
+# tests/infrastructure/test_cold_archive.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.application.customer.queries.get_customer_timeline_service import GetCustomerTimelineQueryService
+from app.application.customer.read_models import TimelineCursor
+from app.domain.activity.enums import ActivityType
+from app.domain.customer.enums import CustomerStatus
+from app.domain.user.models import User
+from app.infrastructure.db.cold_archive import (
+    ARCHIVE_SEGMENTS,
+    ARCHIVE_SOURCES,
+    ColdArchiveStore,
+    ColdArchiver,
+    create_archive_store,
+    _segment_values,
+    decode_segment,
+    encode_segment,
+)
+from app.infrastructure.orm import ActivityORM, AuditLogORM, Base, CustomerORM, NoteORM, ShopORM, UserORM
+from app.infrastructure.repositories.audit_log.audit_log_query_repository import SqlAlchemyAuditLogQueryRepository
+from app.infrastructure.repositories.customer.customer_timeline_repository import SqlAlchemyCustomerTimelineRepository
+
+BASE = datetime(2023, 1, 1, tzinfo=timezone.utc)
+CUTOFF = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = UserORM(email="u@example.com", hashed_password="x", created_at=BASE, updated_at=BASE)
+        shop = ShopORM(code="S1", name="Shop", created_at=BASE, updated_at=BASE)
+        session.add_all([user, shop])
+        session.flush()
+        customer = CustomerORM(
+            shop_id=shop.id, name="C", status=CustomerStatus.ACTIVE, created_at=BASE, updated_at=BASE
+        )
+        session.add(customer)
+        session.flush()
+        # 2023-01 〜 2024-06 に毎月 1 件ずつ（活動・メモ・監査ログ）
+        for month in range(18):
+            at = BASE + timedelta(days=31 * month)
+            session.add(
+                ActivityORM(
+                    customer_id=customer.id,
+                    type=ActivityType.CALL,
+                    subject=f"call {month}",
+                    created_by_user_id=user.id,
+                    created_at=at,
+                    updated_at=at,
+                )
+            )
+            session.add(
+                NoteORM(
+                    customer_id=customer.id,
+                    body=f"note {month}",
+                    created_by_user_id=user.id,
+                    created_at=at + timedelta(hours=1),
+                )
+            )
+            session.add(AuditLogORM(user_id=user.id, action=f"action {month}", created_at=at))
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def store(engine, tmp_path):
+    store = create_archive_store(f"sqlite:///{tmp_path / 'app.db'}", None, engine, codec="zlib")
+    yield store
+    store.engine.dispose()
+
+
+def _user() -> User:
+    return User(
+        id=1,
+        email="u@example.com",
+        full_name=None,
+        hashed_password="x",
+        is_active=True,
+        is_superuser=True,
+        timezone="UTC",
+        roles=[],
+        created_at=BASE,
+        updated_at=BASE,
+    )
+
+
+def _timeline(engine, store, before=None, limit=100):
+    with Session(engine) as session:
+        return SqlAlchemyCustomerTimelineRepository(session, store).fetch_customer_timeline(_user(), 1, before, limit)
+
+
+def test_segment_round_trip_keeps_types():
+    source = ARCHIVE_SOURCES["activities"]
+    row = {
+        "id": 7,
+        "customer_id": 3,
+        "type": ActivityType.VISIT,
+        "subject": "訪問",
+        "description": None,
+        "scheduled_at": None,
+        "created_by_user_id": 1,
+        "created_at": datetime(2023, 5, 1, 9, 30),
+        "updated_at": datetime(2023, 5, 1, 9, 30, tzinfo=timezone.utc),
+    }
+
+    (decoded,) = decode_segment(source, encode_segment(source, [row], "lzma"), "lzma")
+
+    assert decoded["type"] is ActivityType.VISIT
+    assert decoded["created_at"] == datetime(2023, 5, 1, 9, 30, tzinfo=timezone.utc)
+    assert decoded["description"] is None
+
+
+def test_archiver_moves_old_rows_and_timeline_reads_both(engine, store, tmp_path):
+    before_archive = [(e.kind, e.id) for e in _timeline(engine, store)]
+
+    results = ColdArchiver(engine, store, batch_size=5).archive_before(CUTOFF)
+
+    assert [(r.table, r.archived_rows) for r in results] == [("activities", 12), ("notes", 12), ("audit_logs", 12)]
+    assert (tmp_path / "app.archive.db").exists()
+    with Session(engine) as session:
+        assert session.scalar(select(func.count()).select_from(ActivityORM)) == 6
+        assert session.scalar(select(func.count()).select_from(NoteORM)) == 6
+
+    # 並び・件数は hot だけだったときと同じで、古い分は archived になる
+    timeline = _timeline(engine, store)
+    assert [(e.kind, e.id) for e in timeline] == before_archive
+    assert {e.archived for e in timeline if e.created_at < CUTOFF} == {True}
+    assert {e.archived for e in timeline if e.created_at >= CUTOFF} == {False}
+
+    # next_before 相当でさかのぼると、アーカイブ済みの分にページングで入っていける
+    page = _timeline(engine, store, before=TimelineCursor(datetime(2023, 3, 1, tzinfo=timezone.utc)), limit=3)
+    assert [(e.kind, e.body if e.kind == "note" else e.subject) for e in page] == [
+        ("note", "note 1"),
+        ("activity", "call 1"),
+        ("note", "note 0"),
+    ]
+
+    with Session(engine) as session:
+        logs = SqlAlchemyAuditLogQueryRepository(session, store).fetch_user_audit_logs(1, None, 8)
+    assert [log.action for log in logs] == [f"action {m}" for m in range(17, 9, -1)]
+    assert [log.archived for log in logs] == [False] * 6 + [True] * 2
+
+    # もう一度流しても移るものはない
+    assert sum(r.archived_rows for r in ColdArchiver(engine, store).archive_before(CUTOFF)) == 0
+
+
+def test_rows_left_in_both_places_are_not_duplicated(engine, store):
+    source = ARCHIVE_SOURCES["notes"]
+    query = select(source.table).where(source.table.c.created_at < CUTOFF)
+    with engine.connect() as conn:
+        rows = [dict(row) for row in conn.execute(query).mappings()]
+    # アーカイブへの書き込みだけ済んで、hot からの削除前に落ちた状態（2 回書いた）
+    store.write(source, rows)
+    store.write(source, rows)
+
+    timeline = _timeline(engine, store)
+
+    assert len(timeline) == 36
+    assert len({(e.kind, e.id) for e in timeline}) == 36
+    assert ColdArchiveStore(store.engine).read(source, 1, limit=3)[0]["body"] == "note 11"
+
+
+def test_paging_does_not_skip_entries_sharing_a_timestamp(engine, store):
+    # 一括取り込みで同じ日時になった活動・メモ（アーカイブされる分と hot に残る分）
+    with Session(engine) as session:
+        for at in (datetime(2023, 6, 15, tzinfo=timezone.utc), datetime(2024, 3, 15, tzinfo=timezone.utc)):
+            for i in range(3):
+                session.add(
+                    ActivityORM(
+                        customer_id=1,
+                        type=ActivityType.CALL,
+                        subject=f"import {i}",
+                        created_by_user_id=1,
+                        created_at=at,
+                        updated_at=at,
+                    )
+                )
+                session.add(NoteORM(customer_id=1, body=f"import {i}", created_by_user_id=1, created_at=at))
+        session.commit()
+    ColdArchiver(engine, store).archive_before(CUTOFF)
+    expected = [(e.kind, e.id) for e in _timeline(engine, store)]
+
+    seen: list[tuple[str, int]] = []
+    cursor = None
+    with Session(engine) as session:
+        service = GetCustomerTimelineQueryService(SqlAlchemyCustomerTimelineRepository(session, store))
+        while True:
+            page = service.get_customer_timeline(_user(), 1, before=cursor, limit=4)
+            seen += [(e.kind, e.id) for e in page.entries]
+            if page.next_before is None:
+                break
+            cursor = page.next_before
+
+    assert len(expected) == 48
+    assert seen == expected
+
+
+def test_audit_log_paging_does_not_skip_logs_sharing_a_timestamp(engine, store):
+    # 同じ日時の監査ログ（アーカイブされる分と hot に残る分）
+    with Session(engine) as session:
+        for at in (datetime(2023, 6, 15, tzinfo=timezone.utc), datetime(2024, 3, 15, tzinfo=timezone.utc)):
+            session.add_all([AuditLogORM(user_id=1, action=f"bulk {i}", created_at=at) for i in range(3)])
+        session.commit()
+    ColdArchiver(engine, store).archive_before(CUTOFF)
+
+    with Session(engine) as session:
+        repository = SqlAlchemyAuditLogQueryRepository(session, store)
+        expected = [log.id for log in repository.fetch_user_audit_logs(1, None, 100)]
+
+        seen: list[int] = []
+        before, before_id = None, None
+        while True:
+            page = repository.fetch_user_audit_logs(1, before, 4, before_id=before_id)
+            seen += [log.id for log in page]
+            if len(page) < 4:
+                break
+            before, before_id = page[-1].created_at, page[-1].id
+
+    assert len(expected) == 24
+    assert seen == expected
+
+
+def _segments(store, source_name: str) -> list[tuple[int, int]]:
+    table = ARCHIVE_SEGMENTS
+    query = (
+        select(table.c.period_start, table.c.row_count)
+        .where(table.c.source_table == source_name)
+        .order_by(table.c.period_start)
+    )
+    with store.engine.connect() as conn:
+        return [(row.period_start.year, row.row_count) for row in conn.execute(query)]
+
+
+def test_daily_runs_merge_into_one_segment_per_owner_and_year(engine, store):
+    # 毎月 1 回ジョブを回した場合（1 回ごとに 1 か月分ずつ移る）
+    for month in range(1, 13):
+        ColdArchiver(engine, store).archive_before(datetime(2023, month, 1, tzinfo=timezone.utc) + timedelta(days=31))
+
+    assert _segments(store, "notes") == [(2023, 12)]
+    assert [row["body"] for row in store.read(ARCHIVE_SOURCES["notes"], 1, limit=2)] == ["note 11", "note 10"]
+
+
+def test_compact_merges_segments_written_separately(engine, store):
+    source = ARCHIVE_SOURCES["activities"]
+    with engine.connect() as conn:
+        rows = [dict(row) for row in conn.execute(select(source.table).where(source.table.c.created_at < CUTOFF)).mappings()]
+    # 既存セグメントとまとめずに書かれた細切れのセグメント（1 行ずつ、1 行は 2 回）
+    now = datetime.now(timezone.utc)
+    store.ensure_schema()
+    with store.engine.begin() as conn:
+        conn.execute(insert(ARCHIVE_SEGMENTS), [_segment_values(source, 1, [row], "zlib", now) for row in rows + rows[:1]])
+    assert len(_segments(store, "activities")) == 13
+
+    assert store.compact() == 1
+    assert _segments(store, "activities") == [(2023, 12)]
+    assert store.compact() == 0
+    assert [row["subject"] for row in store.read(source, 1)] == [f"call {m}" for m in range(11, -1, -1)]
@@ -0,0 +1,136 @@
+# tests/infrastructure/test_customer_value.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.domain.opportunity.enums import OpportunityStatus
+from app.domain.user.models import User
+from app.infrastructure.db.customer_value import CustomerValueJob, track_customer_value
+from app.infrastructure.orm import CustomerValueAggregateORM, OpportunityORM
+from app.infrastructure.repositories.customer.customer_query_repository import SqlAlchemyCustomerQueryRepository
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture()
+def engine(make_shop_engine):
+    return make_shop_engine(customers=(1, 2), now=NOW)
+
+
+@pytest.fixture()
+def factory(engine):
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    track_customer_value(factory)
+    return factory
+
+
+def _opportunity(amount: str, status: OpportunityStatus, closed_days_ago: int, customer_id: int = 1) -> OpportunityORM:
+    return OpportunityORM(
+        customer_id=customer_id,
+        title="deal",
+        amount=Decimal(amount),
+        status=status,
+        expected_close_date=NOW - timedelta(days=closed_days_ago),
+        owner_user_id=1,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+
+def _aggregates(engine) -> dict[int, tuple[float, float, float]]:
+    with Session(engine) as session:
+        rows = session.execute(
+            select(
+                CustomerValueAggregateORM.customer_id,
+                CustomerValueAggregateORM.lifetime_value,
+                CustomerValueAggregateORM.sales_last_365d,
+                CustomerValueAggregateORM.open_pipeline_amount,
+            )
+        ).all()
+    return {row[0]: (float(row[1]), float(row[2]), float(row[3])) for row in rows}
+
+
+def test_flush_applies_deltas_for_status_amount_customer_and_delete(engine, factory):
+    with factory() as session:
+        recent = _opportunity("100", OpportunityStatus.OPEN, closed_days_ago=10)
+        old = _opportunity("50", OpportunityStatus.WON, closed_days_ago=500)
+        session.add_all([recent, old])
+        session.commit()
+        assert _aggregates(engine) == {1: (50.0, 0.0, 100.0)}
+
+        # 受注にすると進行中から外れて、累計と直近 365 日に入る
+        recent.status = OpportunityStatus.WON
+        session.commit()
+        assert _aggregates(engine) == {1: (150.0, 100.0, 0.0)}
+
+        recent.amount = Decimal("120")
+        session.commit()
+        assert _aggregates(engine) == {1: (170.0, 120.0, 0.0)}
+
+        # 別の顧客へ付け替え / 削除
+        recent.customer_id = 2
+        session.delete(old)
+        session.commit()
+        assert _aggregates(engine) == {1: (0.0, 0.0, 0.0), 2: (120.0, 120.0, 0.0)}
+
+        # ロールバックした変更は反映されない
+        recent.status = OpportunityStatus.LOST
+        session.rollback()
+        session.add(_opportunity("10", OpportunityStatus.OPEN, closed_days_ago=0, customer_id=2))
+        session.commit()
+    assert _aggregates(engine)[2] == (120.0, 120.0, 10.0)
+
+
+def test_decay_moves_window_and_matches_rebuild(engine, factory):
+    with factory() as session:
+        session.add_all(
+            [
+                _opportunity("100", OpportunityStatus.WON, closed_days_ago=10),
+                _opportunity("200", OpportunityStatus.WON, closed_days_ago=300),
+                _opportunity("40", OpportunityStatus.ON_HOLD, closed_days_ago=0),
+                _opportunity("999", OpportunityStatus.LOST, closed_days_ago=0),
+            ]
+        )
+        session.commit()
+    assert _aggregates(engine) == {1: (300.0, 300.0, 40.0)}
+
+    # 100 日後: 300 日前の受注は期間外になる
+    job = CustomerValueJob(engine)
+    later = NOW + timedelta(days=100)
+    assert job.decay(as_of=later) == 1
+    decayed = _aggregates(engine)
+    assert decayed == {1: (300.0, 100.0, 40.0)}
+    assert job.decay(as_of=later) == 0
+
+    assert job.rebuild(as_of=later) == 1
+    assert _aggregates(engine) == decayed
+
+
+def test_customer_summary_exposes_aggregates(engine, factory):
+    with factory() as session:
+        session.add(_opportunity("100", OpportunityStatus.WON, closed_days_ago=10))
+        session.commit()
+
+    user = User(
+        id=1,
+        email="u@example.com",
+        full_name=None,
+        hashed_password="x",
+        is_active=True,
+        is_superuser=True,
+        timezone="UTC",
+        roles=[],
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    with Session(engine) as session:
+        detail = SqlAlchemyCustomerQueryRepository(session).fetch_customer_detail(user, 1)
+        other = SqlAlchemyCustomerQueryRepository(session).fetch_customer_detail(user, 2)
+
+    assert (detail.summary.lifetime_value, detail.summary.sales_last_365d) == (100.0, 100.0)
+    assert other.summary.lifetime_value == 0.0 and other.summary.open_pipeline_amount == 0.0
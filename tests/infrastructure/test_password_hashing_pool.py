@@ -0,0 +1,65 @@
+# tests/infrastructure/test_password_hashing_pool.py
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.application.auth.ports import PasswordHasherBusyError
+from app.infrastructure.security import hashing_pool
+from app.infrastructure.security.hashing_pool import PooledPasswordHasher
+
+
+def test_hash_and_verify_in_process_pool() -> None:
+    """実際のプロセスプールでハッシュ生成と検証ができること"""
+    hasher = PooledPasswordHasher(max_workers=1, max_queue=0)
+    try:
+        hashed = hasher.hash("secret-password")
+        assert hasher.verify("secret-password", hashed) is True
+        assert hasher.verify("wrong-password", hashed) is False
+        assert hasher.verify("secret-password", "not-a-hash") is False
+
+        stats = hasher.stats()
+        assert stats.completed_total == 4
+        assert stats.in_flight == 0
+        assert stats.hash_seconds_max > 0
+    finally:
+        hasher.shutdown()
+
+
+def test_rejects_fast_when_queue_is_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    """実行中 + 待ちが上限に達したら、待たずに PasswordHasherBusyError になること"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_verify(params, plain_password: str, hashed_password: str) -> tuple[bool, float]:
+        started.set()
+        release.wait(timeout=5)
+        return True, 0.01
+
+    monkeypatch.setattr(hashing_pool, "_verify_in_worker", blocking_verify)
+    hasher = PooledPasswordHasher(
+        max_workers=1,
+        max_queue=0,
+        retry_after_seconds=3,
+        executor_factory=lambda n: ThreadPoolExecutor(max_workers=n),
+    )
+
+    worker = threading.Thread(target=hasher.verify, args=("pw", "hash"))
+    worker.start()
+    assert started.wait(timeout=5)
+
+    try:
+        assert hasher.stats().in_flight == 1
+        with pytest.raises(PasswordHasherBusyError) as exc_info:
+            hasher.verify("pw", "hash")
+        assert exc_info.value.retry_after_seconds == 3
+        assert hasher.stats().rejected_total == 1
+    finally:
+        release.set()
+        worker.join(timeout=5)
+        hasher.shutdown()
+
+    # 枠が空けば再び受け付ける
+    assert hasher.stats().in_flight == 0
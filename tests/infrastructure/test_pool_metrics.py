@@ -0,0 +1,59 @@
+# tests/infrastructure/test_pool_metrics.py
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.infrastructure.db.pool_metrics import InstrumentedQueuePool, PoolMetrics
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_metrics_track_checkouts_overflow_and_timeouts(engine):
+    metrics = PoolMetrics()
+    metrics.attach(engine)
+
+    first = engine.connect()
+    second = engine.connect()
+    first.execute(text("SELECT 1"))
+
+    stats = metrics.stats()
+    assert stats.checked_out == 2
+    assert stats.overflow == 1
+    assert stats.checkouts_total == 2
+    assert stats.connections_created_total == 2
+
+    # pool_size + max_overflow を使い切ったら待たされた末にタイムアウト
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    first.close()
+    second.close()
+
+    stats = metrics.stats()
+    assert stats.checked_out == 0
+    assert stats.checked_out_max == 2
+    assert stats.timeouts_total == 1
+    assert stats.wait_seconds_max >= 0.05
+
+
+def test_pool_metrics_survive_engine_dispose(engine):
+    metrics = PoolMetrics()
+    metrics.attach(engine)
+
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    assert metrics.stats().checkouts_total == 1
@@ -0,0 +1,40 @@
+# tests/infrastructure/test_read_only_session.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from app.infrastructure.db.session import ReadOnlySessionError, make_read_only_sessionmaker
+from app.infrastructure.orm import Base, UserORM
+
+
+def _make_user() -> UserORM:
+    now = datetime.now(timezone.utc)
+    return UserORM(
+        email="reader@example.com",
+        full_name="Reader",
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        timezone="Asia/Tokyo",
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def test_read_only_session_can_query_but_rejects_flush():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(bind=engine)
+    factory = make_read_only_sessionmaker(engine)
+
+    session = factory()
+    try:
+        assert session.execute(select(func.count()).select_from(UserORM)).scalar_one() == 0
+
+        session.add(_make_user())
+        with pytest.raises(ReadOnlySessionError):
+            session.flush()
+    finally:
+        session.close()
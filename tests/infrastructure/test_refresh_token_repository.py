@@ -0,0 +1,88 @@
+# tests/infrastructure/test_refresh_token_repository.py
+from __future__ import annotations
+
+from collections.abc import Generator
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.application.auth.services import AuthService, AuthSettings, RefreshTokenReuseError, TokenError
+from app.domain.user.models import User
+from app.infrastructure.orm import Base, RefreshTokenORM, UserORM
+from app.infrastructure.repositories.auth.refresh_token_repository import SqlAlchemyRefreshTokenRepository
+from app.infrastructure.repositories.user.user_query_repository import SqlAlchemyQueryUserRepository
+
+
+class FakeTokenProvider:
+    def encode(self, payload: dict, expires_in_minutes: int) -> str:
+        return f"access-{payload['sub']}"
+
+    def decode(self, token: str) -> dict:
+        raise NotImplementedError
+
+
+class NeverCalledPasswordHasher:
+    def hash(self, plain_password: str) -> str:
+        raise AssertionError("refresh must not touch the password hasher")
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        raise AssertionError("refresh must not touch the password hasher")
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return False
+
+
+@pytest.fixture()
+def session() -> Generator[Session, None, None]:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _make_service(session: Session) -> tuple[AuthService, User]:
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    session.add(UserORM(id=1, email="a@example.com", hashed_password="x", created_at=now, updated_at=now))
+    session.flush()
+
+    user_repo = SqlAlchemyQueryUserRepository(session)
+    service = AuthService(
+        user_repo=user_repo,
+        password_hasher=NeverCalledPasswordHasher(),
+        token_provider=FakeTokenProvider(),
+        settings=AuthSettings(access_token_expires_minutes=30),
+        refresh_tokens=SqlAlchemyRefreshTokenRepository(session),
+    )
+    return service, user_repo.get_by_id(1)
+
+
+def test_refresh_rotates_token(session: Session) -> None:
+    """リフレッシュすると新しいトークンが発行され、DB にはハッシュだけが残ること"""
+    service, user = _make_service(session)
+
+    first = service.create_access_token(user)
+    second = service.refresh_access_token(first.refresh_token)
+
+    assert second.access_token == "access-1"
+    assert second.refresh_token not in (None, first.refresh_token)
+
+    stored = session.execute(select(RefreshTokenORM.token_hash)).scalars().all()
+    assert len(stored) == 2
+    assert first.refresh_token not in stored
+
+
+def test_reused_refresh_token_revokes_family(session: Session) -> None:
+    """ローテーション済みのトークンを再利用すると、系列ごと失効すること"""
+    service, user = _make_service(session)
+
+    first = service.create_access_token(user)
+    second = service.refresh_access_token(first.refresh_token)
+
+    with pytest.raises(RefreshTokenReuseError):
+        service.refresh_access_token(first.refresh_token)
+
+    # 正規のクライアントが持っている最新トークンも使えなくなる
+    with pytest.raises(TokenError):
+        service.refresh_access_token(second.refresh_token)
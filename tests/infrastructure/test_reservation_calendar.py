@@ -0,0 +1,121 @@
+# tests/infrastructure/test_reservation_calendar.py
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.application.reservation.queries.get_reservation_calendar_service import GetReservationCalendarQueryService
+from app.domain.reservation.enums import ReservationStatus
+from app.domain.user.models import User
+from app.infrastructure.orm import ReservationORM
+from app.infrastructure.repositories.reservation.reservation_calendar_repository import (
+    ReservationCalendarDayCache,
+    SqlAlchemyReservationCalendarRepository,
+    bin_by_slot,
+)
+
+UTC = timezone.utc
+
+# (開始日時 UTC, ステータス)。Asia/Tokyo では 2024-03-01 の 9:10, 9:20, 10:00 と、翌日 0:30
+RESERVATIONS = [
+    (datetime(2024, 3, 1, 0, 10, tzinfo=UTC), ReservationStatus.VISITED),
+    (datetime(2024, 3, 1, 0, 20, tzinfo=UTC), ReservationStatus.CANCELED),
+    (datetime(2024, 3, 1, 1, 0, tzinfo=UTC), ReservationStatus.PAID),
+    (datetime(2024, 3, 1, 15, 30, tzinfo=UTC), ReservationStatus.PAID),
+    # New York は 2024-03-10 2:00 に夏時間へ（7:15Z = 3:15 EDT）
+    (datetime(2024, 3, 10, 7, 15, tzinfo=UTC), ReservationStatus.BEFORE_VISIT),
+]
+
+
+@pytest.fixture()
+def engine(make_shop_engine):
+    engine = make_shop_engine()
+    now = datetime(2024, 1, 1, tzinfo=UTC)
+    with Session(engine) as session:
+        for start, status in RESERVATIONS:
+            session.add(
+                ReservationORM(
+                    shop_id=1, customer_id=1, start_datetime=start, status=status.value, created_at=now, updated_at=now
+                )
+            )
+        session.commit()
+    return engine
+
+
+def _user(tz: str) -> User:
+    now = datetime.now(UTC)
+    return User(
+        id=1,
+        email="u@example.com",
+        full_name=None,
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        timezone=tz,
+        roles=[],
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def test_bin_by_slot_counts_per_slot_and_status():
+    edges = np.array(["2024-01-01T00:00", "2024-01-01T01:00", "2024-01-01T01:00", "2024-01-01T02:00"], dtype="datetime64[us]")
+    starts = np.array(
+        ["2023-12-31T23:00", "2024-01-01T00:00", "2024-01-01T00:59", "2024-01-01T01:00", "2024-01-01T02:00"],
+        dtype="datetime64[us]",
+    )
+    statuses = np.array([1, 1, 4, 3, 2])
+
+    table = bin_by_slot(starts, statuses, edges)
+
+    # 範囲外（前日・終端ちょうど）は数えない。長さ 0 の枠には何も入らない
+    assert table.tolist() == [[1, 0, 0, 1], [0, 0, 0, 0], [0, 0, 1, 0]]
+
+
+def test_calendar_buckets_in_user_timezone_and_caches_past_days(engine):
+    cache = ReservationCalendarDayCache()
+
+    with Session(engine) as session:
+        service = GetReservationCalendarQueryService(SqlAlchemyReservationCalendarRepository(session), cache)
+        week = service.get_calendar(_user("Asia/Tokyo"), 1, date(2024, 3, 1), days=7, slot_minutes=60)
+
+    first, second = week.days[:2]
+    assert len(week.days) == 7 and len(first.slots) == 24
+    nine = first.slots[9]
+    assert nine.start.isoformat() == "2024-03-01T09:00:00+09:00"
+    assert nine.counts[ReservationStatus.VISITED] == 1 and nine.counts[ReservationStatus.CANCELED] == 1
+    assert first.slots[10].counts[ReservationStatus.PAID] == 1
+    assert first.totals == {
+        ReservationStatus.BEFORE_VISIT: 0,
+        ReservationStatus.VISITED: 1,
+        ReservationStatus.PAID: 1,
+        ReservationStatus.CANCELED: 1,
+    }
+    assert second.slots[0].counts[ReservationStatus.PAID] == 1
+    assert len(cache) == 7
+
+    # 終わった日はキャッシュから返すので、DB を消しても変わらない
+    with Session(engine) as session:
+        session.execute(delete(ReservationORM))
+        session.commit()
+        service = GetReservationCalendarQueryService(SqlAlchemyReservationCalendarRepository(session), cache)
+        again = service.get_calendar(_user("Asia/Tokyo"), 1, date(2024, 3, 1), slot_minutes=60)
+    assert again.days[0].totals == first.totals
+    assert cache.hits == 1
+
+
+def test_calendar_handles_daylight_saving_gap(engine):
+    with Session(engine) as session:
+        service = GetReservationCalendarQueryService(SqlAlchemyReservationCalendarRepository(session))
+        (day,) = service.get_calendar(_user("America/New_York"), 1, date(2024, 3, 10), slot_minutes=60).days
+
+    # 2:00-3:00 は存在しないので長さ 0。3:15 EDT の予約は 3:00 の枠に入る
+    gap, three = day.slots[2], day.slots[3]
+    assert gap.start == gap.end
+    assert (three.start.hour, three.end.hour) == (3, 4)
+    assert three.counts[ReservationStatus.BEFORE_VISIT] == 1
+    assert day.totals[ReservationStatus.BEFORE_VISIT] == 1
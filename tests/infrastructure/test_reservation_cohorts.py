@@ -0,0 +1,187 @@
+# tests/infrastructure/test_reservation_cohorts.py
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.application.reservation.errors import InvalidReservationInputError
+from app.application.reservation.queries.get_cohort_retention_service import GetCohortRetentionQueryService
+from app.domain.reservation.enums import ReservationStatus
+from app.domain.user.models import User
+from app.infrastructure.db.columnar import epoch_seconds
+from app.infrastructure.orm import CustomerORM, ReservationORM
+from app.infrastructure.repositories.reservation.reservation_cohort_repository import (
+    ReservationCohortCountCache,
+    SqlAlchemyReservationCohortRepository,
+    cohort_matrix,
+)
+
+UTC = timezone.utc
+
+# 顧客 id → 登録日時（UTC）。顧客 3 は Asia/Tokyo では 2 月の登録
+CUSTOMERS = {
+    1: datetime(2024, 1, 5, tzinfo=UTC),
+    2: datetime(2024, 1, 20, tzinfo=UTC),
+    3: datetime(2024, 1, 31, 16, 0, tzinfo=UTC),
+    4: datetime(2024, 2, 10, tzinfo=UTC),
+}
+# (顧客, 来店日時 UTC, ステータス)
+RESERVATIONS = [
+    (1, datetime(2024, 1, 6, tzinfo=UTC), ReservationStatus.VISITED),
+    (1, datetime(2024, 1, 7, tzinfo=UTC), ReservationStatus.PAID),  # 同じ月の 2 回目は 1 人のまま
+    (1, datetime(2024, 2, 3, tzinfo=UTC), ReservationStatus.PAID),
+    (2, datetime(2024, 3, 1, tzinfo=UTC), ReservationStatus.VISITED),
+    (2, datetime(2024, 2, 1, tzinfo=UTC), ReservationStatus.CANCELED),  # 数えない
+    (3, datetime(2024, 2, 15, tzinfo=UTC), ReservationStatus.VISITED),
+    (4, datetime(2024, 3, 20, tzinfo=UTC), ReservationStatus.BEFORE_VISIT),  # 数えない
+]
+
+
+@pytest.fixture()
+def engine(make_shop_engine):
+    engine = make_shop_engine(
+        customers={
+            customer_id: {"created_at": created_at, "updated_at": created_at}
+            for customer_id, created_at in CUSTOMERS.items()
+        }
+    )
+    now = datetime(2024, 1, 1, tzinfo=UTC)
+    with Session(engine) as session:
+        for customer_id, start, status in RESERVATIONS:
+            session.add(
+                ReservationORM(
+                    shop_id=1,
+                    customer_id=customer_id,
+                    start_datetime=start,
+                    status=status.value,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+        session.commit()
+    return engine
+
+
+def _user(tz: str) -> User:
+    now = datetime.now(UTC)
+    return User(
+        id=1,
+        email="u@example.com",
+        full_name=None,
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        timezone=tz,
+        roles=[],
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class _CountingRepository:
+    def __init__(self, session: Session) -> None:
+        self._repo = SqlAlchemyReservationCohortRepository(session, chunk_size=2)
+        self.calls: list[int] = []
+
+    def count_cohorts(self, shop_id, month_edges, first_cohort):
+        self.calls.append(first_cohort)
+        return self._repo.count_cohorts(shop_id, month_edges, first_cohort)
+
+
+def test_cohort_matrix_dedupes_customers_and_visits_across_chunks():
+    edges = np.array([0.0, 10.0, 20.0, 30.0])
+    chunks = [
+        # (顧客, 登録, 来店)。顧客 1 は chunk をまたいで同じ月に 2 回来店
+        np.array([[1, 1.0, 2.0], [1, 1.0, 12.0]]),
+        np.array([[1, 1.0, 15.0], [2, 11.0, np.nan], [3, 12.0, 5.0], [4, 35.0, 36.0]]),
+    ]
+
+    sizes, retained = cohort_matrix(chunks, edges, first_cohort=0)
+
+    # 登録より前の月の来店・範囲外の顧客は数えない
+    assert sizes.tolist() == [1, 2, 0]
+    assert retained.tolist() == [[1, 1, 0], [0, 0, 0], [0, 0, 0]]
+
+    sizes, retained = cohort_matrix(iter(chunks), edges, first_cohort=1)
+    assert sizes.tolist() == [2, 0]
+    assert retained.tolist() == [[0, 0], [0, 0]]
+
+
+def test_epoch_seconds_rejects_unsupported_dialects():
+    with pytest.raises(ValueError, match="does not support mysql"):
+        epoch_seconds(CustomerORM.created_at, "mysql")
+
+
+def test_service_counts_cohorts_in_user_timezone_and_reuses_cache(engine):
+    cache = ReservationCohortCountCache()
+    with Session(engine) as session:
+        repo = _CountingRepository(session)
+        service = GetCohortRetentionQueryService(cohort_repo=repo, cache=cache, max_months=12)
+
+        utc = service.get_cohort_retention(_user("UTC"), 1, date(2024, 1, 15), months=3)
+        assert [(c.cohort_month, c.customers, c.retained) for c in utc.cohorts] == [
+            (date(2024, 1, 1), 3, [1, 2, 1]),
+            (date(2024, 2, 1), 1, [0, 0]),
+            (date(2024, 3, 1), 0, [0]),
+        ]
+        assert utc.cohorts[0].retention_rates == [0.3333, 0.6667, 0.3333]
+
+        tokyo = service.get_cohort_retention(_user("Asia/Tokyo"), 1, date(2024, 1, 1), months=2)
+        assert [(c.customers, c.retained) for c in tokyo.cohorts] == [(2, [1, 1]), (2, [1])]
+
+        # キャッシュから返す（短い期間は切り出す）
+        again = service.get_cohort_retention(_user("UTC"), 1, date(2024, 1, 1), months=2)
+        assert [c.retained for c in again.cohorts] == [[1, 2], [0]]
+        # 期間を延ばすと、最初に欠けているコホートから 1 回だけ数え直す
+        service.get_cohort_retention(_user("UTC"), 1, date(2024, 2, 1), months=3)
+        assert repo.calls == [0, 0, 0]
+
+        with pytest.raises(InvalidReservationInputError):
+            service.get_cohort_retention(_user("UTC"), 1, date(2024, 1, 1), months=13)
+
+
+def test_tracked_writes_invalidate_only_the_affected_cohort_after_commit(engine):
+    cache = ReservationCohortCountCache()
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    cache.track(factory)
+    with Session(engine) as session:
+        service = GetCohortRetentionQueryService(cohort_repo=_CountingRepository(session), cache=cache)
+        service.get_cohort_retention(_user("UTC"), 1, date(2024, 1, 1), months=3)
+    assert len(cache) == 3
+
+    with factory() as session:
+        # 来店前の予約の作成では捨てない
+        session.add(
+            ReservationORM(
+                shop_id=1,
+                customer_id=4,
+                start_datetime=datetime(2024, 3, 5, tzinfo=UTC),
+                status=ReservationStatus.BEFORE_VISIT.value,
+                created_at=CUSTOMERS[4],
+                updated_at=CUSTOMERS[4],
+            )
+        )
+        session.commit()
+        assert len(cache) == 3
+
+        # 2 月の顧客の来店を記録すると 2 月のコホートだけ捨てる（ロールバックしたら捨てない）
+        reservation = session.get(ReservationORM, 7)
+        reservation.status = ReservationStatus.VISITED.value
+        session.flush()
+        session.rollback()
+        assert len(cache) == 3
+
+        reservation = session.get(ReservationORM, 7)
+        reservation.status = ReservationStatus.VISITED.value
+        session.commit()
+        assert cache.get(1, "UTC", date(2024, 2, 1), date(2024, 3, 1)) is None
+        assert cache.get(1, "UTC", date(2024, 1, 1), date(2024, 3, 1)) is not None
+
+    with Session(engine) as session:
+        report = GetCohortRetentionQueryService(
+            cohort_repo=SqlAlchemyReservationCohortRepository(session), cache=cache
+        ).get_cohort_retention(_user("UTC"), 1, date(2024, 1, 1), months=3)
+    assert report.cohorts[1].retained == [0, 1]
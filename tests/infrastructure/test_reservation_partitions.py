@@ -0,0 +1,144 @@
+# tests/infrastructure/test_reservation_partitions.py
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.domain.user.models import User
+from app.infrastructure.db.reservation_partitions import (
+    ReservationCompactor,
+    get_reservation_partitions,
+    postgres_partitioning_ddl,
+    postgres_split_default_month_ddl,
+    sqlite_archive_path,
+)
+from app.infrastructure.orm import ReservationORM, ReservationVisitRollupORM
+from app.infrastructure.repositories.customer.customer_query_repository import SqlAlchemyCustomerQueryRepository
+
+RESERVATION_STARTS = [
+    datetime(2022, 3, 1, 10, 0, tzinfo=timezone.utc),
+    datetime(2022, 11, 5, 10, 0, tzinfo=timezone.utc),
+    datetime(2023, 2, 1, 10, 0, tzinfo=timezone.utc),
+    datetime(2023, 8, 1, 10, 0, tzinfo=timezone.utc),
+    datetime(2023, 12, 31, 23, 0, tzinfo=timezone.utc),
+    datetime(2025, 4, 1, 10, 0, tzinfo=timezone.utc),
+]
+
+
+@pytest.fixture()
+def engine(make_shop_engine):
+    engine = make_shop_engine(customers=(1, 2), now=datetime(2021, 1, 1, tzinfo=timezone.utc), archives=True)
+    with Session(engine) as session:
+        for i, start in enumerate(RESERVATION_STARTS):
+            session.add(
+                ReservationORM(
+                    shop_id=1,
+                    customer_id=1 + i % 2,
+                    start_datetime=start,
+                    created_at=start,
+                    updated_at=start,
+                )
+            )
+        session.commit()
+    return engine
+
+
+def _visit_summaries(engine) -> dict[int, tuple[int, datetime]]:
+    user = User(
+        id=1,
+        email="u@example.com",
+        full_name=None,
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        timezone="UTC",
+        roles=[],
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+    with Session(engine) as session:
+        repository = SqlAlchemyCustomerQueryRepository(session)
+        return {
+            customer_id: (detail.summary.visit_count, detail.summary.last_visit_at.replace(tzinfo=None))
+            for customer_id in (1, 2)
+            if (detail := repository.fetch_customer_detail(user, customer_id)) is not None
+        }
+
+
+def test_compaction_moves_whole_years_to_attached_archives(engine, tmp_path):
+    before = _visit_summaries(engine)
+
+    results = ReservationCompactor(engine, batch_size=2).compact_before(datetime(2024, 6, 1, tzinfo=timezone.utc))
+
+    assert [(r.partition, r.moved_rows) for r in results] == [("reservations_2022", 2), ("reservations_2023", 3)]
+    assert sqlite_archive_path(tmp_path / "app.db", 2022).exists()
+    with Session(engine) as session:
+        assert session.scalar(select(func.count()).select_from(ReservationORM)) == 1
+        assert session.scalar(select(func.count()).select_from(ReservationVisitRollupORM)) == 2
+
+    # 来店回数・最終来店日時は hot + rollup で変わらない
+    assert _visit_summaries(engine) == before
+
+    # もう一度流しても何も移らない
+    assert ReservationCompactor(engine).compact_before(datetime(2024, 6, 1, tzinfo=timezone.utc)) == []
+
+
+def test_compaction_rejects_unsupported_dialects():
+    mysql = SimpleNamespace(dialect=SimpleNamespace(name="mysql"))
+
+    with pytest.raises(ValueError, match="not supported on mysql"):
+        ReservationCompactor(mysql).compact_before(datetime(2024, 6, 1, tzinfo=timezone.utc))
+
+
+def test_select_between_reads_only_overlapping_partitions(engine):
+    ReservationCompactor(engine).compact_before(datetime(2024, 6, 1, tzinfo=timezone.utc))
+
+    with Session(engine) as session:
+        partitions = get_reservation_partitions(session)
+        query = partitions.select_between(
+            datetime(2023, 1, 1, tzinfo=timezone.utc), datetime(2023, 9, 1, tzinfo=timezone.utc)
+        )
+        sql = str(query.compile(engine))
+        assert "reservations_2023" in sql
+        assert "reservations_2022" not in sql
+
+        starts = [row.start_datetime for row in session.execute(query)]
+        assert sorted(s.replace(tzinfo=None) for s in starts) == [
+            datetime(2023, 2, 1, 10, 0),
+            datetime(2023, 8, 1, 10, 0),
+        ]
+
+        # 範囲をまたぐと cold と hot を UNION ALL する
+        everything = session.execute(partitions.select_between(None, None)).all()
+        assert len(everything) == len(RESERVATION_STARTS)
+
+
+def test_postgres_partitioning_ddl_creates_monthly_partitions():
+    statements = postgres_partitioning_ddl(date(2024, 11, 1), date(2025, 2, 1))
+
+    assert any("PARTITION BY RANGE (start_datetime)" in s for s in statements)
+    months = [s for s in statements if "PARTITION OF reservations FOR VALUES" in s]
+    assert [m.split()[5] for m in months] == [
+        "reservations_p2024_11",
+        "reservations_p2024_12",
+        "reservations_p2025_01",
+        "reservations_p2025_02",
+    ]
+    assert "TO ('2025-01-01T00:00:00+00:00')" in months[1]
+
+
+def test_postgres_split_default_month_moves_rows_before_attaching():
+    statements = postgres_split_default_month_ddl(2019, 12)
+
+    assert statements[0].startswith("CREATE TABLE reservations_p2019_12 (LIKE reservations")
+    # DEFAULT から範囲内の行を移してから付け替える（行が残っていると ATTACH が失敗する）
+    assert "DELETE FROM reservations_pdefault" in statements[1]
+    assert "start_datetime >= '2019-12-01T00:00:00+00:00' AND start_datetime < '2020-01-01T00:00:00+00:00'" in statements[1]
+    assert statements[2] == (
+        "ALTER TABLE reservations ATTACH PARTITION reservations_p2019_12 "
+        "FOR VALUES FROM ('2019-12-01T00:00:00+00:00') TO ('2020-01-01T00:00:00+00:00')"
+    )
@@ -0,0 +1,207 @@
+# tests/infrastructure/test_reservation_schedule.py
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.application.reservation.command_inputs import CreateReservationInput
+from app.application.reservation.commands.create_reservation_service import CreateReservationCommandService
+from app.application.reservation.errors import InvalidReservationInputError, ReservationConflictError
+from app.domain.reservation.enums import ReservationStatus
+from app.domain.reservation.models import Reservation
+from app.domain.user.models import User
+from app.infrastructure.orm import ReservationORM
+from app.infrastructure.repositories.reservation.reservation_command_repository import (
+    SqlAlchemyReservationCommandRepository,
+)
+from app.infrastructure.repositories.reservation.reservation_schedule import (
+    ReservationIndexCache,
+    ReservationScheduleView,
+    ShopIntervalIndex,
+)
+
+# テストの日時は「明日の 0 時（UTC）」からの相対で作る（過去の日時は予約できないため）
+DAY = (datetime.now(timezone.utc) + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def at(hour: float) -> datetime:
+    return DAY + timedelta(hours=hour)
+
+
+@pytest.fixture()
+def engine(make_shop_engine):
+    # 顧客 i は店舗 i の顧客
+    engine = make_shop_engine(customers={i: {"shop_id": i} for i in (1, 2)}, shops=(1, 2))
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with Session(engine) as session:
+        # 店舗 1: 10-11 時、終了日時なし（= 既定の 60 分）の 13 時、キャンセル済みの 15 時
+        for start, end, status in [
+            (at(10), at(11), ReservationStatus.BEFORE_VISIT),
+            (at(13), None, ReservationStatus.BEFORE_VISIT),
+            (at(15), at(16), ReservationStatus.CANCELED),
+        ]:
+            session.add(
+                ReservationORM(
+                    shop_id=1,
+                    customer_id=1,
+                    start_datetime=start,
+                    end_datetime=end,
+                    status=status.value,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+        session.commit()
+    return engine
+
+
+def _user() -> User:
+    now = datetime.now(timezone.utc)
+    return User(
+        id=1,
+        email="u@example.com",
+        full_name=None,
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        timezone="UTC",
+        roles=[],
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def _service(session: Session, cache: ReservationIndexCache) -> CreateReservationCommandService:
+    return CreateReservationCommandService(
+        reservation_repo=SqlAlchemyReservationCommandRepository(session),
+        schedule=ReservationScheduleView(cache, lambda shop_id: session),
+        max_duration=timedelta(hours=24),
+    )
+
+
+def _create(session: Session, cache: ReservationIndexCache, start: datetime, end: datetime, customer_id: int = 1):
+    return _service(session, cache).create_reservation(
+        _user(), CreateReservationInput(shop_id=customer_id, customer_id=customer_id, start_datetime=start, end_datetime=end)
+    )
+
+
+def test_interval_index_merges_and_answers_queries():
+    index = ShopIntervalIndex([(at(9), at(10)), (at(9.5), at(10.5)), (at(12), at(13))])
+    assert index.intervals() == [(at(9), at(10.5)), (at(12), at(13))]
+
+    # 半開区間: 10:30 ちょうどから始まる予約は重ならない
+    assert index.overlaps(at(10), at(11))
+    assert not index.overlaps(at(10.5), at(12))
+    assert not index.overlaps(at(8), at(9))
+
+    # 10:30-12:00 は 60 分なら入るが 120 分は入らないので 13 時まで進む
+    assert index.next_free_start(at(9), timedelta(minutes=60)) == at(10.5)
+    assert index.next_free_start(at(9), timedelta(minutes=120)) == at(13)
+    assert index.next_free_start(at(9), timedelta(minutes=120), until=at(14)) is None
+    assert index.free_slots(at(8), at(14), timedelta(minutes=60)) == [
+        (at(8), at(9)),
+        (at(10.5), at(12)),
+        (at(13), at(14)),
+    ]
+
+    # 隙間を埋める予約が入ると、両隣とつながって 1 つの時間帯になる
+    index.add(at(10.5), at(12))
+    assert index.intervals() == [(at(9), at(13))]
+
+
+def test_index_is_loaded_lazily_and_skips_canceled(engine):
+    cache = ReservationIndexCache()
+    with Session(engine) as session:
+        schedule = ReservationScheduleView(cache, lambda shop_id: session)
+        assert len(cache) == 0
+        free = schedule.free_slots(1, at(9), at(17), timedelta(minutes=60))
+
+    assert free == [(at(9), at(10)), (at(11), at(13)), (at(14), at(17))]
+    assert cache.get(1) is not None and cache.get(2) is None
+
+
+def test_create_reservation_checks_overlap_and_syncs_index_after_commit(engine):
+    cache = ReservationIndexCache()
+
+    with Session(engine) as session:
+        with pytest.raises(ReservationConflictError):
+            _create(session, cache, at(10.5), at(11.5))
+        # キャンセル済みの 15 時の枠には入れる
+        created = _create(session, cache, at(15), at(16))
+        assert created.id is not None and created.status is ReservationStatus.BEFORE_VISIT
+        # commit 前はインデックスに入っていない
+        assert not cache.get(1).overlaps(at(15), at(16))
+        session.commit()
+    assert cache.get(1).overlaps(at(15), at(16))
+
+    # ロールバックした予約はインデックスに入らない
+    with Session(engine) as session:
+        _create(session, cache, at(17), at(18))
+        session.rollback()
+    assert not cache.get(1).overlaps(at(17), at(18))
+
+    with Session(engine) as session, pytest.raises(InvalidReservationInputError):
+        _service(session, cache).create_reservation(
+            _user(), CreateReservationInput(shop_id=2, customer_id=1, start_datetime=at(9), end_datetime=at(10))
+        )
+
+
+def test_database_check_catches_reservations_made_elsewhere(engine):
+    cache = ReservationIndexCache()
+    with Session(engine) as session:
+        ReservationScheduleView(cache, lambda shop_id: session).overlaps(1, at(0), at(1))
+
+    # 別プロセスのワーカーが作った予約（このプロセスのインデックスには載っていない）
+    with Session(engine) as session:
+        now = datetime.now(timezone.utc)
+        session.add(
+            ReservationORM(
+                shop_id=1, customer_id=1, start_datetime=at(20), end_datetime=at(21), created_at=now, updated_at=now
+            )
+        )
+        session.commit()
+
+    with Session(engine) as session, pytest.raises(ReservationConflictError):
+        _create(session, cache, at(20.5), at(22))
+
+
+def test_concurrent_creates_for_the_same_slot_are_serialized_by_the_shop_lock(engine):
+    # 2 つのワーカー（どちらのインデックスにも相手の予約はない）が同じ枠を同時に予約する
+    first, second = Session(engine), Session(engine)
+    first_repo = SqlAlchemyReservationCommandRepository(first)
+    first_repo.lock_shop(1)
+    assert not first_repo.has_overlap(1, at(18), at(19))
+
+    result: dict[str, object] = {}
+
+    def _second_worker() -> None:
+        try:
+            _create(second, ReservationIndexCache(), at(18), at(19))
+            second.commit()
+            result["created"] = True
+        except ReservationConflictError as exc:
+            result["conflict"] = exc
+        finally:
+            second.close()
+
+    worker = threading.Thread(target=_second_worker)
+    worker.start()
+    # 2 つ目は 1 つ目がロックを持っている間、重なりの確認まで進めない
+    worker.join(timeout=0.3)
+    assert worker.is_alive()
+
+    first_repo.create(
+        Reservation.create(shop_id=1, customer_id=1, start_datetime=at(18), end_datetime=at(19))
+    )
+    first.commit()
+    first.close()
+    worker.join(timeout=5)
+
+    assert isinstance(result.get("conflict"), ReservationConflictError)
+    with Session(engine) as session:
+        starts = session.scalars(select(ReservationORM.start_datetime).where(ReservationORM.shop_id == 1)).all()
+    assert len([start for start in starts if start.replace(tzinfo=timezone.utc) == at(18)]) == 1
@@ -0,0 +1,56 @@
+# tests/infrastructure/test_revocation_list.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.infrastructure.orm import Base, UserORM
+from app.infrastructure.security.revocation import InMemoryRevocationList
+
+
+def test_refresh_loads_inactive_users_and_version_floors() -> None:
+    """非アクティブユーザーと version フロアが DB から読み込まれること"""
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(bind=engine)
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    with Session(engine) as session:
+        session.add_all(
+            [
+                UserORM(id=1, email="a@example.com", hashed_password="x", is_active=True,
+                        created_at=now, updated_at=now, version=1),
+                UserORM(id=2, email="b@example.com", hashed_password="x", is_active=False,
+                        created_at=now, updated_at=now, version=1),
+                UserORM(id=3, email="c@example.com", hashed_password="x", is_active=True,
+                        created_at=now, updated_at=now, version=3),
+            ]
+        )
+        session.commit()
+
+        revocations = InMemoryRevocationList()
+        revocations.refresh(session)
+
+    assert revocations.is_revoked(1, 1) is False
+    assert revocations.is_revoked(2, 1) is True
+    assert revocations.is_revoked(3, 2) is True
+    assert revocations.is_revoked(3, 3) is False
+
+    # プロセス内での即時失効
+    revocations.revoke_user(1)
+    assert revocations.is_revoked(1, 1) is True
+
+
+def test_failed_initial_load_leaves_the_list_unloaded() -> None:
+    """初回の読み込みに失敗しても起動は止めず、loaded は False のまま（AuthService は DB を見る）"""
+
+    def broken_session() -> Session:
+        raise RuntimeError("database is down")
+
+    revocations = InMemoryRevocationList()
+    revocations.start_background_refresh(broken_session, interval_seconds=60)
+    try:
+        assert revocations.loaded is False
+    finally:
+        revocations.stop()
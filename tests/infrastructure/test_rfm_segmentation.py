@@ -0,0 +1,104 @@
+# tests/infrastructure/test_rfm_segmentation.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.domain.customer.enums import CustomerSegment
+from app.domain.customer.segments import segment_for
+from app.domain.opportunity.enums import OpportunityStatus
+from app.domain.reservation.enums import ReservationStatus
+from app.infrastructure.db.rfm_segmentation import RfmSegmentation, quintile_scores
+from app.infrastructure.orm import CustomerORM, OpportunityORM, ReservationORM, ReservationVisitRollupORM
+
+AS_OF = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def days_ago(days: int) -> datetime:
+    return AS_OF - timedelta(days=days)
+
+
+@pytest.fixture()
+def engine(make_shop_engine):
+    engine = make_shop_engine(
+        customers={i: {"rank": rank} for i, rank in [(1, None), (2, "A"), (3, None), (4, None), (5, None)]}
+    )
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with Session(engine) as session:
+        # 1: 昨日まで 3 回来店 + 大きな受注 / 3: 300 日前に 1 回（キャンセルと as_of より後の予約は数えない）
+        # 4: アーカイブ済み（rollup の最終来店日時だけ） / 5: 5 日前に来店 + 小さな受注 / 2: 履歴なし
+        for customer_id, start, status in [
+            (1, days_ago(1), ReservationStatus.PAID),
+            (1, days_ago(20), ReservationStatus.VISITED),
+            (1, days_ago(40), ReservationStatus.PAID),
+            (3, days_ago(300), ReservationStatus.VISITED),
+            (3, days_ago(2), ReservationStatus.CANCELED),
+            (3, AS_OF + timedelta(days=3), ReservationStatus.BEFORE_VISIT),
+            (5, days_ago(5), ReservationStatus.PAID),
+        ]:
+            session.add(
+                ReservationORM(
+                    shop_id=1, customer_id=customer_id, start_datetime=start, status=status.value, created_at=now, updated_at=now
+                )
+            )
+        session.add(ReservationVisitRollupORM(customer_id=4, visit_count=7, last_visit_at=days_ago(730)))
+        for customer_id, amount, status in [
+            (1, "1000.00", OpportunityStatus.WON),
+            (5, "50.00", OpportunityStatus.WON),
+            (3, "9999.00", OpportunityStatus.LOST),
+        ]:
+            session.add(
+                OpportunityORM(
+                    customer_id=customer_id,
+                    title="deal",
+                    owner_user_id=1,
+                    amount=Decimal(amount),
+                    status=status,
+                    expected_close_date=days_ago(10),
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+        session.commit()
+    return engine
+
+
+def _ranks(engine) -> dict[int, str | None]:
+    with Session(engine) as session:
+        return {customer_id: rank for customer_id, rank in session.execute(select(CustomerORM.id, CustomerORM.rank)).all()}
+
+
+def test_quintile_scores_give_ties_the_same_score():
+    assert quintile_scores(np.array([0.0, 0.0, 50.0, 1000.0])).tolist() == [1, 1, 3, 4]
+    assert quintile_scores(np.arange(10.0)).tolist() == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+
+
+def test_segment_rules():
+    assert segment_for(5, 5, 5) is CustomerSegment.CHAMPIONS
+    assert segment_for(1, 5, 5) is CustomerSegment.AT_RISK
+    assert segment_for(5, 1, 1) is CustomerSegment.NEW
+    with pytest.raises(ValueError):
+        segment_for(0, 3, 3)
+
+
+def test_segmentation_scores_customers_and_writes_only_changes(engine):
+    result = RfmSegmentation([engine], chunk_size=2).run(as_of=AS_OF)
+
+    assert _ranks(engine) == {
+        1: CustomerSegment.CHAMPIONS.value,
+        2: None,
+        3: CustomerSegment.HIBERNATING.value,
+        4: CustomerSegment.HIBERNATING.value,
+        5: CustomerSegment.LOYAL.value,
+    }
+    assert (result.customers, result.scored, result.updated) == (5, 4, 5)
+    assert result.segments[CustomerSegment.HIBERNATING.value] == 2
+
+    # 2 回目は変わる顧客がいないので書かない
+    again = RfmSegmentation([engine]).run(as_of=AS_OF)
+    assert again.updated == 0
@@ -0,0 +1,265 @@
+# tests/infrastructure/test_sharding.py
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.application.customer.query_filter import CustomerFilter
+from app.domain.activity.enums import ActivityType
+from app.domain.customer.enums import CustomerStatus
+from app.domain.customer.models import Customer
+from app.domain.user.models import User
+from app.infrastructure.db.cold_archive import ColdArchiver, ColdArchiveStore, _archive_targets
+from app.infrastructure.db.reservation_partitions import (
+    ReservationCompactor,
+    attach_sqlite_reservation_archives,
+    get_reservation_partitions,
+)
+from app.infrastructure.db.session import make_shard
+from app.infrastructure.db.sharding import (
+    ShardRouter,
+    ShardSessions,
+    ShopRebalancer,
+    create_shard_schema,
+    sync_reference_tables,
+)
+from app.infrastructure.orm import ActivityORM, Base, CustomerORM, ReservationORM, ShopORM, UserORM
+from app.infrastructure.repositories.customer.sharded_customer_repository import (
+    ShardedCustomerCommandRepository,
+    ShardedCustomerQueryRepository,
+    ShardedCustomerTimelineRepository,
+)
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+SHOPS = 4
+CUSTOMERS_PER_SHOP = 3
+
+
+@pytest.fixture()
+def router(tmp_path):
+    engines = [create_engine(f"sqlite:///{tmp_path / f'shard{i}.db'}") for i in range(3)]
+    for engine in engines:
+        attach_sqlite_reservation_archives(engine)
+    Base.metadata.create_all(engines[0])
+    with Session(engines[0]) as session:
+        session.add(UserORM(email="u@example.com", hashed_password="x", created_at=NOW, updated_at=NOW))
+        session.add_all(
+            [
+                ShopORM(id=shop_id, code=f"S{shop_id}", name=f"Shop {shop_id}", created_at=NOW, updated_at=NOW)
+                for shop_id in range(1, SHOPS + 1)
+            ]
+        )
+        session.commit()
+    for engine in engines[1:]:
+        create_shard_schema(engine)
+
+    router = ShardRouter([make_shard(engine) for engine in engines], id_block_size=5)
+    sync_reference_tables(router)
+
+    # 店舗 s はシャード s % 3 に置き、顧客を作る（ID はディレクトリから払い出す）。1 件 = 1 リクエスト相当
+    for shop_id in range(1, SHOPS + 1):
+        router.place_shop(shop_id, shop_id % router.shard_count)
+    for shop_id in range(1, SHOPS + 1):
+        for i in range(CUSTOMERS_PER_SHOP):
+            sessions = ShardSessions(router)
+            customer = ShardedCustomerCommandRepository(sessions).create(
+                Customer(
+                    id=None,
+                    shop_id=shop_id,
+                    email=f"c{shop_id}-{i}@example.com",
+                    name=f"C{shop_id}-{i}",
+                    status=CustomerStatus.ACTIVE,
+                    assigned_to_user_id=None,
+                    created_at=NOW,
+                    updated_at=NOW,
+                )
+            )
+            session = sessions.for_shop(shop_id)
+            session.add(
+                ReservationORM(
+                    shop_id=shop_id, customer_id=customer.id, start_datetime=NOW, created_at=NOW, updated_at=NOW
+                )
+            )
+            session.add(
+                ActivityORM(
+                    customer_id=customer.id,
+                    type=ActivityType.CALL,
+                    subject="call",
+                    created_by_user_id=1,
+                    created_at=NOW,
+                    updated_at=NOW,
+                )
+            )
+            sessions.commit()
+            sessions.close()
+
+    yield router
+    router.dispose()
+    for engine in engines:
+        engine.dispose()
+
+
+def _user() -> User:
+    return User(
+        id=1,
+        email="u@example.com",
+        full_name=None,
+        hashed_password="x",
+        is_active=True,
+        is_superuser=True,
+        timezone="UTC",
+        roles=[],
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+
+def _customer_counts(router: ShardRouter) -> list[int]:
+    return router.fan_out(lambda session: session.scalar(select(func.count()).select_from(CustomerORM)))
+
+
+def test_customers_are_placed_by_shop_and_ids_are_unique_across_shards(router):
+    assert _customer_counts(router) == [3, 6, 3]  # shop 3 / shops 1, 4 / shop 2
+
+    ids = router.fan_out(lambda session: list(session.scalars(select(CustomerORM.id))))
+    flat = [customer_id for shard_ids in ids for customer_id in shard_ids]
+    assert sorted(flat) == list(range(1, SHOPS * CUSTOMERS_PER_SHOP + 1))
+
+
+def test_cross_shard_list_merges_in_id_order(router):
+    repository = ShardedCustomerQueryRepository(router)
+
+    total, first_page = repository.fetch_customer_summaries(_user(), CustomerFilter(), 5, 0)
+    _, second_page = repository.fetch_customer_summaries(_user(), CustomerFilter(), 5, 5)
+    assert total == SHOPS * CUSTOMERS_PER_SHOP
+    assert [s.id for s in first_page + second_page] == list(range(1, 11))
+    assert {s.shop_name for s in first_page} == {"Shop 1", "Shop 2"}
+    assert all(s.visit_count == 1 for s in first_page)
+
+    total, shop_page = repository.fetch_customer_summaries(_user(), CustomerFilter(shop_id=2), 20, 0)
+    assert total == CUSTOMERS_PER_SHOP
+    assert {s.shop_id for s in shop_page} == {2}
+
+    detail = repository.fetch_customer_detail(_user(), 8)
+    assert detail is not None and detail.summary.shop_id == 3
+    assert repository.fetch_customer_detail(_user(), 999) is None
+
+
+def test_rebalancer_moves_shop_with_its_children(router):
+    result = ShopRebalancer(router, batch_size=2).move_shop(shop_id=4, target=2)
+
+    assert (result.source, result.target) == (1, 2)
+    assert result.rows["customers"] == CUSTOMERS_PER_SHOP
+    assert result.rows["reservations"] == CUSTOMERS_PER_SHOP
+    assert result.rows["activities"] == CUSTOMERS_PER_SHOP
+    assert router.shard_for(4) == 2
+    assert _customer_counts(router) == [3, 3, 6]
+
+    # 移した店舗の顧客も、一覧・詳細・更新の経路でそのまま見つかる
+    repository = ShardedCustomerQueryRepository(router)
+    _, summaries = repository.fetch_customer_summaries(_user(), CustomerFilter(shop_id=4), 20, 0)
+    assert [s.visit_count for s in summaries] == [1, 1, 1]
+
+    sessions = ShardSessions(router)
+    customer = ShardedCustomerCommandRepository(sessions).get_by_id(summaries[0].id)
+    assert customer is not None and customer.shop_id == 4
+    sessions.close()
+
+
+def test_rebalancer_moves_the_shops_cold_reservations_too(router):
+    # シャード 1（shops 1, 4）の 2025 年の予約を cold パーティションへ
+    ReservationCompactor(router.shards[1].engine).compact_before(datetime(2026, 6, 1, tzinfo=timezone.utc))
+
+    result = ShopRebalancer(router, batch_size=2).move_shop(shop_id=4, target=2)
+
+    assert result.rows["reservations"] == 0
+    assert result.rows["reservations_2025.reservations"] == CUSTOMERS_PER_SHOP
+    assert result.rows["reservation_visit_rollups"] == CUSTOMERS_PER_SHOP
+
+    # hot + cold の予約は、移した店舗の分がコピー先にだけある
+    def shops_with_reservations(session: Session) -> list[int]:
+        query = get_reservation_partitions(session).select_between(None, None)
+        return sorted(row.shop_id for row in session.execute(query))
+
+    assert router.fan_out(shops_with_reservations) == [[3] * 3, [1] * 3, [2] * 3 + [4] * 3]
+
+
+def test_existing_shops_stay_on_shard_0_and_new_shops_get_an_explicit_placement(tmp_path):
+    engines = [create_engine(f"sqlite:///{tmp_path / f'placement{i}.db'}") for i in range(2)]
+    Base.metadata.create_all(engines[0])
+    with Session(engines[0]) as session:
+        session.add_all(
+            [ShopORM(id=shop_id, code=f"S{shop_id}", name="Shop", created_at=NOW, updated_at=NOW) for shop_id in (1, 2, 3)]
+        )
+        session.commit()
+    router = ShardRouter([make_shard(engine) for engine in engines])
+
+    # シャーディング前からの店舗は、割り当てがなくても init のあとも、データのあるシャード 0
+    assert router.shard_for(3) == 0
+    assert router.pin_existing_shops() == 3
+    assert router.pin_existing_shops() == 0
+    assert [router.shard_for(shop_id) for shop_id in (1, 2, 3)] == [0, 0, 0]
+
+    # 新しい店舗は割り当ての少ないシャードへ。2 回目は同じ置き場所を返す
+    assert router.place_shop(4) == 1
+    assert router.place_shop(4) == 1
+    assert router.place_shop(5, shard=0) == 0
+    with pytest.raises(ValueError):
+        router.place_shop(6, shard=2)
+
+    # シャードを足しても、割り当て済みの店舗の行き先は変わらない
+    engines.append(create_engine(f"sqlite:///{tmp_path / 'placement2.db'}"))
+    grown = ShardRouter([make_shard(engine) for engine in engines])
+    assert [grown.shard_for(shop_id) for shop_id in (1, 2, 3, 4, 5)] == [0, 0, 0, 1, 0]
+    assert grown.place_shop(6) == 2
+
+    router.dispose()
+    grown.dispose()
+    for engine in engines:
+        engine.dispose()
+
+
+def test_archive_job_moves_every_shards_rows_into_one_shared_store(router, tmp_path):
+    store_engine = create_engine(f"sqlite:///{tmp_path / 'archive.db'}")
+    store = ColdArchiveStore(store_engine)
+    database = SimpleNamespace(engine=router.directory.engine, shard_router=router)
+
+    # audit_logs はシャード 0 にしかない
+    targets = _archive_targets(database, None)
+    assert [(shard, tables) for shard, _, tables in targets] == [
+        (0, ["activities", "notes", "audit_logs"]),
+        (1, ["activities", "notes"]),
+        (2, ["activities", "notes"]),
+    ]
+    archived = [
+        sum(result.archived_rows for result in ColdArchiver(engine, store).archive_before(NOW + timedelta(days=1), tables))
+        for _, engine, tables in targets
+    ]
+    assert archived == [3, 6, 3]
+
+    # シャード 2 の店舗（shop 2）の顧客のアーカイブも、タイムラインから読める
+    entries = ShardedCustomerTimelineRepository(router, store).fetch_customer_timeline(_user(), 4, None, 10)
+    assert entries is not None and [(entry.kind, entry.archived) for entry in entries] == [("activity", True)]
+    store_engine.dispose()
+
+
+def test_concurrent_fan_outs_do_not_queue_behind_each_other(router):
+    # 3 リクエストが同時に全シャード（3 つ）へ問い合わせる: 9 本の問い合わせが同時に走れること
+    requests = 3
+    barrier = threading.Barrier(requests * router.shard_count, timeout=5)
+
+    def query(session: Session) -> int:
+        barrier.wait()
+        return session.scalar(select(func.count()).select_from(CustomerORM))
+
+    with ThreadPoolExecutor(max_workers=requests) as pool:
+        results = list(pool.map(lambda _: router.fan_out(query), range(requests)))
+
+    assert router.fan_out_workers >= requests * router.shard_count
+    assert [sum(counts) for counts in results] == [SHOPS * CUSTOMERS_PER_SHOP] * requests
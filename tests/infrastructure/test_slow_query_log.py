@@ -0,0 +1,46 @@
+# tests/infrastructure/test_slow_query_log.py
+from __future__ import annotations
+
+from concurrent.futures import Executor, Future
+
+from sqlalchemy import create_engine, text
+
+from app.infrastructure.db.slow_query_log import SlowQueryLog, normalize_sql, parameter_shape
+
+
+class ImmediateExecutor(Executor):
+    """EXPLAIN をテスト内で同期的に実行する Executor。"""
+
+    def submit(self, fn, *args, **kwargs):
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def test_normalize_sql_collapses_literals_and_in_lists():
+    assert normalize_sql("SELECT *  FROM t\n WHERE a = 'x' AND b IN (?, ?, ?) AND c = 10") == (
+        "SELECT * FROM t WHERE a = ? AND b IN (?) AND c = ?"
+    )
+    assert parameter_shape({"customer_id": 1, "keyword_like": "%a%"}) == {"customer_id": "int", "keyword_like": "str"}
+
+
+def test_slow_queries_are_deduplicated_and_explained():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    # 閾値 0 ms = すべての SQL をスロークエリとして扱う
+    slow_log = SlowQueryLog(threshold_ms=0, sample_rate=0.0, explain_executor=ImmediateExecutor())
+    slow_log.attach(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)"))
+        for i in range(3):
+            conn.execute(text("SELECT name FROM t WHERE id = :id"), {"id": i})
+
+    top = slow_log.report(limit=10)
+    select_entry = next(e for e in top if e.normalized_sql.startswith("SELECT name FROM t"))
+
+    assert select_entry.count == 3
+    assert select_entry.parameter_shape == ["int"]
+    # SQLite の EXPLAIN QUERY PLAN が取れている（主キー検索）
+    assert select_entry.plan is not None
+    assert any("t" in line for line in select_entry.plan)
+    assert len({e.fingerprint for e in top}) == len(top)
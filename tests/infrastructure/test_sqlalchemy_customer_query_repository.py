@@ -286,3 +286,35 @@ def test_fetch_customer_summaries_filter_by_status(session: Session):
     assert total_count == 2
     emails = {c.email for c in items}
     assert emails == {"customer1@example.com", "customer2@example.com"}
+
+
+def test_fetch_customer_summaries_filter_by_keyword_and_shop_with_paging(session: Session):
+    """キーワード + 店舗のフィルタとページングが組み立て済みステートメントでも効くことのテスト。"""
+    current_user = _insert_sample_data(session)
+    repo = SqlAlchemyCustomerQueryRepository(session=session)
+    shop1_id = session.query(ShopORM.id).filter(ShopORM.name == "渋谷店").scalar()
+
+    filters = CustomerFilter(
+        page=1,
+        page_size=1,
+        status=None,
+        keyword="example.com",
+        shop_id=shop1_id,
+        assigned_to_user_id=None,
+    )
+
+    total_count, first_page = repo.fetch_customer_summaries(
+        current_user=current_user, filters=filters, limit=1, offset=0
+    )
+    _, second_page = repo.fetch_customer_summaries(current_user=current_user, filters=filters, limit=1, offset=1)
+
+    # 渋谷店の顧客は customer1, customer2 の 2 件。1 件ずつ別のページに出る
+    assert total_count == 2
+    assert len(first_page) == len(second_page) == 1
+    assert {first_page[0].email, second_page[0].email} == {"customer1@example.com", "customer2@example.com"}
+
+    # キーワードに一致しなければ 0 件
+    filters.keyword = "no-such-customer"
+    total_count, items = repo.fetch_customer_summaries(current_user=current_user, filters=filters, limit=10, offset=0)
+    assert total_count == 0
+    assert items == []
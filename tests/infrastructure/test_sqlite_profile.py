@@ -0,0 +1,23 @@
+# tests/infrastructure/test_sqlite_profile.py
+from __future__ import annotations
+
+from sqlalchemy import create_engine, text
+
+from app.infrastructure.db.sqlite_profile import SqliteOptimizer, SqliteProfile, apply_sqlite_profile
+
+
+def test_profile_pragmas_are_applied_on_connect(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    apply_sqlite_profile(engine, SqliteProfile(busy_timeout_ms=1234, cache_size_kib=2048))
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar_one() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar_one() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA temp_store")).scalar_one() == 2  # MEMORY
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar_one() == 1234
+            assert conn.execute(text("PRAGMA cache_size")).scalar_one() == -2048
+
+        # PRAGMA optimize は例外なく流せる
+        SqliteOptimizer(engine, interval_seconds=3600).optimize()
+    finally:
+        engine.dispose()
@@ -0,0 +1,72 @@
+# tests/infrastructure/test_token_cache.py
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+import pytest
+
+from app.infrastructure.security.token_cache import CachingTokenProvider, VerifiedTokenCache
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingTokenProvider:
+    """decode の呼び出し回数を数え、exp=1000 のペイロードを返すフェイク。"""
+
+    def __init__(self) -> None:
+        self.decode_calls = 0
+
+    def encode(self, payload: Mapping[str, Any], expires_in_minutes: int) -> str:
+        return "token"
+
+    def decode(self, token: str) -> Mapping[str, Any]:
+        self.decode_calls += 1
+        if token == "bad-token":
+            raise ValueError("invalid token")
+        return {"sub": "1", "exp": 1000}
+
+
+def test_decode_is_cached_until_exp() -> None:
+    """exp までは inner.decode を呼ばず、exp を過ぎたら再検証すること"""
+    clock = FakeClock(now=100)
+    inner = CountingTokenProvider()
+    provider = CachingTokenProvider(inner, cache=VerifiedTokenCache(clock=clock))
+
+    assert provider.decode("token")["sub"] == "1"
+    assert provider.decode("token")["sub"] == "1"
+    assert inner.decode_calls == 1
+
+    clock.now = 1000
+    provider.decode("token")
+    assert inner.decode_calls == 2
+
+
+def test_invalid_token_is_not_cached() -> None:
+    """検証に失敗したトークンはキャッシュされず、毎回例外になること"""
+    inner = CountingTokenProvider()
+    cache = VerifiedTokenCache(clock=FakeClock(now=100))
+    provider = CachingTokenProvider(inner, cache=cache)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            provider.decode("bad-token")
+
+    assert inner.decode_calls == 2
+    assert len(cache) == 0
+
+
+def test_cache_is_bounded() -> None:
+    """max_size を超えたら古いものから捨てること"""
+    cache = VerifiedTokenCache(max_size=2, clock=FakeClock(now=100))
+    for i in range(5):
+        cache.put(cache.digest(f"token-{i}"), {"exp": 1000})
+
+    assert len(cache) == 2
+    assert cache.get(cache.digest("token-4")) is not None
+    assert cache.get(cache.digest("token-0")) is None
@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.metrics import CallbackCounter, Histogram, hdr_buckets
+from app.main import app
+
+
+def test_histogram_merges_per_thread_shards():
+    histogram = Histogram("latency_seconds", "test", buckets=hdr_buckets(min_value=0.001, octaves=4))
+
+    def record() -> None:
+        for _ in range(1000):
+            histogram.observe(0.0015, (("route", "/x"),))
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    lines = list(histogram.render())
+    assert 'latency_seconds_count{route="/x"} 4000' in lines
+    assert 'latency_seconds_bucket{route="/x",le="0.001"} 0' in lines
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4000' in lines
+
+
+def test_callback_counter_is_exported_as_counter():
+    counter = CallbackCounter("pool_rejected_total", "test", lambda: [((), 3)])
+
+    assert list(counter.render()) == [
+        "# HELP pool_rejected_total test",
+        "# TYPE pool_rejected_total counter",
+        "pool_rejected_total 3",
+    ]
+
+
+def test_metrics_endpoint_reports_route_templates(monkeypatch: pytest.MonkeyPatch):
+    # 他のテストモジュールが差し込んだ get_current_user の override を外し、認証で弾かれる（DB を読まない）ようにする
+    monkeypatch.setattr(app, "dependency_overrides", {})
+    client = TestClient(app)
+    resp = client.get("/api/customers/999999")  # 認証なし → 401 だがルートは記録される
+    assert resp.status_code == 401
+
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'route="/api/customers/{customer_id}"' in body
+    assert "http_requests_in_flight" in body
+    assert "http_responses_total" in body
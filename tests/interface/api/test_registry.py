@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.infrastructure.db.session import SessionLocal
+from app.interface.api.auth.deps import get_auth_service
+from app.interface.api.registry import ProviderRegistry, get_registry, init_registry
+
+
+def test_auth_service_reuses_registry_components():
+    registry = ProviderRegistry.build(settings, SessionLocal)
+    db = Session()
+    try:
+        first = get_auth_service(db=db, registry=registry)
+        second = get_auth_service(db=db, registry=registry)
+
+        # ステートレスな部品は使い回し、リポジトリだけがリクエストごとに作られる
+        assert first._password_hasher is second._password_hasher is registry.password_hasher
+        assert first._token_provider is second._token_provider is registry.token_provider
+        assert first._settings is second._settings is registry.auth_settings
+        assert first._user_repo is not second._user_repo
+    finally:
+        db.close()
+        registry.shutdown()
+
+
+def test_init_registry_builds_once_per_app():
+    app = FastAPI()
+    try:
+        registry = init_registry(app)
+        assert init_registry(app) is registry
+        assert app.state.registry is registry
+    finally:
+        app.state.registry.shutdown()
+
+
+def test_get_registry_starts_a_lazily_built_registry():
+    # lifespan を通らなくても、失効リストの読み込みなどの start() が走る（2 回目以降は何もしない）
+    app = FastAPI()
+    try:
+        registry = get_registry(SimpleNamespace(app=app))
+        assert registry._started
+        assert get_registry(SimpleNamespace(app=app)) is registry
+        registry.start()
+    finally:
+        app.state.registry.shutdown()
@@ -0,0 +1,45 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.infrastructure.db.query_stats import NPlusOneQueryError, QueryInstrumentation
+from app.interface.api.sql_timing import SqlTimingMiddleware
+
+
+def _make_client() -> TestClient:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    QueryInstrumentation(n_plus_one_threshold=3, n_plus_one_mode="raise").attach(engine)
+
+    app = FastAPI()
+    app.add_middleware(SqlTimingMiddleware, enabled=True)
+
+    @app.get("/two-queries")
+    def two_queries() -> dict:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"ok": True}
+
+    @app.get("/n-plus-one")
+    def n_plus_one() -> dict:
+        with engine.connect() as conn:
+            for i in range(5):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_server_timing_header_reports_query_count():
+    resp = _make_client().get("/two-queries")
+
+    assert resp.status_code == 200
+    server_timing = resp.headers["server-timing"]
+    assert server_timing.startswith("db;dur=")
+    assert 'desc="2 queries"' in server_timing
+
+
+def test_n_plus_one_raises_in_raise_mode():
+    with pytest.raises(NPlusOneQueryError):
+        _make_client().get("/n-plus-one")
@@ -0,0 +1,51 @@
+# tests/interface/test_startup_importtime.py
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# import app.main で app 配下のモジュール自身にかかってよい時間（子モジュールを除く self 時間の合計）
+APP_IMPORT_BUDGET_US = 400_000
+
+# import 時に読み込まれてはいけない重いモジュール（最初に使うときまで遅らせる）
+DEFERRED_MODULES = ("jwt", "pwdlib", "argon2", "numpy")
+
+
+def _run_importtime(tmp_path: Path, code: str) -> subprocess.CompletedProcess:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("APP_")}
+    env["PYTHONPATH"] = str(ROOT)
+    # .env も APP_* もない状態で import できること（Settings は import 時に作らない）
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_app_main_is_lazy_and_within_budget(tmp_path):
+    result = _run_importtime(
+        tmp_path,
+        "import sys, app.main, app.infrastructure.db.session as s;"
+        f"print([m for m in {DEFERRED_MODULES!r} if m in sys.modules]);"
+        "print(s._database is None)",
+    )
+    loaded_heavy, database_is_none = result.stdout.splitlines()
+
+    assert loaded_heavy == "[]"
+    assert database_is_none == "True"
+
+    app_self_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.split(":", 1)[1].split("|")
+        if name.strip().startswith("app"):
+            app_self_us += int(self_us)
+    assert app_self_us < APP_IMPORT_BUDGET_US